@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Alert Outbox - Persistent, asynchronous delivery for Telegram/Discord alerts
+
+Purpose:
+- Take HTTP out of the detectors' cycle: BaseNotifier enqueues a ready-to-send payload
+  into a SQLite outbox and returns at once, instead of blocking on requests.post()
+  (up to 10s per call, plus Retry-After sleeps) inside detect_all()
+- One sender thread per channel (telegram, discord), so a slow Telegram does not
+  hold back the Discord copy of the same alert
+- Per-destination token buckets (ALERT_OUTBOX_*_RATE_PER_SEC) keep bursts under the
+  Telegram/Discord limits; a 429 reschedules the row for Retry-After instead of sleeping
+- Pooled HTTP: each sender thread keeps one requests.Session (keep-alive, one TLS handshake)
+- Persistent: queued alerts survive a restart; any process using the outbox drains rows
+  left behind. Rows are claimed atomically, so several processes can share the file
+- End-to-end latency (enqueue -> HTTP 2xx) is reported to service_health as the
+  'alert_latency_ms' metric of the sending service
+
+Only the route ('main' / 'debug') is stored, never the bot token or webhook URL; the
+sender resolves the URL from config when it delivers.
+
+Usage:
+    from alert_outbox import get_alert_outbox
+
+    outbox = get_alert_outbox()            # starts the sender threads on first use
+    outbox.enqueue('telegram', 'main', payload, chat_id=channel_id)
+
+    python3 alert_outbox.py                # show queue status
+
+Date: 2026-10-16
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+
+import alert_provenance
+import config
+from kite_rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ('telegram', 'discord')
+ROUTES = ('main', 'debug')
+
+HTTP_TIMEOUT_SEC = 10
+CLAIM_TIMEOUT_SEC = 60          # a 'sending' row older than this belongs to a dead sender
+MAX_BACKOFF_SEC = 60
+BATCH_SIZE = 50
+IDLE_WAIT_SEC = 1.0
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS alert_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        channel TEXT NOT NULL,              -- telegram | discord
+        route TEXT NOT NULL,                -- main | debug
+        chat_id TEXT,                       -- telegram only
+        payload TEXT NOT NULL,              -- JSON body, sent as-is
+        service TEXT,
+        status TEXT NOT NULL DEFAULT 'pending',   -- pending | sending | sent | failed
+        attempts INTEGER NOT NULL DEFAULT 0,
+        enqueued_at REAL NOT NULL,          -- epoch seconds
+        next_attempt_at REAL NOT NULL,
+        claimed_at REAL,
+        sent_at REAL,
+        last_error TEXT
+    )
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS idx_outbox_due ON alert_outbox(channel, status, next_attempt_at)"
+
+
+def resolve_url(channel: str, route: str) -> Optional[str]:
+    """
+    Resolve the delivery URL for a channel/route from config.
+
+    Debug routes fall back to the main bot / webhook, as BaseNotifier does.
+
+    Args:
+        channel: 'telegram' or 'discord'
+        route: 'main' or 'debug'
+
+    Returns:
+        URL to POST to, or None if the route is not configured
+    """
+    if channel == 'telegram':
+        token = config.TELEGRAM_BOT_TOKEN
+        if route == 'debug':
+            token = config.TELEGRAM_DEBUG_BOT_TOKEN or config.TELEGRAM_BOT_TOKEN
+        return f"{config.TELEGRAM_API_BASE}/bot{token}/sendMessage" if token else None
+    if channel == 'discord':
+        if route == 'debug':
+            return config.DISCORD_DEBUG_WEBHOOK_URL or config.DISCORD_WEBHOOK_URL
+        return config.DISCORD_WEBHOOK_URL
+    return None
+
+
+def _retry_after(response) -> float:
+    """Seconds to wait after a 429 (Retry-After header, else the JSON body)."""
+    header = response.headers.get('Retry-After')
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+    try:
+        body = response.json()
+    except ValueError:
+        return 5.0
+    if 'retry_after' in body:                                    # Discord
+        return float(body['retry_after'])
+    return float(body.get('parameters', {}).get('retry_after', 5))  # Telegram
+
+
+def _report_to_service_health(service: str, metric: str, value: float):
+    """Default metric sink: the shared service_health tracker."""
+    from service_health import get_health_tracker
+    get_health_tracker().report_metric(service, metric, value)
+
+
+class AlertOutbox:
+    """
+    SQLite-backed alert queue with background per-channel senders.
+
+    enqueue() is safe from any thread and costs one small local commit. start() runs
+    one sender thread per channel; process_due() is the sender's single pass and can
+    be driven directly (tests, one-shot scripts).
+    """
+
+    def __init__(self, db_path: str = None, url_resolver: Callable[[str, str], Optional[str]] = resolve_url,
+                 session_factory: Callable = requests.Session, clock: Callable[[], float] = time.time,
+                 metric_reporter: Optional[Callable[[str, str, float], None]] = None):
+        """
+        Initialize the outbox (creates the table; does not start the senders).
+
+        Args:
+            db_path: SQLite file (default: config.ALERT_OUTBOX_DB_PATH)
+            url_resolver: (channel, route) -> URL, injectable for tests
+            session_factory: Builds the pooled HTTP session of each sender
+            clock: Wall clock in epoch seconds, injectable for tests
+            metric_reporter: (service, metric, value) sink for delivery latency
+                             (default: service_health)
+        """
+        self.db_path = db_path or config.ALERT_OUTBOX_DB_PATH
+        self._url_resolver = url_resolver
+        self._session_factory = session_factory
+        self._clock = clock
+        self._report_metric = metric_reporter or _report_to_service_health
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._wake = {channel: threading.Event() for channel in CHANNELS}
+        self._stop = threading.Event()
+        self._threads = []
+        self.stats = {'enqueued': 0, 'sent': 0, 'failed': 0, 'retried': 0,
+                      'last_latency_ms': None, 'max_latency_ms': 0.0}
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_INDEX)
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def enqueue(self, channel: str, route: str, payload: Dict, chat_id: str = None) -> int:
+        """
+        Queue one message for delivery.
+
+        Args:
+            channel: 'telegram' or 'discord'
+            route: 'main' or 'debug' (selects bot token / webhook at send time)
+            payload: JSON body to POST (already stamped and formatted)
+            chat_id: Telegram chat (used as the rate-limit key)
+
+        Returns:
+            Outbox row id
+        """
+        if channel not in CHANNELS or route not in ROUTES:
+            raise ValueError(f"Unknown outbox destination: {channel}/{route}")
+        now = self._clock()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO alert_outbox (channel, route, chat_id, payload, service, enqueued_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (channel, route, chat_id, json.dumps(payload), alert_provenance.get_service(), now, now))
+            self._conn.commit()
+            self.stats['enqueued'] += 1
+        self._wake[channel].set()
+        return cursor.lastrowid
+
+    # ------------------------------------------------------------------
+    # Sender side
+    # ------------------------------------------------------------------
+
+    def _bucket(self, channel: str, rate_key: str) -> TokenBucket:
+        """Token bucket for one destination (chat / webhook route)."""
+        bucket = self._buckets.get(rate_key)
+        if bucket is None:
+            if channel == 'telegram':
+                rate, burst = config.ALERT_OUTBOX_TELEGRAM_RATE_PER_SEC, config.ALERT_OUTBOX_TELEGRAM_BURST
+            else:
+                rate, burst = config.ALERT_OUTBOX_DISCORD_RATE_PER_SEC, config.ALERT_OUTBOX_DISCORD_BURST
+            bucket = TokenBucket(rate=rate, capacity=burst, clock=self._clock)
+            self._buckets[rate_key] = bucket
+        return bucket
+
+    def _session(self, channel: str) -> requests.Session:
+        """Pooled HTTP session of a channel's sender."""
+        session = self._sessions.get(channel)
+        if session is None:
+            session = self._session_factory()
+            self._sessions[channel] = session
+        return session
+
+    def _reclaim_stale(self, channel: str, now: float):
+        """Return rows claimed by a sender that died mid-send to the queue."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE alert_outbox SET status = 'pending', claimed_at = NULL "
+                "WHERE channel = ? AND status = 'sending' AND claimed_at < ?",
+                (channel, now - CLAIM_TIMEOUT_SEC))
+            self._conn.commit()
+
+    def _claim(self, row_id: int, now: float) -> bool:
+        """Atomically claim a pending row (another process may be draining too)."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE alert_outbox SET status = 'sending', claimed_at = ? WHERE id = ? AND status = 'pending'",
+                (now, row_id))
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def _finish(self, row_id: int, **fields):
+        """Update a delivered / rescheduled / failed row."""
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE alert_outbox SET {assignments} WHERE id = ?",
+                               (*fields.values(), row_id))
+            self._conn.commit()
+
+    def process_due(self, channel: str) -> float:
+        """
+        One sender pass: deliver every due row of `channel` that its bucket allows.
+
+        Rows for one destination go out in enqueue order: once a destination is
+        rate-limited or backing off, its later rows wait for the next pass.
+
+        Args:
+            channel: 'telegram' or 'discord'
+
+        Returns:
+            Seconds until there may be more work (sender sleep hint)
+        """
+        now = self._clock()
+        self._reclaim_stale(channel, now)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM alert_outbox WHERE channel = ? AND status = 'pending' "
+                "ORDER BY id LIMIT ?", (channel, BATCH_SIZE)).fetchall()
+
+        wait = IDLE_WAIT_SEC
+        blocked = set()
+        for row in rows:
+            rate_key = f"{channel}:{row['route']}:{row['chat_id'] or ''}"
+            if rate_key in blocked:
+                continue
+            if row['next_attempt_at'] > now:
+                blocked.add(rate_key)
+                wait = min(wait, row['next_attempt_at'] - now)
+                continue
+            bucket = self._bucket(channel, rate_key)
+            if not bucket.try_acquire():
+                blocked.add(rate_key)
+                wait = min(wait, 1.0 / bucket.rate)
+                continue
+            if not self._claim(row['id'], now):
+                continue
+            if not self._deliver(row):
+                blocked.add(rate_key)  # keep this destination's later rows behind the retry
+            now = self._clock()
+
+        if len(rows) == BATCH_SIZE and len(blocked) == 0:
+            wait = 0.0
+        return max(0.0, wait)
+
+    def _deliver(self, row: sqlite3.Row) -> bool:
+        """POST one claimed row and record the outcome. True if it was delivered."""
+        channel, attempts = row['channel'], row['attempts'] + 1
+        url = self._url_resolver(channel, row['route'])
+        if not url:
+            self._fail(row, attempts, f"{channel}/{row['route']} not configured")
+            return False
+
+        try:
+            response = self._session(channel).post(url, json=json.loads(row['payload']),
+                                                   timeout=HTTP_TIMEOUT_SEC)
+        except requests.exceptions.RequestException as e:
+            self._retry(row, attempts, str(e))
+            return False
+
+        if response.status_code == 429:
+            retry_after = _retry_after(response)
+            logger.warning(f"{channel} rate limit - outbox row {row['id']} retries in {retry_after}s")
+            self._retry(row, attempts, 'HTTP 429', delay=retry_after)
+        elif 400 <= response.status_code < 500:
+            # Bad payload / chat / webhook: resending the same body cannot succeed
+            self._fail(row, attempts, f"HTTP {response.status_code}: {response.text[:200]}")
+        elif response.status_code >= 500:
+            self._retry(row, attempts, f"HTTP {response.status_code}")
+        else:
+            sent_at = self._clock()
+            self._finish(row['id'], status='sent', attempts=attempts, sent_at=sent_at, last_error=None)
+            self._record_latency(row, (sent_at - row['enqueued_at']) * 1000)
+            return True
+        return False
+
+    def _retry(self, row: sqlite3.Row, attempts: int, error: str, delay: float = None):
+        """Reschedule a row with exponential backoff, or fail it after ALERT_OUTBOX_MAX_ATTEMPTS."""
+        if attempts >= config.ALERT_OUTBOX_MAX_ATTEMPTS:
+            self._fail(row, attempts, error)
+            return
+        if delay is None:
+            delay = min(MAX_BACKOFF_SEC, 2 ** attempts)
+        self.stats['retried'] += 1
+        self._finish(row['id'], status='pending', attempts=attempts, claimed_at=None,
+                     next_attempt_at=self._clock() + delay, last_error=error)
+
+    def _fail(self, row: sqlite3.Row, attempts: int, error: str):
+        """Give up on a row (kept for ALERT_OUTBOX_RETENTION_DAYS for inspection)."""
+        logger.error(f"Alert dropped after {attempts} attempt(s) ({row['channel']}/{row['route']}): {error}")
+        self.stats['failed'] += 1
+        self._finish(row['id'], status='failed', attempts=attempts, last_error=error)
+
+    def _record_latency(self, row: sqlite3.Row, latency_ms: float):
+        """Track enqueue -> delivered latency and report it to service_health (error-isolated)."""
+        self.stats['sent'] += 1
+        self.stats['last_latency_ms'] = round(latency_ms, 1)
+        self.stats['max_latency_ms'] = max(self.stats['max_latency_ms'], round(latency_ms, 1))
+        try:
+            self._report_metric(row['service'] or alert_provenance.get_service(),
+                                "alert_latency_ms", round(latency_ms, 1))
+        except Exception as e:
+            logger.debug(f"Could not report alert latency to service_health: {e}")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _run(self, channel: str):
+        """Sender thread loop for one channel."""
+        while not self._stop.is_set():
+            try:
+                wait = self.process_due(channel)
+            except Exception as e:
+                logger.error(f"Alert outbox {channel} sender error: {e}")
+                wait = IDLE_WAIT_SEC
+            if wait > 0:
+                self._wake[channel].wait(timeout=wait)
+            self._wake[channel].clear()
+
+    def start(self):
+        """Start one daemon sender thread per channel (idempotent)."""
+        if self._threads:
+            return
+        self._stop.clear()
+        for channel in CHANNELS:
+            thread = threading.Thread(target=self._run, args=(channel,),
+                                      name=f"alert-outbox-{channel}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Alert outbox senders started ({self.db_path})")
+
+    def pending_count(self) -> int:
+        """Rows not yet delivered or failed (all processes)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM alert_outbox WHERE status IN ('pending', 'sending')").fetchone()[0]
+
+    def drain(self, timeout: float) -> bool:
+        """
+        Wait for the queue to empty (used at process exit).
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if nothing is left pending
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.pending_count() == 0:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            for event in self._wake.values():
+                event.set()
+            time.sleep(0.05)
+
+    def stop(self, drain_timeout: float = 0.0):
+        """
+        Stop the senders, optionally draining first. Undelivered rows stay queued.
+
+        Args:
+            drain_timeout: Seconds to wait for pending rows before stopping
+        """
+        if self._threads and drain_timeout > 0 and not self.drain(drain_timeout):
+            logger.warning(f"Alert outbox: {self.pending_count()} alert(s) still queued at shutdown")
+        self._stop.set()
+        for event in self._wake.values():
+            event.set()
+        for thread in self._threads:
+            thread.join(timeout=HTTP_TIMEOUT_SEC + 1)
+        self._threads = []
+        for session in self._sessions.values():
+            session.close()
+        self._sessions = {}
+
+    def cleanup(self, days: int = None) -> int:
+        """
+        Delete sent/failed rows older than `days`.
+
+        Args:
+            days: Retention (default: config.ALERT_OUTBOX_RETENTION_DAYS)
+
+        Returns:
+            Number of rows deleted
+        """
+        days = config.ALERT_OUTBOX_RETENTION_DAYS if days is None else days
+        cutoff = self._clock() - days * 86400
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM alert_outbox WHERE status IN ('sent', 'failed') AND enqueued_at < ?", (cutoff,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        """Stop the senders and close the database."""
+        self.stop()
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton instance
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_alert_outbox() -> AlertOutbox:
+    """
+    Get the process-wide outbox, starting its senders on first use.
+
+    The senders drain for up to ALERT_OUTBOX_DRAIN_TIMEOUT_SEC at interpreter exit,
+    so one-shot scripts still deliver what they queued.
+
+    Returns:
+        Running AlertOutbox singleton
+    """
+    global _outbox
+
+    with _outbox_lock:
+        if _outbox is None:
+            outbox = AlertOutbox()
+            try:
+                outbox.cleanup()
+            except sqlite3.Error as e:
+                logger.warning(f"Alert outbox cleanup failed: {e}")
+            outbox.start()
+            atexit.register(outbox.stop, config.ALERT_OUTBOX_DRAIN_TIMEOUT_SEC)
+            _outbox = outbox
+        return _outbox
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    outbox = AlertOutbox()
+    with outbox._lock:
+        counts = outbox._conn.execute(
+            "SELECT channel, status, COUNT(*) AS n, MAX(attempts) AS max_attempts "
+            "FROM alert_outbox GROUP BY channel, status ORDER BY channel, status").fetchall()
+    print(f"Alert outbox: {outbox.db_path}")
+    for row in counts:
+        print(f"  {row['channel']:<9} {row['status']:<8} {row['n']:>6}  (max attempts {row['max_attempts']})")
+    if not counts:
+        print("  (empty)")
+    outbox.close()
@@ -48,7 +48,7 @@ class AlertPnLTracker:
         "P&L % 15m", "P&L % 30m", "P&L Rs 15m", "P&L Rs 30m"
     ]
 
-    def __init__(self, central_db, telegram, kite_client):
+    def __init__(self, central_db, telegram, kite_client, quote_window=None):
         """
         Initialize Alert P&L Tracker.
 
@@ -56,8 +56,10 @@ class AlertPnLTracker:
             central_db: CentralQuoteDB instance (reader mode)
             telegram: TelegramNotifier instance
             kite_client: Kite Connect client for loading lot sizes
+            quote_window: Optional in-memory QuoteWindow (no SQL reads when provided)
         """
         self.db = central_db
+        self.window = quote_window
         self.telegram = telegram
         self._lot_sizes: Dict[str, int] = {}
         self._pending_trades: List[Dict] = []
@@ -231,7 +233,7 @@ class AlertPnLTracker:
                 if elapsed >= 2 and trade['entry_price'] is None:
                     entry_time = alert_time + timedelta(minutes=2)
                     entry_ts = entry_time.strftime('%Y-%m-%d %H:%M:00')
-                    price = self.db.get_stock_price_at_time(symbol, entry_ts)
+                    price = self._price_at(symbol, entry_ts)
                     if price:
                         trade['entry_price'] = price
                         trade['status'] = 'entry_filled'
@@ -241,7 +243,7 @@ class AlertPnLTracker:
                 if elapsed >= 15 and trade['exit_price_15m'] is None and trade['entry_price'] is not None:
                     exit_time = alert_time + timedelta(minutes=15)
                     exit_ts = exit_time.strftime('%Y-%m-%d %H:%M:00')
-                    price = self.db.get_stock_price_at_time(symbol, exit_ts)
+                    price = self._price_at(symbol, exit_ts)
                     if price:
                         trade['exit_price_15m'] = price
                         self._compute_pnl(trade, '15m')
@@ -252,7 +254,7 @@ class AlertPnLTracker:
                 if elapsed >= 30 and trade['exit_price_30m'] is None and trade['entry_price'] is not None:
                     exit_time = alert_time + timedelta(minutes=30)
                     exit_ts = exit_time.strftime('%Y-%m-%d %H:%M:00')
-                    price = self.db.get_stock_price_at_time(symbol, exit_ts)
+                    price = self._price_at(symbol, exit_ts)
                     if price:
                         trade['exit_price_30m'] = price
                         self._compute_pnl(trade, '30m')
@@ -271,6 +273,14 @@ class AlertPnLTracker:
         for i in sorted(completed_indices, reverse=True):
             self._completed_trades.append(self._pending_trades.pop(i))
 
+    def _price_at(self, symbol: str, timestamp_str: str) -> Optional[float]:
+        """Price at an absolute minute - quote window first, DB if the window lacks it."""
+        if self.window is not None:
+            price = self.window.price_at_time(symbol, timestamp_str)
+            if price:
+                return price
+        return self.db.get_stock_price_at_time(symbol, timestamp_str)
+
     def _compute_pnl(self, trade: Dict, exit_type: str):
         """
         Compute P&L for a trade at the given exit window.
@@ -338,7 +348,7 @@ class AlertPnLTracker:
                 if trade['entry_price'] is None:
                     entry_time = alert_time + timedelta(minutes=2)
                     entry_ts = entry_time.strftime('%Y-%m-%d %H:%M:00')
-                    price = self.db.get_stock_price_at_time(symbol, entry_ts)
+                    price = self._price_at(symbol, entry_ts)
                     if price:
                         trade['entry_price'] = price
 
@@ -349,7 +359,7 @@ class AlertPnLTracker:
                 if trade['exit_price_15m'] is None:
                     exit_time = alert_time + timedelta(minutes=15)
                     exit_ts = exit_time.strftime('%Y-%m-%d %H:%M:00')
-                    price = self.db.get_stock_price_at_time(symbol, exit_ts)
+                    price = self._price_at(symbol, exit_ts)
                     if price:
                         trade['exit_price_15m'] = price
                         self._compute_pnl(trade, '15m')
@@ -358,7 +368,7 @@ class AlertPnLTracker:
                 if trade['exit_price_30m'] is None:
                     exit_time = alert_time + timedelta(minutes=30)
                     exit_ts = exit_time.strftime('%Y-%m-%d %H:%M:00')
-                    price = self.db.get_stock_price_at_time(symbol, exit_ts)
+                    price = self._price_at(symbol, exit_ts)
                     if price:
                         trade['exit_price_30m'] = price
                         self._compute_pnl(trade, '30m')
@@ -31,6 +31,7 @@ from unified_quote_cache import UnifiedQuoteCache
 from unified_data_cache import UnifiedDataCache
 from rsi_analyzer import calculate_rsi_with_crossovers
 from api_coordinator import get_api_coordinator
+from instrument_master import get_instrument_master
 import requests
 
 # Configure logging
@@ -122,13 +123,9 @@ class ATRBreakoutMonitor:
             return {}
 
     def _fetch_instrument_tokens(self) -> Dict[str, int]:
-        """Fetch instrument tokens from Kite instruments dump"""
+        """Fetch instrument tokens from the instrument master (daily NSE snapshot)"""
         try:
-            instruments = self.kite.instruments("NSE")
-            token_map = {}
-            for inst in instruments:
-                if inst['tradingsymbol'] in self.stocks:
-                    token_map[inst['tradingsymbol']] = inst['instrument_token']
+            token_map = get_instrument_master(self.kite).index("NSE").tokens(self.stocks)
 
             # Save for future use
             os.makedirs("data", exist_ok=True)
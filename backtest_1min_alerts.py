@@ -24,9 +24,8 @@ import time
 from kiteconnect import KiteConnect
 import config
 import json
-from price_cache import PriceCache
-from alert_history_manager import AlertHistoryManager
-from onemin_alert_detector import OneMinAlertDetector
+from candle_warehouse import get_candle_warehouse
+from onemin_alert_vectorized import candle_arrays, detect_1min_alerts
 
 # Configure logging
 logging.basicConfig(
@@ -128,14 +127,6 @@ class OneMinBacktester:
         # Track simulated 5-min alerts for cross-deduplication
         self.recent_5min_alerts = {}  # symbol -> timestamp
 
-        # Initialize alert detector (same as production)
-        self.price_cache = PriceCache()
-        self.alert_history = AlertHistoryManager()
-        self.detector = OneMinAlertDetector(
-            price_cache=self.price_cache,
-            alert_history=self.alert_history
-        )
-
     def _load_stock_list(self) -> List[str]:
         """Load stock list from fo_stocks.json."""
         try:
@@ -190,6 +181,8 @@ class OneMinBacktester:
         """
         Fetch historical 1-minute candle data for a symbol.
 
+        Reads the local candle warehouse; only dates not synced yet go to Kite.
+
         Args:
             symbol: Stock symbol
             from_date: Start date
@@ -205,15 +198,11 @@ class OneMinBacktester:
                 logger.warning(f"No instrument token found for {symbol}")
                 return []
 
-            # Fetch historical data
-            data = self.kite.historical_data(
-                instrument_token=instrument_token,
-                from_date=from_date,
-                to_date=to_date,
-                interval=interval
+            data = get_candle_warehouse().historical_data(
+                self.kite, symbol, from_date, to_date, interval, instrument_token
             )
 
-            logger.info(f"Fetched {len(data)} 1-min candles for {symbol}")
+            logger.info(f"Loaded {len(data)} 1-min candles for {symbol}")
             return data
 
         except Exception as e:
@@ -224,12 +213,13 @@ class OneMinBacktester:
         """
         Detect 1-minute alerts in historical candle data using tiered detection.
 
-        Uses OneMinAlertDetector with 6-layer filtering:
-        1. Price threshold (0.75% in 1 min)
-        2. Volume spike (3x average + 50K min)
+        Applies OneMinAlertDetector's 6-layer filtering to the whole series at
+        once (onemin_alert_vectorized), in candle time:
+        1. Price threshold (DROP/RISE_THRESHOLD_1MIN in 1 min)
+        2. Volume spike (VOLUME_SPIKE_MULTIPLIER_1MIN x 5-minute average)
         3. Quality filters (price >= 50)
-        4. Cooldown (10 min between alerts)
-        5. Cross-deduplication (no recent 5-min alert)
+        4. Cooldown (COOLDOWN_1MIN_ALERTS between alerts)
+        5. Cross-deduplication (no recent 5-min alert - none in the backtest)
         6. Momentum confirmation (for HIGH priority)
 
         Args:
@@ -239,119 +229,34 @@ class OneMinBacktester:
         Returns:
             List of detected alerts with metadata including priority level
         """
-        alerts = []
-
-        # Need at least 6 candles (5 for momentum check + 1 current)
-        if len(candles) < 6:
-            return alerts
-
-        for i in range(1, len(candles)):
-            current = candles[i]
-            prev = candles[i-1]  # 1 min ago
+        found = detect_1min_alerts(*candle_arrays(candles))
 
-            current_price = current['close']
-            prev_price = prev['close']
-            current_volume = current['volume']
-            timestamp = current['date']
-
-            # Skip market opening volatility (9:15-9:25 AM)
-            alert_time = timestamp.time()
-            if alert_time.hour == 9 and 15 <= alert_time.minute < 25:
-                continue
-
-            # Get price from 5 minutes ago for momentum check (if available)
-            price_5min_ago = None
-            if i >= 5:
-                price_5min_ago = candles[i-5]['close']
-
-            # Calculate average volume for metadata and populate cache for detector
-            lookback = min(5, i)
-            avg_volume = sum(candles[i-j]['volume'] for j in range(1, lookback + 1)) / lookback
-            volume_multiplier = current_volume / avg_volume if avg_volume > 0 else 0
-
-            # Manually populate cache for detector's volume check
-            # The detector expects current and previous_1min to be set
-            self.price_cache.cache[symbol] = {
-                "current": {"price": current_price, "volume": current_volume, "timestamp": timestamp.isoformat()},
-                "previous_1min": {"price": prev_price, "volume": avg_volume, "timestamp": timestamp.isoformat()},
-                "previous": None,
-                "previous2": None,
-                "previous3": None,
-                "previous4": None,
-                "previous5": None,
-                "previous6": None
-            }
-
-            # Check for DROP alert using detector
-            drop_priority = self.detector.check_for_drop_1min(
-                symbol=symbol,
-                current_price=current_price,
-                price_1min_ago=prev_price,
-                current_volume=current_volume,
-                oi=0,  # Not used in backtest
-                price_5min_ago=price_5min_ago
-            )
-
-            if drop_priority:
-                drop_pct = self.detector.get_drop_percentage(current_price, prev_price)
-                alerts.append({
-                    'symbol': symbol,
-                    'direction': 'drop',
-                    'priority': drop_priority,  # "HIGH" or "NORMAL"
-                    'timestamp': timestamp,
-                    'current_price': current_price,
-                    'previous_price': prev_price,
-                    'change_percent': drop_pct,
-                    'volume': current_volume,
-                    'avg_volume': avg_volume,
-                    'volume_multiplier': volume_multiplier,
-                    'candle_index': i
-                })
-
-                # Track volume spike strength
-                if volume_multiplier >= 5.0:
-                    self.stats['alerts_with_5x_volume'] += 1
-                elif volume_multiplier >= 4.0:
-                    self.stats['alerts_with_4x_volume'] += 1
-                elif volume_multiplier >= 3.0:
-                    self.stats['alerts_with_3x_volume'] += 1
-
-                continue
-
-            # Check for RISE alert using detector (if enabled)
-            if config.ENABLE_RISE_ALERTS:
-                rise_priority = self.detector.check_for_rise_1min(
-                    symbol=symbol,
-                    current_price=current_price,
-                    price_1min_ago=prev_price,
-                    current_volume=current_volume,
-                    oi=0,  # Not used in backtest
-                    price_5min_ago=price_5min_ago
-                )
-
-                if rise_priority:
-                    rise_pct = self.detector.get_rise_percentage(current_price, prev_price)
-                    alerts.append({
-                        'symbol': symbol,
-                        'direction': 'rise',
-                        'priority': rise_priority,  # "HIGH" or "NORMAL"
-                        'timestamp': timestamp,
-                        'current_price': current_price,
-                        'previous_price': prev_price,
-                        'change_percent': rise_pct,
-                        'volume': current_volume,
-                        'avg_volume': avg_volume,
-                        'volume_multiplier': volume_multiplier,
-                        'candle_index': i
-                    })
-
-                    # Track volume spike strength
-                    if volume_multiplier >= 5.0:
-                        self.stats['alerts_with_5x_volume'] += 1
-                    elif volume_multiplier >= 4.0:
-                        self.stats['alerts_with_4x_volume'] += 1
-                    elif volume_multiplier >= 3.0:
-                        self.stats['alerts_with_3x_volume'] += 1
+        alerts = []
+        for i, direction, priority, change_pct, volume, avg_volume, volume_multiplier in zip(
+                found['index'].tolist(), found['direction'].tolist(), found['priority'].tolist(),
+                found['change_percent'].tolist(), found['volume'].tolist(), found['avg_volume'].tolist(),
+                found['volume_multiplier'].tolist()):
+            alerts.append({
+                'symbol': symbol,
+                'direction': direction,
+                'priority': priority,  # "HIGH" or "NORMAL"
+                'timestamp': candles[i]['date'],
+                'current_price': candles[i]['close'],
+                'previous_price': candles[i - 1]['close'],
+                'change_percent': change_pct,
+                'volume': volume,
+                'avg_volume': avg_volume,
+                'volume_multiplier': volume_multiplier,
+                'candle_index': i
+            })
+
+            # Track volume spike strength
+            if volume_multiplier >= 5.0:
+                self.stats['alerts_with_5x_volume'] += 1
+            elif volume_multiplier >= 4.0:
+                self.stats['alerts_with_4x_volume'] += 1
+            elif volume_multiplier >= 3.0:
+                self.stats['alerts_with_3x_volume'] += 1
 
         return alerts
 
@@ -581,9 +486,6 @@ class OneMinBacktester:
             try:
                 self.backtest_stock(symbol, from_date, to_date)
 
-                # Rate limiting (Kite allows 3 req/sec, be conservative)
-                time.sleep(0.4)
-
             except Exception as e:
                 logger.error(f"Error processing {symbol}: {e}")
                 continue
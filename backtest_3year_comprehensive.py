@@ -7,16 +7,17 @@ Generates detailed Excel report with performance metrics and recommendations
 
 import sys
 import logging
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 from kiteconnect import KiteConnect
 import config
+from candle_warehouse import get_candle_warehouse
 from eod_pattern_detector import EODPatternDetector
 from market_regime_detector import MarketRegimeDetector
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
-import time
 from collections import defaultdict
 
 # Setup logging
@@ -87,83 +88,90 @@ class Comprehensive3YearBacktester:
         from_date: datetime,
         to_date: datetime
     ) -> List[Dict]:
-        """Fetch historical data for a symbol"""
+        """Fetch historical data for a symbol (local candle warehouse, Kite only for missing dates)"""
         token = self.instrument_tokens.get(symbol)
         if not token:
             return []
 
         try:
-            data = self.kite.historical_data(
-                instrument_token=token,
-                from_date=from_date,
-                to_date=to_date,
-                interval="day"
-            )
-            return data
+            return get_candle_warehouse().historical_data(self.kite, symbol, from_date, to_date, "day", token)
         except Exception as e:
             logger.error(f"{symbol}: Error fetching data - {e}")
             return []
 
-    def test_pattern(
+    def test_symbol(
         self,
         symbol: str,
-        test_date: datetime,
+        test_dates: List[datetime],
         market_regime: str
     ) -> List[Dict]:
         """
-        Test patterns for a specific date and analyze forward performance
+        Test patterns on each test date and analyze forward performance
+
+        The symbol's daily history is fetched once for the whole period and the
+        detector slides over it with one shared swing index, instead of fetching
+        80 days of history and 40 days of forward data per test date.
 
         Args:
             symbol: Stock symbol
-            test_date: Date to detect patterns
-            market_regime: Market regime on test date
+            test_dates: Dates to detect patterns on, ascending
+            market_regime: Market regime on the test dates
 
         Returns:
             List of trade results
         """
-        # Fetch 60 days before test_date for pattern detection
-        pattern_start = test_date - timedelta(days=80)  # Extra buffer
-        pattern_data = self.fetch_historical_data(symbol, pattern_start, test_date)
-
-        if not pattern_data or len(pattern_data) < 30:
+        if not test_dates:
             return []
 
-        # Get last 30 days for pattern detection
-        pattern_data = pattern_data[-30:]
-
-        # Detect patterns
-        result = self.pattern_detector.detect_patterns(symbol, pattern_data, market_regime)
-
-        if not result['has_patterns']:
+        candles = self.fetch_historical_data(
+            symbol, test_dates[0] - timedelta(days=80), test_dates[-1] + timedelta(days=40)
+        )
+        if not candles:
             return []
+        days = [c['date'].date() if isinstance(c['date'], datetime) else c['date'] for c in candles]
 
-        # Fetch forward data (30 days) to check performance
-        forward_start = test_date + timedelta(days=1)
-        forward_end = test_date + timedelta(days=40)  # Extra buffer
-        forward_data = self.fetch_historical_data(symbol, forward_start, forward_end)
+        # Each test date sees the last 30 of its previous 80 days (at least 30 candles)
+        tested = []
+        for test_date in test_dates:
+            end = bisect_right(days, test_date.date())
+            if end - bisect_left(days, (test_date - timedelta(days=80)).date()) >= 30:
+                tested.append((test_date, end))
 
-        if not forward_data:
-            return []
+        results = self.pattern_detector.detect_patterns_over_history(
+            symbol, candles, [(end - 30, end) for _, end in tested], market_regime
+        )
 
-        # Analyze each detected pattern
         trades = []
-        pattern_details = result['pattern_details']
+        for (test_date, end), result in zip(tested, results):
+            if not result['has_patterns']:
+                continue
 
-        for pattern_name, details in pattern_details.items():
-            if not details:
+            # Forward data (30 trading days) to check performance
+            forward_data = candles[end:bisect_right(days, (test_date + timedelta(days=40)).date())]
+            if not forward_data:
                 continue
 
-            trade_result = self._analyze_forward_performance(
-                symbol=symbol,
-                pattern_name=pattern_name,
-                pattern_details=details,
-                forward_data=forward_data,
-                entry_date=test_date,
-                market_regime=market_regime
-            )
+            # Analyze each detected pattern
+            date_trades = []
+            for pattern_name, details in result['pattern_details'].items():
+                if not details:
+                    continue
+
+                trade_result = self._analyze_forward_performance(
+                    symbol=symbol,
+                    pattern_name=pattern_name,
+                    pattern_details=details,
+                    forward_data=forward_data,
+                    entry_date=test_date,
+                    market_regime=market_regime
+                )
 
-            if trade_result:
-                trades.append(trade_result)
+                if trade_result:
+                    date_trades.append(trade_result)
+
+            if date_trades:
+                logger.info(f"  {test_date.strftime('%Y-%m-%d')}: {len(date_trades)} patterns detected")
+            trades.extend(date_trades)
 
         return trades
 
@@ -300,21 +308,14 @@ class Comprehensive3YearBacktester:
 
             logger.info(f"  Testing {len(test_dates)} dates (weekly)")
 
-            for test_date in test_dates:
-                # Get market regime (use cached if possible)
-                market_regime = "NEUTRAL"  # Default
-
-                try:
-                    trades = self.test_pattern(symbol, test_date, market_regime)
-                    all_trades.extend(trades)
-
-                    if trades:
-                        logger.info(f"  {test_date.strftime('%Y-%m-%d')}: {len(trades)} patterns detected")
+            # Get market regime (use cached if possible)
+            market_regime = "NEUTRAL"  # Default
 
-                    time.sleep(0.1)  # Rate limiting
+            try:
+                all_trades.extend(self.test_symbol(symbol, test_dates, market_regime))
 
-                except Exception as e:
-                    logger.error(f"  Error testing {symbol} on {test_date}: {e}")
+            except Exception as e:
+                logger.error(f"  Error testing {symbol}: {e}")
 
             logger.info(f"  {symbol} complete: {sum(1 for t in all_trades if t['symbol'] == symbol)} trades")
 
@@ -25,6 +25,7 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 import config
+from candle_warehouse import get_candle_warehouse
 
 # Configure logging
 logging.basicConfig(
@@ -109,7 +110,7 @@ class ATRBacktester:
         from_date: datetime,
         to_date: datetime
     ) -> Optional[pd.DataFrame]:
-        """Fetch historical data for backtesting"""
+        """Fetch historical data for backtesting (local candle warehouse, Kite only for missing dates)"""
         try:
             if symbol not in self.instrument_tokens:
                 logger.warning(f"{symbol}: No instrument token")
@@ -121,11 +122,8 @@ class ATRBacktester:
             buffer_days = 60
             adjusted_from = from_date - timedelta(days=buffer_days)
 
-            data = self.kite.historical_data(
-                instrument_token=token,
-                from_date=adjusted_from.date(),
-                to_date=to_date.date(),
-                interval="day"
+            data = get_candle_warehouse().historical_data(
+                self.kite, symbol, adjusted_from.date(), to_date.date(), "day", token
             )
 
             if not data:
@@ -340,11 +338,6 @@ class ATRBacktester:
                 self.all_trades.extend(trades)
                 logger.info(f"  {symbol}: {len(trades)} trades generated")
 
-            # Rate limiting
-            if idx < len(stocks_to_test):
-                import time
-                time.sleep(config.REQUEST_DELAY_SECONDS)
-
         logger.info("=" * 80)
         logger.info(f"BACKTEST COMPLETE: {len(self.all_trades)} total trades")
         logger.info("=" * 80)
@@ -20,6 +20,7 @@ from kiteconnect import KiteConnect
 
 import config
 from eod_pattern_detector import EODPatternDetector
+from swing_index import SwingIndex
 
 WINDOW = 30   # candles fed to the detector each step (it internally uses last ~15)
 HOLD = 20     # max forward trading days to hold a position
@@ -102,15 +103,17 @@ def run(months: int, cost: float, max_stocks: Optional[int]):
                 time.sleep(config.REQUEST_DELAY_SECONDS)
             continue
         next_ok = {'DOUBLE_BOTTOM': -1, 'DOUBLE_TOP': -1}
+        index = SwingIndex(candles)   # swing points found once, shared by every window
         for i in range(WINDOW, len(candles) - 1):
             if candles[i]['date'].replace(tzinfo=None) < start:
                 continue
             window = candles[i - WINDOW + 1:i + 1]
+            swings = index.window(i + 1, WINDOW)
             avgvol = det._calculate_avg_volume(window)
             for name, fn in detectors:
                 if i < next_ok[name]:
                     continue
-                sig = fn(window, avgvol, 'NEUTRAL')
+                sig = fn(window, avgvol, 'NEUTRAL', swings)
                 if not sig or sig.get('confidence_score', 0) < det.min_confidence:
                     continue
                 trade = simulate(det, sig, candles[i + 1:i + 1 + HOLD], cost)
@@ -1,13 +1,161 @@
 #!/usr/bin/env python3
 """
 Sweep through different thresholds to find optimal early warning settings.
+
+Quotes are queried once (not once per threshold) and reduced to per-minute
+signal strengths; the thresholds are then evaluated by sweep_engine.
 """
 
 import sqlite3
 from datetime import datetime, timedelta
 from collections import defaultdict
+import numpy as np
 import openpyxl
 import config
+import sweep_engine
+
+SIGNAL_COOLDOWN = 15    # minutes between sampled signals of one symbol
+FOLLOW_MINUTES = 5      # a 5-min alert must follow within this many minutes
+FOLLOW_PCT = 1.25       # ...as a >= 1.25% move over 5 minutes
+
+
+def _changes(prices, lookback, direction=None):
+    """
+    Early-warning change at each minute against `lookback` minutes earlier.
+
+    Args:
+        prices: Quote prices, oldest first
+        lookback: Minutes to look back
+        direction: 'drop' / 'rise' for one direction, None for the larger of both
+
+    Returns:
+        Array of % changes; NaN where there is no comparison
+    """
+    curr = np.array(prices[lookback:], dtype=float)
+    prev = np.array(prices[:len(prices) - lookback], dtype=float)
+    change = np.full(len(prices), np.nan)
+    valid = (curr > 0) & (prev > 0) & ~np.isnan(curr) & ~np.isnan(prev)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drop = ((prev - curr) / prev) * 100
+        rise = ((curr - prev) / prev) * 100
+    if direction is None:
+        valid = (curr != 0) & (prev != 0) & ~np.isnan(curr) & ~np.isnan(prev)
+        value = np.where(drop >= rise, drop, rise)
+    else:
+        value = drop if 'drop' in direction else rise
+    change[lookback:] = np.where(valid, value, np.nan)
+    return change
+
+
+def build_features(conn, alerts, cutoff_date, lookbacks):
+    """
+    Query each alert's preceding 10 minutes and the false-positive sample once.
+
+    Returns:
+        {name: array}: alert_best_<lookback> (the strongest early-warning change
+        before each alert; -inf if none), and for the sampled symbol-days back
+        to back, sample_signal_<lookback> (the larger of drop / rise %),
+        sample_follows (a 5-min alert-size move follows) and sample_off (offsets)
+    """
+    cursor = conn.cursor()
+    arrays = {}
+
+    windows = []
+    for alert in alerts:
+        start_time = (alert['datetime'] - timedelta(minutes=10)).strftime('%Y-%m-%d %H:%M:%S')
+        end_time = alert['datetime'].strftime('%Y-%m-%d %H:%M:%S')
+        cursor.execute("""
+            SELECT timestamp, price, volume
+            FROM stock_quotes
+            WHERE symbol = ?
+            AND timestamp >= ?
+            AND timestamp <= ?
+            ORDER BY timestamp ASC
+        """, (alert['symbol'], start_time, end_time))
+        windows.append([row[1] if row[1] else np.nan for row in cursor.fetchall()])
+
+    for lookback in lookbacks:
+        best = np.full(len(alerts), -np.inf)
+        for a, (alert, prices) in enumerate(zip(alerts, windows)):
+            if len(prices) < lookback + 1:
+                continue
+            change = _changes(prices, lookback, alert['direction'])[:-1]   # exclude the alert minute
+            change = change[~np.isnan(change)]
+            if len(change):
+                best[a] = change.max()
+        arrays[f'alert_best_{lookback}'] = best
+
+    # False positives are estimated from a sample: 30 symbols on each of 3 days
+    cursor.execute("""
+        SELECT DISTINCT date(timestamp)
+        FROM stock_quotes
+        WHERE timestamp >= ?
+        LIMIT 5
+    """, (cutoff_date.strftime('%Y-%m-%d'),))
+    sample_dates = [row[0] for row in cursor.fetchall()]
+
+    series = []
+    for date_str in sample_dates[:3]:
+        cursor.execute("""
+            SELECT DISTINCT symbol
+            FROM stock_quotes
+            WHERE date(timestamp) = ?
+            LIMIT 50
+        """, (date_str,))
+        for sym in [row[0] for row in cursor.fetchall()][:30]:
+            cursor.execute("""
+                SELECT timestamp, price, volume
+                FROM stock_quotes
+                WHERE symbol = ?
+                AND date(timestamp) = ?
+                AND time(timestamp) >= '09:25:00'
+                ORDER BY timestamp ASC
+            """, (sym, date_str))
+            series.append([row[1] if row[1] else np.nan for row in cursor.fetchall()])
+
+    follows = []
+    for prices in series:
+        move = np.full(len(prices) + FOLLOW_MINUTES, np.nan)
+        move[5:len(prices)] = _changes(prices, 5, 'drop')[5:]
+        move = np.abs(move)
+        follows.append(np.array([np.any(move[i + 1:i + 1 + FOLLOW_MINUTES] >= FOLLOW_PCT)
+                                 for i in range(len(prices))], dtype=bool))
+    arrays['sample_follows'] = np.concatenate(follows) if follows else np.zeros(0, dtype=bool)
+    arrays['sample_off'] = np.cumsum([0] + [len(prices) for prices in series])
+    for lookback in lookbacks:
+        signals = [_changes(prices, lookback) for prices in series]
+        arrays[f'sample_signal_{lookback}'] = np.concatenate(signals) if signals else np.zeros(0)
+    return arrays
+
+
+def evaluate_config(cfg, arrays, lookbacks):
+    """
+    sweep_engine evaluate(): true positives and sampled false positives of one setting.
+
+    Args:
+        cfg: (lookback, threshold)
+        arrays: build_features() output
+        lookbacks: Lookbacks the features were built for
+
+    Returns:
+        {'tp': int, 'sample_fp': int, 'sample_signals': int}
+    """
+    lookback, threshold = cfg
+    tp = int(np.count_nonzero(arrays[f'alert_best_{lookback}'] >= threshold))
+
+    # Signals with a 15-minute cooldown per symbol-day - a forward scan over candidates
+    signal, follows, offsets = arrays[f'sample_signal_{lookback}'], arrays['sample_follows'], arrays['sample_off']
+    sample_signals = sample_fp = 0
+    for lo, hi in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        last_signal_idx = -100
+        for i in (np.flatnonzero(signal[lo:hi] >= threshold)).tolist():
+            if i - last_signal_idx < SIGNAL_COOLDOWN:
+                continue
+            sample_signals += 1
+            last_signal_idx = i
+            if not follows[lo + i]:
+                sample_fp += 1
+    return {'tp': tp, 'sample_fp': sample_fp, 'sample_signals': sample_signals}
 
 def run_sweep():
     excel_path = config.ALERT_EXCEL_PATH
@@ -56,6 +204,13 @@ def run_sweep():
     thresholds = [0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
     lookbacks = [3, 4]
 
+    # Everything the configs read is loaded and reduced to arrays once
+    arrays = build_features(conn, alerts, cutoff_date, lookbacks)
+    conn.close()
+    results = sweep_engine.run_sweep('early_warning', evaluate_config,
+                        [(lookback, threshold) for lookback in lookbacks for threshold in thresholds],
+                        arrays, lookbacks)
+
     print("\n" + "=" * 80)
     print("EARLY WARNING THRESHOLD SWEEP")
     print("=" * 80)
@@ -64,128 +219,10 @@ def run_sweep():
 
     for lookback in lookbacks:
         for threshold in thresholds:
-            tp = 0
-            fp = 0
-
-            # For each alert, check if early warning would have preceded it
-            for alert in alerts:
-                symbol = alert['symbol']
-                alert_time = alert['datetime']
-                direction = alert['direction']
-
-                # Get data for preceding 10 minutes
-                start_time = (alert_time - timedelta(minutes=10)).strftime('%Y-%m-%d %H:%M:%S')
-                end_time = alert_time.strftime('%Y-%m-%d %H:%M:%S')
-
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT timestamp, price, volume
-                    FROM stock_quotes
-                    WHERE symbol = ?
-                    AND timestamp >= ?
-                    AND timestamp <= ?
-                    ORDER BY timestamp ASC
-                """, (symbol, start_time, end_time))
-
-                data = cursor.fetchall()
-                if len(data) < lookback + 1:
-                    continue
-
-                # Check if EW signal would fire at each minute before alert
-                ew_would_fire = False
-                for i in range(lookback, len(data) - 1):  # -1 to exclude alert time itself
-                    current = data[i]
-                    prev = data[i - lookback]
-
-                    curr_price = current[1]
-                    prev_price = prev[1]
-
-                    if not curr_price or not prev_price or curr_price <= 0 or prev_price <= 0:
-                        continue
-
-                    if 'drop' in direction:
-                        change = ((prev_price - curr_price) / prev_price) * 100
-                    else:
-                        change = ((curr_price - prev_price) / prev_price) * 100
-
-                    if change >= threshold:
-                        ew_would_fire = True
-                        break
-
-                if ew_would_fire:
-                    tp += 1
-
-            # Estimate false positives by sampling random periods
-            # (Full scan takes too long, so we estimate)
-            cursor.execute("""
-                SELECT DISTINCT date(timestamp)
-                FROM stock_quotes
-                WHERE timestamp >= ?
-                LIMIT 5
-            """, (cutoff_date.strftime('%Y-%m-%d'),))
-
-            sample_dates = [row[0] for row in cursor.fetchall()]
-            sample_fp = 0
-            sample_signals = 0
-
-            for date_str in sample_dates[:3]:  # Sample 3 days
-                cursor.execute("""
-                    SELECT DISTINCT symbol
-                    FROM stock_quotes
-                    WHERE date(timestamp) = ?
-                    LIMIT 50
-                """, (date_str,))
-
-                symbols = [row[0] for row in cursor.fetchall()]
-
-                for sym in symbols[:30]:  # Sample 30 symbols per day
-                    cursor.execute("""
-                        SELECT timestamp, price, volume
-                        FROM stock_quotes
-                        WHERE symbol = ?
-                        AND date(timestamp) = ?
-                        AND time(timestamp) >= '09:25:00'
-                        ORDER BY timestamp ASC
-                    """, (sym, date_str))
-
-                    sym_data = cursor.fetchall()
-                    last_signal_idx = -100
-
-                    for i in range(lookback, len(sym_data)):
-                        if i - last_signal_idx < 15:  # Cooldown
-                            continue
-
-                        current = sym_data[i]
-                        prev = sym_data[i - lookback]
-
-                        curr_price = current[1]
-                        prev_price = prev[1]
-
-                        if not curr_price or not prev_price:
-                            continue
-
-                        drop_pct = ((prev_price - curr_price) / prev_price) * 100
-                        rise_pct = ((curr_price - prev_price) / prev_price) * 100
-
-                        if drop_pct >= threshold or rise_pct >= threshold:
-                            sample_signals += 1
-                            last_signal_idx = i
-
-                            # Check if 5-min alert follows (simple check)
-                            alert_follows = False
-                            for j in range(1, 6):
-                                if i + j >= len(sym_data) or i + j < 5:
-                                    continue
-                                fut = sym_data[i + j]
-                                past = sym_data[i + j - 5]
-                                if fut[1] and past[1]:
-                                    d_pct = abs(past[1] - fut[1]) / past[1] * 100
-                                    if d_pct >= 1.25:
-                                        alert_follows = True
-                                        break
-
-                            if not alert_follows:
-                                sample_fp += 1
+            result = results[(lookback, threshold)]
+            tp = result['tp']
+            sample_fp = result['sample_fp']
+            sample_signals = result['sample_signals']
 
             # Estimate total FP (scale up from sample)
             if sample_signals > 0:
@@ -199,8 +236,6 @@ def run_sweep():
 
             print(f"{threshold}%{'':<9} {lookback} min{'':<5} {tp:<8} ~{estimated_fp:<7} {precision:.1%}{'':<7} {fp_rate_sample:.1%}")
 
-    conn.close()
-
     print("-" * 80)
     print("\nLegend:")
     print("  TP = True Positives (EW fired before actual 5-min alert)")
@@ -30,6 +30,7 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 import config
+from candle_warehouse import get_candle_warehouse
 
 # Configure logging
 logging.basicConfig(
@@ -128,7 +129,7 @@ class MomentumBacktester:
             return {}
 
     def fetch_all_price_data(self):
-        """Fetch historical data for all stocks in universe"""
+        """Fetch historical data for all stocks in universe (local candle warehouse, Kite only for missing dates)"""
         logger.info("Fetching historical data for all stocks...")
 
         # Need extra buffer for momentum calculation
@@ -145,11 +146,8 @@ class MomentumBacktester:
 
                 token = self.instrument_tokens[symbol]
 
-                data = self.kite.historical_data(
-                    instrument_token=token,
-                    from_date=fetch_from.date(),
-                    to_date=self.end_date.date(),
-                    interval="day"
+                data = get_candle_warehouse().historical_data(
+                    self.kite, symbol, fetch_from.date(), self.end_date.date(), "day", token
                 )
 
                 if data:
@@ -162,10 +160,6 @@ class MomentumBacktester:
             except Exception as e:
                 logger.error(f"{symbol}: Failed to fetch: {e}")
 
-            # Rate limiting
-            import time
-            time.sleep(config.REQUEST_DELAY_SECONDS)
-
         logger.info(f"Fetched data for {len(self.price_data)} stocks")
 
     def calculate_momentum_scores(self, as_of_date: datetime) -> Dict[str, float]:
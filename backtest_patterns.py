@@ -6,15 +6,16 @@ Tests buy/target price recommendations against historical data
 
 import sys
 import logging
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 from kiteconnect import KiteConnect
 import config
+from candle_warehouse import get_candle_warehouse
 from eod_pattern_detector import EODPatternDetector
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
-import time
 
 # Setup logging
 logging.basicConfig(
@@ -78,7 +79,7 @@ class PatternBacktester:
 
     def fetch_historical_data(self, symbol: str, from_date: datetime, to_date: datetime) -> List[Dict]:
         """
-        Fetch historical daily data
+        Fetch historical daily data (local candle warehouse, Kite only for missing dates)
 
         Args:
             symbol: Stock symbol
@@ -94,71 +95,78 @@ class PatternBacktester:
                 logger.warning(f"{symbol}: No instrument token found")
                 return []
 
-            data = self.kite.historical_data(
-                instrument_token=instrument_token,
-                from_date=from_date,
-                to_date=to_date,
-                interval="day"
+            return get_candle_warehouse().historical_data(
+                self.kite, symbol, from_date, to_date, "day", instrument_token
             )
 
-            return data
-
         except Exception as e:
             logger.error(f"{symbol}: Error fetching historical data - {e}")
             return []
 
-    def test_pattern(self, symbol: str, test_date: datetime) -> List[Dict]:
+    def test_symbol(self, symbol: str, test_dates: List[datetime]) -> List[Dict]:
         """
-        Test pattern detection on a specific date
+        Test pattern detection on each test date
+
+        The symbol's daily history is fetched once for the whole period and the
+        detector slides over it with one shared swing index, instead of two
+        fetches per test date.
 
         Args:
             symbol: Stock symbol
-            test_date: Date to test pattern detection
+            test_dates: Dates to test pattern detection, ascending
 
         Returns:
             List of trade results
         """
-        # Fetch 30 days before test_date for pattern detection
-        pattern_start = test_date - timedelta(days=30)
-        pattern_data = self.fetch_historical_data(symbol, pattern_start, test_date)
+        if not test_dates:
+            return []
 
-        if len(pattern_data) < 10:
+        candles = self.fetch_historical_data(
+            symbol, test_dates[0] - timedelta(days=30), test_dates[-1] + timedelta(days=self.forward_days)
+        )
+        if not candles:
             return []
+        days = [c['date'].date() if isinstance(c['date'], datetime) else c['date'] for c in candles]
 
-        # Detect patterns
-        result = self.pattern_detector.detect_patterns(symbol, pattern_data)
+        # Each test date sees its previous 30 days (at least 10 candles)
+        tested = []
+        for test_date in test_dates:
+            start = bisect_left(days, (test_date - timedelta(days=30)).date())
+            end = bisect_right(days, test_date.date())
+            if end - start >= 10:
+                tested.append((test_date, start, end))
 
-        if not result['has_patterns']:
-            return []
+        results = self.pattern_detector.detect_patterns_over_history(
+            symbol, candles, [(start, end) for _, start, end in tested]
+        )
 
         # For each pattern, test forward performance
         trades = []
-        pattern_details = result.get('pattern_details', {})
-
-        for pattern_name, details in pattern_details.items():
-            if not details or 'buy_price' not in details:
+        for (test_date, _, end), result in zip(tested, results):
+            if not result['has_patterns']:
                 continue
 
-            # Fetch forward data to see if target was hit
-            forward_start = test_date + timedelta(days=1)
-            forward_end = test_date + timedelta(days=self.forward_days)
-            forward_data = self.fetch_historical_data(symbol, forward_start, forward_end)
+            forward_data = candles[end:bisect_right(days, (test_date + timedelta(days=self.forward_days)).date())]
 
-            # Analyze forward performance
-            performance = self._analyze_forward_performance(
-                details, forward_data, test_date
-            )
+            for pattern_name, details in result.get('pattern_details', {}).items():
+                if not details or 'buy_price' not in details:
+                    continue
 
-            trades.append({
-                'symbol': symbol,
-                'pattern': pattern_name,
-                'test_date': test_date,
-                'buy_price': details.get('buy_price'),
-                'target_price': details.get('target_price'),
-                'pattern_type': details.get('pattern_type'),
-                'current_price': details.get('current_price'),
-                **performance
-            })
+                # Analyze forward performance
+                performance = self._analyze_forward_performance(
+                    details, forward_data, test_date
+                )
+
+                trades.append({
+                    'symbol': symbol,
+                    'pattern': pattern_name,
+                    'test_date': test_date,
+                    'buy_price': details.get('buy_price'),
+                    'target_price': details.get('target_price'),
+                    'pattern_type': details.get('pattern_type'),
+                    'current_price': details.get('current_price'),
+                    **performance
+                })
 
         return trades
 
@@ -273,19 +281,14 @@ class PatternBacktester:
         for stock_num, symbol in enumerate(test_stocks, 1):
             logger.info(f"[{stock_num}/{len(test_stocks)}] Testing {symbol}...")
 
-            # Test pattern detection weekly (every 7 days) to reduce API calls
+            # Test pattern detection weekly (every 7 days)
             test_dates = []
             current_date = start_date
             while current_date <= end_date:
                 test_dates.append(datetime.combine(current_date, datetime.min.time()))
                 current_date += timedelta(days=7)  # Weekly tests
 
-            for test_date in test_dates:
-                trades = self.test_pattern(symbol, test_date)
-                all_trades.extend(trades)
-
-                # Rate limiting
-                time.sleep(config.REQUEST_DELAY_SECONDS)
+            all_trades.extend(self.test_symbol(symbol, test_dates))
 
             logger.info(f"{symbol}: {len([t for t in all_trades if t['symbol'] == symbol])} patterns detected")
 
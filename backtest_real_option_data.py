@@ -152,19 +152,29 @@ class RealOptionBacktest:
         self,
         instrument_token: int,
         date: datetime,
-        target_time: time
+        target_time: time,
+        tradingsymbol: Optional[str] = None
     ) -> Optional[float]:
         """
         Get option price at specific time using historical data
 
+        The central collector's option chain snapshots are checked first - they
+        reach back further than Kite's option history and cost no API call.
+
         Args:
             instrument_token: Option instrument token
             date: Trading date
             target_time: Target time (e.g., 10:05 or 15:10)
+            tradingsymbol: Option symbol, to look up the recorded chain
 
         Returns:
             Option price or None
         """
+        if tradingsymbol:
+            recorded = self.get_recorded_option_price(tradingsymbol, date, target_time)
+            if recorded:
+                return recorded
+
         try:
             from_dt = date.replace(hour=9, minute=15)
             to_dt = date.replace(hour=15, minute=30)
@@ -198,6 +208,17 @@ class RealOptionBacktest:
             logger.debug(f"Error fetching option price: {e}")
             return None
 
+    def get_recorded_option_price(self, tradingsymbol: str, date: datetime,
+                                  target_time: time) -> Optional[float]:
+        """Premium from option_chain_snapshots at (or just before) target_time, or None."""
+        try:
+            from central_quote_db import get_central_db
+            timestamp = datetime.combine(date.date(), target_time).strftime('%Y-%m-%d %H:%M:00')
+            return get_central_db().get_option_ltp_at(tradingsymbol, timestamp)
+        except Exception as e:
+            logger.debug(f"No recorded option chain for {tradingsymbol}: {e}")
+            return None
+
     def calculate_transaction_costs(
         self,
         entry_call: float,
@@ -294,13 +315,15 @@ class RealOptionBacktest:
         ce_entry = self.get_option_price_at_time(
             ce_instrument['instrument_token'],
             trade_date,
-            time(10, 5)
+            time(10, 5),
+            tradingsymbol=ce_instrument['tradingsymbol']
         )
 
         pe_entry = self.get_option_price_at_time(
             pe_instrument['instrument_token'],
             trade_date,
-            time(10, 5)
+            time(10, 5),
+            tradingsymbol=pe_instrument['tradingsymbol']
         )
 
         if not ce_entry or not pe_entry:
@@ -313,13 +336,15 @@ class RealOptionBacktest:
         ce_exit = self.get_option_price_at_time(
             ce_instrument['instrument_token'],
             trade_date,
-            time(15, 10)
+            time(15, 10),
+            tradingsymbol=ce_instrument['tradingsymbol']
         )
 
         pe_exit = self.get_option_price_at_time(
             pe_instrument['instrument_token'],
             trade_date,
-            time(15, 10)
+            time(15, 10),
+            tradingsymbol=pe_instrument['tradingsymbol']
         )
 
         if not ce_exit or not pe_exit:
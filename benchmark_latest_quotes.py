@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: get_latest_stock_quotes - correlated subquery vs latest_stock_quotes snapshot
+
+Builds throwaway central_quotes.db files shaped like production (F&O universe x
+375 one-minute rows per session) at 1-day and 7-day retention, then times:
+
+- OLD: WHERE timestamp = (SELECT MAX(timestamp) ... WHERE sq2.symbol = stock_quotes.symbol)
+- NEW: primary-key scan of latest_stock_quotes (what get_latest_stock_quotes() runs now)
+
+Both are checked to return identical rows before timing. Nothing touches
+data/central_quotes.db.
+
+Usage:
+    python3 benchmark_latest_quotes.py
+    python3 benchmark_latest_quotes.py --symbols 210 --runs 20 --days 1 7
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from central_quote_db import CentralQuoteDB
+
+OLD_QUERY = """
+    SELECT symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low
+    FROM stock_quotes
+    WHERE timestamp = (
+        SELECT MAX(timestamp)
+        FROM stock_quotes sq2
+        WHERE sq2.symbol = stock_quotes.symbol
+    )
+"""
+
+MINUTES_PER_SESSION = 375
+
+
+def seed(db: CentralQuoteDB, symbols: list, days: int):
+    """Write `days` sessions of 1-minute quotes through the real write path."""
+    rng = random.Random(42)
+    prices = {s: rng.uniform(100, 5000) for s in symbols}
+    day = datetime.now().replace(hour=9, minute=15, second=0, microsecond=0)
+    for d in reversed(range(days)):
+        session_start = day - timedelta(days=d)
+        for m in range(MINUTES_PER_SESSION):
+            quotes = {}
+            for s in symbols:
+                prices[s] *= 1 + rng.uniform(-0.001, 0.001)
+                quotes[s] = {'price': round(prices[s], 2), 'volume': (m + 1) * 1000,
+                             'oi': 1_000_000 + m, 'oi_day_high': 1_100_000, 'oi_day_low': 900_000}
+            db.store_stock_quotes(quotes, session_start + timedelta(minutes=m))
+
+
+def time_query(fn, runs: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(symbol_count: int, days: int, runs: int) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix='bench_latest_')
+    try:
+        db_path = os.path.join(tmpdir, 'central_quotes.db')
+        writer = CentralQuoteDB(db_path=db_path, mode='writer')
+        symbols = [f"SYM{i:03d}" for i in range(symbol_count)]
+        seed(writer, symbols, days)
+        writer.close()
+
+        reader = CentralQuoteDB(db_path=db_path, mode='reader')
+        raw = sqlite3.connect(db_path)
+
+        old_rows = {r[0]: r[1:] for r in raw.execute(OLD_QUERY).fetchall()}
+        new_rows = reader.get_latest_stock_quotes()
+        assert len(old_rows) == len(new_rows) == symbol_count, "row count mismatch"
+        for symbol, (ts, price, volume, oi, oi_hi, oi_lo) in old_rows.items():
+            q = new_rows[symbol]
+            assert (q['timestamp'], q['price'], q['volume'], q['oi'], q['oi_day_high'], q['oi_day_low']) == \
+                (ts, price, volume, oi, oi_hi, oi_lo), f"mismatch for {symbol}"
+
+        old_ms = time_query(lambda: raw.execute(OLD_QUERY).fetchall(), runs)
+        new_ms = time_query(reader.get_latest_stock_quotes, runs)
+        total_rows = raw.execute("SELECT COUNT(*) FROM stock_quotes").fetchone()[0]
+        raw.close()
+        reader.close()
+
+        return {'days': days, 'rows': total_rows, 'old_ms': old_ms, 'new_ms': new_ms}
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark latest-quote reads")
+    parser.add_argument('--symbols', type=int, default=210, help="Universe size (default: 210)")
+    parser.add_argument('--runs', type=int, default=20, help="Timed runs per query (default: 20)")
+    parser.add_argument('--days', type=int, nargs='+', default=[1, 7], help="Retention windows (default: 1 7)")
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print(f"get_latest_stock_quotes benchmark - {args.symbols} symbols, median of {args.runs} runs")
+    print("=" * 72)
+    print(f"{'Retention':<12}{'stock_quotes rows':>20}{'OLD (ms)':>12}{'NEW (ms)':>12}{'Speedup':>12}")
+    for days in args.days:
+        r = run(args.symbols, days, args.runs)
+        speedup = r['old_ms'] / r['new_ms'] if r['new_ms'] > 0 else float('inf')
+        print(f"{str(days) + ' day(s)':<12}{r['rows']:>20,}{r['old_ms']:>12.2f}{r['new_ms']:>12.2f}{speedup:>11.1f}x")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PriceCache cycle time - save per symbol vs one dirty-row save per cycle
+
+Runs monitor-shaped cycles (a 200-symbol universe, warmed up so every symbol carries
+a full set of snapshots) against throwaway price_cache.db files and times:
+
+- OLD: update_price() per symbol, each call rewriting every row of every symbol
+       (the pre-dirty-set _save_cache behaviour, reproduced by LegacyPriceCache)
+- NEW: update_prices_bulk() - one transaction with only the changed rows
+- WRITE-BEHIND: update_prices_bulk() with PRICE_CACHE_WRITE_BEHIND (caller time only)
+
+Both OLD and NEW are checked to leave identical price_snapshots rows before timing.
+Nothing touches data/price_cache.db.
+
+Usage:
+    python3 benchmark_price_cache.py
+    python3 benchmark_price_cache.py --symbols 200 --cycles 10 --json-backup
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from unittest import mock
+
+import config
+from price_cache import PriceCache
+
+
+class LegacyPriceCache(PriceCache):
+    """PriceCache with the old persistence: a full rewrite after every update."""
+
+    def _request_save(self):
+        self._save_cache(full=True)
+
+
+def cycle_prices(symbols: list, cycle: int) -> dict:
+    return {s: (100.0 + i + cycle * 0.25, 10_000 * (cycle + 1) + i) for i, s in enumerate(symbols)}
+
+
+def make_cache(cls, tmpdir: str, name: str, write_behind: bool, json_backup: bool) -> PriceCache:
+    with mock.patch.multiple(config,
+                             PRICE_CACHE_FILE=os.path.join(tmpdir, f'{name}.json'),
+                             PRICE_CACHE_DB_FILE=os.path.join(tmpdir, f'{name}.db'),
+                             ENABLE_SQLITE_CACHE=True,
+                             ENABLE_JSON_BACKUP=json_backup,
+                             PRICE_CACHE_WRITE_BEHIND=write_behind):
+        return cls()
+
+
+def snapshot_rows(cache: PriceCache) -> list:
+    conn = sqlite3.connect(cache.db_file)
+    try:
+        return conn.execute("SELECT symbol, snapshot_type, price, volume, timestamp FROM price_snapshots "
+                            "ORDER BY symbol, snapshot_type").fetchall()
+    finally:
+        conn.close()
+
+
+def run_cycles(cache: PriceCache, symbols: list, cycles: int, bulk: bool, offset: int = 0) -> list:
+    """Run `cycles` monitor cycles; return per-cycle wall times in ms."""
+    samples = []
+    for c in range(offset, offset + cycles):
+        prices = cycle_prices(symbols, c)
+        timestamp = f"2026-10-16T10:{c % 60:02d}:00"
+        start = time.perf_counter()
+        if bulk:
+            cache.update_prices_bulk(prices, timestamp=timestamp)
+        else:
+            for symbol, (price, volume) in prices.items():
+                cache.update_price(symbol, price, volume, timestamp)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PriceCache per-cycle persistence benchmark")
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--cycles', type=int, default=10)
+    parser.add_argument('--json-backup', action='store_true', help="Also write the JSON backup (ENABLE_JSON_BACKUP)")
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    warmup = 7  # fill current + previous..previous6 for every symbol
+    tmpdir = tempfile.mkdtemp(prefix='bench_price_cache_')
+    try:
+        old = make_cache(LegacyPriceCache, tmpdir, 'old', False, args.json_backup)
+        new = make_cache(PriceCache, tmpdir, 'new', False, args.json_backup)
+        behind = make_cache(PriceCache, tmpdir, 'behind', True, args.json_backup)
+
+        # Warm up through the fast path, then verify OLD and NEW persist the same rows
+        for cache in (old, new, behind):
+            run_cycles(cache, symbols, warmup, bulk=True)
+        run_cycles(old, symbols, 1, bulk=False, offset=warmup)
+        run_cycles(new, symbols, 1, bulk=True, offset=warmup)
+        assert snapshot_rows(old) == snapshot_rows(new), "OLD and NEW persisted different rows"
+
+        offset = warmup + 1
+        results = {
+            'OLD  update_price() x N, full rewrite each': run_cycles(old, symbols, args.cycles, False, offset),
+            'NEW  update_prices_bulk(), dirty rows once': run_cycles(new, symbols, args.cycles, True, offset),
+            'WRITE-BEHIND  update_prices_bulk()': run_cycles(behind, symbols, args.cycles, True, offset),
+        }
+        behind.close()
+
+        print(f"\nPriceCache cycle time - {args.symbols} symbols, {args.cycles} cycles, "
+              f"JSON backup {'on' if args.json_backup else 'off'}")
+        print(f"{'':<46}{'median ms':>12}{'max ms':>10}")
+        for label, samples in results.items():
+            print(f"{label:<46}{statistics.median(samples):>12.2f}{max(samples):>10.2f}")
+        old_ms = statistics.median(results['OLD  update_price() x N, full rewrite each'])
+        new_ms = statistics.median(results['NEW  update_prices_bulk(), dirty rows once'])
+        print(f"\nSpeed-up (median): {old_ms / new_ms:.0f}x")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
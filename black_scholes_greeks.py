@@ -8,10 +8,12 @@ Used when Greeks are not provided by the API.
 
 import math
 from datetime import datetime, date
-from typing import Dict, Union
+from typing import Dict, List, Sequence, Union
 from scipy.stats import norm
 import numpy as np
 
+import black_scholes_vectorized as bsv
+
 
 class BlackScholesGreeks:
     """
@@ -119,6 +121,53 @@ class BlackScholesGreeks:
         greeks['implied_vol'] = round(iv, 4)
         return greeks
 
+    def calculate_chain_greeks_from_prices(
+        self,
+        spot_price: float,
+        strike_prices: Sequence[float],
+        time_to_expiry: float,
+        option_prices: Sequence[float],
+        option_types: Sequence[str]
+    ) -> List[Dict[str, float]]:
+        """
+        calculate_greeks_from_price() for a whole chain in one vectorized pass.
+
+        IV is solved for every contract at once (black_scholes_vectorized). As in
+        the scalar path, the search is clamped to 1%-200% and a contract whose
+        premium no volatility explains is priced at the 20% default.
+
+        Args:
+            spot_price: Current price of underlying
+            strike_prices: Strike per contract
+            time_to_expiry: Time to expiry in years
+            option_prices: Market price per contract
+            option_types: 'CE' or 'PE' per contract
+
+        Returns:
+            One dict per contract (input order): delta, theta, vega, gamma, implied_vol
+        """
+        if time_to_expiry <= 0:
+            return [dict(self._get_zero_greeks(), implied_vol=0.2) for _ in strike_prices]
+
+        iv, valid = bsv.implied_volatility(
+            spot_price, strike_prices, time_to_expiry, option_prices, option_types,
+            r=self.risk_free_rate, vol_min=0.01, vol_max=2.0
+        )
+        iv = np.where(valid, iv, 0.20)
+        greeks = bsv.bs_greeks(spot_price, strike_prices, time_to_expiry, iv, option_types,
+                               r=self.risk_free_rate)
+
+        return [
+            {
+                'delta': round(float(greeks['delta'][i]), 4),
+                'theta': round(float(greeks['theta'][i]), 4),
+                'vega': round(float(greeks['vega'][i]), 4),
+                'gamma': round(float(greeks['gamma'][i]), 6),
+                'implied_vol': round(float(iv[i]), 4)
+            }
+            for i in range(len(iv))
+        ]
+
     def _calculate_d1_d2(
         self,
         spot: float,
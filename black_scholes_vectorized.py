@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Vectorized Black-Scholes - Prices, Implied Volatility and Greeks for Whole Chains
+
+BlackScholesGreeks._calculate_implied_volatility runs a scalar Newton-Raphson
+on scipy.stats.norm one contract at a time, and NiftyOptionAnalyzer bisects
+with math.erf down to 1e-6 (~22 full Black-Scholes evaluations per contract).
+Both are called in per-strike loops.
+
+This module takes NumPy arrays of (spot, strike, t, premium, option type) -
+scalars broadcast - and prices / inverts / differentiates the whole chain at
+once:
+
+- bs_price():            Black-Scholes price
+- implied_volatility():  safeguarded Newton (rtsafe style): a Newton step is
+                         taken when it stays inside the per-contract bracket,
+                         otherwise the bracket is bisected. The bracket check
+                         up front gives an explicit no-solution mask (premium
+                         below intrinsic, stale quote, expired contract)
+                         instead of a default volatility.
+- bs_greeks():           price, delta, gamma, theta, vega, vanna
+- chain_greeks():        IV + Greeks in one call, with the `valid` mask
+
+Conventions match the scalar code: theta per calendar day, vega and vanna per
+1 volatility point (1%), rates continuously compounded, t in years.
+
+Date: 2026-10-16
+"""
+
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+
+try:
+    from scipy.special import ndtr as _ndtr
+except ImportError:  # scipy is optional; math.erf is exact, just slower
+    _erf = np.frompyfunc(math.erf, 1, 1)
+
+    def _ndtr(x):
+        # frompyfunc hands back a bare float for 0-d input - re-wrap before the cast
+        return 0.5 * (1.0 + np.asarray(_erf(np.asarray(x, dtype=float) / math.sqrt(2.0)), dtype=float))
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+IV_MIN = 0.01       # 1%
+IV_MAX = 3.00       # 300%
+PRICE_TOLERANCE = 1e-6
+VOL_TOLERANCE = 1e-8
+MAX_ITERATIONS = 60
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF, elementwise."""
+    return _ndtr(x)
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal PDF, elementwise."""
+    return _INV_SQRT_2PI * np.exp(-0.5 * np.square(x))
+
+
+def _is_call(option_type) -> np.ndarray:
+    """'CE'/'PE' strings (or booleans, True = call) -> boolean array."""
+    option_type = np.asarray(option_type)
+    if option_type.dtype == bool:
+        return option_type
+    return option_type == 'CE'
+
+
+def _d1_d2(spot, strike, t, vol, r) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """d1, d2 and vol * sqrt(t)."""
+    vol_sqrt_t = vol * np.sqrt(t)
+    d1 = (np.log(spot / strike) + (r + 0.5 * vol * vol) * t) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t, vol_sqrt_t
+
+
+def bs_price(spot, strike, t, vol, option_type, r: float = 0.065) -> np.ndarray:
+    """
+    Black-Scholes price.
+
+    Args:
+        spot, strike, t, vol: Arrays or scalars (broadcast); t in years
+        option_type: 'CE'/'PE' array or scalar
+        r: Risk-free rate (annual, continuous)
+
+    Returns:
+        Price array
+    """
+    spot, strike, t, vol = (np.asarray(a, dtype=float) for a in (spot, strike, t, vol))
+    is_call = _is_call(option_type)
+    d1, d2, _ = _d1_d2(spot, strike, t, vol, r)
+    discounted_strike = strike * np.exp(-r * t)
+    call = spot * norm_cdf(d1) - discounted_strike * norm_cdf(d2)
+    put = discounted_strike * norm_cdf(-d2) - spot * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def _price_and_vega(spot, strike, t, vol, is_call, r):
+    """Price and raw vega (dPrice/dVol, not per 1%) - the Newton pair."""
+    d1, d2, _ = _d1_d2(spot, strike, t, vol, r)
+    discounted_strike = strike * np.exp(-r * t)
+    nd1, nd2 = norm_cdf(d1), norm_cdf(d2)
+    call = spot * nd1 - discounted_strike * nd2
+    price = np.where(is_call, call, call - spot + discounted_strike)  # Put via parity
+    return price, spot * norm_pdf(d1) * np.sqrt(t)
+
+
+def implied_volatility(spot, strike, t, premium, option_type, r: float = 0.065,
+                       vol_min: float = IV_MIN, vol_max: float = IV_MAX,
+                       price_tolerance: float = PRICE_TOLERANCE,
+                       max_iterations: int = MAX_ITERATIONS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Implied volatility for every contract at once.
+
+    Args:
+        spot, strike, t, premium: Arrays or scalars (broadcast); t in years
+        option_type: 'CE'/'PE' array or scalar
+        r: Risk-free rate
+        vol_min, vol_max: Search bracket; a premium outside
+            [price(vol_min), price(vol_max)] has no solution
+        price_tolerance: Stop when |model - premium| is below this
+        max_iterations: Iteration cap (bisection alone halves the bracket each
+            step, so 60 is far more than needed)
+
+    Returns:
+        (iv, valid): iv is NaN where valid is False
+    """
+    spot, strike, t, premium = np.broadcast_arrays(*(np.asarray(a, dtype=float)
+                                                     for a in (spot, strike, t, premium)))
+    is_call = np.broadcast_to(_is_call(option_type), spot.shape)
+    shape = spot.shape
+    spot, strike, t, premium, is_call = (a.ravel() for a in (spot, strike, t, premium, is_call))
+
+    iv = np.full(spot.shape, np.nan)
+    valid = (premium > 0) & (spot > 0) & (strike > 0) & (t > 0)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        idx = np.flatnonzero(valid)
+        s, k, tt, p, c = spot[idx], strike[idx], t[idx], premium[idx], is_call[idx]
+        low = np.full(idx.shape, vol_min)
+        high = np.full(idx.shape, vol_max)
+
+        # Bracket check: price is monotone in volatility
+        price_low, _ = _price_and_vega(s, k, tt, low, c, r)
+        price_high, _ = _price_and_vega(s, k, tt, high, c, r)
+        bracketed = (price_low <= p) & (p <= price_high)
+        valid[idx[~bracketed]] = False
+        idx, s, k, tt, p, c, low, high = (a[bracketed] for a in (idx, s, k, tt, p, c, low, high))
+
+        # Start at the Brenner-Subrahmanyam ATM estimate, kept inside the bracket
+        vol = np.clip(p / s * np.sqrt(2.0 * math.pi / tt), low, high)
+
+        for _ in range(max_iterations):
+            if idx.size == 0:
+                break
+            price, vega = _price_and_vega(s, k, tt, vol, c, r)
+            diff = price - p
+
+            done = (np.abs(diff) < price_tolerance) | (high - low < VOL_TOLERANCE)
+            if done.any():
+                iv[idx[done]] = vol[done]
+                keep = ~done
+                idx, s, k, tt, p, c, low, high, vol, diff, vega = (
+                    a[keep] for a in (idx, s, k, tt, p, c, low, high, vol, diff, vega))
+                if idx.size == 0:
+                    break
+
+            # Tighten the bracket around the root
+            above = diff > 0
+            high = np.where(above, vol, high)
+            low = np.where(above, low, vol)
+
+            # Newton where it lands strictly inside the bracket, bisection elsewhere
+            newton = vol - diff / vega
+            safe = np.isfinite(newton) & (newton > low) & (newton < high)
+            vol = np.where(safe, newton, 0.5 * (low + high))
+
+        iv[idx] = vol  # Iteration cap: the bracket is already narrow
+
+    return iv.reshape(shape), valid.reshape(shape)
+
+
+def bs_greeks(spot, strike, t, vol, option_type, r: float = 0.065) -> Dict[str, np.ndarray]:
+    """
+    Price and Greeks at given volatilities.
+
+    Args:
+        spot, strike, t, vol: Arrays or scalars (broadcast); t in years
+        option_type: 'CE'/'PE' array or scalar
+        r: Risk-free rate
+
+    Returns:
+        {price, delta, gamma, theta (per day), vega (per 1%), vanna (delta per 1%)}
+    """
+    spot, strike, t, vol = (np.asarray(a, dtype=float) for a in (spot, strike, t, vol))
+    is_call = _is_call(option_type)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, d2, vol_sqrt_t = _d1_d2(spot, strike, t, vol, r)
+        pdf_d1 = norm_pdf(d1)
+        nd1, nd2 = norm_cdf(d1), norm_cdf(d2)
+        discounted_strike = strike * np.exp(-r * t)
+        sqrt_t = np.sqrt(t)
+
+        call = spot * nd1 - discounted_strike * nd2
+        decay = -(spot * pdf_d1 * vol) / (2 * sqrt_t)
+        return {
+            'price': np.where(is_call, call, call - spot + discounted_strike),
+            'delta': np.where(is_call, nd1, nd1 - 1.0),
+            'gamma': pdf_d1 / (spot * vol_sqrt_t),
+            'theta': np.where(is_call,
+                              decay - r * discounted_strike * nd2,
+                              decay + r * discounted_strike * (1.0 - nd2)) / 365.0,
+            'vega': spot * pdf_d1 * sqrt_t / 100.0,
+            'vanna': -pdf_d1 * d2 / vol / 100.0,
+        }
+
+
+def chain_greeks(spot, strike, t, premium, option_type, r: float = 0.065,
+                 vol_min: float = IV_MIN, vol_max: float = IV_MAX) -> Dict[str, np.ndarray]:
+    """
+    Implied volatility and Greeks for a chain in one pass.
+
+    Args:
+        spot, strike, t, premium: Arrays or scalars (broadcast); t in years
+        option_type: 'CE'/'PE' array or scalar
+        r: Risk-free rate
+        vol_min, vol_max: IV search bracket
+
+    Returns:
+        bs_greeks() keys plus `iv` and `valid`; every Greek is NaN where valid is False
+    """
+    iv, valid = implied_volatility(spot, strike, t, premium, option_type, r, vol_min, vol_max)
+    greeks = bs_greeks(spot, strike, t, iv, option_type, r)
+    greeks['iv'] = iv
+    greeks['valid'] = valid
+    return greeks
@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+Candle Warehouse - Local OHLCV Store Shared by the Backtests
+
+The backtests called kite.historical_data() per symbol on every run, with a
+fixed sleep between symbols, so rerunning a 30-day 1-minute backtest
+re-downloaded everything. The warehouse keeps every candle fetched once on
+disk and serves later runs from there:
+
+    data/candle_warehouse/<interval>/<SYMBOL>/<YYYY-MM>.npy
+    data/candle_warehouse/<interval>/<SYMBOL>/coverage.json
+
+Each month file is one float64 array of shape (6, n): rows are ts (epoch
+seconds), open, high, low, close, volume - column-major, so a column of a
+month is a contiguous slice. Files are read with mmap: a range inside one
+month comes back as views of the file (no copy, no parse); a range spanning
+months costs one concatenate per column.
+
+coverage.json records the IST dates already fetched (holidays included, so
+they are not refetched). sync() asks Kite only for the missing dates, split
+into Kite's per-request limits, through the shared historical rate limiter.
+Today is only marked covered after the close, so an intraday sync is
+completed by the next one.
+
+Usage:
+    from candle_warehouse import get_candle_warehouse, load_candles
+
+    warehouse = get_candle_warehouse()
+    warehouse.sync(kite, ['RELIANCE'], 'minute', date(2026, 9, 1), date(2026, 9, 30))
+    candles = load_candles(['RELIANCE'], 'minute', date(2026, 9, 1), date(2026, 9, 30))
+    closes = candles['RELIANCE'].close                # np.ndarray
+    rows = candles['RELIANCE'].to_dicts()             # kite.historical_data() format
+
+    # Backtests: fetch only what is missing, return Kite-format candles
+    rows = warehouse.historical_data(kite, 'RELIANCE', from_date, to_date, 'day', token)
+
+Sync from the command line (F&O universe, last 30 days of 1-minute candles):
+    python candle_warehouse.py sync --interval minute --days 30
+
+Date: 2026-10-16
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+FIELDS = ('ts', 'open', 'high', 'low', 'close', 'volume')
+
+SESSION_CLOSE = dtime(15, 30)   # NSE close: a day's candles are final after this
+
+# Longest date range Kite serves in one historical_data() call, per interval
+INTERVAL_MAX_DAYS = {
+    'minute': 60,
+    '3minute': 100,
+    '5minute': 100,
+    '10minute': 100,
+    '15minute': 200,
+    '30minute': 200,
+    '60minute': 400,
+    'day': 2000,
+}
+
+DateLike = Union[date, datetime]
+
+
+def to_ts(value: datetime) -> float:
+    """Epoch seconds; naive datetimes are IST (Kite / exchange time)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=IST)
+    return value.timestamp()
+
+
+def _bounds(start: DateLike, end: DateLike) -> Tuple[float, float]:
+    """[start, end] as epoch seconds; a date end covers that whole day."""
+    if not isinstance(start, datetime):
+        start = datetime.combine(start, dtime.min)
+    if not isinstance(end, datetime):
+        end = datetime.combine(end, dtime.max)
+    return to_ts(start), to_ts(end)
+
+
+def _as_date(value: DateLike) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _merge_ranges(ranges: Iterable[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    """Sort and merge overlapping / adjacent inclusive date ranges."""
+    merged: List[Tuple[date, date]] = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _missing_ranges(covered: List[Tuple[date, date]], start: date, end: date) -> List[Tuple[date, date]]:
+    """Inclusive date ranges within [start, end] not in covered (merged, sorted)."""
+    missing, cursor = [], start
+    for lo, hi in covered:
+        if hi < cursor:
+            continue
+        if lo > end:
+            break
+        if lo > cursor:
+            missing.append((cursor, min(end, lo - timedelta(days=1))))
+        cursor = max(cursor, hi + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        missing.append((cursor, end))
+    return missing
+
+
+class Candles:
+    """One symbol's candles as columns (views of the month files when the range is in one month)."""
+
+    def __init__(self, data: np.ndarray):
+        """
+        Args:
+            data: float64 array of shape (6, n), rows in FIELDS order
+        """
+        self.data = data
+
+    def __len__(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def ts(self) -> np.ndarray:
+        return self.data[0]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.data[1]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.data[2]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.data[3]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.data[4]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.data[5]
+
+    def to_dicts(self) -> List[Dict]:
+        """Candles in kite.historical_data() format (IST-aware 'date')."""
+        return [
+            {'date': datetime.fromtimestamp(ts, IST), 'open': o, 'high': h, 'low': l,
+             'close': c, 'volume': int(v)}
+            for ts, o, h, l, c, v in zip(*(column.tolist() for column in self.data))
+        ]
+
+    def to_frame(self):
+        """
+        Candles as a pandas DataFrame.
+
+        Returns:
+            DataFrame with a naive IST 'date' column and open/high/low/close/volume
+        """
+        import pandas as pd
+
+        return pd.DataFrame({
+            'date': pd.to_datetime(self.ts, unit='s').tz_localize('UTC').tz_convert(IST).tz_localize(None),
+            'open': self.open, 'high': self.high, 'low': self.low, 'close': self.close,
+            'volume': self.volume.astype(np.int64),
+        })
+
+
+def _rows(candles: List[Dict]) -> np.ndarray:
+    """Kite candles -> (6, n) float64 array"""
+    data = np.empty((len(FIELDS), len(candles)), dtype=np.float64)
+    for j, c in enumerate(candles):
+        data[:, j] = (to_ts(c['date']), c['open'], c['high'], c['low'], c['close'], c.get('volume', 0))
+    return data
+
+
+class CandleWarehouse:
+    """Columnar OHLCV files partitioned by interval, symbol and month."""
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Warehouse directory (default: config.CANDLE_WAREHOUSE_DIR)
+        """
+        self.root = Path(root or config.CANDLE_WAREHOUSE_DIR)
+        self._lock = threading.Lock()
+
+    def _dir(self, interval: str, symbol: str) -> Path:
+        return self.root / interval / symbol
+
+    # ------------------------------------------------------------------
+    # Coverage
+    # ------------------------------------------------------------------
+
+    def coverage(self, symbol: str, interval: str) -> List[Tuple[date, date]]:
+        """
+        Dates already synced for a symbol.
+
+        Returns:
+            Merged, sorted inclusive (from, to) date ranges
+        """
+        path = self._dir(interval, symbol) / 'coverage.json'
+        try:
+            with open(path) as f:
+                ranges = json.load(f)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.warning(f"{symbol}/{interval}: unreadable coverage file, treating as empty: {e}")
+            return []
+        return [(date.fromisoformat(lo), date.fromisoformat(hi)) for lo, hi in ranges]
+
+    def _mark_covered(self, symbol: str, interval: str, start: date, end: date):
+        ranges = _merge_ranges(self.coverage(symbol, interval) + [(start, end)])
+        path = self._dir(interval, symbol) / 'coverage.json'
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump([[lo.isoformat(), hi.isoformat()] for lo, hi in ranges], f)
+        os.replace(tmp, path)
+
+    def missing(self, symbol: str, interval: str, start: DateLike, end: DateLike) -> List[Tuple[date, date]]:
+        """Inclusive date ranges within [start, end] not yet synced."""
+        return _missing_ranges(self.coverage(symbol, interval), _as_date(start), _as_date(end))
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def store(self, symbol: str, interval: str, candles: List[Dict]) -> int:
+        """
+        Merge Kite-format candles into the month files (newer values win on equal timestamps).
+
+        Args:
+            symbol: Trading symbol
+            interval: Kite interval
+            candles: kite.historical_data() rows
+
+        Returns:
+            Number of candles written
+        """
+        if not candles:
+            return 0
+        new = _rows(candles)
+        ist_days = ((new[0] + IST.utcoffset(None).total_seconds()) // 86400).astype('datetime64[D]')
+        months = ist_days.astype('datetime64[M]')
+
+        directory = self._dir(interval, symbol)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            for month in np.unique(months):
+                path = directory / f"{month}.npy"
+                part = new[:, months == month]
+                if path.exists():
+                    part = np.concatenate([np.load(path), part], axis=1)
+                order = np.argsort(part[0], kind='stable')
+                part = part[:, order]
+                keep = np.append(part[0, 1:] != part[0, :-1], True)   # last write of each ts
+                tmp = directory / f"{month}.tmp.npy"
+                np.save(tmp, np.ascontiguousarray(part[:, keep]))
+                os.replace(tmp, path)
+        return len(candles)
+
+    def sync(
+        self,
+        kite,
+        symbols: Iterable[str],
+        interval: str,
+        start: DateLike,
+        end: DateLike,
+        tokens: Optional[Dict[str, int]] = None,
+        now: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        Fetch the dates in [start, end] that are not in the warehouse yet.
+
+        Args:
+            kite: KiteConnect instance
+            symbols: Trading symbols
+            interval: Kite interval ('minute', '5minute', 'day', ...)
+            start: First date
+            end: Last date
+            tokens: {symbol: instrument_token}; missing ones come from the instrument master
+            now: Current time (default: datetime.now()), for today's completeness
+
+        Returns:
+            {symbol: candles fetched} for symbols that needed a fetch
+        """
+        from kite_rate_limiter import get_historical_rate_limiter
+
+        symbols = list(symbols)
+        tokens = dict(tokens or {})
+        unresolved = [s for s in symbols if s not in tokens]
+        if unresolved:
+            from instrument_master import get_instrument_master
+            tokens.update(get_instrument_master(kite).index('NSE').tokens(unresolved))
+
+        now = now or datetime.now()
+        closed = now.time() >= SESSION_CLOSE
+        last_complete = now.date() if closed else now.date() - timedelta(days=1)
+        chunk_days = INTERVAL_MAX_DAYS.get(interval, 60)
+        limiter = get_historical_rate_limiter()
+
+        fetched = {}
+        for symbol in symbols:
+            gaps = self.missing(symbol, interval, start, end)
+            if not gaps:
+                continue
+            token = tokens.get(symbol)
+            if token is None:
+                logger.warning(f"{symbol}: No instrument token - not synced")
+                continue
+
+            count = 0
+            for lo, hi in gaps:
+                chunk_start = lo
+                while chunk_start <= hi:
+                    chunk_end = min(hi, chunk_start + timedelta(days=chunk_days - 1))
+                    limiter.acquire()
+                    try:
+                        candles = kite.historical_data(
+                            instrument_token=token,
+                            from_date=datetime.combine(chunk_start, dtime.min),
+                            to_date=datetime.combine(chunk_end, dtime(23, 59, 59)),
+                            interval=interval
+                        )
+                    except Exception as e:
+                        logger.error(f"{symbol}: {interval} fetch {chunk_start}..{chunk_end} failed: {e}")
+                        break
+                    count += self.store(symbol, interval, candles)
+                    if chunk_start <= last_complete:
+                        self._mark_covered(symbol, interval, chunk_start, min(chunk_end, last_complete))
+                    chunk_start = chunk_end + timedelta(days=1)
+
+            fetched[symbol] = count
+            logger.info(f"{symbol}: synced {count} {interval} candles ({len(gaps)} missing range(s))")
+        return fetched
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def load(self, symbol: str, interval: str, start: DateLike, end: DateLike) -> Candles:
+        """
+        A symbol's candles in [start, end] (a date end includes that whole day).
+
+        Returns:
+            Candles - empty if nothing is stored
+        """
+        lo_ts, hi_ts = _bounds(start, end)
+        first = datetime.fromtimestamp(lo_ts, IST).strftime('%Y-%m')
+        last = datetime.fromtimestamp(hi_ts, IST).strftime('%Y-%m')
+
+        directory = self._dir(interval, symbol)
+        parts = []
+        if directory.is_dir():
+            for path in sorted(directory.glob('????-??.npy')):
+                if not first <= path.stem <= last:
+                    continue
+                data = np.load(path, mmap_mode='r')
+                i = np.searchsorted(data[0], lo_ts, side='left')
+                j = np.searchsorted(data[0], hi_ts, side='right')
+                if j > i:
+                    parts.append(data[:, i:j])
+
+        if not parts:
+            return Candles(np.empty((len(FIELDS), 0), dtype=np.float64))
+        return Candles(parts[0] if len(parts) == 1 else np.concatenate(parts, axis=1))
+
+    def historical_data(
+        self,
+        kite,
+        symbol: str,
+        from_date: DateLike,
+        to_date: DateLike,
+        interval: str,
+        token: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Drop-in for kite.historical_data(): sync what is missing, then read locally.
+
+        Args:
+            kite: KiteConnect instance, or None to read the warehouse only
+            symbol: Trading symbol
+            from_date: Start date / datetime
+            to_date: End date / datetime
+            interval: Kite interval
+            token: Instrument token (looked up in the instrument master if omitted)
+
+        Returns:
+            List of candles in kite.historical_data() format
+        """
+        if kite is not None:
+            self.sync(kite, [symbol], interval, from_date, to_date,
+                      tokens={symbol: token} if token is not None else None)
+        return self.load(symbol, interval, from_date, to_date).to_dicts()
+
+    def stats(self) -> Dict:
+        """File count and size per interval."""
+        result = {}
+        if not self.root.is_dir():
+            return result
+        for interval_dir in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            files = list(interval_dir.glob('*/????-??.npy'))
+            result[interval_dir.name] = {
+                'symbols': len({f.parent.name for f in files}),
+                'files': len(files),
+                'size_mb': round(sum(f.stat().st_size for f in files) / 1024 / 1024, 2),
+            }
+        return result
+
+
+_instances: Dict[str, CandleWarehouse] = {}
+_instances_lock = threading.Lock()
+
+
+def get_candle_warehouse(root: Optional[str] = None) -> CandleWarehouse:
+    """
+    Get the process-wide CandleWarehouse for a directory.
+
+    Args:
+        root: Warehouse directory (default: config.CANDLE_WAREHOUSE_DIR)
+
+    Returns:
+        CandleWarehouse instance
+    """
+    path = root or config.CANDLE_WAREHOUSE_DIR
+    with _instances_lock:
+        if path not in _instances:
+            _instances[path] = CandleWarehouse(path)
+        return _instances[path]
+
+
+def load_candles(
+    symbols: Iterable[str],
+    interval: str,
+    start: DateLike,
+    end: DateLike,
+    root: Optional[str] = None
+) -> Dict[str, Candles]:
+    """
+    Read candles for several symbols from the warehouse (no Kite calls).
+
+    Args:
+        symbols: Trading symbols
+        interval: Kite interval
+        start: Start date / datetime
+        end: End date / datetime (a date includes that whole day)
+        root: Warehouse directory (default: config.CANDLE_WAREHOUSE_DIR)
+
+    Returns:
+        {symbol: Candles} - empty Candles for symbols with nothing stored
+    """
+    warehouse = get_candle_warehouse(root)
+    return {symbol: warehouse.load(symbol, interval, start, end) for symbol in symbols}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Local OHLCV warehouse for backtests')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sync_parser = sub.add_parser('sync', help='Fetch missing candles from Kite')
+    sync_parser.add_argument('--interval', default='day', choices=sorted(INTERVAL_MAX_DAYS))
+    sync_parser.add_argument('--days', type=int, default=30, help='Calendar days back from today (default: 30)')
+    sync_parser.add_argument('--from', dest='from_date', help='Start date YYYY-MM-DD (overrides --days)')
+    sync_parser.add_argument('--to', dest='to_date', help='End date YYYY-MM-DD (default: today)')
+    sync_parser.add_argument('--symbols', nargs='+', help='Symbols (default: F&O stock list)')
+    sub.add_parser('stats', help='Show warehouse contents')
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        for name, info in get_candle_warehouse().stats().items():
+            print(f"{name}: {info['symbols']} symbols, {info['files']} files, {info['size_mb']} MB")
+    else:
+        from kiteconnect import KiteConnect
+
+        to_date = date.fromisoformat(args.to_date) if args.to_date else date.today()
+        from_date = date.fromisoformat(args.from_date) if args.from_date else to_date - timedelta(days=args.days)
+        symbols = args.symbols
+        if not symbols:
+            with open(config.STOCK_LIST_FILE) as f:
+                symbols = json.load(f)['stocks']
+
+        kite = KiteConnect(api_key=config.KITE_API_KEY)
+        kite.set_access_token(config.KITE_ACCESS_TOKEN)
+        fetched = get_candle_warehouse().sync(kite, symbols, args.interval, from_date, to_date)
+        print(f"Synced {len(fetched)}/{len(symbols)} symbols, "
+              f"{sum(fetched.values())} {args.interval} candles ({from_date} to {to_date})")
@@ -197,6 +197,7 @@ class CentralDataBackfill:
             # Store each minute's data
             cursor = self.db.conn.cursor()
             records_stored = 0
+            last_row = None
 
             for candle in data:
                 timestamp = candle['date']
@@ -216,6 +217,11 @@ class CentralDataBackfill:
 
                 if cursor.rowcount > 0:
                     records_stored += 1
+                    last_row = (symbol, ts_str, candle['close'], candle['volume'], 0, 0, 0, now_str)
+
+            # Keep the latest-quote snapshot in step (no-op unless this minute is newer)
+            if last_row:
+                self.db.upsert_latest_stock_quotes(cursor, [last_row])
 
             self.db.conn.commit()
             return records_stored
@@ -16,6 +16,16 @@ ROBUSTNESS FEATURES:
 - Token validation before collection
 - Health tracking and alerting
 - Graceful degradation
+- Tick-built minute bars (ENABLE_TICK_MINUTE_BARS): stock quotes come from the
+  order-flow tick stream when it covers the minute; REST polling is the fallback
+- Incremental indicators (ENABLE_INDICATOR_ENGINE): each stored minute updates
+  running VWAP / OBV / RSI / ATR that the detectors read without SQL
+- Option chain snapshots (ENABLE_OPTION_CHAIN_COLLECTOR): the NIFTY chain around
+  ATM with IV / Greeks, stored each cycle in option_chain_snapshots
+- Minute bus (ENABLE_MINUTE_BUS): "minute committed" is published right after the
+  cycle's transaction so consumer services wake on it instead of their timers
+- Quote snapshot (ENABLE_QUOTE_SNAPSHOT): the committed stock quotes are also
+  written to a shared-memory array that consumers read instead of SQLite
 
 Author: Claude Sonnet 4.5
 Date: 2026-01-19
@@ -27,8 +37,9 @@ import os
 import sys
 import time
 import random
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from kiteconnect import KiteConnect
 from kiteconnect.exceptions import (
     TokenException, NetworkException, GeneralException,
@@ -37,6 +48,14 @@ from kiteconnect.exceptions import (
 
 import config
 from central_quote_db import get_central_db_writer
+from indicator_engine import IndicatorEngine
+from instrument_master import get_instrument_master
+from kite_rate_limiter import get_quote_rate_limiter
+from minute_bar_builder import METADATA_KEY as TICK_BARS_METADATA_KEY
+from minute_bus import FLAG_NIFTY, FLAG_VIX, get_minute_bus
+from quote_snapshot import get_quote_snapshot
+from option_chain_collector import OptionChainCollector
+from quote_window import QuoteWindow
 # Note: Market hour checks handled by central_data_collector_continuous.py
 from futures_mapper import get_futures_mapper
 
@@ -46,6 +65,10 @@ INITIAL_RETRY_DELAY = 1.0  # seconds
 MAX_RETRY_DELAY = 10.0  # seconds
 BACKOFF_MULTIPLIER = 2.0
 
+# Index instruments (fetched in the same quote() batches as the stocks)
+NIFTY_INSTRUMENT = "NSE:NIFTY 50"
+VIX_INSTRUMENT = "NSE:INDIA VIX"
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -98,6 +121,9 @@ class CentralDataCollector:
 
         logger.info("✓ Kite Connect initialized and token validated")
 
+        # Every kite.quote() call from this process draws from one token bucket
+        self.rate_limiter = get_quote_rate_limiter()
+
         # Initialize central database
         logger.info("Initializing central database...")
         self.db = get_central_db_writer()  # Writer mode for central collector
@@ -107,6 +133,70 @@ class CentralDataCollector:
         self.stocks = self._load_stock_list()
         logger.info(f"✓ Loaded {len(self.stocks)} F&O stocks")
 
+        # In-memory rolling window of today's quotes, shared with the detectors
+        # so a detection cycle reads no SQL (SQLite stays the durable store)
+        self.quote_window = None
+        if config.ENABLE_QUOTE_WINDOW:
+            try:
+                self.quote_window = QuoteWindow(symbols=self.stocks)
+                self.quote_window.load_from_db(self.db)
+                logger.info("✓ Quote window initialized")
+            except Exception as e:
+                logger.error(f"Failed to initialize quote window (detectors will read SQLite): {e}")
+                self.quote_window = None
+
+        # Running VWAP / OBV / RSI / ATR per symbol, fed each stored cycle and
+        # handed to the detectors; resumes from saved state, then replays the gap
+        self.indicators = None
+        if config.ENABLE_INDICATOR_ENGINE:
+            try:
+                self.indicators = IndicatorEngine(db_path=config.INDICATOR_STATE_DB_PATH)
+                self.indicators.load()
+                today = datetime.now().strftime('%Y-%m-%d 00:00:00')
+                history = (self.quote_window.since(today) if self.quote_window is not None
+                           else self.db.get_all_stock_history_since(today))
+                replayed = self.indicators.catch_up(history)
+                self.indicators.save()
+                logger.info(f"✓ Indicator engine initialized ({len(self.indicators)} symbols, "
+                           f"{replayed} minutes replayed)")
+            except Exception as e:
+                logger.error(f"Failed to initialize indicator engine (detectors will recompute): {e}")
+                self.indicators = None
+
+        # NIFTY option chain around ATM, one batched quote per cycle - quoted on
+        # its own thread while the stock batches are fetched
+        self.option_chain = None
+        self._chain_pool = None
+        if config.ENABLE_OPTION_CHAIN_COLLECTOR:
+            try:
+                self.option_chain = OptionChainCollector(self._quote, self.db,
+                                                         get_instrument_master(self.kite))
+                self._chain_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="option-chain")
+                logger.info("✓ Option chain collector initialized")
+            except Exception as e:
+                logger.error(f"Failed to initialize option chain collector: {e}")
+                self.option_chain = None
+
+        # "Minute committed" events for consumer services (minute_bus.py)
+        self.minute_bus = None
+        if config.ENABLE_MINUTE_BUS:
+            try:
+                self.minute_bus = get_minute_bus()
+                logger.info(f"✓ Minute bus initialized ({self.minute_bus.path})")
+            except Exception as e:
+                logger.error(f"Failed to initialize minute bus (consumers stay on timers): {e}")
+                self.minute_bus = None
+
+        # Latest quote universe in shared memory for consumer services (quote_snapshot.py)
+        self.quote_snapshot = None
+        if config.ENABLE_QUOTE_SNAPSHOT:
+            try:
+                self.quote_snapshot = get_quote_snapshot()
+                logger.info(f"✓ Quote snapshot initialized ({self.quote_snapshot.path})")
+            except Exception as e:
+                logger.error(f"Failed to initialize quote snapshot (consumers read SQLite): {e}")
+                self.quote_snapshot = None
+
         # Initialize futures mapper for OI data
         self.futures_mapper = None
         if config.ENABLE_FUTURES_OI:
@@ -328,21 +418,37 @@ class CentralDataCollector:
             'nifty_stored': False,
             'vix_fetched': False,
             'vix_stored': False,
+            'option_contracts_stored': 0,
             'errors': 0,
             'data_quality': 'UNKNOWN',
             'stock_quotes': {}  # For rapid_drop_detector: {symbol: {price, volume, oi, ...}}
         }
 
         start_time = time.time()
+        chain_job = self._start_option_chain(timestamp)
 
         try:
             # ============================================
             # Step 1: Fetch ALL data first (don't store yet)
             # ============================================
 
-            # Fetch F&O stock quotes
-            logger.info(f"Fetching quotes for {len(self.stocks)} stocks...")
-            stock_quotes, all_quotes_raw, instrument_map_raw = self._fetch_stock_quotes()
+            # Prefer this minute's tick-built bars (already in the DB, written by
+            # order_flow_monitor); poll Kite REST only as the fallback. The first
+            # cycle always polls - prev_close comes from the REST quote's ohlc.
+            tick_quotes = self._tick_bar_quotes(timestamp) if self._prev_close_stored else None
+            if tick_quotes is not None:
+                stock_quotes, instrument_map_raw = tick_quotes, {}
+                all_quotes_raw = self._fetch_index_quotes()
+                collection_stats['stock_source'] = 'ticks'
+                logger.info(f"Using tick-built bars for {len(stock_quotes)} stocks (REST poll skipped)")
+            else:
+                # Fetch F&O stock quotes (NIFTY/VIX ride along in the same batches
+                # when concurrent fetch is enabled)
+                logger.info(f"Fetching quotes for {len(self.stocks)} stocks...")
+                concurrent = config.ENABLE_CONCURRENT_QUOTE_FETCH
+                index_instruments = (NIFTY_INSTRUMENT, VIX_INSTRUMENT) if concurrent else ()
+                stock_quotes, all_quotes_raw, instrument_map_raw = self._fetch_stock_quotes(index_instruments)
+                collection_stats['stock_source'] = 'rest'
             collection_stats['stocks_fetched'] = len(stock_quotes)
             collection_stats['stock_quotes'] = stock_quotes  # Include for rapid_drop_detector
 
@@ -360,14 +466,18 @@ class CentralDataCollector:
                     logger.info(f"Stored prev_close for {len(prev_close_map)} symbols")
                     self._prev_close_stored = True
 
-            # Fetch NIFTY spot data
-            logger.info("Fetching NIFTY 50 quote...")
-            nifty_quote = self._fetch_nifty_quote()
+            # NIFTY spot data (separate call only if it was not in the batches)
+            nifty_quote = all_quotes_raw.get(NIFTY_INSTRUMENT)
+            if nifty_quote is None:
+                logger.info("Fetching NIFTY 50 quote...")
+                nifty_quote = self._fetch_nifty_quote()
             collection_stats['nifty_fetched'] = (nifty_quote is not None)
 
-            # Fetch India VIX data
-            logger.info("Fetching India VIX quote...")
-            vix_quote = self._fetch_vix_quote()
+            # India VIX data (separate call only if it was not in the batches)
+            vix_quote = all_quotes_raw.get(VIX_INSTRUMENT)
+            if vix_quote is None:
+                logger.info("Fetching India VIX quote...")
+                vix_quote = self._fetch_vix_quote()
             collection_stats['vix_fetched'] = (vix_quote is not None)
 
             # ============================================
@@ -385,13 +495,75 @@ class CentralDataCollector:
             logger.info(f"  VIX: {'✓ PASS' if vix_ok else '✗ FAIL'}")
 
             # ============================================
-            # Step 3: Store ONLY if data quality is acceptable
+            # Step 3: Determine overall data quality
             # ============================================
 
+            metadata = {}
+            if stocks_ok and nifty_ok and vix_ok:
+                collection_stats['data_quality'] = 'COMPLETE'
+                metadata['last_collection_time'] = timestamp.isoformat()
+                metadata['collection_status'] = 'success'
+            elif stocks_ok:
+                # Stocks OK but NIFTY/VIX failed - partial success
+                collection_stats['data_quality'] = 'PARTIAL'
+                metadata['last_collection_time'] = timestamp.isoformat()
+                metadata['collection_status'] = 'partial: stocks_only'
+            else:
+                # Stocks failed - this is a failure
+                collection_stats['data_quality'] = 'FAILED'
+                metadata['collection_status'] = (
+                    f'failed: {collection_stats["stocks_fetched"]}/{collection_stats["stocks_expected"]} stocks')
+                if self._consecutive_failures + 1 >= 3:
+                    metadata['health_alert'] = (
+                        f'consecutive_failures: {self._consecutive_failures + 1}, data may be stale')
+
+            # ============================================
+            # Step 4: Store ONLY data that passed validation - one transaction
+            # ============================================
+            # Stocks, NIFTY, VIX and metadata commit together (one fsync), so
+            # readers never see a half-written minute. Failed parts are left out
+            # and the last known good data stays in the database.
+
+            nifty_row = None
+            if nifty_ok:
+                nifty_row = {
+                    'price': nifty_quote['last_price'],
+                    'open': nifty_quote.get('ohlc', {}).get('open'),
+                    'high': nifty_quote.get('ohlc', {}).get('high'),
+                    'low': nifty_quote.get('ohlc', {}).get('low'),
+                    'volume': nifty_quote.get('volume', 0)
+                }
+            vix_row = None
+            if vix_ok:
+                vix_row = {
+                    'price': vix_quote['last_price'],
+                    'open': vix_quote.get('ohlc', {}).get('open'),
+                    'high': vix_quote.get('ohlc', {}).get('high'),
+                    'low': vix_quote.get('ohlc', {}).get('low')
+                }
+
+            option_rows = self._finish_option_chain(
+                chain_job, timestamp, nifty_quote['last_price'] if nifty_ok else None)
+
+            # Tick-built stock rows are already committed - don't write them twice
+            write_ms = self.db.write_cycle(
+                timestamp,
+                stock_quotes=stock_quotes if stocks_ok and tick_quotes is None else None,
+                nifty=nifty_row,
+                vix=vix_row,
+                metadata=metadata,
+                option_chain=option_rows
+            )
+            collection_stats['db_write_ms'] = round(write_ms, 1)
+            self._report_write_latency(write_ms)
+
             if stocks_ok:
-                # Stock data meets accuracy threshold - store it
-                self.db.store_stock_quotes(stock_quotes, timestamp)
+                self._publish_snapshot(timestamp, stock_quotes)
+                self._publish_minute(timestamp, len(stock_quotes), nifty_ok, vix_ok)
                 collection_stats['stocks_stored'] = len(stock_quotes)
+                self._update_quote_window(timestamp, stock_quotes,
+                                          nifty_quote['last_price'] if nifty_ok else None)
+                self._update_indicators(timestamp, stock_quotes)
                 logger.info(f"✓ Stored {len(stock_quotes)} stock quotes (accuracy: "
                            f"{len(stock_quotes)/len(self.stocks)*100:.1f}%)")
             else:
@@ -402,35 +574,19 @@ class CentralDataCollector:
                 logger.error("  Keeping last known good data in database")
 
             if nifty_ok:
-                # NIFTY data valid - store it
-                self.db.store_nifty_quote(
-                    price=nifty_quote['last_price'],
-                    ohlc={
-                        'open': nifty_quote.get('ohlc', {}).get('open'),
-                        'high': nifty_quote.get('ohlc', {}).get('high'),
-                        'low': nifty_quote.get('ohlc', {}).get('low'),
-                        'volume': nifty_quote.get('volume', 0)
-                    },
-                    timestamp=timestamp
-                )
                 collection_stats['nifty_stored'] = True
                 logger.info(f"✓ Stored NIFTY quote: ₹{nifty_quote['last_price']:.2f}")
+                if not stocks_ok:
+                    self._update_quote_window(timestamp, {}, nifty_quote['last_price'])
+                if self.option_chain:
+                    collection_stats['option_contracts_stored'] = len(option_rows)
+                    self._report_option_chain(len(option_rows))
             else:
                 # NIFTY failed - DON'T store, keep last known good data
                 collection_stats['errors'] += 1
                 logger.error("✗ NOT storing NIFTY quote - fetch failed, keeping last known good data")
 
             if vix_ok:
-                # VIX data valid - store it
-                self.db.store_vix_quote(
-                    vix_value=vix_quote['last_price'],
-                    ohlc={
-                        'open': vix_quote.get('ohlc', {}).get('open'),
-                        'high': vix_quote.get('ohlc', {}).get('high'),
-                        'low': vix_quote.get('ohlc', {}).get('low')
-                    },
-                    timestamp=timestamp
-                )
                 collection_stats['vix_stored'] = True
                 logger.info(f"✓ Stored VIX quote: {vix_quote['last_price']:.2f}")
             else:
@@ -438,36 +594,19 @@ class CentralDataCollector:
                 collection_stats['errors'] += 1
                 logger.error("✗ NOT storing VIX quote - fetch failed, keeping last known good data")
 
-            # ============================================
-            # Step 4: Determine overall data quality
-            # ============================================
-
+            # Health counters move only once the cycle is committed
             if stocks_ok and nifty_ok and vix_ok:
-                collection_stats['data_quality'] = 'COMPLETE'
                 self._consecutive_failures = 0
                 self._total_successes += 1
                 self._last_successful_collection = timestamp
-                self.db.update_metadata('last_collection_time', timestamp.isoformat())
-                self.db.update_metadata('collection_status', 'success')
-            elif stocks_ok:
-                # Stocks OK but NIFTY/VIX failed - partial success
-                collection_stats['data_quality'] = 'PARTIAL'
-                self.db.update_metadata('last_collection_time', timestamp.isoformat())
-                self.db.update_metadata('collection_status', 'partial: stocks_only')
-            else:
-                # Stocks failed - this is a failure
-                collection_stats['data_quality'] = 'FAILED'
+            elif not stocks_ok:
                 self._consecutive_failures += 1
                 self._total_failures += 1
-                self.db.update_metadata('collection_status',
-                    f'failed: {collection_stats["stocks_fetched"]}/{collection_stats["stocks_expected"]} stocks')
 
                 # Alert on consecutive failures
                 if self._consecutive_failures >= 3:
                     logger.critical(f"🚨 ALERT: {self._consecutive_failures} consecutive collection failures!")
                     logger.critical("🚨 Database contains STALE data - services may be using outdated prices!")
-                    self.db.update_metadata('health_alert',
-                        f'consecutive_failures: {self._consecutive_failures}, data may be stale')
 
         except TokenException as e:
             logger.error(f"❌ TOKEN ERROR: {e}")
@@ -509,6 +648,185 @@ class CentralDataCollector:
 
         return collection_stats
 
+    def _report_write_latency(self, write_ms: float):
+        """Report this cycle's DB write latency to service_health (error-isolated)."""
+        try:
+            from service_health import get_health_tracker
+            get_health_tracker().report_metric("central_collector", "db_write_ms", round(write_ms, 1))
+        except Exception as e:
+            logger.debug(f"Could not report write latency to service_health: {e}")
+
+    def _publish_snapshot(self, timestamp: datetime, stock_quotes: Dict[str, Dict]):
+        """Mirror just-committed quotes into the shared snapshot (error-isolated)."""
+        if not self.quote_snapshot:
+            return
+        try:
+            self.quote_snapshot.publish(stock_quotes, timestamp)
+        except Exception as e:
+            logger.error(f"Quote snapshot publish failed: {e}")
+
+    def _publish_minute(self, timestamp: datetime, stocks: int, nifty_ok: bool, vix_ok: bool):
+        """Tell consumer services this minute is committed (error-isolated)."""
+        if not self.minute_bus:
+            return
+        try:
+            flags = (FLAG_NIFTY if nifty_ok else 0) | (FLAG_VIX if vix_ok else 0)
+            self.minute_bus.publish(timestamp, stocks=stocks, flags=flags)
+        except Exception as e:
+            logger.error(f"Minute bus publish failed: {e}")
+
+    def _update_quote_window(self, timestamp: datetime, stock_quotes: Dict[str, Dict],
+                             nifty_price: Optional[float]):
+        """
+        Mirror just-stored quotes into the in-memory window (error-isolated).
+
+        Only data that was written to SQLite goes in, so the window never shows
+        detectors anything the DB would not.
+        """
+        if not self.quote_window:
+            return
+        try:
+            if stock_quotes:
+                self.quote_window.append(timestamp, stock_quotes, nifty_price)
+            elif nifty_price is not None:
+                self.quote_window.append_nifty(timestamp, nifty_price)
+        except Exception as e:
+            logger.error(f"Quote window update failed - resyncing from DB: {e}")
+            try:
+                self.quote_window.reset()
+                self.quote_window.load_from_db(self.db)
+            except Exception as e2:
+                logger.error(f"Quote window resync failed: {e2}")
+
+    def _update_indicators(self, timestamp: datetime, stock_quotes: Dict[str, Dict]):
+        """Fold just-stored quotes into the indicator engine and save its state (error-isolated)."""
+        if not self.indicators:
+            return
+        try:
+            self.indicators.update(timestamp, stock_quotes)
+            self.indicators.save()
+        except Exception as e:
+            logger.error(f"Indicator engine update failed: {e}")
+
+    def _start_option_chain(self, timestamp: datetime) -> Optional[Future]:
+        """
+        Start quoting the option chain on the chain thread (error-isolated).
+
+        Strikes are picked around the last stored NIFTY price - within a minute
+        of this cycle's, well inside the ±N strike window; IV and Greeks are
+        solved at this cycle's spot in _finish_option_chain.
+
+        Returns:
+            Future of (contracts, quotes), or None when there is no chain to take
+        """
+        if not self.option_chain:
+            return None
+        try:
+            latest = self.db.get_nifty_latest()
+            if not latest or not latest.get('price'):
+                logger.info("Option chain skipped this cycle - no stored NIFTY price to pick strikes")
+                return None
+            return self._chain_pool.submit(self.option_chain.quote_chain, latest['price'], timestamp)
+        except Exception as e:
+            logger.error(f"Option chain snapshot failed to start: {e}")
+            return None
+
+    def _finish_option_chain(self, job: Optional[Future], timestamp: datetime,
+                             nifty_price: Optional[float]) -> List[Dict]:
+        """
+        This cycle's option chain rows priced at its NIFTY spot (error-isolated).
+
+        Waits at most OPTION_CHAIN_WAIT_SEC for the chain quote; a late or failed
+        chain is left out of the cycle rather than delaying it.
+
+        Returns:
+            Rows for write_cycle (empty when skipped)
+        """
+        if job is None or nifty_price is None:
+            return []
+        try:
+            contracts, quotes = job.result(timeout=config.OPTION_CHAIN_WAIT_SEC)
+            return self.option_chain.build_rows(contracts, quotes, timestamp, nifty_price)
+        except FutureTimeout:
+            logger.warning(f"Option chain quote not back within {config.OPTION_CHAIN_WAIT_SEC}s - "
+                           f"skipped this cycle")
+        except Exception as e:
+            logger.error(f"Option chain snapshot failed: {e}")
+        return []
+
+    def _report_option_chain(self, stored: int):
+        """Report this cycle's option chain size to service_health (error-isolated)."""
+        logger.info(f"✓ Stored option chain snapshot: {stored} contracts")
+        try:
+            from service_health import get_health_tracker
+            get_health_tracker().report_metric("central_collector", "option_contracts", stored)
+        except Exception as e:
+            logger.debug(f"Could not report option chain size to service_health: {e}")
+
+    def _tick_bar_quotes(self, timestamp: datetime) -> Optional[Dict[str, Dict]]:
+        """
+        This minute's stock quotes from the tick-built bars, if they are complete.
+
+        Waits up to TICK_BAR_WAIT_SEC for order_flow_monitor to commit the minute
+        (it closes a minute ~1-2s after the boundary).
+
+        Args:
+            timestamp: Cycle timestamp (bars are stamped at its minute)
+
+        Returns:
+            {symbol: {price, volume, oi, oi_day_high, oi_day_low}}, or None to
+            fall back to REST (disabled, late, or < TICK_BAR_MIN_COVERAGE of stocks)
+        """
+        if not config.ENABLE_TICK_MINUTE_BARS:
+            return None
+
+        expected = timestamp.strftime('%Y-%m-%d %H:%M:00')
+        deadline = time.time() + config.TICK_BAR_WAIT_SEC
+        try:
+            while True:
+                stamp = self.db.get_metadata(TICK_BARS_METADATA_KEY)
+                if stamp and stamp >= expected:
+                    break
+                if time.time() >= deadline:
+                    logger.warning(f"Tick bars for {expected[11:16]} not in DB (latest: {stamp}) "
+                                   f"- falling back to REST")
+                    return None
+                time.sleep(0.25)
+
+            latest = self.db.get_latest_stock_quotes(self.stocks)
+        except Exception as e:
+            logger.error(f"Tick bar lookup failed - falling back to REST: {e}")
+            return None
+
+        quotes = {
+            symbol: {
+                'price': q['price'],
+                'volume': q['volume'],
+                'oi': q['oi'],
+                'oi_day_high': q['oi_day_high'],
+                'oi_day_low': q['oi_day_low'],
+            }
+            for symbol, q in latest.items() if q['timestamp'] == expected
+        }
+        required = int(len(self.stocks) * config.TICK_BAR_MIN_COVERAGE)
+        if len(quotes) < required:
+            logger.warning(f"Tick bars cover {len(quotes)}/{len(self.stocks)} stocks "
+                           f"(need {required}) - falling back to REST")
+            return None
+        return quotes
+
+    def _fetch_index_quotes(self) -> Dict:
+        """NIFTY + VIX in one rate-limited quote() call (raw quotes, {} on failure)."""
+        result = self._retry_with_backoff(
+            lambda: self._quote(NIFTY_INSTRUMENT, VIX_INSTRUMENT)
+        )
+        return result or {}
+
+    def _quote(self, *instruments: str) -> Dict:
+        """kite.quote() gated by the shared token bucket (safe to call from worker threads)."""
+        self.rate_limiter.acquire()
+        return self.kite.quote(*instruments)
+
     def _fetch_batch_with_retry(self, instruments: List[str], batch_num: int) -> Tuple[Dict, List[str]]:
         """
         Fetch a batch of instruments with retry logic.
@@ -522,7 +840,7 @@ class CentralDataCollector:
         """
         # Try with full batch first
         result = self._retry_with_backoff(
-            lambda: self.kite.quote(*instruments)
+            lambda: self._quote(*instruments)
         )
 
         if result is not None:
@@ -540,7 +858,7 @@ class CentralDataCollector:
             sub_batch_num = i // sub_batch_size + 1
 
             result = self._retry_with_backoff(
-                lambda batch=sub_batch: self.kite.quote(*batch),
+                lambda batch=sub_batch: self._quote(*batch),
                 max_retries=2  # Fewer retries for sub-batches
             )
 
@@ -550,22 +868,28 @@ class CentralDataCollector:
             else:
                 failed_instruments.extend(sub_batch)
                 logger.warning(f"  Sub-batch {sub_batch_num}: ✗ {len(sub_batch)} instruments failed")
-
-            # Small delay between sub-batches
-            time.sleep(0.2)
+            # No fixed delay between sub-batches - _quote() waits on the rate limiter
 
         return successful_quotes, failed_instruments
 
-    def _fetch_stock_quotes(self) -> Tuple[Dict[str, Dict], Dict, Dict]:
+    def _fetch_stock_quotes(self, extra_instruments: Sequence[str] = ()) -> Tuple[Dict[str, Dict], Dict, Dict]:
         """
         Fetch F&O stock quotes in batches (equity + futures for OI).
 
+        With ENABLE_CONCURRENT_QUOTE_FETCH the batches are fetched concurrently
+        (QUOTE_FETCH_WORKERS threads, paced by the shared token bucket), so a full
+        cycle takes about one round-trip instead of one per batch.
+
         ROBUSTNESS:
         - Retry with exponential backoff on failures
         - Fall back to smaller batches if large batch fails
         - Track and report partial failures
         - Continue with partial data rather than complete failure
 
+        Args:
+            extra_instruments: Additional instruments (e.g. NIFTY_INSTRUMENT) to fetch
+                in the same batches; their raw quotes are returned in all_raw_quotes
+
         Returns:
             Tuple of (stock_data, all_raw_quotes, instrument_map)
             - stock_data: {symbol: {price, volume, oi, oi_day_high, oi_day_low}}
@@ -595,23 +919,32 @@ class CentralDataCollector:
                     total_instruments.append(futures_instrument)
                     instrument_map[futures_instrument] = symbol
 
+        total_instruments.extend(extra_instruments)
+
         logger.info(f"Fetching {len(total_instruments)} instruments "
-                   f"({len(self.stocks)} equity + futures)")
+                   f"({len(self.stocks)} equity + futures"
+                   f"{f' + {len(extra_instruments)} indices' if extra_instruments else ''})")
 
         # Fetch in batches with robust retry
         all_quotes = {}
         all_failed = []
-        batch_count = 0
         successful_batches = 0
-
-        for i in range(0, len(total_instruments), batch_size):
-            batch = total_instruments[i:i + batch_size]
-            batch_count += 1
-
-            logger.debug(f"Batch {batch_count}: Fetching {len(batch)} instruments...")
-
-            batch_quotes, failed = self._fetch_batch_with_retry(batch, batch_count)
-
+        batches = [total_instruments[i:i + batch_size]
+                   for i in range(0, len(total_instruments), batch_size)]
+        batch_count = len(batches)
+
+        if config.ENABLE_CONCURRENT_QUOTE_FETCH and batch_count > 1:
+            # All batches in flight at once; the token bucket keeps us within Kite's limit
+            workers = max(1, min(config.QUOTE_FETCH_WORKERS, batch_count))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quote-batch") as pool:
+                results = list(pool.map(self._fetch_batch_with_retry, batches, range(1, batch_count + 1)))
+        else:
+            results = []
+            for batch_num, batch in enumerate(batches, 1):
+                logger.debug(f"Batch {batch_num}: Fetching {len(batch)} instruments...")
+                results.append(self._fetch_batch_with_retry(batch, batch_num))
+
+        for batch_quotes, failed in results:
             if batch_quotes:
                 all_quotes.update(batch_quotes)
                 successful_batches += 1
@@ -619,10 +952,6 @@ class CentralDataCollector:
             if failed:
                 all_failed.extend(failed)
 
-            # Rate limiting between batches
-            if i + batch_size < len(total_instruments):
-                time.sleep(config.REQUEST_DELAY_SECONDS)
-
         # Log summary
         logger.info(f"Fetched {len(all_quotes)} quotes in {batch_count} batches "
                    f"({successful_batches} successful)")
@@ -673,10 +1002,10 @@ class CentralDataCollector:
         Returns:
             Quote dict or None
         """
-        instrument = "NSE:NIFTY 50"
+        instrument = NIFTY_INSTRUMENT
 
         result = self._retry_with_backoff(
-            lambda: self.kite.quote(instrument)
+            lambda: self._quote(instrument)
         )
 
         if result:
@@ -692,10 +1021,10 @@ class CentralDataCollector:
         Returns:
             Quote dict or None
         """
-        instrument = "NSE:INDIA VIX"
+        instrument = VIX_INSTRUMENT
 
         result = self._retry_with_backoff(
-            lambda: self.kite.quote(instrument)
+            lambda: self._quote(instrument)
         )
 
         if result:
@@ -134,6 +134,12 @@ def main():
         alert_history = AlertHistoryManager()
         telegram = TelegramNotifier()
         detection_db = get_central_db(mode="reader")
+        # Detectors read the collector's in-memory quote window (no SQL per cycle);
+        # detection_db is the fallback when the window is disabled.
+        if collector.quote_window is not None:
+            logger.info("✅ Detectors wired to in-memory quote window")
+        if collector.indicators is not None:
+            logger.info("✅ Detectors wired to incremental indicator engine")
 
         # Initialize auto-trader if enabled (uses collector's Kite client)
         if config.ENABLE_AUTO_TRADING:
@@ -143,19 +149,23 @@ def main():
                 logger.info(f"✅ Auto-trader initialized ({mode} mode)")
 
         # 5-minute alert detector (with optional auto-trader)
-        rapid_detector = RapidAlertDetector(detection_db, alert_history, telegram, auto_trader)
+        rapid_detector = RapidAlertDetector(detection_db, alert_history, telegram, auto_trader,
+                                            quote_window=collector.quote_window)
         logger.info("✅ Rapid alert detector initialized (5-min drop + rise alerts)")
 
         # Early warning detector (pre-alerts)
         if config.ENABLE_EARLY_WARNING:
-            early_warning = EarlyWarningDetector(detection_db, alert_history, telegram)
+            early_warning = EarlyWarningDetector(detection_db, alert_history, telegram,
+                                                 quote_window=collector.quote_window,
+                                                 indicators=collector.indicators)
             logger.info("✅ Early warning detector initialized (pre-alerts enabled)")
         else:
             logger.info("ℹ️ Early warning detector disabled in config")
 
         # Institutional closing window detector (3:10-3:25 PM)
         if config.ENABLE_CLOSING_WINDOW_MONITOR:
-            closing_window_detector = ClosingWindowDetector(detection_db, alert_history, telegram)
+            closing_window_detector = ClosingWindowDetector(detection_db, alert_history, telegram,
+                                                            quote_window=collector.quote_window)
             logger.info("✅ Closing window detector initialized (3:10-3:25 PM institutional activity)")
         else:
             logger.info("ℹ️ Closing window detector disabled in config")
@@ -177,7 +187,8 @@ def main():
     try:
         if config.ENABLE_ALERT_PNL_TRACKER and detection_db and telegram:
             from alert_pnl_tracker import AlertPnLTracker
-            pnl_tracker = AlertPnLTracker(detection_db, telegram, collector.kite)
+            pnl_tracker = AlertPnLTracker(detection_db, telegram, collector.kite,
+                                          quote_window=collector.quote_window)
             logger.info("✅ Alert P&L Tracker initialized (futures simulation)")
     except Exception as e:
         logger.warning(f"⚠️ P&L Tracker init failed (continuing without): {e}")
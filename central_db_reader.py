@@ -3,7 +3,8 @@
 Central DB Reader - Shared Helper Module for All Services
 
 Provides reusable functions for reading from central_quotes.db with:
-- Freshness checks before using data
+- Freshness checks before using data (minute bus first, then SQL)
+- Latest quotes from the collector's shared-memory snapshot (SQL fallback)
 - API fallback when central DB fails
 - Health reporting for dashboard visibility
 
@@ -18,6 +19,7 @@ import time
 from datetime import datetime
 from typing import Dict, List, Optional, Callable, Any
 
+import config
 from central_quote_db import get_central_db
 from service_health import get_health_tracker
 
@@ -27,6 +29,92 @@ logger = logging.getLogger(__name__)
 DEFAULT_MAX_AGE_MINUTES = 2
 
 
+def check_data_freshness(central_db, service_name: str, max_age_minutes: int):
+    """
+    (is_fresh, age_minutes) for the latest committed minute.
+
+    Reads the minute bus first (no SQL); when that has nothing to say, runs
+    central_db.is_data_fresh(). If the data is stale but a collector has
+    published before, waits up to MINUTE_BUS_FALLBACK_WAIT_SEC for its next
+    commit - a service that woke just ahead of a running collector then reads
+    the DB instead of falling back to Kite.
+    """
+    bus = _get_minute_bus()
+    if bus is not None:
+        age = bus.age_minutes()
+        if age is not None and age <= max_age_minutes:
+            return True, age
+
+    is_fresh, age_minutes = central_db.is_data_fresh(max_age_minutes=max_age_minutes)
+    last = bus.latest() if bus is not None and not is_fresh else None
+    # Only wait on a collector that is still running (published recently)
+    if last is None or time.time() - last.committed_at > (max_age_minutes + 1) * 60:
+        return is_fresh, age_minutes
+
+    event = bus.wait_for_next(timeout=config.MINUTE_BUS_FALLBACK_WAIT_SEC, after_seq=last.seq)
+    if event is None:
+        return is_fresh, age_minutes
+    logger.info(f"[{service_name}] Waited for collector minute {event.minute:%H:%M} instead of API fallback")
+    return central_db.is_data_fresh(max_age_minutes=max_age_minutes)
+
+
+def _get_minute_bus():
+    """The process-wide minute bus, or None when disabled / unavailable."""
+    if not config.ENABLE_MINUTE_BUS:
+        return None
+    try:
+        from minute_bus import get_minute_bus
+        return get_minute_bus()
+    except Exception as e:
+        logger.debug(f"Minute bus unavailable: {e}")
+        return None
+
+
+def get_latest_stock_quotes(central_db, symbols: Optional[List[str]] = None,
+                            max_age_minutes: int = DEFAULT_MAX_AGE_MINUTES) -> Dict[str, Dict]:
+    """
+    Latest stock quotes - from the collector's shared-memory snapshot when it is
+    fresh, else central_db.get_latest_stock_quotes() (same return shape).
+
+    Symbols the snapshot does not hold are read from SQL, so the result never
+    has less than the table would.
+
+    Args:
+        central_db: CentralQuoteDB reader
+        symbols: List of symbols (None = all stocks)
+        max_age_minutes: Oldest snapshot cycle to trust
+
+    Returns:
+        Dict of {symbol: {price, volume, oi, oi_day_high, oi_day_low, timestamp}}
+    """
+    snapshot = _get_quote_snapshot()
+    if snapshot is not None:
+        try:
+            age = snapshot.age_minutes()
+            if age is not None and age <= max_age_minutes:
+                quotes = snapshot.get_latest_stock_quotes(symbols)
+                if quotes:
+                    missing = [s for s in symbols if s not in quotes] if symbols else []
+                    if missing:
+                        quotes.update(central_db.get_latest_stock_quotes(symbols=missing))
+                    return quotes
+        except Exception as e:
+            logger.debug(f"Quote snapshot read failed, using SQL: {e}")
+    return central_db.get_latest_stock_quotes(symbols=symbols)
+
+
+def _get_quote_snapshot():
+    """The process-wide quote snapshot, or None when disabled / unavailable."""
+    if not config.ENABLE_QUOTE_SNAPSHOT:
+        return None
+    try:
+        from quote_snapshot import get_quote_snapshot
+        return get_quote_snapshot()
+    except Exception as e:
+        logger.debug(f"Quote snapshot unavailable: {e}")
+        return None
+
+
 def fetch_stock_prices(
     symbols: List[str],
     service_name: str,
@@ -68,8 +156,8 @@ def fetch_stock_prices(
     health = get_health_tracker()
     central_db = get_central_db()
 
-    # Step 1: Check data freshness
-    is_fresh, age_minutes = central_db.is_data_fresh(max_age_minutes=max_age_minutes)
+    # Step 1: Check data freshness (minute bus, else SQL)
+    is_fresh, age_minutes = check_data_freshness(central_db, service_name, max_age_minutes)
 
     # Step 2: Handle no data / stale data scenarios
     if age_minutes is None:
@@ -110,7 +198,7 @@ def fetch_stock_prices(
 
     # Step 4: Fetch quotes from central database
     try:
-        db_quotes = central_db.get_latest_stock_quotes(symbols=symbols)
+        db_quotes = get_latest_stock_quotes(central_db, symbols=symbols, max_age_minutes=max_age_minutes)
 
         if not db_quotes:
             error_msg = "No quotes returned from central database despite freshness check passing"
@@ -392,8 +480,8 @@ def fetch_nifty_vix(
     health = get_health_tracker()
     central_db = get_central_db()
 
-    # Step 1: Check data freshness
-    is_fresh, age_minutes = central_db.is_data_fresh(max_age_minutes=max_age_minutes)
+    # Step 1: Check data freshness (minute bus, else SQL)
+    is_fresh, age_minutes = check_data_freshness(central_db, service_name, max_age_minutes)
 
     # Step 2: Handle no data / stale data scenarios
     if age_minutes is None or not is_fresh:
@@ -28,6 +28,62 @@ logger = logging.getLogger(__name__)
 # Thread-local storage for reader connections
 _thread_local = threading.local()
 
+# Per-cycle write statements. Every write path uses these exact strings, so the
+# writer connection's statement cache prepares each one once and reuses it.
+_STOCK_QUOTES_SQL = """
+    INSERT OR REPLACE INTO stock_quotes
+    (symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_LATEST_STOCK_QUOTES_SQL = """
+    INSERT INTO latest_stock_quotes
+    (symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(symbol) DO UPDATE SET
+        timestamp = excluded.timestamp,
+        price = excluded.price,
+        volume = excluded.volume,
+        oi = excluded.oi,
+        oi_day_high = excluded.oi_day_high,
+        oi_day_low = excluded.oi_day_low,
+        last_updated = excluded.last_updated
+    WHERE excluded.timestamp >= latest_stock_quotes.timestamp
+"""
+
+_NIFTY_QUOTE_SQL = """
+    INSERT OR REPLACE INTO nifty_quotes
+    (timestamp, price, open, high, low, volume, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_VIX_QUOTE_SQL = """
+    INSERT OR REPLACE INTO vix_quotes
+    (timestamp, vix_value, open, high, low, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_METADATA_SQL = """
+    INSERT OR REPLACE INTO metadata (key, value, updated_at)
+    VALUES (?, ?, ?)
+"""
+
+_OPTION_CHAIN_SQL = """
+    INSERT OR REPLACE INTO option_chain_snapshots
+    (expiry, timestamp, strike, option_type, tradingsymbol, ltp, oi, volume,
+     bid, ask, spot, iv, delta, gamma, theta, vega)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_OPTION_CHAIN_COLUMNS = ('expiry', 'timestamp', 'strike', 'option_type', 'tradingsymbol', 'ltp', 'oi',
+                         'volume', 'bid', 'ask', 'spot', 'iv', 'delta', 'gamma', 'theta', 'vega')
+
+_INTRADAY_CANDLES_SQL = """
+    INSERT OR REPLACE INTO intraday_candles
+    (symbol, interval, timestamp, open, high, low, close, volume, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 class CentralQuoteDB:
     """
@@ -178,6 +234,38 @@ class CentralQuoteDB:
             ON stock_quotes(symbol, last_updated DESC)
         """)
 
+        # Latest-quote snapshot: one row per symbol, upserted by store_stock_quotes()
+        # in the same transaction as the stock_quotes insert. get_latest_stock_quotes()
+        # reads this with a primary-key scan instead of a correlated MAX(timestamp)
+        # subquery over the whole stock_quotes table.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS latest_stock_quotes (
+                symbol TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                price REAL NOT NULL,
+                volume INTEGER,
+                oi INTEGER DEFAULT 0,
+                oi_day_high INTEGER DEFAULT 0,
+                oi_day_low INTEGER DEFAULT 0,
+                last_updated TEXT NOT NULL
+            )
+        """)
+
+        # One-time seed for databases created before the snapshot table existed
+        cursor.execute("SELECT 1 FROM latest_stock_quotes LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.execute("""
+                INSERT INTO latest_stock_quotes
+                (symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low, last_updated)
+                SELECT symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low, last_updated
+                FROM stock_quotes
+                WHERE timestamp = (
+                    SELECT MAX(timestamp)
+                    FROM stock_quotes sq2
+                    WHERE sq2.symbol = stock_quotes.symbol
+                )
+            """)
+
         # Table 2: NIFTY Spot Quotes (1-minute NIFTY 50 data)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS nifty_quotes (
@@ -276,6 +364,34 @@ class CentralQuoteDB:
             ON intraday_candles(symbol, interval, timestamp DESC)
         """)
 
+        # NIFTY option chain, one row per contract per minute (option_chain_collector).
+        # Clustered by (expiry, timestamp) so "the chain at minute T" is one range read.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS option_chain_snapshots (
+                expiry        TEXT NOT NULL,
+                timestamp     TEXT NOT NULL,
+                strike        REAL NOT NULL,
+                option_type   TEXT NOT NULL,
+                tradingsymbol TEXT NOT NULL,
+                ltp           REAL,
+                oi            INTEGER,
+                volume        INTEGER,
+                bid           REAL,
+                ask           REAL,
+                spot          REAL,
+                iv            REAL,
+                delta         REAL,
+                gamma         REAL,
+                theta         REAL,
+                vega          REAL,
+                PRIMARY KEY (expiry, timestamp, strike, option_type)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_option_chain_symbol_ts
+            ON option_chain_snapshots(tradingsymbol, timestamp DESC)
+        """)
+
         conn.commit()
         logger.info("Database tables and indexes created successfully")
 
@@ -303,9 +419,32 @@ class CentralQuoteDB:
         now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
         # Bulk insert
-        rows = []
-        for symbol, data in quotes.items():
-            rows.append((
+        rows = self._stock_quote_rows(quotes, ts_str, now_str)
+        cursor.executemany(_STOCK_QUOTES_SQL, rows)
+        self.upsert_latest_stock_quotes(cursor, rows)
+
+        self.conn.commit()  # Both tables in one transaction - readers never see them disagree
+        logger.info(f"Stored {len(rows)} stock quotes at {ts_str}")
+
+    def upsert_latest_stock_quotes(self, cursor: sqlite3.Cursor, rows: List[Tuple]):
+        """
+        Upsert rows into the latest_stock_quotes snapshot inside the caller's transaction.
+
+        A row only replaces the snapshot if it is at least as new, so backfilling
+        older minutes never rolls the snapshot back.
+
+        Args:
+            cursor: Cursor of the transaction that wrote the same rows to stock_quotes
+            rows: Tuples in stock_quotes column order
+                  (symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low, last_updated)
+        """
+        cursor.executemany(_LATEST_STOCK_QUOTES_SQL, rows)
+
+    @staticmethod
+    def _stock_quote_rows(quotes: Dict[str, Dict], ts_str: str, now_str: str) -> List[Tuple]:
+        """Build stock_quotes rows from {symbol: {price, volume, oi, ...}}."""
+        return [
+            (
                 symbol,
                 ts_str,
                 data.get('price', 0),
@@ -314,16 +453,55 @@ class CentralQuoteDB:
                 data.get('oi_day_high', 0),
                 data.get('oi_day_low', 0),
                 now_str
-            ))
+            )
+            for symbol, data in quotes.items()
+        ]
 
-        cursor.executemany("""
-            INSERT OR REPLACE INTO stock_quotes
-            (symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, rows)
+    @staticmethod
+    def _intraday_candle_rows(candles: Dict[str, List[Dict]], interval: str, now_str: str) -> List[Tuple]:
+        """Build intraday_candles rows; bars whose `date` is missing are skipped."""
+        rows = []
+        for symbol, bars in candles.items():
+            for bar in bars:
+                d = bar.get('date')
+                if hasattr(d, 'isoformat'):
+                    ts = d.isoformat()
+                elif isinstance(d, str):
+                    ts = d
+                else:
+                    continue
+                rows.append((
+                    symbol, interval, ts,
+                    bar.get('open'), bar.get('high'),
+                    bar.get('low'), bar.get('close'),
+                    bar.get('volume', 0), now_str
+                ))
+        return rows
 
-        self.conn.commit()
-        logger.info(f"Stored {len(rows)} stock quotes at {ts_str}")
+    @staticmethod
+    def _nifty_quote_row(price: float, ohlc: Dict, ts_str: str, now_str: str) -> Tuple:
+        """Build a nifty_quotes row (missing OHLC fields fall back to price)."""
+        return (
+            ts_str,
+            price,
+            ohlc.get('open', price),
+            ohlc.get('high', price),
+            ohlc.get('low', price),
+            ohlc.get('volume', 0),
+            now_str
+        )
+
+    @staticmethod
+    def _vix_quote_row(vix_value: float, ohlc: Dict, ts_str: str, now_str: str) -> Tuple:
+        """Build a vix_quotes row (missing OHLC fields fall back to the VIX value)."""
+        return (
+            ts_str,
+            vix_value,
+            ohlc.get('open', vix_value),
+            ohlc.get('high', vix_value),
+            ohlc.get('low', vix_value),
+            now_str
+        )
 
     def store_nifty_quote(self, price: float, ohlc: Dict, timestamp: datetime):
         """
@@ -338,19 +516,7 @@ class CentralQuoteDB:
         ts_str = timestamp.strftime('%Y-%m-%d %H:%M:00')
         now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO nifty_quotes
-            (timestamp, price, open, high, low, volume, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            ts_str,
-            price,
-            ohlc.get('open', price),
-            ohlc.get('high', price),
-            ohlc.get('low', price),
-            ohlc.get('volume', 0),
-            now_str
-        ))
+        cursor.execute(_NIFTY_QUOTE_SQL, self._nifty_quote_row(price, ohlc, ts_str, now_str))
 
         self.conn.commit()
         logger.debug(f"Stored NIFTY quote at {ts_str}: ₹{price:.2f}")
@@ -368,18 +534,7 @@ class CentralQuoteDB:
         ts_str = timestamp.strftime('%Y-%m-%d %H:%M:00')
         now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO vix_quotes
-            (timestamp, vix_value, open, high, low, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            ts_str,
-            vix_value,
-            ohlc.get('open', vix_value),
-            ohlc.get('high', vix_value),
-            ohlc.get('low', vix_value),
-            now_str
-        ))
+        cursor.execute(_VIX_QUOTE_SQL, self._vix_quote_row(vix_value, ohlc, ts_str, now_str))
 
         self.conn.commit()
         logger.debug(f"Stored VIX quote at {ts_str}: {vix_value:.2f}")
@@ -477,7 +632,7 @@ class CentralQuoteDB:
         return len(rows)
 
     def get_daily_candles_batch(
-        self, symbols: List[str], days: int = 50
+        self, symbols: List[str], days: int = 50, include_updated: bool = False
     ) -> Dict[str, List[Dict]]:
         """
         Return the most recent `days` daily candles per symbol, oldest-first
@@ -486,9 +641,11 @@ class CentralQuoteDB:
         Args:
             symbols: List of stock symbols
             days: Max number of most-recent candles per symbol
+            include_updated: Also return each row's last_updated ('YYYY-MM-DD HH:MM:SS'),
+                             to tell a final bar for a day from one stored mid-session
 
         Returns:
-            {symbol: [{date, open, high, low, close, volume}, ...]} (asc by date)
+            {symbol: [{date, open, high, low, close, volume[, last_updated]}, ...]} (asc by date)
         """
         if not symbols:
             return {}
@@ -497,21 +654,24 @@ class CentralQuoteDB:
         placeholders = ','.join('?' * len(symbols))
         # Pull newest-first, then trim per-symbol and reverse to oldest-first.
         cursor.execute(f"""
-            SELECT symbol, date, open, high, low, close, volume
+            SELECT symbol, date, open, high, low, close, volume, last_updated
             FROM daily_candles
             WHERE symbol IN ({placeholders})
             ORDER BY symbol ASC, date DESC
         """, symbols)
 
         result: Dict[str, List[Dict]] = {}
-        for sym, date, o, h, l, c, v in cursor.fetchall():
+        for sym, date, o, h, l, c, v, updated in cursor.fetchall():
             bucket = result.setdefault(sym, [])
             if len(bucket) >= days:
                 continue
-            bucket.append({
+            bar = {
                 'date': date, 'open': o, 'high': h,
                 'low': l, 'close': c, 'volume': v
-            })
+            }
+            if include_updated:
+                bar['last_updated'] = updated
+            bucket.append(bar)
         # Stored newest-first above; reverse each to oldest-first for callers.
         for sym in result:
             result[sym].reverse()
@@ -535,37 +695,18 @@ class CentralQuoteDB:
         cursor = self.conn.cursor()
         now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        rows = []
-        for symbol, bars in candles.items():
-            for bar in bars:
-                d = bar.get('date')
-                if hasattr(d, 'isoformat'):
-                    ts = d.isoformat()
-                elif isinstance(d, str):
-                    ts = d
-                else:
-                    continue
-                rows.append((
-                    symbol, interval, ts,
-                    bar.get('open'), bar.get('high'),
-                    bar.get('low'), bar.get('close'),
-                    bar.get('volume', 0), now_str
-                ))
-
+        rows = self._intraday_candle_rows(candles, interval, now_str)
         if not rows:
             return 0
 
-        cursor.executemany("""
-            INSERT OR REPLACE INTO intraday_candles
-            (symbol, interval, timestamp, open, high, low, close, volume, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, rows)
+        cursor.executemany(_INTRADAY_CANDLES_SQL, rows)
         self.conn.commit()
         logger.info(f"Stored {len(rows)} {interval} candles for {len(candles)} symbols")
         return len(rows)
 
     def get_intraday_candles_batch(
-        self, symbols: List[str], interval: str, limit: int = 80
+        self, symbols: List[str], interval: str, limit: int = 80,
+        since: Optional[str] = None, until: Optional[str] = None
     ) -> Dict[str, List[Dict]]:
         """
         Return the most recent `limit` intraday candles per symbol, oldest-first.
@@ -574,6 +715,8 @@ class CentralQuoteDB:
             symbols: List of stock symbols
             interval: candle interval, e.g. '5minute'
             limit: Max number of most-recent candles per symbol
+            since: Only candles with timestamp >= this ISO prefix, e.g. '2026-10-16'
+            until: Only candles with timestamp < this ISO prefix (e.g. the next day)
 
         Returns:
             {symbol: [{date, open, high, low, close, volume}, ...]} (asc by timestamp)
@@ -583,12 +726,20 @@ class CentralQuoteDB:
 
         cursor = self.conn.cursor()
         placeholders = ','.join('?' * len(symbols))
+        params = [interval, *symbols]
+        bounds = ''
+        if since:
+            bounds += ' AND timestamp >= ?'
+            params.append(since)
+        if until:
+            bounds += ' AND timestamp < ?'
+            params.append(until)
         cursor.execute(f"""
             SELECT symbol, timestamp, open, high, low, close, volume
             FROM intraday_candles
-            WHERE interval = ? AND symbol IN ({placeholders})
+            WHERE interval = ? AND symbol IN ({placeholders}){bounds}
             ORDER BY symbol ASC, timestamp DESC
-        """, [interval, *symbols])
+        """, params)
 
         result: Dict[str, List[Dict]] = {}
         for sym, ts, o, h, l, c, v in cursor.fetchall():
@@ -603,6 +754,112 @@ class CentralQuoteDB:
             result[sym].reverse()  # newest-first above -> oldest-first for callers
         return result
 
+    def store_option_chain(self, rows: List[Dict], timestamp: datetime) -> int:
+        """
+        Store one option chain snapshot (all contracts, one transaction). Collector-only.
+
+        Args:
+            rows: [{expiry, strike, option_type, tradingsymbol, ltp, oi, volume,
+                    bid, ask, spot, iv, delta, gamma, theta, vega}]; expiry as
+                    'YYYY-MM-DD', IV / Greeks None where no volatility fits
+            timestamp: Snapshot timestamp (minute-level precision)
+
+        Returns:
+            Number of contracts written
+        """
+        if not rows:
+            return 0
+
+        values = self._option_chain_rows(rows, timestamp)
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(_OPTION_CHAIN_SQL, values)
+        return len(values)
+
+    @staticmethod
+    def _option_chain_rows(rows: List[Dict], timestamp: datetime) -> List[Tuple]:
+        """option_chain_snapshots parameter tuples, timestamp rounded to the minute."""
+        ts_str = timestamp.strftime('%Y-%m-%d %H:%M:00')
+        return [tuple(ts_str if col == 'timestamp' else row.get(col) for col in _OPTION_CHAIN_COLUMNS)
+                for row in rows]
+
+    def get_option_chain(self, expiry: str, at: Optional[str] = None) -> List[Dict]:
+        """
+        The stored option chain snapshot for an expiry at (or just before) a minute.
+
+        Args:
+            expiry: 'YYYY-MM-DD'
+            at: 'YYYY-MM-DD HH:MM:SS' upper bound (None = latest)
+
+        Returns:
+            [{expiry, timestamp, strike, option_type, tradingsymbol, ltp, ...}]
+            ordered by strike, CE before PE; [] if none stored
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT MAX(timestamp) FROM option_chain_snapshots
+            WHERE expiry = ? AND timestamp <= ?
+        """, (expiry, at or '9999-12-31 23:59:59'))
+        row = cursor.fetchone()
+        if not row or row[0] is None:
+            return []
+
+        cursor.execute(f"""
+            SELECT {', '.join(_OPTION_CHAIN_COLUMNS)} FROM option_chain_snapshots
+            WHERE expiry = ? AND timestamp = ?
+            ORDER BY strike, option_type
+        """, (expiry, row[0]))
+        return [dict(zip(_OPTION_CHAIN_COLUMNS, values)) for values in cursor.fetchall()]
+
+    def get_option_chain_quotes(self, tradingsymbols: List[str],
+                                max_age_minutes: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Latest stored snapshot row per option contract.
+
+        Args:
+            tradingsymbols: Contract symbols, with or without the 'NFO:' prefix
+            max_age_minutes: Skip rows older than this (None = any age)
+
+        Returns:
+            {symbol as passed: row}; contracts with no (fresh) row are absent
+        """
+        if not tradingsymbols:
+            return {}
+
+        bare = {symbol.split(':', 1)[-1]: symbol for symbol in tradingsymbols}
+        cutoff = ((datetime.now() - timedelta(minutes=max_age_minutes)).strftime('%Y-%m-%d %H:%M:00')
+                  if max_age_minutes is not None else '')
+        cursor = self.conn.cursor()
+        placeholders = ','.join('?' * len(bare))
+        cursor.execute(f"""
+            SELECT {', '.join(_OPTION_CHAIN_COLUMNS)} FROM option_chain_snapshots o
+            WHERE tradingsymbol IN ({placeholders})
+              AND timestamp = (SELECT MAX(timestamp) FROM option_chain_snapshots
+                               WHERE tradingsymbol = o.tradingsymbol)
+              AND timestamp >= ?
+        """, [*bare, cutoff])
+        return {bare[values[4]]: dict(zip(_OPTION_CHAIN_COLUMNS, values)) for values in cursor.fetchall()}
+
+    def get_option_ltp_at(self, tradingsymbol: str, timestamp_str: str) -> Optional[float]:
+        """
+        Recorded premium of one contract at (or just before) a minute, same day only.
+
+        Args:
+            tradingsymbol: Contract symbol, e.g. 'NIFTY26OCT25350CE'
+            timestamp_str: 'YYYY-MM-DD HH:MM:SS'
+
+        Returns:
+            Last traded price, or None if nothing was recorded that day before then
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT ltp FROM option_chain_snapshots
+            WHERE tradingsymbol = ? AND timestamp <= ? AND timestamp >= ?
+            ORDER BY timestamp DESC LIMIT 1
+        """, (tradingsymbol, timestamp_str, timestamp_str[:10]))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
     def update_metadata(self, key: str, value: str):
         """
         Update metadata (e.g., last_collection_time).
@@ -614,13 +871,84 @@ class CentralQuoteDB:
         cursor = self.conn.cursor()
         now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO metadata (key, value, updated_at)
-            VALUES (?, ?, ?)
-        """, (key, value, now_str))
+        cursor.execute(_METADATA_SQL, (key, value, now_str))
 
         self.conn.commit()
 
+    def write_cycle(self, timestamp: datetime,
+                    stock_quotes: Optional[Dict[str, Dict]] = None,
+                    nifty: Optional[Dict] = None,
+                    vix: Optional[Dict] = None,
+                    metadata: Optional[Dict[str, str]] = None,
+                    candles: Optional[Dict[str, List[Dict]]] = None,
+                    candle_interval: str = '1minute',
+                    option_chain: Optional[List[Dict]] = None) -> float:
+        """
+        Write one collection cycle - stocks, NIFTY, VIX, option chain and metadata -
+        in a single BEGIN IMMEDIATE transaction.
+
+        One commit (one WAL fsync) instead of one per table, and readers never see
+        a minute whose stocks are stored but whose NIFTY/VIX are not. Any failure
+        rolls the whole cycle back, leaving the last known good data in place.
+
+        Args:
+            timestamp: Data timestamp (minute-level precision)
+            stock_quotes: Dict of {symbol: {price, volume, oi, oi_day_high, oi_day_low}}
+            nifty: Dict with 'price' and optional 'open', 'high', 'low', 'volume'
+            vix: Dict with 'price' and optional 'open', 'high', 'low'
+            metadata: Dict of {key: value} metadata updates
+            candles: Optional intraday candles {symbol: [{date, open, high, low, close, volume}]}
+                     (same shape as store_intraday_candles_batch)
+            candle_interval: Interval label for `candles`, e.g. '1minute'
+            option_chain: Optional option chain snapshot rows (same shape as
+                          store_option_chain), stored at `timestamp`
+
+        Returns:
+            Write latency in milliseconds (BEGIN IMMEDIATE to COMMIT)
+        """
+        ts_str = timestamp.strftime('%Y-%m-%d %H:%M:00')  # Round to minute
+        now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        with self._lock:
+            conn = self.conn
+            if conn.in_transaction:
+                conn.commit()  # Flush anything an earlier caller left open
+
+            start = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.cursor()
+                if stock_quotes:
+                    rows = self._stock_quote_rows(stock_quotes, ts_str, now_str)
+                    cursor.executemany(_STOCK_QUOTES_SQL, rows)
+                    self.upsert_latest_stock_quotes(cursor, rows)
+                if nifty:
+                    cursor.execute(_NIFTY_QUOTE_SQL,
+                                   self._nifty_quote_row(nifty['price'], nifty, ts_str, now_str))
+                if vix:
+                    cursor.execute(_VIX_QUOTE_SQL,
+                                   self._vix_quote_row(vix['price'], vix, ts_str, now_str))
+                if candles:
+                    cursor.executemany(_INTRADAY_CANDLES_SQL,
+                                       self._intraday_candle_rows(candles, candle_interval, now_str))
+                if option_chain:
+                    cursor.executemany(_OPTION_CHAIN_SQL, self._option_chain_rows(option_chain, timestamp))
+                if metadata:
+                    cursor.executemany(_METADATA_SQL,
+                                       [(key, value, now_str) for key, value in metadata.items()])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        logger.info(f"Wrote cycle at {ts_str}: {len(stock_quotes or {})} stocks, "
+                    f"NIFTY={'✓' if nifty else '✗'}, VIX={'✓' if vix else '✗'}, "
+                    f"{len(candles or {})} {candle_interval} candles, "
+                    f"{len(option_chain or [])} option contracts, "
+                    f"{len(metadata or {})} metadata keys in {elapsed_ms:.1f}ms")
+        return elapsed_ms
+
     # ============================================
     # READ OPERATIONS (All Monitoring Services)
     # ============================================
@@ -629,6 +957,10 @@ class CentralQuoteDB:
         """
         Get latest quotes for stocks (most recent timestamp).
 
+        Reads the latest_stock_quotes snapshot (one row per symbol, maintained by
+        store_stock_quotes) - a primary-key scan independent of how many days of
+        history stock_quotes retains.
+
         Args:
             symbols: List of symbols (None = all stocks)
 
@@ -641,24 +973,14 @@ class CentralQuoteDB:
             placeholders = ','.join('?' * len(symbols))
             query = f"""
                 SELECT symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low
-                FROM stock_quotes
+                FROM latest_stock_quotes
                 WHERE symbol IN ({placeholders})
-                AND timestamp = (
-                    SELECT MAX(timestamp)
-                    FROM stock_quotes sq2
-                    WHERE sq2.symbol = stock_quotes.symbol
-                )
             """
             cursor.execute(query, symbols)
         else:
             cursor.execute("""
                 SELECT symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low
-                FROM stock_quotes
-                WHERE timestamp = (
-                    SELECT MAX(timestamp)
-                    FROM stock_quotes sq2
-                    WHERE sq2.symbol = stock_quotes.symbol
-                )
+                FROM latest_stock_quotes
             """)
 
         quotes = {}
@@ -970,6 +1292,36 @@ class CentralQuoteDB:
 
         return result
 
+    def get_all_stock_history_since(self, since_time_str: str) -> Dict[str, List[Dict]]:
+        """
+        Get minute-by-minute history (with OI) for EVERY stock since a given time.
+        Used once at collector startup to warm the in-memory QuoteWindow.
+
+        Args:
+            since_time_str: Time string in format 'YYYY-MM-DD HH:MM:00'
+
+        Returns:
+            Dict mapping symbol to list of {timestamp, price, volume, oi} ordered by timestamp ASC
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT symbol, timestamp, price, volume, oi
+            FROM stock_quotes
+            WHERE timestamp >= ?
+            ORDER BY symbol, timestamp ASC
+        """, (since_time_str,))
+
+        result: Dict[str, List[Dict]] = {}
+        for symbol, timestamp, price, volume, oi in cursor.fetchall():
+            result.setdefault(symbol, []).append({
+                'timestamp': timestamp,
+                'price': price,
+                'volume': volume or 0,
+                'oi': oi or 0
+            })
+
+        return result
+
     def get_nifty_history_since(self, since_time_str: str) -> List[Dict]:
         """
         Get NIFTY historical data since a given time.
@@ -1266,9 +1618,10 @@ class CentralQuoteDB:
         cutoff = datetime.now() - timedelta(days=days)
         cutoff_str = cutoff.strftime('%Y-%m-%d %H:%M:00')
 
-        # Clean stock quotes
+        # Clean stock quotes (and snapshot rows of symbols with nothing newer left)
         cursor.execute("DELETE FROM stock_quotes WHERE timestamp < ?", (cutoff_str,))
         deleted_stocks = cursor.rowcount
+        cursor.execute("DELETE FROM latest_stock_quotes WHERE timestamp < ?", (cutoff_str,))
 
         # Clean NIFTY quotes
         cursor.execute("DELETE FROM nifty_quotes WHERE timestamp < ?", (cutoff_str,))
@@ -1288,6 +1641,18 @@ class CentralQuoteDB:
         cursor.execute("DELETE FROM intraday_candles WHERE timestamp < ?", (intraday_cutoff,))
         deleted_intraday = cursor.rowcount
 
+        # Tick-built 1-minute bars are ~5x the rows of 5-minute bars; keep them shorter.
+        minute_days = config.TICK_BAR_CANDLE_RETENTION_DAYS
+        minute_cutoff = (datetime.now() - timedelta(days=minute_days)).isoformat()
+        cursor.execute("DELETE FROM intraday_candles WHERE interval = '1minute' AND timestamp < ?",
+                       (minute_cutoff,))
+        deleted_intraday += cursor.rowcount
+
+        # Option chain snapshots are history for IV surfaces and the option backtests
+        chain_days = config.OPTION_CHAIN_RETENTION_DAYS
+        chain_cutoff = (datetime.now() - timedelta(days=chain_days)).strftime('%Y-%m-%d %H:%M:00')
+        cursor.execute("DELETE FROM option_chain_snapshots WHERE timestamp < ?", (chain_cutoff,))
+
         self.conn.commit()
 
         # Vacuum to reclaim space
@@ -1337,8 +1702,15 @@ class CentralQuoteDB:
 
     def close(self):
         """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        if self.mode == "writer":
+            conn, self._writer_conn = self._writer_conn, None
+        else:
+            # Drop the thread-local handle too, so the next reader on this thread
+            # (possibly for a different db_path) opens a fresh connection
+            conn = getattr(_thread_local, 'conn', None)
+            _thread_local.conn = None
+        if conn:
+            conn.close()
             logger.info("Database connection closed")
 
 
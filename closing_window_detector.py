@@ -38,7 +38,7 @@ class ClosingWindowDetector:
     Zero additional API calls - reads from central_quotes.db.
     """
 
-    def __init__(self, central_db, alert_history, telegram):
+    def __init__(self, central_db, alert_history, telegram, quote_window=None):
         """
         Initialize detector with shared components.
 
@@ -46,8 +46,10 @@ class ClosingWindowDetector:
             central_db: CentralQuoteDB instance (reader mode)
             alert_history: AlertHistoryManager instance
             telegram: TelegramNotifier instance
+            quote_window: Optional in-memory QuoteWindow (no SQL reads when provided)
         """
         self.db = central_db
+        self.window = quote_window
         self.alert_history = alert_history
         self.telegram = telegram
 
@@ -132,18 +134,20 @@ class ClosingWindowDetector:
                     return stats
 
                 # Record NIFTY price at window start
-                nifty = self.db.get_nifty_latest()
+                nifty = self.window.nifty_latest() if self.window is not None else self.db.get_nifty_latest()
                 if nifty:
                     self._nifty_window_start_price = nifty['price']
                     logger.info(f"ClosingWindowDetector: NIFTY at window start: {self._nifty_window_start_price:.2f}")
 
                 logger.info(f"ClosingWindowDetector: Day baseline computed for {len(self._day_baseline)} stocks")
 
-            # Get window data for all stocks (batch query)
-            window_data = self.db.get_stock_history_since_batch(symbols, window_start_str)
-
-            # Get NIFTY window data
-            nifty_window = self.db.get_nifty_history_since(window_start_str)
+            # Get window data for all stocks (in-memory window, else one batch query)
+            if self.window is not None:
+                window_data = self.window.since(window_start_str, symbols)
+                nifty_window = self.window.nifty_since(window_start_str)
+            else:
+                window_data = self.db.get_stock_history_since_batch(symbols, window_start_str)
+                nifty_window = self.db.get_nifty_history_since(window_start_str)
             nifty_current_price = None
             if nifty_window:
                 nifty_current_price = nifty_window[-1]['price']
@@ -261,14 +265,20 @@ class ClosingWindowDetector:
         """
         try:
             # Get day aggregates (batch)
-            aggregates = self.db.get_stock_day_aggregates_batch(symbols)
+            if self.window is not None:
+                aggregates = self.window.day_aggregates(symbols)
+            else:
+                aggregates = self.db.get_stock_day_aggregates_batch(symbols)
             if not aggregates:
                 return None
 
             # Get stock history for computing avg 15-min changes
             # Query from start of day until now
             day_start_str = f"{today_str} 09:15:00"
-            all_history = self.db.get_stock_history_since_batch(symbols, day_start_str)
+            if self.window is not None:
+                all_history = self.window.since(day_start_str, symbols)
+            else:
+                all_history = self.db.get_stock_history_since_batch(symbols, day_start_str)
 
             baseline = {}
             for symbol in symbols:
@@ -21,6 +21,18 @@ TELEGRAM_API_BASE = os.getenv('TELEGRAM_API_BASE', 'https://api.telegram.org').r
 # Telegram is blocked. Leave unset to disable. Debug falls back to main if unset.
 DISCORD_WEBHOOK_URL = os.getenv('DISCORD_WEBHOOK_URL')
 DISCORD_DEBUG_WEBHOOK_URL = os.getenv('DISCORD_DEBUG_WEBHOOK_URL')
+# Alert outbox (alert_outbox.py): notifiers enqueue into a SQLite outbox and return at
+# once; a background sender thread delivers with per-channel rate limits and retries.
+# Off = the old synchronous requests.post() path inside the detector's cycle.
+ENABLE_ALERT_OUTBOX = os.getenv('ENABLE_ALERT_OUTBOX', 'false').lower() == 'true'
+ALERT_OUTBOX_DB_PATH = os.getenv('ALERT_OUTBOX_DB_PATH', 'data/alert_outbox.db')
+ALERT_OUTBOX_TELEGRAM_RATE_PER_SEC = float(os.getenv('ALERT_OUTBOX_TELEGRAM_RATE_PER_SEC', '1.0'))  # per chat
+ALERT_OUTBOX_TELEGRAM_BURST = int(os.getenv('ALERT_OUTBOX_TELEGRAM_BURST', '3'))
+ALERT_OUTBOX_DISCORD_RATE_PER_SEC = float(os.getenv('ALERT_OUTBOX_DISCORD_RATE_PER_SEC', '2.5'))    # per webhook (5 per 2s)
+ALERT_OUTBOX_DISCORD_BURST = int(os.getenv('ALERT_OUTBOX_DISCORD_BURST', '5'))
+ALERT_OUTBOX_MAX_ATTEMPTS = int(os.getenv('ALERT_OUTBOX_MAX_ATTEMPTS', '5'))      # then marked 'failed'
+ALERT_OUTBOX_DRAIN_TIMEOUT_SEC = float(os.getenv('ALERT_OUTBOX_DRAIN_TIMEOUT_SEC', '10'))  # flush at exit
+ALERT_OUTBOX_RETENTION_DAYS = int(os.getenv('ALERT_OUTBOX_RETENTION_DAYS', '3'))  # sent/failed rows kept
 
 # Market Configuration
 MARKET_TIMEZONE = 'Asia/Kolkata'
@@ -102,6 +114,58 @@ ENABLE_CLOSING_WINDOW_MONITOR = os.getenv('ENABLE_CLOSING_WINDOW_MONITOR', 'true
 CLOSING_WINDOW_MIN_SCORE = int(os.getenv('CLOSING_WINDOW_MIN_SCORE', '75'))
 CLOSING_WINDOW_SEND_SUMMARY = os.getenv('CLOSING_WINDOW_SEND_SUMMARY', 'true').lower() == 'true'
 
+# ============================================
+# IN-MEMORY QUOTE WINDOW (quote_window.py)
+# ============================================
+# The collector keeps the session's 1-minute quotes in a NumPy ring buffer and hands it
+# to the rapid / early-warning / closing-window detectors and the P&L tracker, so a
+# detection cycle reads no SQL. SQLite stays the durable store (and warms the window
+# once at startup). Depth must cover a full session (9:15-15:30 = 376 minutes).
+ENABLE_QUOTE_WINDOW = os.getenv('ENABLE_QUOTE_WINDOW', 'true').lower() == 'true'
+QUOTE_WINDOW_MINUTES = int(os.getenv('QUOTE_WINDOW_MINUTES', '400'))
+
+# Incremental intraday indicators (indicator_engine.py): the collector folds each stored
+# minute into running VWAP / OBV / Wilder RSI / ATR per symbol and hands the engine to the
+# detectors (no per-symbol SQL). State is saved every cycle so a restart resumes cheaply.
+ENABLE_INDICATOR_ENGINE = os.getenv('ENABLE_INDICATOR_ENGINE', 'true').lower() == 'true'
+INDICATOR_STATE_DB_PATH = os.getenv('INDICATOR_STATE_DB_PATH', 'data/indicator_state.db')
+INDICATOR_RSI_PERIOD = int(os.getenv('INDICATOR_RSI_PERIOD', '9'))    # EarlyWarning RSI(9)
+INDICATOR_ATR_PERIOD = int(os.getenv('INDICATOR_ATR_PERIOD', '14'))
+
+# Minute bus (minute_bus.py): the collector publishes "minute N committed" through a small
+# shared-memory counter right after each cycle's transaction; consumer services wait on it
+# instead of sleeping on their own timers, and central_db_reader uses it as the freshness
+# check. A consumer that finds the DB stale waits up to MINUTE_BUS_FALLBACK_WAIT_SEC for the
+# next commit before falling back to direct Kite calls.
+ENABLE_MINUTE_BUS = os.getenv('ENABLE_MINUTE_BUS', 'true').lower() == 'true'
+MINUTE_BUS_PATH = os.getenv('MINUTE_BUS_PATH', 'data/minute_bus.shm')
+MINUTE_BUS_POLL_SEC = float(os.getenv('MINUTE_BUS_POLL_SEC', '0.05'))
+MINUTE_BUS_FALLBACK_WAIT_SEC = float(os.getenv('MINUTE_BUS_FALLBACK_WAIT_SEC', '20'))
+
+# Quote snapshot (quote_snapshot.py): the collector also writes each committed cycle's stock
+# quotes into a shared-memory structured array; central_db_reader.get_latest_stock_quotes()
+# serves consumers from it (no SQLite read) while it is fresh. Capacity is rows, sized with
+# headroom over the F&O universe.
+ENABLE_QUOTE_SNAPSHOT = os.getenv('ENABLE_QUOTE_SNAPSHOT', 'true').lower() == 'true'
+QUOTE_SNAPSHOT_PATH = os.getenv('QUOTE_SNAPSHOT_PATH', 'data/quote_snapshot.shm')
+QUOTE_SNAPSHOT_CAPACITY = int(os.getenv('QUOTE_SNAPSHOT_CAPACITY', '1024'))
+
+# NIFTY option chain snapshots (option_chain_collector.py): every cycle the collector quotes
+# the ±N strikes around ATM for the next expiries in one batched call, solves IV / Greeks for
+# the whole chain and stores it in option_chain_snapshots. The option analyzer, Greeks tracker
+# and option backtests read recorded premiums from there before asking Kite. The chain is
+# quoted on its own thread while the stock batches are fetched and committed in the cycle's
+# write_cycle transaction; a chain not back within OPTION_CHAIN_WAIT_SEC is skipped that cycle.
+ENABLE_OPTION_CHAIN_COLLECTOR = os.getenv('ENABLE_OPTION_CHAIN_COLLECTOR', 'true').lower() == 'true'
+OPTION_CHAIN_UNDERLYING = 'NIFTY'
+OPTION_CHAIN_STRIKE_STEP = 50
+OPTION_CHAIN_STRIKES_EACH_SIDE = int(os.getenv('OPTION_CHAIN_STRIKES_EACH_SIDE', '15'))  # ±15 x 50 = ±750 points
+OPTION_CHAIN_EXPIRIES = int(os.getenv('OPTION_CHAIN_EXPIRIES', '2'))                    # Next two expiries
+OPTION_CHAIN_RISK_FREE_RATE = float(os.getenv('OPTION_CHAIN_RISK_FREE_RATE', '0.07'))
+OPTION_CHAIN_MAX_AGE_MINUTES = int(os.getenv('OPTION_CHAIN_MAX_AGE_MINUTES', '2'))     # Readers fall back to Kite past this
+OPTION_CHAIN_WAIT_SEC = float(os.getenv('OPTION_CHAIN_WAIT_SEC', '5'))               # Collector waits this long for the chain quote
+OPTION_CHAIN_RETENTION_DAYS = int(os.getenv('OPTION_CHAIN_RETENTION_DAYS', '30'))
+
 # ============================================
 # ALERT P&L TRACKER (FUTURES SIMULATION)
 # ============================================
@@ -189,6 +253,27 @@ REQUEST_DELAY_SECONDS = float(os.getenv('REQUEST_DELAY_SECONDS', '0.4'))  # Dela
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))  # Max retry attempts per stock
 RETRY_DELAY_SECONDS = float(os.getenv('RETRY_DELAY_SECONDS', '2.0'))  # Delay before retry
 
+# Central collector quote fetch (kite_rate_limiter.py)
+# Batches (with NIFTY/VIX folded in) go out concurrently from a small thread pool; a
+# shared token bucket keeps the process within Kite's quote limit instead of fixed
+# sleeps between batches. Disable to fall back to sequential batches + separate
+# NIFTY/VIX calls.
+ENABLE_CONCURRENT_QUOTE_FETCH = os.getenv('ENABLE_CONCURRENT_QUOTE_FETCH', 'true').lower() == 'true'
+QUOTE_FETCH_WORKERS = int(os.getenv('QUOTE_FETCH_WORKERS', '3'))  # Concurrent quote() calls
+KITE_QUOTE_RATE_PER_SEC = float(os.getenv('KITE_QUOTE_RATE_PER_SEC', '3.0'))  # Token refill rate
+KITE_QUOTE_BURST = int(os.getenv('KITE_QUOTE_BURST', '3'))  # Calls allowed back-to-back
+KITE_HISTORICAL_RATE_PER_SEC = float(os.getenv('KITE_HISTORICAL_RATE_PER_SEC', '3.0'))  # historical_data() refill
+KITE_HISTORICAL_BURST = int(os.getenv('KITE_HISTORICAL_BURST', '3'))
+
+# EOD analysis pipeline (eod_analyzer.py)
+# Candles come from central_quotes.db first (daily_candles, intraday_candles); Kite is
+# called only for symbols the DB doesn't cover, from EOD_FETCH_WORKERS threads sharing
+# the historical rate limiter. Volume analysis and pattern detection are split across
+# EOD_ANALYSIS_WORKERS processes (0 or 1 = run in-process).
+EOD_FETCH_WORKERS = int(os.getenv('EOD_FETCH_WORKERS', '3'))
+EOD_ANALYSIS_WORKERS = int(os.getenv('EOD_ANALYSIS_WORKERS', str(min(os.cpu_count() or 1, 8))))
+EOD_HISTORY_DAYS = 30  # Daily lookback fed to volume averages and pattern detection
+
 # File Paths
 STOCK_LIST_FILE = 'fo_stocks.json'
 PRICE_CACHE_FILE = 'data/price_cache.json'
@@ -200,6 +285,14 @@ PRICE_CACHE_DB_FILE = 'data/price_cache.db'  # SQLite database for price cache
 QUOTE_CACHE_DB_FILE = 'data/unified_cache/quote_cache.db'  # SQLite database for quote cache
 ENABLE_SQLITE_CACHE = os.getenv('ENABLE_SQLITE_CACHE', 'true').lower() == 'true'  # Enable SQLite storage
 ENABLE_JSON_BACKUP = os.getenv('ENABLE_JSON_BACKUP', 'true').lower() == 'true'  # Keep JSON backup during transition
+# PriceCache persists only changed symbols, once per batch()/update_prices_bulk() call.
+# Write-behind: updates only touch memory; a background thread saves every N seconds
+# (a crash can lose up to N seconds of snapshots - they are rebuilt from the next cycles).
+PRICE_CACHE_WRITE_BEHIND = os.getenv('PRICE_CACHE_WRITE_BEHIND', 'false').lower() == 'true'
+PRICE_CACHE_FLUSH_INTERVAL_SEC = float(os.getenv('PRICE_CACHE_FLUSH_INTERVAL_SEC', '5'))
+# Snapshots kept per symbol (ring buffer; PriceCache.get_snapshot(symbol, lookback)).
+# The named slots need 7 (current + previous..previous6); deeper history is in memory only.
+PRICE_CACHE_RING_DEPTH = int(os.getenv('PRICE_CACHE_RING_DEPTH', '60'))
 
 # SQLite Lock Contention Fixes
 # Addressing database lock contention from multiple concurrent services (stock_monitor, atr_monitor, nifty_option_monitor)
@@ -243,6 +336,22 @@ ENABLE_FUTURES_OI = os.getenv('ENABLE_FUTURES_OI', 'true').lower() == 'true'  #
 FUTURES_MAPPING_FILE = 'data/futures_mapping.json'  # Cache file for equity → futures mapping
 FUTURES_REFRESH_TIME = "09:15"  # Daily refresh at market open to detect expiry rollovers
 
+# Instrument Master (shared, indexed snapshot of kite.instruments() - fetched once per day)
+INSTRUMENT_MASTER_DB_PATH = os.getenv('INSTRUMENT_MASTER_DB_PATH', 'data/instrument_master.db')
+INSTRUMENT_MASTER_RETRY_SEC = int(os.getenv('INSTRUMENT_MASTER_RETRY_SEC', '60'))           # First retry after a failed daily fetch
+INSTRUMENT_MASTER_RETRY_MAX_SEC = int(os.getenv('INSTRUMENT_MASTER_RETRY_MAX_SEC', '1800'))  # Backoff doubles up to this
+
+# Candle Warehouse (local OHLCV files shared by the backtests - candle_warehouse.py)
+# Backtests read candles from here and fetch only dates not synced yet; fill it ahead
+# of a run with `python candle_warehouse.py sync --interval minute --days 30`.
+CANDLE_WAREHOUSE_DIR = os.getenv('CANDLE_WAREHOUSE_DIR', 'data/candle_warehouse')
+
+# Parameter sweeps (sweep_engine.py - vwap_winrate_optimizer, backtest_early_warning_sweep)
+# Configs are spread over SWEEP_WORKERS processes (0 or 1 = in-process) and each result is
+# written to SWEEP_RESULTS_DB as it finishes; rerunning an interrupted sweep resumes it.
+SWEEP_WORKERS = int(os.getenv('SWEEP_WORKERS', str(os.cpu_count() or 1)))
+SWEEP_RESULTS_DB = os.getenv('SWEEP_RESULTS_DB', 'data/sweep_results.db')
+
 # Sector Analysis Configuration
 # Analyze sector performance and fund flow using existing price cache data (ZERO additional API calls)
 ENABLE_SECTOR_ANALYSIS = os.getenv('ENABLE_SECTOR_ANALYSIS', 'true').lower() == 'true'  # Toggle sector analysis
@@ -269,6 +378,9 @@ PRICE_ACTION_TIMEFRAME = '5minute'  # Timeframe for pattern detection
 PRICE_ACTION_MIN_CONFIDENCE = float(os.getenv('PRICE_ACTION_MIN_CONFIDENCE', '8.0'))  # Minimum 8.0/10 (high confidence only)
 PRICE_ACTION_LOOKBACK_CANDLES = int(os.getenv('PRICE_ACTION_LOOKBACK_CANDLES', '50'))  # Candles to analyze
 PRICE_ACTION_COOLDOWN = int(os.getenv('PRICE_ACTION_COOLDOWN', '30'))  # 30-min cooldown per stock/pattern
+# Scan all stocks in one pass (pattern rules as NumPy masks, ATR computed once per cycle);
+# false = run every detector on every stock
+ENABLE_VECTORIZED_PATTERN_SCAN = os.getenv('ENABLE_VECTORIZED_PATTERN_SCAN', 'true').lower() == 'true'
 
 # Price and liquidity filters
 PRICE_ACTION_MIN_PRICE = float(os.getenv('PRICE_ACTION_MIN_PRICE', '50.0'))  # Min ₹50
@@ -454,6 +566,13 @@ VOLUME_PROFILE_MIN_CANDLES = int(os.getenv('VOLUME_PROFILE_MIN_CANDLES', '30'))
 VOLUME_PROFILE_TICK_SIZE_AUTO = os.getenv('VOLUME_PROFILE_TICK_SIZE_AUTO', 'true').lower() == 'true'  # Use adaptive tick size
 VOLUME_PROFILE_REPORT_DIR = 'data/volume_profile_reports'  # Report output directory
 
+# 1-minute candles come from central_quotes.db intraday_candles and the previous run's
+# 'intraday_1min' cache; Kite is called only for missing tails, from
+# VOLUME_PROFILE_FETCH_WORKERS threads sharing the historical rate limiter. Profiles are
+# split across VOLUME_PROFILE_ANALYSIS_WORKERS processes (0 or 1 = run in-process).
+VOLUME_PROFILE_FETCH_WORKERS = int(os.getenv('VOLUME_PROFILE_FETCH_WORKERS', '3'))
+VOLUME_PROFILE_ANALYSIS_WORKERS = int(os.getenv('VOLUME_PROFILE_ANALYSIS_WORKERS', str(min(os.cpu_count() or 1, 4))))
+
 # Dropbox Upload for Volume Profile Reports
 VOLUME_PROFILE_ENABLE_DROPBOX = os.getenv('VOLUME_PROFILE_ENABLE_DROPBOX', 'true').lower() == 'true'  # Auto-upload to Dropbox
 VOLUME_PROFILE_DROPBOX_TOKEN = os.getenv('VOLUME_PROFILE_DROPBOX_TOKEN', '')  # Dropbox access token
@@ -725,11 +844,26 @@ ORDER_FLOW_TICK_BUFFER_SIZE     = int(os.getenv('ORDER_FLOW_TICK_BUFFER_SIZE', '
 ORDER_FLOW_WRITER_INTERVAL_SEC  = float(os.getenv('ORDER_FLOW_WRITER_INTERVAL_SEC', '2.0'))    # flush buffer to DB every N seconds
 ORDER_FLOW_TICK_RETENTION_MINUTES = int(os.getenv('ORDER_FLOW_TICK_RETENTION_MINUTES', '10'))  # delete ticks older than N min
 
+# Full-day binary tick archive (tick_archive.py): the writer thread also appends every
+# tick to fixed-width per-(day, symbol) files with a minute index, so order flow
+# backtests can replay whole sessions (tick_snapshots only keeps the last few minutes).
+# Closed days are compacted to delta-encoded .npz on the next start.
+ENABLE_TICK_ARCHIVE             = os.getenv('ENABLE_TICK_ARCHIVE', 'true').lower() == 'true'
+TICK_ARCHIVE_DIR                = os.getenv('TICK_ARCHIVE_DIR', 'data/tick_archive')
+TICK_ARCHIVE_RETENTION_DAYS     = int(os.getenv('TICK_ARCHIVE_RETENTION_DAYS', '90'))
+
 # Analysis
 ORDER_FLOW_ANALYSIS_WINDOW      = int(os.getenv('ORDER_FLOW_ANALYSIS_WINDOW', '30'))           # seconds per metric computation window
 ORDER_FLOW_MONITOR_INTERVAL_SEC = int(os.getenv('ORDER_FLOW_MONITOR_INTERVAL_SEC', '30'))      # main loop cadence
 ORDER_FLOW_ABSORPTION_LOOKBACK  = int(os.getenv('ORDER_FLOW_ABSORPTION_LOOKBACK', '60'))       # seconds for absorption pattern
 ORDER_FLOW_MIN_TICKS            = int(os.getenv('ORDER_FLOW_MIN_TICKS', '3'))                  # min ticks in window to compute metrics
+ORDER_FLOW_CUM_WINDOW_SEC       = int(os.getenv('ORDER_FLOW_CUM_WINDOW_SEC', '300'))           # cumulative executed-flow window (cum_delta_pct)
+
+# Streaming analysis (order_flow_stream.py): the collector folds every tick into rolling
+# per-symbol windows and the monitor reads their snapshot each cycle — no tick_snapshots
+# queries. tick_snapshots is still written (history/backtests). 'false' = old SQL path.
+ORDER_FLOW_STREAMING            = os.getenv('ORDER_FLOW_STREAMING', 'true').lower() == 'true'
+ORDER_FLOW_STREAM_MAX_TICKS     = int(os.getenv('ORDER_FLOW_STREAM_MAX_TICKS', '3000'))        # per symbol/asset window cap
 
 # Alert thresholds
 # NOTE: BAI on liquid F&O stocks rarely crosses ±0.65 even on sharp moves (order book
@@ -783,6 +917,20 @@ ORDER_FLOW_SUMMARY_TOP_N        = int(os.getenv('ORDER_FLOW_SUMMARY_TOP_N', '5')
 # Data freshness guard — skip analysis cycle if WebSocket is silent > this many seconds
 ORDER_FLOW_STALE_THRESHOLD_SEC  = int(os.getenv('ORDER_FLOW_STALE_THRESHOLD_SEC', '60'))
 
+# Tick-built minute bars (minute_bar_builder.py)
+# OrderFlowCollector folds its MODE_FULL ticks into exact 1-minute OHLC/volume/OI bars
+# and writes them to central_quotes.db (stock_quotes at bar end + '1minute'
+# intraday_candles). The central collector then uses those rows and only polls Kite
+# REST for stocks when the tick bars for the minute are missing or incomplete.
+# volume_profile_analyzer reads the same '1minute' candles; with the flag off (or for
+# symbols the order flow collector doesn't subscribe) it fetches them from Kite.
+ENABLE_TICK_MINUTE_BARS         = os.getenv('ENABLE_TICK_MINUTE_BARS', 'false').lower() == 'true'
+TICK_BAR_CLOSE_GRACE_SEC        = float(os.getenv('TICK_BAR_CLOSE_GRACE_SEC', '1.0'))          # wait for late ticks before closing a minute
+TICK_BAR_WAIT_SEC               = float(os.getenv('TICK_BAR_WAIT_SEC', '5.0'))                 # collector waits this long for the minute's bars
+TICK_BAR_MIN_COVERAGE           = float(os.getenv('TICK_BAR_MIN_COVERAGE', '0.95'))            # share of stocks the bars must cover, else REST
+TICK_BAR_CANDLE_RETENTION_DAYS  = int(os.getenv('TICK_BAR_CANDLE_RETENTION_DAYS', '30'))       # '1minute' intraday_candles retention
+TICK_RECORD_DIR                 = os.getenv('TICK_RECORD_DIR', '')                             # e.g. data/tick_recordings ('' = off)
+
 # Stock futures order flow (additive layer on top of cash equity WebSocket)
 # Institutional flow concentrates in futures — subscribes near-month contracts for 204 stocks.
 ORDER_FLOW_FUTURES_ENABLED       = os.getenv('ORDER_FLOW_FUTURES_ENABLED', 'true').lower() == 'true'
@@ -40,7 +40,7 @@ class EarlyWarningDetector:
     giving traders lead time before the full 5-min alert triggers.
     """
 
-    def __init__(self, central_db, alert_history, telegram):
+    def __init__(self, central_db, alert_history, telegram, quote_window=None, indicators=None):
         """
         Initialize detector with shared components.
 
@@ -48,8 +48,13 @@ class EarlyWarningDetector:
             central_db: CentralQuoteDB instance (reader mode)
             alert_history: AlertHistoryManager instance
             telegram: TelegramNotifier instance
+            quote_window: Optional in-memory QuoteWindow (no SQL reads when provided)
+            indicators: Optional IndicatorEngine - running VWAP / OBV / RSI fed by the
+                        collector (no per-symbol recomputation when provided)
         """
         self.db = central_db
+        self.window = quote_window
+        self.indicators = indicators
         self.alert_history = alert_history
         self.telegram = telegram
 
@@ -68,8 +73,8 @@ class EarlyWarningDetector:
         # Track recently sent pre-alerts to avoid duplicates within session
         self._recent_prealerts: Set[str] = set()  # "SYMBOL_YYYY-MM-DD_HH:MM"
 
-        # Cache for VWAP calculations (reset daily)
-        self._vwap_cache: Dict[str, Tuple[float, str]] = {}  # symbol -> (vwap, date)
+        # Cache for fallback VWAP calculations (no engine) - valid for one minute
+        self._vwap_cache: Dict[str, Tuple[float, str]] = {}  # symbol -> (vwap, minute)
 
         # Alert start time: 9:25 AM (from config)
         self.alert_start_time = dt_time(config.MARKET_START_HOUR, config.MARKET_START_MINUTE)
@@ -88,6 +93,9 @@ class EarlyWarningDetector:
     def _get_recent_history(self, symbol: str, minutes: int = 10) -> List[Dict]:
         """Get recent price/volume history for OBV calculation."""
         try:
+            if self.window is not None:
+                return self.window.history(symbol, minutes)
+
             # Use the db's get_stock_history method if available
             if hasattr(self.db, 'get_stock_history'):
                 return self.db.get_stock_history(symbol, minutes)
@@ -139,13 +147,13 @@ class EarlyWarningDetector:
             - is_confirmed: True if OBV is moving in same direction as price
             - pattern_type: 'confirmation', 'divergence', or 'neutral'
         """
-        history = self._get_recent_history(symbol, 10)
-
-        if len(history) < 5:
-            return True, 'neutral'  # Not enough data, allow signal
-
-        prices = [h['price'] for h in history]
-        obv = self._calculate_obv(history)
+        if self.indicators is not None:
+            obv = self.indicators.recent_obv(symbol)  # last ~10 minutes, running OBV
+        else:
+            history = self._get_recent_history(symbol, 10)
+            if len(history) < 5:
+                return True, 'neutral'  # Not enough data, allow signal
+            obv = self._calculate_obv(history)
 
         if len(obv) < 5:
             return True, 'neutral'
@@ -205,18 +213,22 @@ class EarlyWarningDetector:
             if not current_oi or current_oi <= 0:
                 return True, 'no_oi_data'  # Allow if no OI data
 
-            # Get day-start OI from the database
-            today = datetime.now().strftime('%Y-%m-%d')
-            cursor = self.db.conn.cursor()
-            cursor.execute("""
-                SELECT oi FROM stock_quotes
-                WHERE symbol = ? AND date(timestamp) = ?
-                AND time(timestamp) >= '09:15:00'
-                ORDER BY timestamp ASC
-                LIMIT 1
-            """, (symbol, today))
+            # Get day-start OI from the quote window (else the database)
+            if self.window is not None:
+                first = self.window.day_open([symbol]).get(symbol)
+                row = (first['oi'],) if first else None
+            else:
+                today = datetime.now().strftime('%Y-%m-%d')
+                cursor = self.db.conn.cursor()
+                cursor.execute("""
+                    SELECT oi FROM stock_quotes
+                    WHERE symbol = ? AND date(timestamp) = ?
+                    AND time(timestamp) >= '09:15:00'
+                    ORDER BY timestamp ASC
+                    LIMIT 1
+                """, (symbol, today))
+                row = cursor.fetchone()
 
-            row = cursor.fetchone()
             if not row or not row[0]:
                 return True, 'no_oi_data'
 
@@ -264,6 +276,12 @@ class EarlyWarningDetector:
             (is_confirmed, rsi_value)
         """
         try:
+            if self.indicators is not None:
+                rsi = self.indicators.rsi(symbol)  # Wilder RSI(INDICATOR_RSI_PERIOD)
+                if rsi is None:
+                    return True, 50.0  # Allow if insufficient data
+                return self._rsi_confirms(rsi, direction), rsi
+
             history = self._get_recent_history(symbol, 15)  # Need ~14 points for RSI
 
             if len(history) < 10:
@@ -296,43 +314,59 @@ class EarlyWarningDetector:
                 rs = avg_gain / avg_loss
                 rsi = 100 - (100 / (1 + rs))
 
-            if direction == 'drop':
-                # For drops: RSI should have room to fall (not already oversold)
-                # Accept if RSI > 40 (plenty of room to fall)
-                return rsi > 40, rsi
-            else:  # rise
-                # For rises: RSI should have room to rise (not already overbought)
-                # Accept if RSI < 60 (plenty of room to rise)
-                return rsi < 60, rsi
+            return self._rsi_confirms(rsi, direction), rsi
 
         except Exception as e:
             logger.debug(f"RSI check failed for {symbol}: {e}")
             return True, 50.0
 
+    @staticmethod
+    def _rsi_confirms(rsi: float, direction: str) -> bool:
+        """RSI leaves room for the move to continue."""
+        if direction == 'drop':
+            # For drops: RSI should have room to fall (not already oversold)
+            # Accept if RSI > 40 (plenty of room to fall)
+            return rsi > 40
+        # For rises: RSI should have room to rise (not already overbought)
+        # Accept if RSI < 60 (plenty of room to rise)
+        return rsi < 60
+
     def _calculate_vwap(self, symbol: str) -> Optional[float]:
         """
         Calculate intraday VWAP from today's data.
 
         VWAP = Σ(Price × Volume) / Σ(Volume)
+
+        Uses the indicator engine's running VWAP when available; the fallback
+        recomputes from today's rows at most once per minute.
         """
+        if self.indicators is not None:
+            return self.indicators.vwap(symbol)
+
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
+            now = datetime.now()
+            today = now.strftime('%Y-%m-%d')
+            minute = now.strftime('%Y-%m-%d %H:%M')
 
             # Check cache
             if symbol in self._vwap_cache:
-                cached_vwap, cached_date = self._vwap_cache[symbol]
-                if cached_date == today:
+                cached_vwap, cached_minute = self._vwap_cache[symbol]
+                if cached_minute == minute:
                     return cached_vwap
 
-            cursor = self.db.conn.cursor()
-            cursor.execute("""
-                SELECT price, volume FROM stock_quotes
-                WHERE symbol = ? AND date(timestamp) = ?
-                AND time(timestamp) >= '09:15:00'
-                ORDER BY timestamp ASC
-            """, (symbol, today))
+            if self.window is not None:
+                rows = [(r['price'], r['volume'])
+                        for r in self.window.since(f"{today} 09:15:00", [symbol]).get(symbol, [])]
+            else:
+                cursor = self.db.conn.cursor()
+                # Plain range on timestamp so the (symbol, timestamp) index is used
+                cursor.execute("""
+                    SELECT price, volume FROM stock_quotes
+                    WHERE symbol = ? AND timestamp >= ? AND timestamp < ?
+                    ORDER BY timestamp ASC
+                """, (symbol, f"{today} 09:15:00", (now + timedelta(days=1)).strftime('%Y-%m-%d')))
+                rows = cursor.fetchall()
 
-            rows = cursor.fetchall()
             if not rows:
                 return None
 
@@ -350,7 +384,7 @@ class EarlyWarningDetector:
             vwap = total_pv / total_volume
 
             # Cache result
-            self._vwap_cache[symbol] = (vwap, today)
+            self._vwap_cache[symbol] = (vwap, minute)
 
             return vwap
 
@@ -415,8 +449,11 @@ class EarlyWarningDetector:
 
         symbols = list(current_quotes.keys())
 
-        # Batch query: Get prices from N minutes ago
-        quotes_ago = self.db.get_stock_quotes_at_batch(symbols, minutes_ago=self.lookback_minutes)
+        # Prices from N minutes ago (in-memory window, else ONE batch query)
+        if self.window is not None:
+            quotes_ago = self.window.at(self.lookback_minutes, symbols)
+        else:
+            quotes_ago = self.db.get_stock_quotes_at_batch(symbols, minutes_ago=self.lookback_minutes)
 
         if not quotes_ago:
             logger.debug(f"EarlyWarningDetector: No {self.lookback_minutes}-min-ago data")
@@ -2,15 +2,30 @@
 """
 EOD Stock Analyzer - Main orchestrator for end-of-day analysis
 Runs daily after market close to detect volume spikes and chart patterns
+
+Pipeline stages (each timed and logged):
+1. quotes   - batch quotes for the F&O universe (shared quote rate limiter)
+2. filter   - keep the active stocks
+3. candles  - today's 15-minute and 30-day daily candles from central_quotes.db;
+              Kite historical_data only for symbols the DB doesn't cover, fetched
+              concurrently under the shared historical rate limiter
+4. regime   - NIFTY market regime
+5. analysis - volume analysis and pattern detection, split across a process pool
+6. report / telegram
 """
 
 import json
 import logging
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from kiteconnect import KiteConnect
 import config
+from central_quote_db import get_central_db
+from instrument_master import get_instrument_master
+from kite_rate_limiter import get_historical_rate_limiter, get_quote_rate_limiter
 from unified_data_cache import UnifiedDataCache
 from eod_stock_filter import EODStockFilter
 from eod_volume_analyzer import EODVolumeAnalyzer
@@ -30,6 +45,55 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+MARKET_OPEN_MINUTE = 9 * 60 + 15
+MARKET_CLOSE_MINUTE = 15 * 60 + 30
+EOD_INTRADAY_MINUTES = 15  # Candle size the volume analyzer works in
+
+
+def _interval_minutes(interval: str) -> int:
+    """'5minute' -> 5, 'minute' -> 1."""
+    return int(interval.replace('minute', '') or 1)
+
+
+def _bar_time(value) -> datetime:
+    """Stored candle timestamp (ISO text or datetime) -> datetime."""
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def aggregate_intraday(bars: List[Dict], minutes: int = EOD_INTRADAY_MINUTES) -> List[Dict]:
+    """
+    Roll finer intraday bars up into session-aligned candles (09:15, 09:30, ...).
+
+    Args:
+        bars: One day's bars, oldest-first, each {date, open, high, low, close, volume}
+        minutes: Target candle size
+
+    Returns:
+        [{date (datetime), open, high, low, close, volume}], oldest-first
+    """
+    candles: List[Dict] = []
+    for bar in bars:
+        t = _bar_time(bar['date'])
+        offset = (t.hour * 60 + t.minute - MARKET_OPEN_MINUTE) // minutes * minutes
+        start = t.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(
+            minutes=MARKET_OPEN_MINUTE + offset)
+        if candles and candles[-1]['date'] == start:
+            candle = candles[-1]
+            candle['high'] = max(candle['high'], bar['high'])
+            candle['low'] = min(candle['low'], bar['low'])
+            candle['close'] = bar['close']
+            candle['volume'] += bar.get('volume') or 0
+        else:
+            candles.append({'date': start, 'open': bar['open'], 'high': bar['high'],
+                            'low': bar['low'], 'close': bar['close'], 'volume': bar.get('volume') or 0})
+    return candles
+
+
+def _chunks(items: List[str], count: int) -> List[List[str]]:
+    """Split items into at most `count` contiguous, near-equal chunks."""
+    size = -(-len(items) // max(count, 1))
+    return [items[i:i + size] for i in range(0, len(items), size)] if items else []
+
 
 class EODAnalyzer:
     """Main orchestrator for end-of-day stock analysis"""
@@ -51,6 +115,9 @@ class EODAnalyzer:
         )
         self.report_generator = EODReportGenerator()
         self.regime_detector = MarketRegimeDetector(self.kite)
+        self.quote_limiter = get_quote_rate_limiter()
+        self.historical_limiter = get_historical_rate_limiter()
+        self.stage_timings: Dict[str, float] = {}
 
         # Load F&O stock list
         self.fo_stocks = self._load_fo_stocks()
@@ -77,15 +144,10 @@ class EODAnalyzer:
         Returns:
             Dict mapping symbol to instrument_token
         """
-        logger.info("Building instrument token map from Kite API...")
+        logger.info("Building instrument token map from the instrument master...")
 
         try:
-            instruments = self.kite.instruments("NSE")
-            token_map = {}
-
-            for instrument in instruments:
-                if instrument['segment'] == 'NSE' and instrument['tradingsymbol'] in self.fo_stocks:
-                    token_map[instrument['tradingsymbol']] = instrument['instrument_token']
+            token_map = get_instrument_master(self.kite).index("NSE").tokens(self.fo_stocks, segment="NSE")
 
             logger.info(f"Built token map for {len(token_map)} stocks")
             return token_map
@@ -116,13 +178,11 @@ class EODAnalyzer:
 
             try:
                 # Unpack instruments list with *
+                self.quote_limiter.acquire()
                 quotes = self.kite.quote(*instruments)
                 quote_data.update(quotes)
                 logger.debug(f"Fetched batch {i//batch_size + 1}: {len(batch)} stocks")
 
-                # Rate limiting
-                time.sleep(config.REQUEST_DELAY_SECONDS)
-
             except Exception as e:
                 logger.error(f"Error fetching quotes for batch {i//batch_size + 1}: {e}")
 
@@ -151,6 +211,7 @@ class EODAnalyzer:
             to_date = datetime.combine(today, datetime.max.time())
 
             # Fetch 15-minute candles
+            self.historical_limiter.acquire()
             data = self.kite.historical_data(
                 instrument_token=instrument_token,
                 from_date=from_date,
@@ -164,13 +225,16 @@ class EODAnalyzer:
             logger.error(f"{symbol}: Error fetching intraday data - {e}")
             return []
 
-    def _fetch_historical_data(self, symbol: str, use_cache: bool = True) -> List[Dict]:
+    def _fetch_historical_data(self, symbol: str, use_cache: bool = True,
+                               store_cache: bool = True) -> List[Dict]:
         """
         Fetch 30-day historical data with caching
 
         Args:
             symbol: Stock symbol
             use_cache: Whether to use cached data (default: True)
+            store_cache: Whether to write the fetched data to the cache (the
+                cache is not thread-safe; concurrent callers store afterwards)
 
         Returns:
             List of daily OHLCV candles for last 30 days
@@ -190,12 +254,13 @@ class EODAnalyzer:
 
             # Get 30-day date range
             to_date = datetime.now().date()
-            from_date = to_date - timedelta(days=30)
+            from_date = to_date - timedelta(days=config.EOD_HISTORY_DAYS)
 
             from_datetime = datetime.combine(from_date, datetime.min.time())
             to_datetime = datetime.combine(to_date, datetime.max.time())
 
             # Fetch daily candles
+            self.historical_limiter.acquire()
             data = self.kite.historical_data(
                 instrument_token=instrument_token,
                 from_date=from_datetime,
@@ -204,7 +269,8 @@ class EODAnalyzer:
             )
 
             # Cache the data
-            self.cache_manager.set_historical_data(symbol, data)
+            if store_cache:
+                self.cache_manager.set_historical_data(symbol, data)
 
             return data
 
@@ -227,6 +293,141 @@ class EODAnalyzer:
             logger.warning(f"{symbol}: No instrument token found")
         return token
 
+    def _read_central_candles(self, symbols: List[str],
+                              today: date) -> Tuple[Dict[str, List[Dict]], Dict[str, List[Dict]]]:
+        """
+        Today's 15-minute and 30-day daily candles from central_quotes.db.
+
+        A symbol counts as covered only when the DB has the whole session: the
+        daily series ends with a bar for today stored after the close (the
+        collector refreshes daily_candles at startup, so a bar written
+        mid-session is partial), and today's intraday bars fill every slot
+        from the open to the close.
+
+        Args:
+            symbols: Stock symbols
+            today: Session date
+
+        Returns:
+            (intraday_map, historical_map) for covered symbols only
+        """
+        intraday_map: Dict[str, List[Dict]] = {}
+        historical_map: Dict[str, List[Dict]] = {}
+        try:
+            db = get_central_db()
+            today_str = today.strftime('%Y-%m-%d')
+            from_str = (today - timedelta(days=config.EOD_HISTORY_DAYS)).strftime('%Y-%m-%d')
+            closed_str = (datetime.combine(today, datetime.min.time())
+                          + timedelta(minutes=MARKET_CLOSE_MINUTE)).strftime('%Y-%m-%d %H:%M:%S')
+            daily = db.get_daily_candles_batch(symbols, days=config.EOD_HISTORY_DAYS + 1, include_updated=True)
+            for symbol, bars in daily.items():
+                if bars and bars[-1]['date'] == today_str and bars[-1]['last_updated'] >= closed_str:
+                    historical_map[symbol] = [{k: v for k, v in bar.items() if k != 'last_updated'}
+                                              for bar in bars if bar['date'] >= from_str]
+
+            interval = config.INTRADAY_CANDLE_INTERVAL
+            step = _interval_minutes(interval)
+            if EOD_INTRADAY_MINUTES % step == 0:
+                per_session = (MARKET_CLOSE_MINUTE - MARKET_OPEN_MINUTE) // step
+                slots = set(range(MARKET_OPEN_MINUTE, MARKET_CLOSE_MINUTE, step))
+                for symbol, bars in db.get_intraday_candles_batch(symbols, interval, limit=per_session).items():
+                    session = [bar for bar in bars if str(bar['date'])[:10] == today_str]
+                    # Every bar slot of the session, not just the last one - a hole goes to Kite
+                    starts = {_bar_time(bar['date']) for bar in session}
+                    if len(session) == per_session and {t.hour * 60 + t.minute for t in starts} == slots:
+                        intraday_map[symbol] = aggregate_intraday(session)
+        except Exception as e:
+            logger.warning(f"Central candle read failed, fetching everything from Kite: {e}")
+            return {}, {}
+        return intraday_map, historical_map
+
+    def _load_candles(self, symbols: List[str]) -> Tuple[Dict[str, List[Dict]], Dict[str, List[Dict]]]:
+        """
+        Intraday and daily candles for the filtered stocks, DB first, Kite for gaps.
+
+        Gaps are fetched from EOD_FETCH_WORKERS threads; every historical_data()
+        call draws from the shared historical rate limiter instead of sleeping.
+
+        Args:
+            symbols: Filtered stock symbols
+
+        Returns:
+            (intraday_data_map, historical_data_map), both keyed by every symbol
+        """
+        intraday_map, historical_map = self._read_central_candles(symbols, datetime.now().date())
+
+        # The unified cache isn't thread-safe: read it here, write it after the fetch
+        for symbol in symbols:
+            if symbol not in historical_map:
+                cached = self.cache_manager.get_historical_data(symbol)
+                if cached is not None:
+                    historical_map[symbol] = cached
+
+        intraday_gaps = [s for s in symbols if s not in intraday_map]
+        historical_gaps = [s for s in symbols if s not in historical_map]
+        logger.info(f"Candles from central DB: {len(symbols) - len(intraday_gaps)} intraday, "
+                    f"{len(symbols) - len(historical_gaps)} daily (of {len(symbols)}); "
+                    f"fetching {len(intraday_gaps) + len(historical_gaps)} from Kite")
+
+        if intraday_gaps or historical_gaps:
+            with ThreadPoolExecutor(max_workers=max(1, config.EOD_FETCH_WORKERS)) as pool:
+                intraday_map.update(zip(intraday_gaps, pool.map(self._fetch_intraday_data, intraday_gaps)))
+                fetched = list(pool.map(lambda s: self._fetch_historical_data(s, use_cache=False,
+                                                                              store_cache=False),
+                                        historical_gaps))
+            for symbol, data in zip(historical_gaps, fetched):
+                historical_map[symbol] = data
+                if data:
+                    self.cache_manager.set_historical_data(symbol, data)
+
+        return ({s: intraday_map[s] for s in symbols},
+                {s: historical_map[s] for s in symbols})
+
+    def _run_analysis_stage(self, intraday_data_map: Dict[str, List[Dict]],
+                            historical_data_map: Dict[str, List[Dict]],
+                            market_regime: str) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Volume analysis and pattern detection, split by symbol across a process pool.
+
+        Each worker runs the same batch_analyze / batch_detect on its slice, so the
+        results (concatenated in symbol order) are what one process would produce.
+        Falls back to running in-process if the pool can't be used.
+
+        Returns:
+            (volume_results, pattern_results)
+        """
+        symbols = list(historical_data_map)
+        workers = min(config.EOD_ANALYSIS_WORKERS, len(symbols))
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    volume_jobs, pattern_jobs = [], []
+                    for chunk in _chunks(symbols, workers):
+                        volume_jobs.append(pool.submit(
+                            self.volume_analyzer.batch_analyze,
+                            {s: intraday_data_map[s] for s in chunk},
+                            {s: historical_data_map[s] for s in chunk}))
+                        pattern_jobs.append(pool.submit(
+                            self.pattern_detector.batch_detect,
+                            {s: historical_data_map[s] for s in chunk}, market_regime))
+                    return ([r for job in volume_jobs for r in job.result()],
+                            [r for job in pattern_jobs for r in job.result()])
+            except Exception as e:
+                logger.warning(f"Parallel analysis failed ({e}); running in-process")
+
+        return (self.volume_analyzer.batch_analyze(intraday_data_map, historical_data_map),
+                self.pattern_detector.batch_detect(historical_data_map, market_regime))
+
+    @contextmanager
+    def _stage(self, name: str):
+        """Time one pipeline stage into self.stage_timings."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[name] = time.perf_counter() - started
+            logger.info(f"Stage '{name}' took {self.stage_timings[name]:.2f}s")
+
     def run_analysis(self) -> str:
         """
         Run complete EOD analysis
@@ -239,10 +440,12 @@ class EODAnalyzer:
         logger.info("="*80)
 
         start_time = time.time()
+        self.stage_timings = {}
 
         # Step 1: Fetch batch quotes for all F&O stocks
         logger.info("Step 1: Fetching batch quotes...")
-        quote_data = self._fetch_batch_quotes(self.fo_stocks)
+        with self._stage('quotes'):
+            quote_data = self._fetch_batch_quotes(self.fo_stocks)
 
         if not quote_data:
             logger.error("No quote data fetched. Aborting analysis.")
@@ -250,7 +453,8 @@ class EODAnalyzer:
 
         # Step 2: Filter stocks using smart filtering
         logger.info("Step 2: Filtering active stocks...")
-        filtered_stocks_with_prefix = self.stock_filter.filter_stocks(quote_data)
+        with self._stage('filter'):
+            filtered_stocks_with_prefix = self.stock_filter.filter_stocks(quote_data)
 
         # Strip NSE: prefix from filtered stocks
         filtered_stocks = [s.replace("NSE:", "") for s in filtered_stocks_with_prefix]
@@ -262,57 +466,42 @@ class EODAnalyzer:
             logger.warning("No stocks passed filtering. Generating empty report.")
             filtered_stocks = []  # Will generate report with no findings
 
-        # Step 3: Fetch intraday data for filtered stocks
-        logger.info("Step 3: Fetching intraday data for filtered stocks...")
-        intraday_data_map = {}
-
-        for symbol in filtered_stocks:
-            intraday_data = self._fetch_intraday_data(symbol)
-            intraday_data_map[symbol] = intraday_data
-            time.sleep(config.REQUEST_DELAY_SECONDS)  # Rate limiting
-
-        logger.info(f"Fetched intraday data for {len(intraday_data_map)} stocks")
-
-        # Step 4: Fetch/cache 30-day historical data for filtered stocks
-        logger.info("Step 4: Fetching historical data (with caching)...")
-        historical_data_map = {}
+        # Step 3: Intraday + 30-day daily candles (central DB first, Kite for gaps)
+        logger.info("Step 3: Loading intraday and historical candles...")
+        with self._stage('candles'):
+            intraday_data_map, historical_data_map = self._load_candles(filtered_stocks)
 
-        for symbol in filtered_stocks:
-            historical_data = self._fetch_historical_data(symbol, use_cache=True)
-            historical_data_map[symbol] = historical_data
-            time.sleep(config.REQUEST_DELAY_SECONDS)  # Rate limiting
+        logger.info(f"Loaded candles for {len(historical_data_map)} stocks")
 
-        logger.info(f"Fetched/cached historical data for {len(historical_data_map)} stocks")
-
-        # Step 5: Run volume analysis
-        logger.info("Step 5: Running volume analysis...")
-        volume_results = self.volume_analyzer.batch_analyze(intraday_data_map, historical_data_map)
-
-        # Step 6: Detect market regime
-        logger.info("Step 6: Detecting market regime...")
-        market_regime = self.regime_detector.get_market_regime()
-        regime_details = self.regime_detector.get_regime_details()
+        # Step 4: Detect market regime
+        logger.info("Step 4: Detecting market regime...")
+        with self._stage('regime'):
+            market_regime = self.regime_detector.get_market_regime()
+            regime_details = self.regime_detector.get_regime_details()
         logger.info(f"Market Regime: {market_regime} "
                    f"(Nifty: {regime_details.get('current_price', 0):.2f}, "
                    f"50-SMA: {regime_details.get('sma_50', 0):.2f}, "
                    f"Diff: {regime_details.get('diff_pct', 0):+.2f}%)")
 
-        # Step 7: Run pattern detection with market regime
-        logger.info("Step 7: Running pattern detection...")
-        pattern_results = self.pattern_detector.batch_detect(historical_data_map, market_regime)
-
-        # Step 8: Generate Excel report
-        logger.info("Step 8: Generating Excel report...")
-        report_path = self.report_generator.generate_report(
-            volume_results,
-            pattern_results,
-            quote_data,
-            historical_data_map,
-            datetime.now()
-        )
+        # Step 5: Volume analysis + pattern detection with market regime (process pool)
+        logger.info("Step 5: Running volume analysis and pattern detection...")
+        with self._stage('analysis'):
+            volume_results, pattern_results = self._run_analysis_stage(
+                intraday_data_map, historical_data_map, market_regime)
+
+        # Step 6: Generate Excel report
+        logger.info("Step 6: Generating Excel report...")
+        with self._stage('report'):
+            report_path = self.report_generator.generate_report(
+                volume_results,
+                pattern_results,
+                quote_data,
+                historical_data_map,
+                datetime.now()
+            )
 
-        # Step 9: Send EOD pattern summary to Telegram (if patterns found)
-        logger.info("Step 9: Sending EOD pattern summary to Telegram...")
+        # Step 7: Send EOD pattern summary to Telegram (if patterns found)
+        logger.info("Step 7: Sending EOD pattern summary to Telegram...")
         try:
             from telegram_notifier import TelegramNotifier
             notifier = TelegramNotifier()
@@ -341,7 +530,8 @@ class EODAnalyzer:
         logger.info("EOD Analysis Complete!")
         logger.info(f"Report: {report_path}")
         logger.info(f"Time taken: {elapsed_time:.1f} seconds")
-        logger.info(f"API calls made: ~{len(filtered_stocks) * 2 + len(self.fo_stocks)//50}")
+        logger.info("Stage timings: " + " | ".join(
+            f"{name} {seconds:.2f}s" for name, seconds in self.stage_timings.items()))
         logger.info("="*80)
 
         return report_path
@@ -7,6 +7,8 @@ Implements: Volume confirmation, Market regime filtering, Confidence scoring
 from typing import Dict, List, Optional, Tuple
 import logging
 
+from swing_index import SwingIndex, SwingWindow
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,7 +41,8 @@ class EODPatternDetector:
         self,
         symbol: str,
         historical_data: List[Dict],
-        market_regime: str = "NEUTRAL"
+        market_regime: str = "NEUTRAL",
+        swings: Optional[SwingWindow] = None
     ) -> Dict:
         """
         Detect all chart patterns for a single stock
@@ -49,6 +52,8 @@ class EODPatternDetector:
             historical_data: 30-day daily OHLCV data from Kite API
                            [{date: datetime, open: float, high: float, low: float, close: float, volume: int}, ...]
             market_regime: Current market regime ('BULLISH', 'BEARISH', 'NEUTRAL')
+            swings: Window of the symbol's SwingIndex covering exactly historical_data
+                    (built from historical_data when omitted)
 
         Returns:
             Dict with pattern detection results:
@@ -67,11 +72,16 @@ class EODPatternDetector:
         patterns_found = []
         pattern_details = {}
 
+        # Swing points shared by all detectors
+        if swings is not None and len(swings) != len(historical_data):
+            raise ValueError(f"Swing window covers {len(swings)} days, candles {len(historical_data)}")
+        swings = self._swing_window(historical_data, swings)
+
         # Calculate average volume for confirmation
         avg_volume = self._calculate_avg_volume(historical_data)
 
         # Detect Double Bottom (Bullish)
-        double_bottom = self._detect_double_bottom(historical_data, avg_volume, market_regime)
+        double_bottom = self._detect_double_bottom(historical_data, avg_volume, market_regime, swings)
         if double_bottom and double_bottom.get('confidence_score', 0) >= self.min_confidence:
             # Filter based on market regime
             if market_regime in ['BULLISH', 'NEUTRAL']:
@@ -81,7 +91,7 @@ class EODPatternDetector:
                 logger.debug(f"{symbol}: Double Bottom filtered (bearish market regime)")
 
         # Detect Double Top (Bearish) - DISABLED: 40.7% win rate in backtest
-        double_top = self._detect_double_top(historical_data, avg_volume, market_regime)
+        double_top = self._detect_double_top(historical_data, avg_volume, market_regime, swings)
         if double_top and double_top.get('confidence_score', 0) >= self.min_confidence:
             # DISABLED: Historical backtest shows 40.7% win rate (poor performance)
             # Pattern detection kept for logging but NOT added to tradeable patterns
@@ -91,7 +101,7 @@ class EODPatternDetector:
             # pattern_details['double_top'] = double_top  # COMMENTED OUT
 
         # Detect Support Breakout (Bearish) - DISABLED: 42.6% win rate in backtest
-        support_breakout = self._detect_support_breakout(historical_data, avg_volume, market_regime)
+        support_breakout = self._detect_support_breakout(historical_data, avg_volume, market_regime, swings)
         if support_breakout and support_breakout.get('confidence_score', 0) >= self.min_confidence:
             # DISABLED: Historical backtest shows 42.6% win rate (poor performance)
             # Pattern detection kept for logging but NOT added to tradeable patterns
@@ -101,7 +111,7 @@ class EODPatternDetector:
             # pattern_details['support_breakout'] = support_breakout  # COMMENTED OUT
 
         # Detect Resistance Breakout (Bullish)
-        resistance_breakout = self._detect_resistance_breakout(historical_data, avg_volume, market_regime)
+        resistance_breakout = self._detect_resistance_breakout(historical_data, avg_volume, market_regime, swings)
         if resistance_breakout and resistance_breakout.get('confidence_score', 0) >= self.min_confidence:
             # Filter based on market regime
             if market_regime in ['BULLISH', 'NEUTRAL']:
@@ -111,7 +121,7 @@ class EODPatternDetector:
                 logger.debug(f"{symbol}: Resistance Breakout filtered (bearish market regime)")
 
         # Detect Cup & Handle (Bullish)
-        cup_handle = self._detect_cup_handle(historical_data, avg_volume, market_regime)
+        cup_handle = self._detect_cup_handle(historical_data, avg_volume, market_regime, swings)
         if cup_handle and cup_handle.get('confidence_score', 0) >= self.min_confidence:
             # Filter based on market regime
             if market_regime in ['BULLISH', 'NEUTRAL']:
@@ -123,7 +133,7 @@ class EODPatternDetector:
         # PHASE 2 PATTERNS - High-probability patterns with 65-80% win rates
 
         # Detect Inverse Head & Shoulders (Bullish Reversal) - 70-80% win rate
-        inverse_hs = self._detect_inverse_head_shoulders(historical_data, avg_volume, market_regime)
+        inverse_hs = self._detect_inverse_head_shoulders(historical_data, avg_volume, market_regime, swings)
         if inverse_hs and inverse_hs.get('confidence_score', 0) >= self.min_confidence:
             # Filter based on market regime
             if market_regime in ['BULLISH', 'NEUTRAL']:
@@ -133,7 +143,7 @@ class EODPatternDetector:
                 logger.debug(f"{symbol}: Inverse H&S filtered (bearish market regime)")
 
         # Detect Bull Flag (Bullish Continuation) - 65-75% win rate
-        bull_flag = self._detect_bull_flag(historical_data, avg_volume, market_regime)
+        bull_flag = self._detect_bull_flag(historical_data, avg_volume, market_regime, swings)
         if bull_flag and bull_flag.get('confidence_score', 0) >= self.min_confidence:
             # Filter based on market regime (only in bullish/neutral markets)
             if market_regime in ['BULLISH', 'NEUTRAL']:
@@ -143,7 +153,7 @@ class EODPatternDetector:
                 logger.debug(f"{symbol}: Bull Flag filtered (bearish market regime)")
 
         # Detect Ascending Triangle (Bullish Continuation) - 65-70% win rate
-        ascending_triangle = self._detect_ascending_triangle(historical_data, avg_volume, market_regime)
+        ascending_triangle = self._detect_ascending_triangle(historical_data, avg_volume, market_regime, swings)
         if ascending_triangle and ascending_triangle.get('confidence_score', 0) >= self.min_confidence:
             # Filter based on market regime
             if market_regime in ['BULLISH', 'NEUTRAL']:
@@ -153,7 +163,7 @@ class EODPatternDetector:
                 logger.debug(f"{symbol}: Ascending Triangle filtered (bearish market regime)")
 
         # Detect Falling Wedge (Bullish Reversal) - 68-74% win rate
-        falling_wedge = self._detect_falling_wedge(historical_data, avg_volume, market_regime)
+        falling_wedge = self._detect_falling_wedge(historical_data, avg_volume, market_regime, swings)
         if falling_wedge and falling_wedge.get('confidence_score', 0) >= self.min_confidence:
             # Filter based on market regime
             if market_regime in ['BULLISH', 'NEUTRAL']:
@@ -179,6 +189,11 @@ class EODPatternDetector:
             'market_regime': market_regime
         }
 
+    @staticmethod
+    def _swing_window(data: List[Dict], swings: Optional[SwingWindow]) -> SwingWindow:
+        """The caller's swing window for data, or one built from data"""
+        return SwingIndex(data).window() if swings is None else swings
+
     def _calculate_avg_volume(self, data: List[Dict]) -> float:
         """Calculate 30-day average volume"""
         if not data:
@@ -367,7 +382,8 @@ class EODPatternDetector:
         self,
         data: List[Dict],
         avg_volume: float,
-        market_regime: str
+        market_regime: str,
+        swings: Optional[SwingWindow] = None
     ) -> Optional[Dict]:
         """
         Detect Double Bottom pattern (bullish reversal)
@@ -381,14 +397,10 @@ class EODPatternDetector:
             return None
 
         # Focus on recent data (last 15 days or available data)
-        lookback = min(15, len(data))
-        recent_data = data[-lookback:]
+        recent = self._swing_window(data, swings).tail(15)
 
-        # Find local minima (lows) in recent data
-        local_minima = []
-        for i in range(1, len(recent_data) - 1):
-            if recent_data[i]['low'] < recent_data[i-1]['low'] and recent_data[i]['low'] < recent_data[i+1]['low']:
-                local_minima.append((i, recent_data[i]['low']))
+        # Local minima (lows) in recent data
+        local_minima = recent.swing_lows()
 
         # Need at least 2 local minima
         if len(local_minima) < 2:
@@ -403,9 +415,9 @@ class EODPatternDetector:
 
         if price_diff_pct <= self.pattern_tolerance:
             # Check if there's a peak between the two lows
-            between_data = recent_data[first_low[0]:second_low[0]+1]
-            if between_data:
-                max_between = max(candle['high'] for candle in between_data)
+            between_highs = recent.high[first_low[0]:second_low[0]+1]
+            if between_highs:
+                max_between = max(between_highs)
                 # Peak should be at least 3% higher than lows (more strict)
                 if max_between > first_low[1] * 1.03:
                     # Current price should be above the second low (potential breakout)
@@ -469,7 +481,8 @@ class EODPatternDetector:
         self,
         data: List[Dict],
         avg_volume: float,
-        market_regime: str
+        market_regime: str,
+        swings: Optional[SwingWindow] = None
     ) -> Optional[Dict]:
         """
         Detect Double Top pattern (bearish reversal)
@@ -483,14 +496,10 @@ class EODPatternDetector:
             return None
 
         # Focus on recent data (last 15 days or available data)
-        lookback = min(15, len(data))
-        recent_data = data[-lookback:]
+        recent = self._swing_window(data, swings).tail(15)
 
-        # Find local maxima (highs) in recent data
-        local_maxima = []
-        for i in range(1, len(recent_data) - 1):
-            if recent_data[i]['high'] > recent_data[i-1]['high'] and recent_data[i]['high'] > recent_data[i+1]['high']:
-                local_maxima.append((i, recent_data[i]['high']))
+        # Local maxima (highs) in recent data
+        local_maxima = recent.swing_highs()
 
         # Need at least 2 local maxima
         if len(local_maxima) < 2:
@@ -505,9 +514,9 @@ class EODPatternDetector:
 
         if price_diff_pct <= self.pattern_tolerance:
             # Check if there's a trough between the two highs
-            between_data = recent_data[first_high[0]:second_high[0]+1]
-            if between_data:
-                min_between = min(candle['low'] for candle in between_data)
+            between_lows = recent.low[first_high[0]:second_high[0]+1]
+            if between_lows:
+                min_between = min(between_lows)
                 # Trough should be at least 3% lower than highs (more strict)
                 if min_between < first_high[1] * 0.97:
                     # Current price should be below the second high (potential breakdown)
@@ -564,7 +573,8 @@ class EODPatternDetector:
         self,
         data: List[Dict],
         avg_volume: float,
-        market_regime: str
+        market_regime: str,
+        swings: Optional[SwingWindow] = None
     ) -> Optional[Dict]:
         """
         Detect Support Breakout (bearish)
@@ -578,12 +588,12 @@ class EODPatternDetector:
 
         # Calculate recent support (lowest low in last 10-20 days, excluding last 2 days)
         lookback_period = min(20, len(data) - 3)
-        recent_data = data[-lookback_period-3:-2]  # Exclude last 2 days to find established support
+        recent_lows = self._swing_window(data, swings).low[-lookback_period-3:-2]  # Exclude last 2 days
 
-        if not recent_data:
+        if not recent_lows:
             return None
 
-        support_level = min(candle['low'] for candle in recent_data)
+        support_level = min(recent_lows)
         current_price = data[-1]['close']
         current_low = data[-1]['low']
 
@@ -644,7 +654,8 @@ class EODPatternDetector:
         self,
         data: List[Dict],
         avg_volume: float,
-        market_regime: str
+        market_regime: str,
+        swings: Optional[SwingWindow] = None
     ) -> Optional[Dict]:
         """
         Detect Resistance Breakout (bullish)
@@ -658,12 +669,12 @@ class EODPatternDetector:
 
         # Calculate recent resistance (highest high in last 10-20 days, excluding last 2 days)
         lookback_period = min(20, len(data) - 3)
-        recent_data = data[-lookback_period-3:-2]  # Exclude last 2 days to find established resistance
+        recent_highs = self._swing_window(data, swings).high[-lookback_period-3:-2]  # Exclude last 2 days
 
-        if not recent_data:
+        if not recent_highs:
             return None
 
-        resistance_level = max(candle['high'] for candle in recent_data)
+        resistance_level = max(recent_highs)
         current_price = data[-1]['close']
         current_high = data[-1]['high']
 
@@ -731,7 +742,8 @@ class EODPatternDetector:
         self,
         data: List[Dict],
         avg_volume: float,
-        market_regime: str
+        market_regime: str,
+        swings: Optional[SwingWindow] = None
     ) -> Optional[Dict]:
         """
         Detect Cup & Handle pattern (bullish continuation)
@@ -753,25 +765,25 @@ class EODPatternDetector:
 
         lookback = min(30, len(data))
         cup_data = data[-lookback:]
+        cup = self._swing_window(data, swings).tail(lookback)
 
-        # Find left rim (local high before decline)
-        left_rim_idx = None
-        left_rim_price = 0
-        for i in range(len(cup_data) - 10):
-            if cup_data[i]['high'] > left_rim_price:
-                left_rim_idx = i
-                left_rim_price = cup_data[i]['high']
+        # Find left rim (highest high before the last 10 days; first one on ties)
+        rim_highs = cup.high[:len(cup_data) - 10]
+        if not rim_highs or max(rim_highs) <= 0:
+            return None
+        left_rim_price = max(rim_highs)
+        left_rim_idx = rim_highs.index(left_rim_price)
 
-        if left_rim_idx is None or left_rim_idx < 5:
+        if left_rim_idx < 5:
             return None
 
         # Find cup bottom (lowest low after left rim)
         cup_bottom_idx = left_rim_idx
         cup_bottom_price = left_rim_price
-        for i in range(left_rim_idx, len(cup_data) - 5):
-            if cup_data[i]['low'] < cup_bottom_price:
-                cup_bottom_idx = i
-                cup_bottom_price = cup_data[i]['low']
+        bottom_lows = cup.low[left_rim_idx:len(cup_data) - 5]
+        if bottom_lows and min(bottom_lows) < cup_bottom_price:
+            cup_bottom_price = min(bottom_lows)
+            cup_bottom_idx = left_rim_idx + bottom_lows.index(cup_bottom_price)
 
         # Validate cup depth (12-33% from rim to bottom)
         cup_depth_pct = ((left_rim_price - cup_bottom_price) / left_rim_price) * 100
@@ -791,13 +803,13 @@ class EODPatternDetector:
             logger.debug(f"Cup rejected: V-shaped bottom (not rounded)")
             return None
 
-        # Find right rim (recovery to near left rim level)
+        # Find right rim (recovery to near left rim level, before the breakout candle)
         right_rim_idx = cup_bottom_idx
         right_rim_price = cup_bottom_price
-        for i in range(cup_bottom_idx, len(cup_data)):
-            if cup_data[i]['high'] > right_rim_price:
-                right_rim_idx = i
-                right_rim_price = cup_data[i]['high']
+        recovery_highs = cup.high[cup_bottom_idx:-1]
+        if max(recovery_highs) > right_rim_price:
+            right_rim_price = max(recovery_highs)
+            right_rim_idx = cup_bottom_idx + recovery_highs.index(right_rim_price)
 
         # Right rim should reach 90-100% of left rim
         rim_recovery_pct = (right_rim_price / left_rim_price) * 100
@@ -815,15 +827,17 @@ class EODPatternDetector:
         if right_rim_idx >= len(cup_data) - 3:
             return None  # Not enough data for handle
 
+        # The handle runs from the right rim up to (not including) the current
+        # candle, which is the breakout being confirmed below
         handle_start_idx = right_rim_idx
-        handle_data = cup_data[handle_start_idx:]
+        handle_data = cup_data[handle_start_idx:-1]
 
         if len(handle_data) < 3 or len(handle_data) > 5:
             return None  # Handle duration must be 3-5 days
 
         # Find handle high and low
-        handle_high = max(c['high'] for c in handle_data)
-        handle_low = min(c['low'] for c in handle_data)
+        handle_high = max(cup.high[handle_start_idx:-1])
+        handle_low = min(cup.low[handle_start_idx:-1])
 
         # Validate handle depth (5-12% below cup rim)
         handle_depth_pct = ((right_rim_price - handle_low) / right_rim_price) * 100
@@ -903,7 +917,8 @@ class EODPatternDetector:
         self,
         data: List[Dict],
         avg_volume: float,
-        market_regime: str
+        market_regime: str,
+        swings: Optional[SwingWindow] = None
     ) -> Optional[Dict]:
         """
         Detect Inverse Head & Shoulders pattern (bullish reversal)
@@ -930,56 +945,32 @@ class EODPatternDetector:
 
         # Look for pattern in last 25 days
         lookback = min(25, len(data))
-        pattern_data = data[-lookback:]
+        pattern = self._swing_window(data, swings).tail(lookback)
 
         # Step 1: Find potential head (lowest low in middle section)
         # Head should be in middle 60% of lookback period
         start_idx = int(lookback * 0.2)
         end_idx = int(lookback * 0.8)
 
-        head_idx = start_idx
-        head_low = pattern_data[start_idx]['low']
-
-        for i in range(start_idx, end_idx):
-            if pattern_data[i]['low'] < head_low:
-                head_idx = i
-                head_low = pattern_data[i]['low']
+        middle_lows = pattern.low[start_idx:end_idx]
+        head_low = min(middle_lows)
+        head_idx = start_idx + middle_lows.index(head_low)
 
         # Need at least 3 candles on each side of head
-        if head_idx < 3 or head_idx > len(pattern_data) - 4:
+        if head_idx < 3 or head_idx > len(pattern) - 4:
             return None
 
-        # Step 2: Find left shoulder (local low before head)
-        left_shoulder_idx = None
-        left_shoulder_low = float('inf')
-
-        for i in range(max(0, head_idx - 10), head_idx - 2):
-            if pattern_data[i]['low'] < left_shoulder_low:
-                # Check if it's a local low (lower than neighbors)
-                if i > 0 and i < len(pattern_data) - 1:
-                    if (pattern_data[i]['low'] < pattern_data[i-1]['low'] and
-                        pattern_data[i]['low'] < pattern_data[i+1]['low']):
-                        left_shoulder_idx = i
-                        left_shoulder_low = pattern_data[i]['low']
-
-        if left_shoulder_idx is None:
+        # Step 2: Find left shoulder (lowest local low before head)
+        left_lows = pattern.swing_lows(max(0, head_idx - 10), head_idx - 2)
+        if not left_lows:
             return None
+        left_shoulder_idx, left_shoulder_low = min(left_lows, key=lambda point: point[1])
 
-        # Step 3: Find right shoulder (local low after head)
-        right_shoulder_idx = None
-        right_shoulder_low = float('inf')
-
-        for i in range(head_idx + 3, min(len(pattern_data), head_idx + 12)):
-            if pattern_data[i]['low'] < right_shoulder_low:
-                # Check if it's a local low
-                if i > 0 and i < len(pattern_data) - 1:
-                    if (pattern_data[i]['low'] < pattern_data[i-1]['low'] and
-                        pattern_data[i]['low'] < pattern_data[i+1]['low']):
-                        right_shoulder_idx = i
-                        right_shoulder_low = pattern_data[i]['low']
-
-        if right_shoulder_idx is None:
+        # Step 3: Find right shoulder (lowest local low after head)
+        right_lows = pattern.swing_lows(head_idx + 3, head_idx + 12)
+        if not right_lows:
             return None
+        right_shoulder_idx, right_shoulder_low = min(right_lows, key=lambda point: point[1])
 
         # Step 4: Validate pattern structure
         # Head must be significantly lower than both shoulders (5-25% - RELAXED from 8-20%)
@@ -1002,20 +993,10 @@ class EODPatternDetector:
 
         # Step 5: Define neckline (resistance connecting peaks between shoulders and head)
         # Peak between LS and H
-        ls_h_peak_idx = left_shoulder_idx
-        ls_h_peak_high = pattern_data[left_shoulder_idx]['high']
-        for i in range(left_shoulder_idx + 1, head_idx):
-            if pattern_data[i]['high'] > ls_h_peak_high:
-                ls_h_peak_idx = i
-                ls_h_peak_high = pattern_data[i]['high']
+        ls_h_peak_high = max(pattern.high[left_shoulder_idx:head_idx])
 
         # Peak between H and RS
-        h_rs_peak_idx = head_idx
-        h_rs_peak_high = pattern_data[head_idx]['high']
-        for i in range(head_idx + 1, right_shoulder_idx + 1):
-            if pattern_data[i]['high'] > h_rs_peak_high:
-                h_rs_peak_idx = i
-                h_rs_peak_high = pattern_data[i]['high']
+        h_rs_peak_high = max(pattern.high[head_idx:right_shoulder_idx + 1])
 
         # Neckline is average of two peaks
         neckline_level = (ls_h_peak_high + h_rs_peak_high) / 2
@@ -1094,7 +1075,8 @@ class EODPatternDetector:
         self,
         data: List[Dict],
         avg_volume: float,
-        market_regime: str
+        market_regime: str,
+        swings: Optional[SwingWindow] = None
     ) -> Optional[Dict]:
         """
         Detect Bull Flag/Pennant pattern (bullish continuation)
@@ -1120,26 +1102,26 @@ class EODPatternDetector:
         # Look for pattern in last 25 days
         lookback = min(25, len(data))
         pattern_data = data[-lookback:]
+        pattern = self._swing_window(data, swings).tail(lookback)
 
         # Step 1: Find the pole (sharp upward move)
         # Look for significant price rise in 5-10 days
+        highs, lows = pattern.high, pattern.low
         pole_found = False
         pole_start_idx = None
         pole_end_idx = None
         pole_gain_pct = 0
 
         for start in range(0, len(pattern_data) - 10):
+            start_low = lows[start]
             for end in range(start + 3, min(start + 13, len(pattern_data) - 5)):  # RELAXED from 5-11 to 3-13
-                start_low = pattern_data[start]['low']
-                end_high = pattern_data[end]['high']
+                end_high = highs[end]
                 gain_pct = ((end_high - start_low) / start_low) * 100
 
                 if 8.0 <= gain_pct <= 35.0:  # RELAXED from 10-30% to 8-35%
-                    # Check if it's a relatively straight move (no major pullbacks)
-                    max_pullback = 0
-                    for i in range(start + 1, end):
-                        pullback = ((end_high - pattern_data[i]['low']) / end_high) * 100
-                        max_pullback = max(max_pullback, pullback)
+                    # Check if it's a relatively straight move (no major pullbacks):
+                    # the deepest low inside the pole sets the worst pullback
+                    max_pullback = ((end_high - min(lows[start + 1:end])) / end_high) * 100
 
                     # Allow max 12% pullback during pole formation (RELAXED from 8%)
                     if max_pullback <= 12.0:  # RELAXED from 8.0%
@@ -1154,8 +1136,8 @@ class EODPatternDetector:
         if not pole_found:
             return None
 
-        pole_low = pattern_data[pole_start_idx]['low']
-        pole_high = pattern_data[pole_end_idx]['high']
+        pole_low = lows[pole_start_idx]
+        pole_high = highs[pole_end_idx]
         pole_height = pole_high - pole_low
 
         # Step 2: Find the flag (consolidation after pole)
@@ -1261,7 +1243,8 @@ class EODPatternDetector:
         self,
         data: List[Dict],
         avg_volume: float,
-        market_regime: str
+        market_regime: str,
+        swings: Optional[SwingWindow] = None
     ) -> Optional[Dict]:
         """
         Detect Ascending Triangle pattern (bullish continuation)
@@ -1287,20 +1270,13 @@ class EODPatternDetector:
 
         # Look for pattern in last 25 days
         lookback = min(25, len(data))
-        pattern_data = data[-lookback:]
+        pattern = self._swing_window(data, swings).tail(lookback)
 
         # Step 1: Find flat resistance level (horizontal line tested 2-3 times)
-        # Look for multiple highs at similar levels
-        highs = [(i, candle['high']) for i, candle in enumerate(pattern_data)]
-
-        # Find the highest high in the lookback period
-        max_high = max(h[1] for h in highs)
-
-        # Find all touches within 2% of max high (RELAXED from 1%)
-        resistance_touches = []
-        for idx, high in highs:
-            if high >= max_high * 0.98:  # Within 2% of max high (RELAXED from 1%)
-                resistance_touches.append((idx, high))
+        # Look for multiple highs at similar levels: all touches within 2% of the
+        # highest high in the lookback period (RELAXED from 1%)
+        max_high = max(pattern.high)
+        resistance_touches = [(i, high) for i, high in enumerate(pattern.high) if high >= max_high * 0.98]
 
         # Need at least 2 touches on resistance
         if len(resistance_touches) < 2:
@@ -1330,14 +1306,8 @@ class EODPatternDetector:
             return None
 
         # Step 2: Find rising support (higher lows)
-        # Look for lows in the pattern period
-        lows_in_pattern = []
-        for i in range(first_touch_idx, last_touch_idx + 1):
-            # Identify local lows (lower than neighbors)
-            if i > 0 and i < len(pattern_data) - 1:
-                if (pattern_data[i]['low'] < pattern_data[i-1]['low'] and
-                    pattern_data[i]['low'] < pattern_data[i+1]['low']):
-                    lows_in_pattern.append((i, pattern_data[i]['low']))
+        # Local lows (lower than neighbors) in the pattern period
+        lows_in_pattern = pattern.swing_lows(first_touch_idx, last_touch_idx + 1)
 
         # Need at least 2 lows to form support trendline
         if len(lows_in_pattern) < 2:
@@ -1438,7 +1408,8 @@ class EODPatternDetector:
         self,
         data: List[Dict],
         avg_volume: float,
-        market_regime: str
+        market_regime: str,
+        swings: Optional[SwingWindow] = None
     ) -> Optional[Dict]:
         """
         Detect Falling Wedge pattern (bullish reversal)
@@ -1466,16 +1437,11 @@ class EODPatternDetector:
 
         # Look for pattern in last 25 days
         lookback = min(25, len(data))
-        pattern_data = data[-lookback:]
+        pattern = self._swing_window(data, swings).tail(lookback)
 
         # Step 1: Find lower highs (resistance trendline)
-        # Identify local highs (peaks) - RELAXED tolerance to allow near-peaks
-        highs_in_pattern = []
-        for i in range(1, len(pattern_data) - 1):
-            # Allow 1% tolerance for peak detection (more lenient)
-            if (pattern_data[i]['high'] >= pattern_data[i-1]['high'] * 0.99 and
-                pattern_data[i]['high'] >= pattern_data[i+1]['high'] * 0.99):
-                highs_in_pattern.append((i, pattern_data[i]['high']))
+        # Local highs (peaks) - RELAXED: 1% tolerance allows near-peaks
+        highs_in_pattern = pattern.near_highs()
 
         # Need at least 2 highs for resistance trendline
         if len(highs_in_pattern) < 2:
@@ -1492,13 +1458,8 @@ class EODPatternDetector:
             return None
 
         # Step 2: Find lower lows (support trendline)
-        # Identify local lows (troughs) - RELAXED tolerance to allow near-troughs
-        lows_in_pattern = []
-        for i in range(1, len(pattern_data) - 1):
-            # Allow 1% tolerance for trough detection (more lenient)
-            if (pattern_data[i]['low'] <= pattern_data[i-1]['low'] * 1.01 and
-                pattern_data[i]['low'] <= pattern_data[i+1]['low'] * 1.01):
-                lows_in_pattern.append((i, pattern_data[i]['low']))
+        # Local lows (troughs) - RELAXED: 1% tolerance allows near-troughs
+        lows_in_pattern = pattern.near_lows()
 
         # Need at least 2 lows for support trendline
         if len(lows_in_pattern) < 2:
@@ -1544,7 +1505,7 @@ class EODPatternDetector:
 
         # Step 4: Calculate current resistance level (extrapolate upper trendline)
         # Linear interpolation of resistance trendline to current day
-        days_from_first_high = len(pattern_data) - 1 - first_high_idx
+        days_from_first_high = len(pattern) - 1 - first_high_idx
         resistance_decline_per_day = (last_high - first_high) / (last_high_idx - first_high_idx) if last_high_idx != first_high_idx else 0
         current_resistance = first_high + (resistance_decline_per_day * days_from_first_high)
 
@@ -1631,6 +1592,37 @@ class EODPatternDetector:
             'market_regime': market_regime
         }
 
+    def detect_patterns_over_history(
+        self,
+        symbol: str,
+        candles: List[Dict],
+        windows: List[Tuple[int, int]],
+        market_regime: str = "NEUTRAL"
+    ) -> List[Dict]:
+        """
+        Detect patterns as of many days of one symbol's history (backtests)
+
+        One SwingIndex is extended day by day as the windows move forward, so no
+        window is rescanned for swing points.
+
+        Args:
+            symbol: Stock symbol
+            candles: The symbol's daily OHLCV history, oldest first
+            windows: (start, end) candle positions, end non-decreasing; each
+                     detection sees candles[start:end] (the last candle is "today")
+            market_regime: Market regime for every window
+
+        Returns:
+            detect_patterns() result per window, in order
+        """
+        index = SwingIndex()
+        results = []
+        for start, end in windows:
+            index.extend(candles[len(index):end])
+            results.append(self.detect_patterns(symbol, candles[start:end], market_regime,
+                                                 swings=index.window(end, end - start)))
+        return results
+
     def batch_detect(
         self,
         historical_data_map: Dict[str, List[Dict]],
@@ -11,6 +11,8 @@ from datetime import datetime, date
 from typing import Dict, Optional, List
 from pathlib import Path
 
+from instrument_master import get_instrument_master
+
 logger = logging.getLogger(__name__)
 
 # Singleton instance
@@ -78,7 +80,7 @@ class FuturesMapper:
         Fetch all NFO instruments and build futures mappings.
 
         Process:
-        1. Fetch all NFO instruments from Kite
+        1. Fetch all NFO instruments (instrument master snapshot)
         2. Filter for equity futures (instrument_type == 'FUT')
         3. Group by equity symbol
         4. Select nearest expiry (most liquid contract)
@@ -98,12 +100,12 @@ class FuturesMapper:
         logger.info("Fetching NFO instruments from Kite API...")
 
         try:
-            # Fetch all NFO instruments
-            instruments = kite_client.instruments("NFO")
+            # NFO instruments from the shared daily snapshot (one download per day)
+            instruments = get_instrument_master(kite_client).index("NFO")
 
             # Filter for equity futures only
             futures = [
-                inst for inst in instruments
+                inst for inst in instruments.rows
                 if inst.get('instrument_type') == 'FUT'
             ]
 
@@ -29,8 +29,10 @@ from typing import Dict, List
 from kiteconnect import KiteConnect
 
 import config
+from central_db_reader import get_latest_stock_quotes
 from central_quote_db import get_central_db_reader
 from market_utils import is_trading_day
+from minute_bus import wait_for_next_minute
 from telegram_notifiers.base_notifier import BaseNotifier
 
 # ── Parameters ────────────────────────────────────────────────────────────────
@@ -425,7 +427,7 @@ class GapOrbMonitor:
         if not syms:
             return
 
-        quotes = self.db.get_latest_stock_quotes(syms)
+        quotes = get_latest_stock_quotes(self.db, syms)
 
         for sym in list(self.active_trades.keys()):
             trade = self.active_trades[sym]
@@ -445,7 +447,7 @@ class GapOrbMonitor:
         if not self.active_trades:
             return
         syms   = list(self.active_trades.keys())
-        quotes = self.db.get_latest_stock_quotes(syms)
+        quotes = get_latest_stock_quotes(self.db, syms)
         for sym in list(self.active_trades.keys()):
             trade  = self.active_trades[sym]
             q      = quotes.get(sym)
@@ -588,7 +590,8 @@ class GapOrbMonitor:
             if now_hm >= EXIT_TIME and self.active_trades:
                 self._close_all_eod()
 
-            time.sleep(LOOP_INTERVAL)
+            # Wake on the collector's next commit (LOOP_INTERVAL at most)
+            wait_for_next_minute(LOOP_INTERVAL, after_time=now.timestamp())
 
 
 def main():
@@ -29,6 +29,7 @@ from unified_data_cache import UnifiedDataCache
 from telegram_notifier import TelegramNotifier
 from black_scholes_greeks import BlackScholesGreeks
 from api_coordinator import get_api_coordinator
+from instrument_master import get_instrument_master
 
 # Setup logging
 logging.basicConfig(
@@ -517,11 +518,17 @@ class GreeksDifferenceTracker:
                     symbols.append(nfo_symbol)
                     symbol_to_strike_type[nfo_symbol] = (strike, opt_type)
 
+            # Premiums the collector recorded this minute need no API call
+            quotes = self._recorded_chain_quotes(expiry, symbol_to_strike_type)
+            symbols = [nfo_symbol for nfo_symbol in symbols if nfo_symbol not in quotes]
+
             # Single batch API call for ALL options (e.g., 8 options in 1 call instead of 8 calls)
-            logger.info(f"Fetching {len(symbols)} options in single batch call...")
-            quotes = self.coordinator.get_multiple_instruments(symbols)
+            if symbols:
+                logger.info(f"Fetching {len(symbols)} options in single batch call...")
+                quotes.update(self.coordinator.get_multiple_instruments(symbols))
 
             # Parse results and build greeks_map
+            pending = []  # (strike, opt_type, option_price) to price with Black-Scholes
             for nfo_symbol, quote_data in quotes.items():
                 if nfo_symbol not in symbol_to_strike_type:
                     continue
@@ -539,28 +546,28 @@ class GreeksDifferenceTracker:
                         'theta': quote_data['greeks'].get('theta', 0),
                         'vega': quote_data['greeks'].get('vega', 0)
                     }
-                else:
-                    # Calculate Greeks using Black-Scholes if not in API
-                    logger.info(f"Calculating Greeks for {nfo_symbol} using Black-Scholes...")
-                    spot_price = self._get_nifty_spot_price()
-                    option_price = quote_data.get('last_price', 0)
-
-                    if spot_price and option_price > 0:
-                        time_to_expiry = self.bs_calculator.calculate_time_to_expiry(expiry)
-                        greeks = self.bs_calculator.calculate_greeks_from_price(
-                            spot_price=spot_price,
-                            strike_price=strike,
-                            time_to_expiry=time_to_expiry,
-                            option_price=option_price,
-                            option_type=opt_type
-                        )
-
-                        if greeks:
-                            greeks_map[strike][opt_type] = {
-                                'delta': greeks.get('delta', 0),
-                                'theta': greeks.get('theta', 0),
-                                'vega': greeks.get('vega', 0)
-                            }
+                elif quote_data.get('last_price', 0) > 0:
+                    pending.append((strike, opt_type, quote_data['last_price']))
+
+            # Calculate missing Greeks using Black-Scholes - whole chain in one vectorized pass
+            spot_price = self._get_nifty_spot_price() if pending else None
+            if spot_price:
+                logger.info(f"Calculating Greeks for {len(pending)} options using Black-Scholes...")
+                time_to_expiry = self.bs_calculator.calculate_time_to_expiry(expiry)
+                chain = self.bs_calculator.calculate_chain_greeks_from_prices(
+                    spot_price=spot_price,
+                    strike_prices=[strike for strike, _, _ in pending],
+                    time_to_expiry=time_to_expiry,
+                    option_prices=[price for _, _, price in pending],
+                    option_types=[opt_type for _, opt_type, _ in pending]
+                )
+
+                for (strike, opt_type, _), greeks in zip(pending, chain):
+                    greeks_map[strike][opt_type] = {
+                        'delta': greeks.get('delta', 0),
+                        'theta': greeks.get('theta', 0),
+                        'vega': greeks.get('vega', 0)
+                    }
 
             logger.info(f"Successfully fetched Greeks for {len(greeks_map)} strikes via batch call")
 
@@ -592,6 +599,37 @@ class GreeksDifferenceTracker:
 
         return greeks_map
 
+    def _recorded_chain_quotes(self, expiry: datetime, symbol_to_strike_type: Dict[str, Tuple[int, str]]) -> Dict:
+        """
+        Premiums for these contracts from the collector's option chain snapshot.
+
+        Matched on (strike, type) for the expiry, so the exchange's own symbol
+        convention doesn't matter. Greeks are still computed here, with this
+        tracker's rate, to stay comparable with the baseline.
+
+        Returns:
+            {nfo_symbol: {'last_price': ...}}; {} if the snapshot is missing or
+            older than OPTION_CHAIN_MAX_AGE_MINUTES
+        """
+        if not config.ENABLE_OPTION_CHAIN_COLLECTOR:
+            return {}
+        try:
+            from central_quote_db import get_central_db
+            chain = get_central_db().get_option_chain(expiry.strftime('%Y-%m-%d'))
+        except Exception as e:
+            logger.debug(f"Option chain snapshot unavailable: {e}")
+            return {}
+        if not chain:
+            return {}
+
+        age = datetime.now() - datetime.strptime(chain[0]['timestamp'], '%Y-%m-%d %H:%M:%S')
+        if age > timedelta(minutes=config.OPTION_CHAIN_MAX_AGE_MINUTES):
+            return {}
+
+        premiums = {(int(row['strike']), row['option_type']): row['ltp'] for row in chain if row['ltp']}
+        return {nfo_symbol: {'last_price': premiums[key]}
+                for nfo_symbol, key in symbol_to_strike_type.items() if key in premiums}
+
     def _get_option_data(self, option_type: str, expiry: datetime, strike: int) -> Dict:
         """
         Fetch option data for a specific strike.
@@ -1165,17 +1203,8 @@ class GreeksDifferenceTracker:
         Returns expiries with > 7 days remaining.
         """
         try:
-            # Get all NFO instruments
-            instruments = self.kite.instruments('NFO')
-
-            # Filter NIFTY options
-            nifty_options = [
-                i for i in instruments
-                if i['name'] == 'NIFTY' and i['instrument_type'] in ['CE', 'PE']
-            ]
-
-            # Get unique expiries
-            expiries = sorted(set([i['expiry'] for i in nifty_options]))
+            # NIFTY option expiries from the shared instrument master (sorted)
+            expiries = get_instrument_master(self.kite).index('NFO').expiries('NIFTY', 'OPT')
 
             # Filter expiries > 7 days away
             today = datetime.now().date()
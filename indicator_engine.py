@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Indicator Engine - Incremental Intraday VWAP / OBV / RSI / ATR per Symbol
+
+The central collector feeds every stored 1-minute cycle into the engine right
+after it goes into SQLite and the quote window; detectors read the running
+values instead of re-querying and recomputing from raw history per symbol.
+
+Why:
+- EarlyWarningDetector._calculate_vwap ran `date(timestamp) = ?` per symbol
+  (defeats the (symbol, timestamp) index) and then cached the value for the
+  whole day, so VWAP went stale after the first call.
+- _calculate_obv / _check_rsi_momentum re-read and re-walked the last 10-15
+  minutes for every symbol, every cycle.
+
+Each update is O(1) per symbol:
+- VWAP: running Σ(price x minute volume) / Σ(minute volume) from 09:15.
+  stock_quotes.volume is Kite's cumulative day volume, so the minute volume is
+  its delta (the old query weighted each minute by the cumulative figure).
+- OBV: running on-balance volume on the same minute volumes, plus the last
+  OBV_RECENT_POINTS values for the detectors' slope check.
+- RSI / ATR: Wilder smoothing (seeded with the simple mean of the first
+  `period` changes). ATR uses high/low when a quote carries them (tick-built
+  bars), else the close-to-close range.
+
+State is saved to INDICATOR_STATE_DB_PATH (only symbols changed since the last
+save, one transaction) so a restart resumes from the last saved minute and
+replays only the minutes after it (catch_up()).
+
+Date: 2026-10-16
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Union
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+SESSION_START_MINUTE = 9 * 60 + 15  # VWAP accumulates from 09:15
+OBV_RECENT_POINTS = 10              # OBV values kept for the slope check (~10 minutes)
+
+TimeLike = Union[str, datetime]
+
+CREATE_STATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS indicator_state (
+        symbol TEXT PRIMARY KEY,
+        trade_date TEXT NOT NULL,
+        last_minute INTEGER NOT NULL,
+        state TEXT NOT NULL
+    )
+"""
+
+UPSERT_STATE = """
+    INSERT OR REPLACE INTO indicator_state (symbol, trade_date, last_minute, state)
+    VALUES (?, ?, ?, ?)
+"""
+
+
+def _to_minute(ts: TimeLike) -> int:
+    """Datetime or 'YYYY-MM-DD HH:MM[:SS]' string -> minute ordinal (naive epoch)."""
+    if isinstance(ts, str):
+        ts = datetime.strptime(ts[:16], '%Y-%m-%d %H:%M')
+    return int((ts - _EPOCH).total_seconds() // 60)
+
+
+def _minute_date(minute: int) -> str:
+    """Minute ordinal -> 'YYYY-MM-DD'."""
+    return (_EPOCH + timedelta(minutes=minute)).strftime('%Y-%m-%d')
+
+
+class _SymbolState:
+    """Running indicator state of one symbol for the current trading day."""
+
+    __slots__ = ('last_minute', 'price', 'cum_volume',
+                 'pv_sum', 'vol_sum', 'obv', 'obv_recent',
+                 'rsi_count', 'avg_gain', 'avg_loss',
+                 'atr_count', 'atr')
+
+    def __init__(self):
+        self.last_minute = -1
+        self.price = None
+        self.cum_volume = 0
+        self.pv_sum = 0.0
+        self.vol_sum = 0
+        self.obv = 0.0
+        self.obv_recent = deque(maxlen=OBV_RECENT_POINTS)
+        self.rsi_count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.atr_count = 0
+        self.atr = 0.0
+
+    def to_dict(self) -> Dict:
+        return {name: (list(getattr(self, name)) if name == 'obv_recent' else getattr(self, name))
+                for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> '_SymbolState':
+        state = cls()
+        for name in cls.__slots__:
+            if name == 'obv_recent':
+                state.obv_recent.extend(data.get(name, []))
+            elif name in data:
+                setattr(state, name, data[name])
+        return state
+
+
+class IndicatorEngine:
+    """
+    Running VWAP / OBV / RSI / ATR for the whole universe, one update per minute.
+
+    Readers get the values as of the last update() - no SQL, no history walk.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, rsi_period: int = None, atr_period: int = None):
+        """
+        Initialize an empty engine.
+
+        Args:
+            db_path: SQLite file for persisted state (None = in-memory only)
+            rsi_period: Wilder RSI period (default: config.INDICATOR_RSI_PERIOD)
+            atr_period: Wilder ATR period (default: config.INDICATOR_ATR_PERIOD)
+        """
+        self.rsi_period = rsi_period or config.INDICATOR_RSI_PERIOD
+        self.atr_period = atr_period or config.INDICATOR_ATR_PERIOD
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._states: Dict[str, _SymbolState] = {}
+        self._dirty = set()
+        self._conn = None
+
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(CREATE_STATE_TABLE)
+            self._conn.commit()
+
+    # ============================================
+    # WRITE PATH (Central Collector)
+    # ============================================
+
+    def update(self, timestamp: TimeLike, quotes: Dict[str, Dict]) -> int:
+        """
+        Fold one collection cycle into every symbol's state.
+
+        Args:
+            timestamp: Cycle timestamp (minute resolution, as stored in stock_quotes)
+            quotes: {symbol: {price, volume[, high, low]}} exactly as stored
+
+        Returns:
+            Number of symbols updated (repeated or older minutes are skipped)
+        """
+        minute = _to_minute(timestamp)
+        updated = 0
+        with self._lock:
+            for symbol, data in quotes.items():
+                if self._update_symbol(symbol, minute, data.get('price'), data.get('volume'),
+                                       data.get('high'), data.get('low')):
+                    updated += 1
+        return updated
+
+    def catch_up(self, history: Dict[str, List[Dict]]) -> int:
+        """
+        Replay minutes newer than each symbol's state (startup after load()).
+
+        Args:
+            history: {symbol: [{timestamp, price, volume}, ...]} oldest first -
+                     QuoteWindow.since() / CentralQuoteDB.get_all_stock_history_since()
+
+        Returns:
+            Number of minutes replayed across all symbols
+        """
+        replayed = 0
+        with self._lock:
+            for symbol, rows in history.items():
+                for row in rows:
+                    if self._update_symbol(symbol, _to_minute(row['timestamp']), row.get('price'),
+                                           row.get('volume'), row.get('high'), row.get('low')):
+                        replayed += 1
+        return replayed
+
+    def _update_symbol(self, symbol: str, minute: int, price, volume,
+                       high=None, low=None) -> bool:
+        """One minute for one symbol (caller holds _lock). False if skipped."""
+        if not price or price <= 0:
+            return False
+
+        state = self._states.get(symbol)
+        if state is None or state.last_minute // 1440 != minute // 1440:
+            if state is not None and minute < state.last_minute:
+                return False
+            state = self._states[symbol] = _SymbolState()  # New trading day
+        elif minute <= state.last_minute:
+            return False  # Same minute twice or out of order: first write wins
+
+        cum_volume = int(volume or 0)
+        minute_volume = max(0, cum_volume - state.cum_volume)
+        prev_price = state.price
+
+        # VWAP (session only)
+        if minute % 1440 >= SESSION_START_MINUTE and minute_volume > 0:
+            state.pv_sum += price * minute_volume
+            state.vol_sum += minute_volume
+
+        if prev_price is not None:
+            change = price - prev_price
+
+            # OBV
+            if change > 0:
+                state.obv += minute_volume
+            elif change < 0:
+                state.obv -= minute_volume
+
+            # RSI (Wilder): running mean for the first `period` changes, then smoothing
+            state.rsi_count += 1
+            n = min(state.rsi_count, self.rsi_period)
+            state.avg_gain += (max(change, 0.0) - state.avg_gain) / n
+            state.avg_loss += (max(-change, 0.0) - state.avg_loss) / n
+
+            # ATR (Wilder)
+            if high is not None and low is not None:
+                true_range = max(high - low, abs(high - prev_price), abs(low - prev_price))
+            else:
+                true_range = abs(change)
+            state.atr_count += 1
+            n = min(state.atr_count, self.atr_period)
+            state.atr += (true_range - state.atr) / n
+
+        state.obv_recent.append(state.obv)
+        state.price = price
+        state.cum_volume = max(cum_volume, state.cum_volume)
+        state.last_minute = minute
+        self._dirty.add(symbol)
+        return True
+
+    def reset(self):
+        """Drop all in-memory state (persisted rows are kept until the next save)."""
+        with self._lock:
+            self._states.clear()
+            self._dirty.clear()
+
+    # ============================================
+    # READ PATH (Detectors)
+    # ============================================
+
+    def vwap(self, symbol: str) -> Optional[float]:
+        """Session VWAP as of the last update, or None before any session volume."""
+        state = self._states.get(symbol)
+        if state is None or state.vol_sum <= 0:
+            return None
+        return state.pv_sum / state.vol_sum
+
+    def rsi(self, symbol: str) -> Optional[float]:
+        """Wilder RSI, or None until `rsi_period` price changes have been seen."""
+        state = self._states.get(symbol)
+        if state is None or state.rsi_count < self.rsi_period:
+            return None
+        if state.avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + state.avg_gain / state.avg_loss))
+
+    def atr(self, symbol: str) -> Optional[float]:
+        """Wilder ATR (price units), or None until `atr_period` ranges have been seen."""
+        state = self._states.get(symbol)
+        if state is None or state.atr_count < self.atr_period:
+            return None
+        return state.atr
+
+    def obv(self, symbol: str) -> Optional[float]:
+        """Running on-balance volume for today, or None if the symbol has no state."""
+        state = self._states.get(symbol)
+        return state.obv if state is not None else None
+
+    def recent_obv(self, symbol: str) -> List[float]:
+        """Last OBV_RECENT_POINTS OBV values, oldest first."""
+        state = self._states.get(symbol)
+        return list(state.obv_recent) if state is not None else []
+
+    def snapshot(self, symbol: str) -> Optional[Dict]:
+        """All indicators for a symbol: {vwap, obv, rsi, atr, price, timestamp} or None."""
+        state = self._states.get(symbol)
+        if state is None:
+            return None
+        return {
+            'vwap': self.vwap(symbol),
+            'obv': state.obv,
+            'rsi': self.rsi(symbol),
+            'atr': self.atr(symbol),
+            'price': state.price,
+            'timestamp': (_EPOCH + timedelta(minutes=state.last_minute)).strftime('%Y-%m-%d %H:%M:00'),
+        }
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._states
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    # ============================================
+    # PERSISTENCE
+    # ============================================
+
+    def save(self) -> int:
+        """
+        Persist symbols changed since the last save (one transaction).
+
+        Returns:
+            Number of symbols written
+        """
+        if self._conn is None:
+            return 0
+        with self._lock:
+            rows = [(symbol, _minute_date(state.last_minute), state.last_minute,
+                     json.dumps(state.to_dict()))
+                    for symbol, state in ((s, self._states[s]) for s in self._dirty if s in self._states)]
+            if not rows:
+                return 0
+            with self._conn:
+                self._conn.executemany(UPSERT_STATE, rows)
+            self._dirty.clear()
+        return len(rows)
+
+    def load(self, now: Optional[datetime] = None) -> int:
+        """
+        Restore today's saved state (older days are ignored and purged).
+
+        Args:
+            now: Clock override (default: datetime.now())
+
+        Returns:
+            Number of symbols restored
+        """
+        if self._conn is None:
+            return 0
+        today = (now or datetime.now()).strftime('%Y-%m-%d')
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol, state FROM indicator_state WHERE trade_date = ?", (today,)).fetchall()
+            for symbol, blob in rows:
+                self._states[symbol] = _SymbolState.from_dict(json.loads(blob))
+            with self._conn:
+                self._conn.execute("DELETE FROM indicator_state WHERE trade_date < ?", (today,))
+        logger.info(f"IndicatorEngine: restored {len(rows)} symbols from {self.db_path}")
+        return len(rows)
+
+    def close(self):
+        """Save and close the state file."""
+        if self._conn is not None:
+            try:
+                self.save()
+            finally:
+                self._conn.close()
+                self._conn = None
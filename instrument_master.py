@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Instrument Master - One Indexed Snapshot of kite.instruments() per Trading Day
+
+kite.instruments("NSE") / kite.instruments("NFO") was called from dozens of
+places (monitors, analyzers, trackers, backtests). Every call downloaded and
+parsed the full dump - tens of thousands of rows - and kept it as a list of
+dicts, and NiftyOptionAnalyzer._resolve_option_symbol then scanned that list
+once per contract.
+
+This module fetches each exchange once per trading day into a local SQLite
+snapshot (INSTRUMENT_MASTER_DB_PATH) shared by every process, and serves
+dictionary lookups over it:
+
+- tradingsymbol -> instrument row / instrument_token
+- (underlying, expiry, strike, CE|PE) -> option tradingsymbol
+- underlying -> sorted option / futures expiries
+- underlying -> futures contracts by month (nearest first), lot size
+
+Processes load lazily: nothing is read until the first lookup on an exchange,
+and then only that exchange's rows. Each index is built on first use. If the
+day's snapshot is missing and no Kite client is available (or the fetch fails),
+the last snapshot is served with a warning rather than failing the caller.
+
+Usage:
+    from instrument_master import get_instrument_master
+
+    master = get_instrument_master(kite)
+    token = master.index('NSE').token('RELIANCE')
+    symbol = master.index('NFO').option_symbol('NIFTY', expiry, 25350, 'CE')
+
+Date: 2026-10-16
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+OPTION_TYPES = ('CE', 'PE')
+
+COLUMNS = ('instrument_token', 'exchange_token', 'tradingsymbol', 'name', 'expiry',
+           'strike', 'tick_size', 'lot_size', 'instrument_type', 'segment', 'exchange')
+
+CREATE_TABLES = """
+    CREATE TABLE IF NOT EXISTS instruments (
+        exchange TEXT NOT NULL,
+        tradingsymbol TEXT NOT NULL,
+        instrument_token INTEGER,
+        exchange_token INTEGER,
+        name TEXT,
+        expiry TEXT,
+        strike REAL,
+        tick_size REAL,
+        lot_size INTEGER,
+        instrument_type TEXT,
+        segment TEXT,
+        PRIMARY KEY (exchange, tradingsymbol)
+    );
+    CREATE TABLE IF NOT EXISTS snapshot_meta (
+        exchange TEXT PRIMARY KEY,
+        trade_date TEXT NOT NULL,
+        fetched_at TEXT NOT NULL,
+        row_count INTEGER NOT NULL
+    );
+"""
+
+SELECT_ROWS = f"SELECT {', '.join(COLUMNS)} FROM instruments WHERE exchange = ?"
+INSERT_ROW = f"INSERT OR REPLACE INTO instruments ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+def _to_date(value) -> Optional[date]:
+    """Kite expiry (date, datetime, 'YYYY-MM-DD' or '') -> date or None."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _strike_key(strike) -> float:
+    """Strikes are floats in the dump (25350.0); callers pass ints - compare as float."""
+    return float(strike or 0)
+
+
+class InstrumentIndex:
+    """
+    Lookups over one exchange's instrument rows (kite.instruments() format).
+
+    Each index is built on first use, so a process that only needs tokens never
+    pays for the option or futures maps.
+    """
+
+    def __init__(self, rows: List[Dict]):
+        """
+        Args:
+            rows: Instrument dicts as returned by kite.instruments(exchange)
+        """
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    # ============================================
+    # INDEXES (built lazily)
+    # ============================================
+
+    @cached_property
+    def _by_symbol(self) -> Dict[str, Dict]:
+        return {row['tradingsymbol']: row for row in self.rows}
+
+    @cached_property
+    def _options(self) -> Dict[Tuple[str, date, float, str], str]:
+        options = {}
+        for row in self.rows:
+            if row.get('instrument_type') in OPTION_TYPES:
+                key = (row.get('name'), _to_date(row.get('expiry')),
+                       _strike_key(row.get('strike')), row['instrument_type'])
+                options[key] = row['tradingsymbol']
+        return options
+
+    @cached_property
+    def _expiries(self) -> Dict[Tuple[str, str], List[date]]:
+        expiries: Dict[Tuple[str, str], set] = {}
+        for row in self.rows:
+            kind = 'OPT' if row.get('instrument_type') in OPTION_TYPES else row.get('instrument_type')
+            expiry = _to_date(row.get('expiry'))
+            if expiry is not None and kind in ('OPT', 'FUT'):
+                expiries.setdefault((row.get('name'), kind), set()).add(expiry)
+        return {key: sorted(values) for key, values in expiries.items()}
+
+    @cached_property
+    def _futures(self) -> Dict[str, List[Dict]]:
+        futures: Dict[str, List[Dict]] = {}
+        for row in self.rows:
+            if row.get('instrument_type') == 'FUT' and row.get('name'):
+                futures.setdefault(row['name'], []).append(row)
+        for contracts in futures.values():
+            contracts.sort(key=lambda r: _to_date(r.get('expiry')) or date.max)
+        return futures
+
+    # ============================================
+    # LOOKUPS
+    # ============================================
+
+    def get(self, tradingsymbol: str) -> Optional[Dict]:
+        """Instrument row for a tradingsymbol, or None."""
+        return self._by_symbol.get(tradingsymbol)
+
+    def token(self, tradingsymbol: str) -> Optional[int]:
+        """instrument_token for a tradingsymbol, or None."""
+        row = self._by_symbol.get(tradingsymbol)
+        return row['instrument_token'] if row else None
+
+    def tokens(self, symbols: Iterable[str], segment: Optional[str] = None) -> Dict[str, int]:
+        """
+        {symbol: instrument_token} for the symbols that are listed.
+
+        Args:
+            symbols: Tradingsymbols
+            segment: Only rows of this segment, e.g. 'NSE' for equities
+                     (skips 'INDICES' rows sharing a tradingsymbol)
+        """
+        if segment is None:
+            by_symbol = self._by_symbol
+            return {s: by_symbol[s]['instrument_token'] for s in symbols if s in by_symbol}
+        wanted = set(symbols)
+        return {row['tradingsymbol']: row['instrument_token'] for row in self.rows
+                if row.get('segment') == segment and row['tradingsymbol'] in wanted}
+
+    def option_symbol(self, underlying: str, expiry, strike, option_type: str) -> Optional[str]:
+        """
+        Tradingsymbol of one option contract.
+
+        Args:
+            underlying: Instrument name, e.g. 'NIFTY'
+            expiry: date / datetime / 'YYYY-MM-DD'
+            strike: Strike price (int or float)
+            option_type: 'CE' or 'PE'
+
+        Returns:
+            Listed tradingsymbol (e.g. 'NIFTY26AUG25350CE') or None
+        """
+        return self._options.get((underlying, _to_date(expiry), _strike_key(strike), option_type))
+
+    def expiries(self, underlying: str, kind: str = 'OPT') -> List[date]:
+        """Sorted expiry dates of an underlying's options ('OPT') or futures ('FUT')."""
+        return list(self._expiries.get((underlying, kind), []))
+
+    def futures(self, underlying: str) -> List[Dict]:
+        """An underlying's futures contracts, nearest expiry first."""
+        return list(self._futures.get(underlying, []))
+
+    def futures_month(self, underlying: str, offset: int = 0, today: Optional[date] = None) -> Optional[Dict]:
+        """
+        Futures contract `offset` months out among those not yet expired.
+
+        Args:
+            underlying: Instrument name, e.g. 'RELIANCE'
+            offset: 0 = current (nearest) month, 1 = next month, ...
+            today: Clock override (default: date.today())
+        """
+        today = today or date.today()
+        live = [r for r in self._futures.get(underlying, []) if (_to_date(r.get('expiry')) or date.max) >= today]
+        return live[offset] if offset < len(live) else None
+
+    def futures_map(self, today: Optional[date] = None) -> Dict[str, Dict]:
+        """{underlying: current-month futures row} for every underlying with futures."""
+        today = today or date.today()
+        mapping = {}
+        for name, contracts in self._futures.items():
+            for row in contracts:
+                if (_to_date(row.get('expiry')) or date.max) >= today:
+                    mapping[name] = row
+                    break
+        return mapping
+
+    def lot_size(self, underlying: str, today: Optional[date] = None) -> Optional[int]:
+        """Lot size of the underlying's current-month futures contract, or None."""
+        row = self.futures_month(underlying, today=today)
+        return row.get('lot_size') if row else None
+
+
+class InstrumentMaster:
+    """
+    Daily on-disk snapshot of the instrument dump, shared across processes.
+
+    Thread-safe; one SQLite connection per call (the file is read rarely).
+    """
+
+    def __init__(self, db_path: Optional[str] = None, kite=None):
+        """
+        Args:
+            db_path: Snapshot file (default: config.INSTRUMENT_MASTER_DB_PATH)
+            kite: KiteConnect used to fetch a missing/stale day (None = snapshot only)
+        """
+        self.db_path = db_path or config.INSTRUMENT_MASTER_DB_PATH
+        self.kite = kite
+        self._lock = threading.RLock()
+        self._indexes: Dict[str, InstrumentIndex] = {}
+        self._loaded_for: Dict[str, Optional[str]] = {}   # exchange -> snapshot date in memory
+        self._failures: Dict[str, int] = {}               # exchange -> failed refreshes in a row
+        self._retry_at: Dict[str, datetime] = {}          # exchange -> next refresh attempt
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(CREATE_TABLES)
+        return conn
+
+    # ============================================
+    # SNAPSHOT
+    # ============================================
+
+    def snapshot_date(self, exchange: str) -> Optional[str]:
+        """Trade date ('YYYY-MM-DD') of the stored snapshot for an exchange, or None."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT trade_date FROM snapshot_meta WHERE exchange = ?",
+                               (exchange,)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def refresh(self, exchange: str, now: Optional[datetime] = None) -> int:
+        """
+        Download one exchange's dump and replace its snapshot (one transaction).
+
+        Args:
+            exchange: 'NSE', 'NFO', ...
+            now: Clock override (default: datetime.now())
+
+        Returns:
+            Number of instruments stored
+
+        Raises:
+            RuntimeError: No Kite client to fetch with
+        """
+        if self.kite is None:
+            raise RuntimeError("InstrumentMaster: no Kite client to fetch instruments with")
+
+        now = now or datetime.now()
+        instruments = self.kite.instruments(exchange)
+        rows = []
+        for inst in instruments:
+            expiry = _to_date(inst.get('expiry'))
+            rows.append((inst.get('instrument_token'), inst.get('exchange_token'), inst['tradingsymbol'],
+                         inst.get('name'), expiry.isoformat() if expiry else None, inst.get('strike'),
+                         inst.get('tick_size'), inst.get('lot_size'), inst.get('instrument_type'),
+                         inst.get('segment'), exchange))
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM instruments WHERE exchange = ?", (exchange,))
+                conn.executemany(INSERT_ROW, rows)
+                conn.execute("INSERT OR REPLACE INTO snapshot_meta VALUES (?, ?, ?, ?)",
+                             (exchange, now.strftime('%Y-%m-%d'), now.isoformat(), len(rows)))
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._indexes.pop(exchange, None)
+        logger.info(f"InstrumentMaster: stored {len(rows)} {exchange} instruments")
+        return len(rows)
+
+    def _load(self, exchange: str) -> List[Dict]:
+        """Read one exchange's rows from the snapshot as kite-style dicts."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(SELECT_ROWS, (exchange,)).fetchall()
+        finally:
+            conn.close()
+        # Few distinct expiries across tens of thousands of rows: parse each once
+        expiries = {value: _to_date(value) or '' for value in {values[4] for values in rows}}
+        instruments = [dict(zip(COLUMNS, values)) for values in rows]
+        for row in instruments:
+            row['expiry'] = expiries[row['expiry']]
+        return instruments
+
+    # ============================================
+    # ACCESS
+    # ============================================
+
+    def index(self, exchange: str, now: Optional[datetime] = None) -> InstrumentIndex:
+        """
+        Today's index for an exchange, fetching the dump at most once per day.
+
+        When today's dump can't be had (fetch failed, no Kite client) the last
+        snapshot is served and the refresh is retried on a later call, backing
+        off from INSTRUMENT_MASTER_RETRY_SEC to INSTRUMENT_MASTER_RETRY_MAX_SEC.
+
+        Args:
+            exchange: 'NSE', 'NFO', ...
+            now: Clock override (default: datetime.now())
+
+        Returns:
+            InstrumentIndex (empty if there is no snapshot and none could be fetched)
+        """
+        now = now or datetime.now()
+        today = now.strftime('%Y-%m-%d')
+        with self._lock:
+            index = self._indexes.get(exchange)
+            if index is not None:
+                if self._loaded_for.get(exchange) == today:
+                    return index
+                retry_at = self._retry_at.get(exchange)
+                if retry_at is not None and now < retry_at:
+                    return index
+
+            stored = self.snapshot_date(exchange)
+            if stored != today and self.kite is not None:
+                try:
+                    self.refresh(exchange, now=now)
+                    stored = today
+                except Exception as e:
+                    logger.warning(f"InstrumentMaster: {exchange} fetch failed ({e}); "
+                                   f"using snapshot from {stored or 'never'}")
+            elif stored != today:
+                logger.warning(f"InstrumentMaster: no Kite client; using {exchange} snapshot from {stored or 'never'}")
+
+            if stored == today:
+                self._failures.pop(exchange, None)
+                self._retry_at.pop(exchange, None)
+            else:
+                failures = self._failures[exchange] = self._failures.get(exchange, 0) + 1
+                delay = min(config.INSTRUMENT_MASTER_RETRY_SEC * 2 ** (failures - 1),
+                            config.INSTRUMENT_MASTER_RETRY_MAX_SEC)
+                self._retry_at[exchange] = now + timedelta(seconds=delay)
+
+            if index is None or self._loaded_for.get(exchange) != stored:
+                index = InstrumentIndex(self._load(exchange))
+                self._indexes[exchange] = index
+                self._loaded_for[exchange] = stored
+            return index
+
+    def instruments(self, exchange: str) -> List[Dict]:
+        """Drop-in for kite.instruments(exchange), served from today's snapshot."""
+        return self.index(exchange).rows
+
+
+_instances: Dict[str, InstrumentMaster] = {}
+_instances_lock = threading.Lock()
+
+
+def get_instrument_master(kite=None, db_path: Optional[str] = None) -> InstrumentMaster:
+    """
+    Get the process-wide InstrumentMaster for a snapshot file.
+
+    Args:
+        kite: KiteConnect for fetching (attached to the shared instance if it has none)
+        db_path: Snapshot file (default: config.INSTRUMENT_MASTER_DB_PATH)
+
+    Returns:
+        InstrumentMaster instance
+    """
+    path = db_path or config.INSTRUMENT_MASTER_DB_PATH
+    with _instances_lock:
+        master = _instances.get(path)
+        if master is None:
+            master = _instances[path] = InstrumentMaster(path, kite)
+        elif master.kite is None and kite is not None:
+            master.kite = kite
+        return master
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Refresh the instrument master snapshot')
+    parser.add_argument('--exchange', action='append', help='Exchange to refresh (repeatable, default: NSE and NFO)')
+    args = parser.parse_args()
+
+    from kiteconnect import KiteConnect
+    kite = KiteConnect(api_key=config.KITE_API_KEY)
+    kite.set_access_token(config.KITE_ACCESS_TOKEN)
+    master = get_instrument_master(kite)
+    for exch in args.exchange or ['NSE', 'NFO']:
+        print(f"{exch}: {master.refresh(exch)} instruments")
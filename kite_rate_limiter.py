@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Kite Rate Limiter - Thread-safe token bucket for Kite Connect API calls
+
+Purpose:
+- Let several threads fire Kite requests concurrently without exceeding the
+  per-second limit (quote API: KITE_QUOTE_RATE_PER_SEC)
+- Replace fixed time.sleep(REQUEST_DELAY_SECONDS) gaps between batches: a burst
+  of up to KITE_QUOTE_BURST calls goes out at once, later calls wait only as long
+  as the bucket needs to refill
+- Singleton per process, so every caller in the process draws from one budget
+
+Usage:
+    from kite_rate_limiter import get_quote_rate_limiter
+
+    limiter = get_quote_rate_limiter()
+    limiter.acquire()          # blocks until a token is available
+    quotes = kite.quote(*instruments)
+
+Date: 2026-10-16
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Refill arithmetic can leave 0.9999999... tokens; count that as a whole token
+# (otherwise acquire() would sleep for ~1e-16s forever)
+_TOKEN_EPSILON = 1e-9
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Holds up to `capacity` tokens and refills at `rate` tokens per second.
+    acquire() takes one token, sleeping (outside the lock) until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: int, clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize token bucket (starts full).
+
+        Args:
+            rate: Refill rate in tokens per second (> 0)
+            capacity: Maximum burst size (>= 1)
+            clock: Monotonic clock, injectable for tests
+            sleep: Sleep function, injectable for tests
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be > 0, got {rate}")
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+
+        self.rate = float(rate)
+        self.capacity = int(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Add tokens for the time elapsed since the last refill (caller holds lock)."""
+        elapsed = now - self._last
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last = now
+
+    def try_acquire(self) -> bool:
+        """
+        Take a token without waiting.
+
+        Returns:
+            True if a token was taken, False if the bucket is empty
+        """
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= 1 - _TOKEN_EPSILON:
+                self._tokens = max(0.0, self._tokens - 1)
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take a token, waiting for the bucket to refill if needed.
+
+        Args:
+            timeout: Maximum seconds to wait (None = wait indefinitely)
+
+        Returns:
+            True if a token was taken, False if the timeout expired first
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if self._tokens >= 1 - _TOKEN_EPSILON:
+                    self._tokens = max(0.0, self._tokens - 1)
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            self._sleep(wait)
+
+
+# Singleton instances
+_quote_limiter = None
+_historical_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_quote_rate_limiter() -> TokenBucket:
+    """
+    Get the process-wide token bucket for Kite quote() calls.
+
+    Returns:
+        TokenBucket configured from KITE_QUOTE_RATE_PER_SEC / KITE_QUOTE_BURST
+    """
+    global _quote_limiter
+
+    with _limiter_lock:
+        if _quote_limiter is None:
+            rate = config.KITE_QUOTE_RATE_PER_SEC
+            burst = config.KITE_QUOTE_BURST
+            _quote_limiter = TokenBucket(rate=rate, capacity=burst)
+            logger.info(f"Kite quote rate limiter initialized ({rate}/s, burst {burst})")
+        return _quote_limiter
+
+
+def get_historical_rate_limiter() -> TokenBucket:
+    """
+    Get the process-wide token bucket for Kite historical_data() calls.
+
+    Historical candles have their own per-second limit, separate from quote().
+
+    Returns:
+        TokenBucket configured from KITE_HISTORICAL_RATE_PER_SEC / KITE_HISTORICAL_BURST
+    """
+    global _historical_limiter
+
+    with _limiter_lock:
+        if _historical_limiter is None:
+            rate = config.KITE_HISTORICAL_RATE_PER_SEC
+            burst = config.KITE_HISTORICAL_BURST
+            _historical_limiter = TokenBucket(rate=rate, capacity=burst)
+            logger.info(f"Kite historical rate limiter initialized ({rate}/s, burst {burst})")
+        return _historical_limiter
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Minute Bar Builder - exact 1-minute bars from the KiteTicker stream
+
+OrderFlowCollector already receives every F&O cash and futures tick in MODE_FULL.
+This module folds those ticks into per-minute bars and writes them to
+central_quotes.db, so the central collector no longer has to poll ~400 instruments
+over REST each minute (REST stays as the fallback when bars are missing or stale).
+
+Per symbol and minute a bar carries:
+  - open / high / low / close of the cash last_price (true intra-minute high/low)
+  - volume (traded in the minute = delta of Kite's cumulative volume_traded)
+  - cum_volume (cumulative day volume at the close, same as REST quote 'volume')
+  - oi / oi_day_high / oi_day_low from the near-month futures ticks
+
+Timestamps follow the existing tables:
+  - stock_quotes: stamped at the bar END (the 10:30 bar is the 10:31:00 snapshot),
+    exactly what a REST poll at 10:31:00 would have stored
+  - intraday_candles ('1minute'): stamped at the bar START in IST, like Kite candles
+
+Recording / replay:
+  - TickRecorder appends raw tick batches (plus the token maps) to a JSONL file
+  - replay_recording() feeds a recording through a builder with the recorded
+    receive times as the clock, so bars can be rebuilt offline and tested
+
+Usage:
+    python3 minute_bar_builder.py --replay data/tick_recordings/ticks_20261016.jsonl
+
+Date: 2026-10-16
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+SESSION_START = dt_time(9, 15)   # pre-open ticks (9:00-9:08) are not bars
+SESSION_END = dt_time(15, 30)
+CANDLE_INTERVAL = '1minute'
+METADATA_KEY = 'tick_bars_minute'  # stock_quotes stamp of the newest tick-built minute
+
+# Tick fields that arrive as datetimes from KiteTicker
+_DATETIME_FIELDS = ('exchange_timestamp', 'last_trade_time', 'timestamp')
+
+
+def _floor_minute(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def _tick_time(tick: Dict, received_at: datetime) -> datetime:
+    """Exchange time of a tick (naive IST), falling back to when it was received."""
+    for field in ('exchange_timestamp', 'last_trade_time'):
+        ts = tick.get(field)
+        if isinstance(ts, datetime):
+            return ts.astimezone(IST).replace(tzinfo=None) if ts.tzinfo else ts
+    return received_at
+
+
+class MinuteBarBuilder:
+    """
+    Aggregates ticks into closed 1-minute bars.
+
+    Thread-safe: add_tick() is called from the KiteTicker thread and flush() from
+    the collector's writer thread. Closed bars are handed to `on_bars` outside the
+    lock, so a slow DB write never stalls tick ingestion.
+    """
+
+    def __init__(self, on_bars: Callable[[datetime, Dict[str, Dict]], None],
+                 close_grace_sec: float = 1.0):
+        """
+        Initialize bar builder.
+
+        Args:
+            on_bars: Called as on_bars(bar_start, {symbol: bar}) for every closed minute.
+                     Symbols with no tick in the minute get a flat carry-forward bar
+                     (ticks=0) so stock_quotes stays complete for illiquid names.
+            close_grace_sec: How long after a minute ends flush() waits for late ticks
+
+        Minutes in which nothing traded at all (outside the session, feed outage)
+        produce no bars - carry-forward only fills symbols that were quiet while
+        others traded.
+        """
+        self.on_bars = on_bars
+        self.close_grace = timedelta(seconds=close_grace_sec)
+
+        self._lock = threading.Lock()
+        self._day: Optional[date] = None
+        self._minute: Optional[datetime] = None      # start of the open minute
+        self._bars: Dict[str, Dict] = {}             # open minute's bars
+        self._last: Dict[str, Dict] = {}             # last closed state per symbol
+        self._oi: Dict[str, Tuple[int, int, int]] = {}  # latest futures OI per symbol
+
+        self.ticks_seen = 0
+        self.late_ticks = 0
+        self.minutes_closed = 0
+
+    def add_tick(self, symbol: str, asset_type: str, tick: Dict,
+                 received_at: Optional[datetime] = None) -> None:
+        """
+        Fold one KiteTicker tick into the open minute.
+
+        A tick for a minute that has already closed is dropped and counted in
+        late_ticks.
+
+        Args:
+            symbol: Stock symbol the tick's token maps to
+            asset_type: 'CASH' (price/volume) or 'FUT' (OI)
+            tick: Raw KiteTicker tick dict
+            received_at: Receive time (default now) - used when the tick has no
+                         exchange timestamp
+        """
+        received_at = received_at or datetime.now()
+        minute = _floor_minute(_tick_time(tick, received_at))
+        if not (SESSION_START <= minute.time() < SESSION_END):
+            return
+
+        closed = []
+        with self._lock:
+            if self._day is not None and minute.date() != self._day:
+                closed.extend(self._close_through(self._minute))
+                self._reset(minute.date())
+            if self._day is None:
+                self._reset(minute.date())
+
+            if self._minute is None:
+                self._minute = minute
+            elif minute > self._minute:
+                closed.extend(self._close_through(minute - timedelta(minutes=1)))
+                self._minute = minute
+
+            self.ticks_seen += 1
+            if minute < self._minute:
+                # Arrived after its minute was closed and handed to on_bars - drop it.
+                # Its quantity is not lost: volume_traded is cumulative, so the next
+                # tick's delta carries it into the open minute's volume.
+                self.late_ticks += 1
+            elif asset_type == 'FUT':
+                oi = tick.get('oi')
+                if oi is not None:
+                    self._oi[symbol] = (oi or 0, tick.get('oi_day_high', 0) or 0,
+                                        tick.get('oi_day_low', 0) or 0)
+            else:
+                self._add_cash_tick(symbol, tick)
+
+        self._emit(closed)
+
+    def flush(self, now: Optional[datetime] = None) -> int:
+        """
+        Close every minute that ended at least close_grace_sec before `now`.
+
+        Called periodically (writer thread) so a minute closes even when no tick
+        for the next minute arrives.
+
+        Returns:
+            Number of minutes closed
+        """
+        now = now or datetime.now()
+        with self._lock:
+            if self._minute is None:
+                return 0
+            last_closable = _floor_minute(now - self.close_grace) - timedelta(minutes=1)
+            closed = self._close_through(last_closable)
+        self._emit(closed)
+        return len(closed)
+
+    def _reset(self, day: date):
+        self._day = day
+        self._minute = None
+        self._bars = {}
+        self._last = {}
+        self._oi = {}
+
+    def _add_cash_tick(self, symbol: str, tick: Dict):
+        price = tick.get('last_price')
+        if not price:
+            return
+        cum_volume = tick.get('volume_traded', 0) or 0
+
+        bar = self._bars.get(symbol)
+        if bar is None:
+            last = self._last.get(symbol)
+            if last is not None:
+                base_volume = last['cum_volume']
+            else:
+                # First tick of the session for this symbol: the trade that printed
+                # it is part of this minute
+                base_volume = cum_volume - (tick.get('last_traded_quantity', 0) or 0)
+            self._bars[symbol] = {
+                'open': price, 'high': price, 'low': price, 'close': price,
+                'cum_volume': cum_volume, 'base_volume': base_volume, 'ticks': 1,
+            }
+            return
+
+        bar['high'] = max(bar['high'], price)
+        bar['low'] = min(bar['low'], price)
+        bar['close'] = price
+        bar['cum_volume'] = max(bar['cum_volume'], cum_volume)
+        bar['ticks'] += 1
+
+    def _close_through(self, last_minute: Optional[datetime]) -> List[Tuple[datetime, Dict[str, Dict]]]:
+        """Close the open minute and any empty minutes up to last_minute (caller holds lock)."""
+        closed = []
+        while self._minute is not None and last_minute is not None and self._minute <= last_minute:
+            if not self._bars:
+                # Nothing traded in this minute - no bar, not even carry-forward
+                self._minute += timedelta(minutes=1)
+                continue
+            bars = {}
+            for symbol in set(self._bars) | set(self._last):
+                bar = self._bars.get(symbol)
+                if bar is not None:
+                    out = {
+                        'open': bar['open'], 'high': bar['high'], 'low': bar['low'],
+                        'close': bar['close'],
+                        'volume': max(0, bar['cum_volume'] - bar['base_volume']),
+                        'cum_volume': bar['cum_volume'], 'ticks': bar['ticks'],
+                    }
+                else:
+                    last = self._last[symbol]
+                    out = {
+                        'open': last['close'], 'high': last['close'], 'low': last['close'],
+                        'close': last['close'], 'volume': 0,
+                        'cum_volume': last['cum_volume'], 'ticks': 0,
+                    }
+                oi, oi_hi, oi_lo = self._oi.get(symbol, (0, 0, 0))
+                out.update(oi=oi, oi_day_high=oi_hi, oi_day_low=oi_lo)
+                bars[symbol] = out
+                self._last[symbol] = {'close': out['close'], 'cum_volume': out['cum_volume']}
+
+            closed.append((self._minute, bars))
+            self.minutes_closed += 1
+            self._bars = {}
+            self._minute += timedelta(minutes=1)
+        return closed
+
+    def _emit(self, closed: List[Tuple[datetime, Dict[str, Dict]]]):
+        for bar_start, bars in closed:
+            try:
+                self.on_bars(bar_start, bars)
+            except Exception as e:
+                logger.error(f"Minute bar sink failed for {bar_start:%H:%M}: {e}", exc_info=True)
+
+
+def write_bars_to_central_db(db, bar_start: datetime, bars: Dict[str, Dict]) -> float:
+    """
+    Store one closed minute in central_quotes.db (one transaction).
+
+    stock_quotes / latest_stock_quotes get every symbol at the bar END; the
+    '1minute' intraday_candles get symbols that actually traded, at the bar START.
+    metadata[METADATA_KEY] records the stamp so the central collector can tell the
+    minute is covered and skip its REST poll.
+
+    Args:
+        db: CentralQuoteDB in writer mode
+        bar_start: Start of the closed minute (naive IST)
+        bars: {symbol: bar} from MinuteBarBuilder
+
+    Returns:
+        Write latency in milliseconds
+    """
+    bar_end = bar_start + timedelta(minutes=1)
+    quotes = {
+        symbol: {
+            'price': bar['close'],
+            'volume': bar['cum_volume'],
+            'oi': bar['oi'],
+            'oi_day_high': bar['oi_day_high'],
+            'oi_day_low': bar['oi_day_low'],
+        }
+        for symbol, bar in bars.items()
+    }
+    candle_date = bar_start.replace(tzinfo=IST)
+    candles = {
+        symbol: [{
+            'date': candle_date,
+            'open': bar['open'], 'high': bar['high'], 'low': bar['low'],
+            'close': bar['close'], 'volume': bar['volume'],
+        }]
+        for symbol, bar in bars.items() if bar['ticks'] > 0
+    }
+    return db.write_cycle(
+        bar_end,
+        stock_quotes=quotes,
+        candles=candles,
+        candle_interval=CANDLE_INTERVAL,
+        metadata={METADATA_KEY: bar_end.strftime('%Y-%m-%d %H:%M:00')},
+    )
+
+
+# ============================================
+# RECORDING / REPLAY
+# ============================================
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def _restore_datetimes(tick: Dict) -> Dict:
+    for field in _DATETIME_FIELDS:
+        value = tick.get(field)
+        if isinstance(value, str):
+            try:
+                tick[field] = datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    return tick
+
+
+class TickRecorder:
+    """
+    Append-only JSONL recording of raw KiteTicker batches.
+
+    Line 1 is a header with the token maps; every other line is
+    {"received_at": ISO time, "ticks": [raw tick, ...]}.
+    """
+
+    def __init__(self, path: str, cash_token_map: Dict[int, str], fut_token_map: Dict[int, str]):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a')
+        if write_header:
+            self._file.write(json.dumps({
+                'cash_token_map': {str(k): v for k, v in cash_token_map.items()},
+                'fut_token_map': {str(k): v for k, v in fut_token_map.items()},
+            }) + '\n')
+            self._file.flush()
+
+    def record(self, ticks: List[Dict], received_at: Optional[datetime] = None):
+        line = json.dumps({'received_at': (received_at or datetime.now()).isoformat(),
+                           'ticks': ticks}, default=_json_default)
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def load_recording(path: str) -> Tuple[Dict[int, str], Dict[int, str], Iterator[Tuple[datetime, List[Dict]]]]:
+    """
+    Open a TickRecorder file.
+
+    Returns:
+        (cash_token_map, fut_token_map, iterator of (received_at, ticks))
+    """
+    f = open(path)
+    header = json.loads(f.readline())
+    cash_map = {int(k): v for k, v in header.get('cash_token_map', {}).items()}
+    fut_map = {int(k): v for k, v in header.get('fut_token_map', {}).items()}
+
+    def batches():
+        with f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                yield (datetime.fromisoformat(entry['received_at']),
+                       [_restore_datetimes(t) for t in entry['ticks']])
+
+    return cash_map, fut_map, batches()
+
+
+def replay_recording(path: str, builder: MinuteBarBuilder, flush_at_end: bool = True) -> int:
+    """
+    Feed a recording through a builder, using recorded receive times as the clock.
+
+    flush() is called after every batch, as the collector's writer thread would.
+
+    Args:
+        path: TickRecorder JSONL file
+        builder: MinuteBarBuilder to feed
+        flush_at_end: Close the final open minute after the last batch
+
+    Returns:
+        Number of ticks replayed
+    """
+    cash_map, fut_map, batches = load_recording(path)
+    replayed = 0
+    last_received = None
+    for received_at, ticks in batches:
+        for tick in ticks:
+            token = tick.get('instrument_token')
+            if token in cash_map:
+                builder.add_tick(cash_map[token], 'CASH', tick, received_at)
+            elif token in fut_map:
+                builder.add_tick(fut_map[token], 'FUT', tick, received_at)
+            else:
+                continue
+            replayed += 1
+        builder.flush(received_at)
+        last_received = received_at
+
+    if flush_at_end and last_received is not None:
+        builder.flush(_floor_minute(last_received) + timedelta(minutes=2))
+    return replayed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild 1-minute bars from a tick recording")
+    parser.add_argument('--replay', required=True, help="TickRecorder JSONL file")
+    parser.add_argument('--symbol', help="Only print this symbol")
+    args = parser.parse_args()
+
+    def print_bars(bar_start, bars):
+        for symbol, bar in sorted(bars.items()):
+            if args.symbol and symbol != args.symbol:
+                continue
+            print(f"{bar_start:%Y-%m-%d %H:%M} {symbol:<12} O={bar['open']:.2f} H={bar['high']:.2f} "
+                  f"L={bar['low']:.2f} C={bar['close']:.2f} V={bar['volume']:,} OI={bar['oi']:,} "
+                  f"ticks={bar['ticks']}")
+
+    builder = MinuteBarBuilder(on_bars=print_bars)
+    count = replay_recording(args.replay, builder)
+    print(f"Replayed {count} ticks into {builder.minutes_closed} minutes "
+          f"({builder.late_ticks} late ticks)")
+
+
+if __name__ == "__main__":
+    main()
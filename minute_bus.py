@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Minute Bus - "Minute N Committed" Notification for Consumer Services
+
+The central collector publishes an event right after a minute's quotes are
+committed to central_quotes.db; consumer services block on it instead of
+sleeping on their own timers and then finding the minute not written yet
+(is_data_fresh fails -> direct Kite fallback).
+
+Channel: a 64-byte shared-memory file (MINUTE_BUS_PATH) holding a sequence
+counter and the last committed minute, written under a seqlock (the counter is
+odd while a write is in progress). No server process, any number of readers,
+and a consumer that starts late sees the last committed minute immediately.
+Waiting polls the mapped counter every MINUTE_BUS_POLL_SEC - a memory read,
+no syscalls, no SQL.
+
+Usage:
+    # Collector (after the cycle's transaction commits)
+    get_minute_bus().publish(timestamp, stocks=len(stock_quotes))
+
+    # Consumer loop (timeout = the loop's old sleep, so a stopped collector
+    # leaves the service on its timer)
+    while running:
+        cycle_start = time.time()
+        run_cycle()
+        wait_for_next_minute(60, after_time=cycle_start)
+
+Date: 2026-10-16
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# seq (u64), minute ordinal (i64), committed_at epoch (f64), stocks (u32), flags (u32)
+_LAYOUT = struct.Struct('<QqdII')
+_SIZE = 64
+
+FLAG_NIFTY = 1
+FLAG_VIX = 2
+
+
+class MinuteEvent(NamedTuple):
+    """One committed collector minute."""
+    seq: int                # events published so far (monotonic)
+    minute: datetime        # cycle timestamp truncated to the minute
+    committed_at: float     # epoch seconds when the commit finished
+    stocks: int             # stock rows in the minute
+    flags: int              # FLAG_NIFTY | FLAG_VIX when those were stored
+
+
+# A last commit older than this means the collector isn't publishing
+STALE_BUS_SEC = 180
+
+
+def _to_minute(ts: datetime) -> int:
+    return int((ts - _EPOCH).total_seconds() // 60)
+
+
+class MinuteBus:
+    """Publisher / subscriber handle on the shared minute counter."""
+
+    def __init__(self, path: Optional[str] = None, poll_sec: Optional[float] = None,
+                 clock: Optional[Callable[[], float]] = None,
+                 sleep: Optional[Callable[[float], None]] = None):
+        """
+        Args:
+            path: Shared file (default: config.MINUTE_BUS_PATH)
+            poll_sec: Wait poll interval (default: config.MINUTE_BUS_POLL_SEC)
+            clock: Monotonic clock for wait deadlines (default: time.monotonic)
+            sleep: Poll sleep (default: time.sleep, looked up at call time so
+                   tests patching time.sleep also drive the bus)
+        """
+        self.path = path or config.MINUTE_BUS_PATH
+        self.poll_sec = poll_sec or config.MINUTE_BUS_POLL_SEC
+        self._clock = clock
+        self._sleep_fn = sleep
+        self._map: Optional[mmap.mmap] = None
+        self._writable = False
+        self._lock = threading.Lock()
+        event = self.latest()
+        self._last_seq = event.seq if event else 0
+
+    def _now(self) -> float:
+        return (self._clock or time.monotonic)()
+
+    def _sleep(self, seconds: float) -> None:
+        (self._sleep_fn or time.sleep)(seconds)
+
+    # ------------------------------------------------------------------
+    # Mapping
+    # ------------------------------------------------------------------
+
+    def _open(self, writable: bool) -> Optional[mmap.mmap]:
+        if self._map is not None and (self._writable or not writable):
+            return self._map
+        if writable:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size < _SIZE:
+                    os.ftruncate(fd, _SIZE)
+                mapped = mmap.mmap(fd, _SIZE, access=mmap.ACCESS_WRITE)
+            finally:
+                os.close(fd)
+        else:
+            try:
+                fd = os.open(self.path, os.O_RDONLY)
+            except FileNotFoundError:
+                return None
+            try:
+                if os.fstat(fd).st_size < _SIZE:
+                    return None
+                mapped = mmap.mmap(fd, _SIZE, access=mmap.ACCESS_READ)
+            finally:
+                os.close(fd)
+        if self._map is not None:
+            self._map.close()
+        self._map, self._writable = mapped, writable
+        return mapped
+
+    # ------------------------------------------------------------------
+    # WRITE PATH (central collector)
+    # ------------------------------------------------------------------
+
+    def publish(self, timestamp: datetime, stocks: int = 0, flags: int = 0) -> int:
+        """
+        Announce that the minute of `timestamp` is committed.
+
+        Returns:
+            The new sequence number
+        """
+        with self._lock:
+            mapped = self._open(writable=True)
+            seq = _LAYOUT.unpack_from(mapped, 0)[0]
+            events = (seq + 1) // 2 + 1
+            # Odd counter = write in progress; readers retry
+            struct.pack_into('<Q', mapped, 0, events * 2 - 1)
+            _LAYOUT.pack_into(mapped, 0, events * 2 - 1, _to_minute(timestamp), time.time(),
+                              stocks, flags)
+            struct.pack_into('<Q', mapped, 0, events * 2)
+        return events
+
+    # ------------------------------------------------------------------
+    # READ PATH (consumer services)
+    # ------------------------------------------------------------------
+
+    def latest(self) -> Optional[MinuteEvent]:
+        """Last committed minute, or None if nothing was ever published."""
+        with self._lock:
+            mapped = self._open(writable=False)
+            if mapped is None:
+                return None
+            for _ in range(100):
+                seq, minute, committed_at, stocks, flags = _LAYOUT.unpack_from(mapped, 0)
+                if seq % 2 == 0 and struct.unpack_from('<Q', mapped, 0)[0] == seq:
+                    break
+                time.sleep(0)
+            else:
+                return None
+        if seq == 0:
+            return None
+        return MinuteEvent(seq // 2, _EPOCH + timedelta(minutes=minute), committed_at, stocks, flags)
+
+    def wait_for_next(self, timeout: float, after_seq: Optional[int] = None,
+                      after_time: Optional[float] = None) -> Optional[MinuteEvent]:
+        """
+        Block until a minute newer than after_seq / after_time is committed.
+
+        Args:
+            timeout: Seconds to wait at most
+            after_seq: Sequence already handled (default: the last one this
+                       handle returned or saw at construction)
+            after_time: Epoch seconds instead of a sequence - return for any
+                        commit that finished after it (e.g. the cycle start)
+
+        Returns:
+            The event, or None on timeout (collector down / market closed)
+        """
+        after = self._last_seq if after_seq is None else after_seq
+        deadline = self._now() + timeout
+        while True:
+            event = self.latest()
+            if event is not None and (event.committed_at > after_time if after_time is not None
+                                      else event.seq > after):
+                self._last_seq = event.seq
+                return event
+            remaining = deadline - self._now()
+            if remaining <= 0:
+                return None
+            self._sleep(min(self.poll_sec, remaining))
+
+    def wait_for_minute(self, minute: datetime, timeout: float) -> Optional[MinuteEvent]:
+        """Block until the minute of `minute` (or a later one) is committed."""
+        target = _to_minute(minute)
+        deadline = self._now() + timeout
+        while True:
+            event = self.latest()
+            if event is not None and _to_minute(event.minute) >= target:
+                self._last_seq = max(self._last_seq, event.seq)
+                return event
+            remaining = deadline - self._now()
+            if remaining <= 0:
+                return None
+            self._sleep(min(self.poll_sec, remaining))
+
+    def age_minutes(self, now: Optional[datetime] = None) -> Optional[int]:
+        """Whole minutes since the last committed minute (None if never published)."""
+        event = self.latest()
+        if event is None:
+            return None
+        return int(((now or datetime.now()) - event.minute).total_seconds() // 60)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+
+def wait_for_next_minute(timeout: float, after_time: Optional[float] = None) -> Optional[MinuteEvent]:
+    """
+    Consumer loop sleep: return as soon as the collector commits a new minute,
+    at the latest after `timeout` seconds (a plain sleep when the bus is off).
+
+    Args:
+        timeout: The loop's old sleep - the most this waits
+        after_time: Epoch seconds the current cycle started; a commit that
+                    landed during the cycle returns at once
+
+    Returns:
+        The event, or None on timeout / bus disabled / collector not publishing
+    """
+    if config.ENABLE_MINUTE_BUS:
+        try:
+            bus = get_minute_bus()
+            event = bus.latest()
+            # Never published, or nothing for minutes (collector down, market
+            # closed): polling can't end early - one plain sleep instead
+            if event is not None and time.time() - event.committed_at <= STALE_BUS_SEC:
+                return bus.wait_for_next(timeout, after_time=after_time)
+        except Exception as e:
+            logger.debug(f"Minute bus wait failed, sleeping instead: {e}")
+    time.sleep(timeout)
+    return None
+
+
+_instance: Optional[MinuteBus] = None
+_instance_lock = threading.Lock()
+
+
+def get_minute_bus() -> MinuteBus:
+    """Process-wide MinuteBus on config.MINUTE_BUS_PATH."""
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = MinuteBus()
+        return _instance
@@ -28,6 +28,8 @@ from api_coordinator import get_api_coordinator
 from historical_data_cache import get_historical_cache
 from central_quote_db import get_central_db
 from central_db_reader import fetch_nifty_vix, report_cycle_complete
+from instrument_master import InstrumentIndex, get_instrument_master
+import black_scholes_vectorized as bsv
 
 logger = logging.getLogger(__name__)
 
@@ -85,8 +87,8 @@ class NiftyOptionAnalyzer:
         # Initialize Central Quote Database (Tier 3 - single source of truth for NIFTY/VIX)
         self.central_db = get_central_db()
 
-        # Cache for instruments
-        self._nfo_instruments = None
+        # NFO instrument index (shared daily snapshot - see instrument_master)
+        self._nfo_index = None
         self._instruments_cache_time = None
 
         logger.info("NiftyOptionAnalyzer initialized with Central DB + API Coordinator + Historical Cache")
@@ -977,22 +979,18 @@ class NiftyOptionAnalyzer:
                 'interpretation': str(e)
             }
 
-    def _get_nfo_instruments(self) -> List[Dict]:
-        """Get NFO instruments with caching (1 hour cache)"""
+    def _get_nfo_index(self) -> InstrumentIndex:
+        """Get the NFO instrument index (re-checked hourly; fetched at most once a day)"""
         # Check cache validity
-        if (self._nfo_instruments is not None and
+        if (self._nfo_index is not None and
             self._instruments_cache_time is not None and
             datetime.now() - self._instruments_cache_time < timedelta(hours=1)):
-            return self._nfo_instruments
+            return self._nfo_index
 
-        # Fetch fresh data
-        logger.info("Fetching NFO instruments...")
-        instruments = self.kite.instruments("NFO")
-
-        self._nfo_instruments = instruments
+        self._nfo_index = get_instrument_master(self.kite).index("NFO")
         self._instruments_cache_time = datetime.now()
 
-        return instruments
+        return self._nfo_index
 
     def _get_next_expiries(self, count: int = 2) -> List[datetime]:
         """
@@ -1009,30 +1007,19 @@ class NiftyOptionAnalyzer:
             List of expiry dates (datetime objects)
         """
         try:
-            instruments = self._get_nfo_instruments()
-
-            # Filter NIFTY options
-            nifty_options = [
-                inst for inst in instruments
-                if inst['name'] == 'NIFTY' and inst['instrument_type'] in ['CE', 'PE']
-            ]
-
-            # Extract unique expiry dates
-            expiries = set()
+            # Unique NIFTY option expiries, sorted
             today = datetime.now().date()
             min_days = config.NIFTY_OPTION_MIN_DAYS_TO_EXPIRY
 
-            for option in nifty_options:
-                expiry = option['expiry']
-                days_to_expiry = (expiry - today).days
-
-                # Skip expiries that are too close (current week)
-                # Only include expiries >= MIN_DAYS_TO_EXPIRY days away
-                if days_to_expiry >= min_days:
-                    expiries.add(expiry)
+            # Skip expiries that are too close (current week)
+            # Only include expiries >= MIN_DAYS_TO_EXPIRY days away
+            expiries = [
+                expiry for expiry in self._get_nfo_index().expiries('NIFTY', 'OPT')
+                if (expiry - today).days >= min_days
+            ]
 
-            # Sort and return next N
-            sorted_expiries = sorted(list(expiries))[:count]
+            # Return next N (already sorted)
+            sorted_expiries = expiries[:count]
 
             if sorted_expiries:
                 logger.info(f"Selected expiries (>{min_days} days away): {[exp.strftime('%Y-%m-%d') for exp in sorted_expiries]}")
@@ -1187,9 +1174,13 @@ class NiftyOptionAnalyzer:
                 'strangle_put': self._resolve_option_symbol('PE', expiry, strangle_strikes['put'])
             }
 
-            # Single batch API call for all 4 options (Tier 2 optimization)
-            logger.info(f"Fetching 4 options in single batch call for expiry {expiry.date()}...")
-            quotes = self.coordinator.get_multiple_instruments(list(symbols.values()))
+            # The collector's option chain snapshot first; one batch API call
+            # for whatever it doesn't cover (Tier 2 optimization)
+            quotes = self._recorded_option_quotes(list(symbols.values()))
+            missing = [symbol for symbol in symbols.values() if symbol not in quotes]
+            if missing:
+                logger.info(f"Fetching {len(missing)} options in single batch call for expiry {expiry.date()}...")
+                quotes.update(self.coordinator.get_multiple_instruments(missing))
 
             # Parse results and build structured data for each option
             results = {}
@@ -1233,7 +1224,8 @@ class NiftyOptionAnalyzer:
                     'volume': option_data.get('volume', 0)
                 }
 
-            logger.info(f"Successfully fetched all 4 options via batch call")
+            logger.info(f"Successfully fetched all 4 options "
+                        f"({len(symbols) - len(missing)} from the option chain snapshot)")
             return results
 
         except OptionDataError:
@@ -1250,6 +1242,24 @@ class NiftyOptionAnalyzer:
                 'strangle_put': self._get_option_data('PE', expiry, strangle_strikes['put'], nifty_spot)
             }
 
+    def _recorded_option_quotes(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Quotes for these contracts from the collector's option chain snapshot.
+
+        Returns:
+            {symbol: {last_price, oi, volume}} for contracts with a snapshot no older
+            than OPTION_CHAIN_MAX_AGE_MINUTES; {} if the chain isn't being recorded
+        """
+        if not config.ENABLE_OPTION_CHAIN_COLLECTOR:
+            return {}
+        try:
+            rows = self.central_db.get_option_chain_quotes(symbols, config.OPTION_CHAIN_MAX_AGE_MINUTES)
+        except Exception as e:
+            logger.debug(f"Option chain snapshot unavailable: {e}")
+            return {}
+        return {symbol: {'last_price': row['ltp'], 'oi': row['oi'] or 0, 'volume': row['volume'] or 0}
+                for symbol, row in rows.items() if row['ltp']}
+
     def _get_option_data(
         self,
         option_type: str,
@@ -1343,7 +1353,8 @@ class NiftyOptionAnalyzer:
         Rather than encode the conventions (they also carry month letters O/N/D and
         holiday-shifted expiry dates), look the contract up in the NFO instrument
         dump, which is the exchange's own list of trading symbols and is already
-        fetched and cached for the expiry list.
+        fetched and cached for the expiry list (an O(1) key lookup in the shared
+        instrument master's option index).
 
         Returns:
             Symbol prefixed for the quote API, e.g. "NFO:NIFTY26AUG25350CE"
@@ -1353,22 +1364,9 @@ class NiftyOptionAnalyzer:
         """
         expiry_date = expiry.date() if isinstance(expiry, datetime) else expiry
 
-        for instrument in self._get_nfo_instruments():
-            if instrument.get('name') != 'NIFTY':
-                continue
-            if instrument.get('instrument_type') != option_type:
-                continue
-
-            inst_expiry = instrument.get('expiry')
-            if isinstance(inst_expiry, datetime):
-                inst_expiry = inst_expiry.date()
-            if inst_expiry != expiry_date:
-                continue
-
-            if int(instrument.get('strike', 0)) != int(strike):
-                continue
-
-            return f"NFO:{instrument['tradingsymbol']}"
+        tradingsymbol = self._get_nfo_index().option_symbol('NIFTY', expiry_date, strike, option_type)
+        if tradingsymbol:
+            return f"NFO:{tradingsymbol}"
 
         raise OptionQuoteUnavailable(
             f"No listed NIFTY {option_type} contract at strike {strike} "
@@ -1455,17 +1453,17 @@ class NiftyOptionAnalyzer:
         premium: float
     ) -> Optional[float]:
         """
-        Recover implied volatility from an observed premium, by bisection.
-
-        Bisection rather than Newton-Raphson because the Black-Scholes price is
-        monotone in volatility: a bracket that does not contain the observed
-        premium is a definitive "this price is not consistent with the model",
-        which is exactly the failure that must be reported rather than papered
-        over. (`black_scholes_greeks.BlackScholesGreeks` already inverts BS, but
-        its solver returns a hardcoded 0.20 when Newton-Raphson fails to converge
-        - the same silent-constant defect - and it is shared with
-        greeks_difference_tracker.py and the greeks backtests, so it is left
-        alone here.)
+        Recover implied volatility from an observed premium.
+
+        Solved by black_scholes_vectorized.implied_volatility: Newton steps
+        safeguarded by a bisection bracket. The Black-Scholes price is monotone in
+        volatility, so a bracket that does not contain the observed premium is a
+        definitive "this price is not consistent with the model", which is exactly
+        the failure that must be reported rather than papered over.
+        (`black_scholes_greeks.BlackScholesGreeks` keeps its own 0.20 fallback
+        when no volatility fits - the same silent-constant defect - because it is
+        shared with greeks_difference_tracker.py and the greeks backtests; it is
+        left alone here.)
 
         Returns:
             Implied volatility as a decimal, or None if the premium falls outside
@@ -1477,24 +1475,11 @@ class NiftyOptionAnalyzer:
 
         t = self._time_to_expiry(expiry)
 
-        low, high = self.IV_SEARCH_MIN, self.IV_SEARCH_MAX
-        try:
-            price_low = self._bs_price(option_type, spot, strike, t, low)
-            price_high = self._bs_price(option_type, spot, strike, t, high)
-        except (ValueError, ZeroDivisionError, OverflowError):
-            return None
-
-        if not price_low <= premium <= price_high:
-            return None
-
-        while high - low > 1e-6:
-            mid = (low + high) / 2
-            if self._bs_price(option_type, spot, strike, t, mid) < premium:
-                low = mid
-            else:
-                high = mid
-
-        return (low + high) / 2
+        iv, valid = bsv.implied_volatility(
+            spot, strike, t, premium, option_type, r=self.RISK_FREE_RATE,
+            vol_min=self.IV_SEARCH_MIN, vol_max=self.IV_SEARCH_MAX
+        )
+        return float(iv) if valid else None
 
     def _bs_price(
         self,
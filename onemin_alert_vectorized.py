@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Vectorized 1-Minute Alert Detection - OneMinAlertDetector Over Whole Candle Series
+
+OneMinBacktester.detect_1min_alerts walked the candles one at a time, rebuilt
+a price_cache.cache[symbol] dict per candle and called the detector's
+check_for_drop_1min / check_for_rise_1min. This module applies the same six
+layers to a whole series of 1-minute candles with array operations:
+
+1. Price threshold:  ((close - prev) / prev) * 100 against DROP/RISE_THRESHOLD_1MIN
+2. Volume spike:     the minute's volume > VOLUME_SPIKE_MULTIPLIER_1MIN x the
+                     average volume of the last 5 minutes (including this one)
+3. Quality:          close >= 50
+4. Cooldown:         COOLDOWN_1MIN_ALERTS minutes between alerts, shared by
+                     drops and rises - a forward scan over the candidates only
+5. 5-min dedup:      always passes (the backtest has no 5-min alerts)
+6. Momentum:         1-min rate > 1.3 x the 4-minute average rate -> HIGH
+
+Layer 2 reproduces what the live detector sees when onemin_monitor feeds
+PriceCache once a minute with the day's cumulative volume: the per-minute
+delta is the candle's volume once the day has traded, and the average is
+taken over the positive same-day deltas of the last VOLUME_AVG_1MIN_MINUTES
+updates. The 9:15-9:25 opening candles are never alerted on but still count
+towards that average. Time (cooldown, days) is candle time, not wall-clock.
+
+Usage:
+    from onemin_alert_vectorized import candle_arrays, detect_1min_alerts
+
+    ts, close, volume = candle_arrays(candles)      # kite.historical_data() rows
+    alerts = detect_1min_alerts(ts, close, volume)
+    for i, direction in zip(alerts['index'], alerts['direction']):
+        ...
+
+Date: 2026-10-16
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from candle_warehouse import to_ts
+from price_cache import VOLUME_AVG_1MIN_MINUTES
+
+IST_OFFSET = 19800                      # seconds; candle days and times are IST
+OPENING_SKIP = (9 * 60 + 15, 9 * 60 + 25)  # minutes of day: no alerts 9:15-9:25
+MIN_PRICE = 50                          # layer 3: no penny stocks
+MOMENTUM_FACTOR = 1.3                   # layer 6: 30% faster than the 4-min average
+MIN_CANDLES = 6                         # 5 for the momentum check + 1 current
+
+
+def candle_arrays(candles: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Kite-format candles -> (ts, close, volume) arrays.
+
+    Args:
+        candles: kite.historical_data() rows; naive 'date' values are IST
+
+    Returns:
+        Epoch seconds, closes, volumes
+    """
+    ts = np.fromiter((to_ts(c['date']) for c in candles), dtype=np.float64, count=len(candles))
+    close = np.fromiter((c['close'] for c in candles), dtype=np.float64, count=len(candles))
+    volume = np.fromiter((c['volume'] for c in candles), dtype=np.float64, count=len(candles))
+    return ts, close, volume
+
+
+def _empty() -> Dict[str, np.ndarray]:
+    return {
+        'index': np.empty(0, dtype=np.int64),
+        'direction': np.empty(0, dtype='<U4'),
+        'priority': np.empty(0, dtype='<U6'),
+        'change_percent': np.empty(0),
+        'volume': np.empty(0, dtype=np.int64),
+        'avg_volume': np.empty(0),
+        'volume_multiplier': np.empty(0),
+    }
+
+
+def detect_1min_alerts(
+    ts: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    drop_threshold: Optional[float] = None,
+    rise_threshold: Optional[float] = None,
+    volume_multiplier: Optional[float] = None,
+    cooldown_minutes: Optional[int] = None,
+    enable_rise: Optional[bool] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Find the candles OneMinAlertDetector would alert on.
+
+    Args:
+        ts: Candle times, epoch seconds, ascending
+        close: Closing prices
+        volume: Per-candle volumes
+        drop_threshold: % drop in 1 minute (default config.DROP_THRESHOLD_1MIN)
+        rise_threshold: % rise in 1 minute (default config.RISE_THRESHOLD_1MIN)
+        volume_multiplier: Spike multiple (default config.VOLUME_SPIKE_MULTIPLIER_1MIN)
+        cooldown_minutes: Minutes between alerts (default config.COOLDOWN_1MIN_ALERTS)
+        enable_rise: Detect rises too (default config.ENABLE_RISE_ALERTS)
+
+    Returns:
+        Arrays, one entry per alert in time order: index (candle position),
+        direction ('drop' / 'rise'), priority ('HIGH' / 'NORMAL'),
+        change_percent (size of the move, positive), volume (the minute's volume),
+        avg_volume (layer 2's 5-minute average) and volume_multiplier
+    """
+    drop_threshold = config.DROP_THRESHOLD_1MIN if drop_threshold is None else drop_threshold
+    rise_threshold = config.RISE_THRESHOLD_1MIN if rise_threshold is None else rise_threshold
+    volume_multiplier = config.VOLUME_SPIKE_MULTIPLIER_1MIN if volume_multiplier is None else volume_multiplier
+    cooldown_minutes = config.COOLDOWN_1MIN_ALERTS if cooldown_minutes is None else cooldown_minutes
+    enable_rise = config.ENABLE_RISE_ALERTS if enable_rise is None else enable_rise
+
+    n = len(ts)
+    if n < MIN_CANDLES:
+        return _empty()
+
+    ts = np.asarray(ts, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64).astype(np.int64)
+
+    local = ts.astype(np.int64) + IST_OFFSET
+    day = local // 86400
+    minute_of_day = (local % 86400) // 60
+
+    # Layer 2: the day's cumulative volume as the live cache holds it, and the
+    # per-minute delta once the previous minute had traded (0 across days)
+    new_day = np.ones(n, dtype=bool)
+    new_day[1:] = day[1:] != day[:-1]
+    starts = np.flatnonzero(new_day)
+    cumulative = np.cumsum(volume)
+    cumulative -= np.repeat(cumulative[starts] - volume[starts], np.diff(np.append(starts, n)))
+
+    delta = np.zeros(n, dtype=np.int64)
+    traded = ~new_day[1:] & (cumulative[:-1] > 0)
+    delta[1:] = np.where(traded, volume[1:], 0)
+
+    window = VOLUME_AVG_1MIN_MINUTES
+    positive = delta > 0
+    sums = np.concatenate(([0], np.cumsum(np.where(positive, delta, 0))))
+    counts = np.concatenate(([0], np.cumsum(positive)))
+    lo = np.maximum(np.arange(n) - window + 1, 0)
+    delta_sum = sums[1:] - sums[lo]
+    delta_count = counts[1:] - counts[lo]
+    avg = np.zeros(n)
+    np.divide(delta_sum, delta_count, out=avg, where=delta_count > 0)
+    spike = positive & (avg > 0) & (delta > avg * volume_multiplier)
+
+    # Layer 1 (same float expression as the detector) and layer 3
+    prev = np.empty(n)
+    prev[0] = np.nan
+    prev[1:] = close[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = ((close - prev) / prev) * 100
+    valid = np.isfinite(change)
+    valid[0] = False
+    valid &= ~((minute_of_day >= OPENING_SKIP[0]) & (minute_of_day < OPENING_SKIP[1]))
+    valid &= spike & ~(close < MIN_PRICE)
+
+    drop = valid & ~(change >= -drop_threshold)
+    rise = valid & ~(change <= rise_threshold) if enable_rise else np.zeros(n, dtype=bool)
+
+    # Layer 4: forward scan over the candidates; an alert in either direction
+    # starts the cooldown
+    cooldown = cooldown_minutes * 60
+    alerted = []
+    last = None
+    for i in np.flatnonzero(drop | rise).tolist():
+        if last is None or ts[i] - ts[last] >= cooldown:
+            alerted.append(i)
+            last = i
+    if not alerted:
+        return _empty()
+    index = np.array(alerted, dtype=np.int64)
+
+    # Layer 6: momentum against the price 5 minutes ago
+    is_drop = drop[index]
+    current, p1 = close[index], prev[index]
+    p5 = np.where(index >= 5, close[np.maximum(index - 5, 0)], 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drop_1min = ((p1 - current) / p1) * 100
+        rise_1min = ((current - p1) / p1) * 100
+        drop_4min = (((p5 - p1) / p5) * 100) / 4
+        rise_4min = (((p1 - p5) / p5) * 100) / 4
+    momentum = np.where(is_drop, drop_1min > drop_4min * MOMENTUM_FACTOR,
+                        rise_1min > rise_4min * MOMENTUM_FACTOR) & (p5 != 0)
+
+    return {
+        'index': index,
+        'direction': np.where(is_drop, 'drop', 'rise'),
+        'priority': np.where(momentum, 'HIGH', 'NORMAL'),
+        'change_percent': np.where(is_drop, drop_1min, rise_1min),
+        'volume': volume[index],
+        'avg_volume': avg[index],
+        'volume_multiplier': delta[index] / avg[index],     # avg > 0: layer 2 passed
+    }
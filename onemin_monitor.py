@@ -25,6 +25,7 @@ from unified_quote_cache import UnifiedQuoteCache
 from api_coordinator import get_api_coordinator
 from alert_history_manager import AlertHistoryManager
 from central_quote_db import get_central_db
+from central_db_reader import check_data_freshness, get_latest_stock_quotes
 from alert_excel_logger import AlertExcelLogger
 from telegram_notifier import TelegramNotifier
 from onemin_alert_detector import OneMinAlertDetector
@@ -267,6 +268,14 @@ class OneMinMonitor:
         price_data = self._fetch_fresh_prices()
         logger.info(f"Received price data for {len(price_data)} stocks")
 
+        # Update price cache (1-min granularity) for the whole universe - one save per cycle
+        self.price_cache.update_prices_bulk(
+            {symbol: (price_data[symbol].get('price', 0), price_data[symbol].get('volume', 0))
+             for symbol in self.stocks
+             if symbol in price_data and price_data[symbol].get('price', 0) != 0},
+            interval="1min"
+        )
+
         # DEBUG: Track stocks with price movements for sample analysis
         stocks_with_movements = []
 
@@ -289,9 +298,6 @@ class OneMinMonitor:
                     logger.debug(f"{symbol}: Invalid price (0)")
                     continue
 
-                # Update price cache (1-min granularity)
-                self.price_cache.update_price_1min(symbol, current_price, current_volume)
-
                 # Get price from 1 minute ago
                 price_1min_ago = self.price_cache.get_price_1min_ago(symbol)
                 if not price_1min_ago:
@@ -395,8 +401,9 @@ class OneMinMonitor:
 
         health = get_health_tracker()
 
-        # CRITICAL: Check data freshness BEFORE using it
-        is_fresh, age_minutes = self.central_db.is_data_fresh(max_age_minutes=2)
+        # CRITICAL: Check data freshness BEFORE using it (waits briefly for an
+        # in-flight collector commit instead of falling back to the API)
+        is_fresh, age_minutes = check_data_freshness(self.central_db, "onemin_monitor", 2)
 
         # Track central DB health
         if age_minutes is None:
@@ -428,7 +435,7 @@ class OneMinMonitor:
         price_data = {}
 
         # Read latest quotes from central database (ZERO API calls!)
-        db_quotes = self.central_db.get_latest_stock_quotes(symbols=self.stocks)
+        db_quotes = get_latest_stock_quotes(self.central_db, symbols=self.stocks)
 
         if not db_quotes:
             # This shouldn't happen if data freshness check passed
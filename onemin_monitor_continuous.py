@@ -15,6 +15,7 @@ import logging
 from datetime import datetime, time as dt_time
 from onemin_monitor import OneMinMonitor
 from market_utils import is_market_open, get_market_status
+from minute_bus import wait_for_next_minute
 
 logging.basicConfig(
     level=logging.INFO,
@@ -107,6 +108,7 @@ def main():
                 break
 
             # Run one monitoring cycle
+            cycle_start = time.time()
             cycle_count += 1
             logger.info(f"\n{'='*80}")
             logger.info(f"Cycle #{cycle_count} - {datetime.now().strftime('%H:%M:%S')}")
@@ -117,9 +119,9 @@ def main():
 
             logger.info(f"Cycle complete: {stats.get('alerts_sent', 0)} alerts sent")
 
-            # Wait 60 seconds before next cycle
-            logger.info("⏳ Waiting 60 seconds for next cycle...")
-            time.sleep(60)
+            # Wait for the collector's next committed minute (60s at most)
+            logger.info("⏳ Waiting for next committed minute...")
+            wait_for_next_minute(60, after_time=cycle_start)
 
         except KeyboardInterrupt:
             logger.info("\n⚠️  Interrupted by user - exiting gracefully")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Option Chain Collector - Full NIFTY Option Chain Snapshots Every Minute
+
+The option analyzer, the Greeks tracker and the option backtests each fetched
+a handful of contracts from Kite on their own schedule, so no consistent
+chain history existed: a backtest had to estimate premiums, and every
+consumer paid its own quote calls.
+
+Once per collector cycle this takes the ±N strikes around ATM for the next
+expiries (contracts listed in the instrument master only), quotes them in one
+batched call, solves IV and Greeks for the whole chain at once
+(black_scholes_vectorized) and stores the snapshot in
+option_chain_snapshots. Consumers read the latest row per contract from
+there and fall back to Kite when it is stale.
+
+The collector quotes the chain (quote_chain) on a background thread while it
+fetches stock quotes, prices it at the cycle's NIFTY spot (build_rows) and
+commits the rows inside the cycle's write_cycle transaction.
+
+Date: 2026-10-16
+"""
+
+import logging
+from datetime import date, datetime, time as dt_time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import black_scholes_vectorized as bsv
+import config
+
+logger = logging.getLogger(__name__)
+
+QUOTE_CHUNK = 500                      # kite.quote() instrument limit per call
+EXPIRY_CLOSE = dt_time(15, 30)         # Contracts expire at the close
+MIN_T_YEARS = 1.0 / (365 * 24 * 60)    # One minute - keeps expiry-day IV finite
+
+
+class OptionChainCollector:
+    """Snapshots the option chain around ATM into the central database."""
+
+    def __init__(self, quote_fn: Callable[..., Dict], db, instrument_master,
+                 underlying: Optional[str] = None, strike_step: Optional[int] = None,
+                 strikes_each_side: Optional[int] = None, expiries: Optional[int] = None,
+                 risk_free_rate: Optional[float] = None):
+        """
+        Args:
+            quote_fn: kite.quote-compatible callable ('NFO:SYMBOL', ... -> {key: quote});
+                the collector passes its rate-limited _quote
+            db: CentralQuoteDB writer
+            instrument_master: InstrumentMaster (contracts and expiries come from its NFO index)
+            underlying, strike_step, strikes_each_side, expiries, risk_free_rate:
+                Overrides for the OPTION_CHAIN_* config values
+        """
+        self.quote_fn = quote_fn
+        self.db = db
+        self.instrument_master = instrument_master
+        self.underlying = underlying or config.OPTION_CHAIN_UNDERLYING
+        self.strike_step = strike_step or config.OPTION_CHAIN_STRIKE_STEP
+        self.strikes_each_side = (strikes_each_side if strikes_each_side is not None
+                                  else config.OPTION_CHAIN_STRIKES_EACH_SIDE)
+        self.expiries = expiries or config.OPTION_CHAIN_EXPIRIES
+        self.risk_free_rate = (risk_free_rate if risk_free_rate is not None
+                               else config.OPTION_CHAIN_RISK_FREE_RATE)
+
+    def select_contracts(self, spot: float, now: datetime) -> List[Dict]:
+        """
+        Listed contracts for the ±N strikes around ATM on the next expiries.
+
+        Args:
+            spot: Underlying price
+            now: Current time (expiries before today are skipped)
+
+        Returns:
+            [{tradingsymbol, expiry (date), strike, option_type}], expiry then strike order
+        """
+        index = self.instrument_master.index("NFO", now=now)
+        atm = round(spot / self.strike_step) * self.strike_step
+        strikes = [atm + i * self.strike_step
+                   for i in range(-self.strikes_each_side, self.strikes_each_side + 1)]
+        upcoming = [e for e in index.expiries(self.underlying, 'OPT') if e >= now.date()][:self.expiries]
+
+        contracts = []
+        for expiry in upcoming:
+            for strike in strikes:
+                for option_type in ('CE', 'PE'):
+                    symbol = index.option_symbol(self.underlying, expiry, strike, option_type)
+                    if symbol:
+                        contracts.append({'tradingsymbol': symbol, 'expiry': expiry,
+                                          'strike': float(strike), 'option_type': option_type})
+        return contracts
+
+    def quote_chain(self, spot: float, now: datetime) -> Tuple[List[Dict], Dict]:
+        """
+        Select and quote the contracts around `spot` (the Kite calls only).
+
+        Args:
+            spot: Underlying price used to pick strikes
+            now: Current time
+
+        Returns:
+            (contracts, {'NFO:SYMBOL': quote})
+        """
+        contracts = self.select_contracts(spot, now)
+        quotes = {}
+        keys = [f"NFO:{c['tradingsymbol']}" for c in contracts]
+        for start in range(0, len(keys), QUOTE_CHUNK):
+            quotes.update(self.quote_fn(*keys[start:start + QUOTE_CHUNK]) or {})
+        return contracts, quotes
+
+    def build_rows(self, contracts: List[Dict], quotes: Dict, timestamp: datetime,
+                   spot: float) -> List[Dict]:
+        """
+        Price quoted contracts at `spot` into option_chain_snapshots rows.
+
+        Args:
+            contracts: From quote_chain / select_contracts
+            quotes: {'NFO:SYMBOL': quote}
+            timestamp: Snapshot time (time to expiry is measured from it)
+            spot: Underlying price stored with the snapshot
+
+        Returns:
+            Rows for CentralQuoteDB.store_option_chain / write_cycle
+            (empty if nothing was quoted)
+        """
+        quoted = [(c, quotes[f"NFO:{c['tradingsymbol']}"]) for c in contracts
+                  if f"NFO:{c['tradingsymbol']}" in quotes]
+        if not quoted:
+            return []
+
+        ltp = np.array([q.get('last_price') or 0.0 for _, q in quoted], dtype=float)
+        strikes = np.array([c['strike'] for c, _ in quoted])
+        types = np.array([c['option_type'] for c, _ in quoted])
+        t = np.array([self._years_to_expiry(c['expiry'], timestamp) for c, _ in quoted])
+        greeks = bsv.chain_greeks(spot, strikes, t, ltp, types, self.risk_free_rate)
+
+        rows = []
+        for i, (contract, quote) in enumerate(quoted):
+            depth = quote.get('depth') or {}
+            valid = bool(greeks['valid'][i])
+            rows.append({
+                'expiry': contract['expiry'].strftime('%Y-%m-%d'),
+                'strike': contract['strike'],
+                'option_type': contract['option_type'],
+                'tradingsymbol': contract['tradingsymbol'],
+                'ltp': quote.get('last_price'),
+                'oi': quote.get('oi'),
+                'volume': quote.get('volume'),
+                'bid': _best_price(depth.get('buy')),
+                'ask': _best_price(depth.get('sell')),
+                'spot': spot,
+                **{key: round(float(greeks[key][i]), 6) if valid else None
+                   for key in ('iv', 'delta', 'gamma', 'theta', 'vega')},
+            })
+        return rows
+
+    def collect(self, timestamp: datetime, spot: float) -> int:
+        """
+        Quote, price and store one chain snapshot (standalone use; the collector
+        folds build_rows() into its cycle transaction instead).
+
+        Args:
+            timestamp: Snapshot timestamp
+            spot: Underlying price stored with this snapshot
+
+        Returns:
+            Number of contracts stored (0 if nothing was listed or quoted)
+        """
+        rows = self.build_rows(*self.quote_chain(spot, timestamp), timestamp, spot)
+        return self.db.store_option_chain(rows, timestamp)
+
+    @staticmethod
+    def _years_to_expiry(expiry: date, now: datetime) -> float:
+        """Time to the expiry-day close in years (calendar time), floored at one minute."""
+        seconds = (datetime.combine(expiry, EXPIRY_CLOSE) - now).total_seconds()
+        return max(seconds / (365 * 24 * 3600), MIN_T_YEARS)
+
+
+def _best_price(levels: Optional[List[Dict]]) -> Optional[float]:
+    """Top-of-book price from a Kite depth side, None when the side is empty."""
+    if levels and levels[0].get('price'):
+        return levels[0]['price']
+    return None
@@ -19,6 +19,7 @@ Author: Claude Sonnet 4.6
 """
 
 import logging
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
 import config
@@ -30,13 +31,18 @@ logger = logging.getLogger(__name__)
 class OrderFlowAnalyzer:
     """
     Computes per-stock order flow metrics from the last N seconds of tick data.
-    Reads all ticks in a single batch query — one pass for all 208 stocks.
+
+    With a stream (order_flow_stream.OrderFlowStream fed by the collector) the
+    window aggregates are read from memory in O(symbols); without one, all ticks
+    are read in a single batch query — one pass for all 208 stocks.
     """
 
-    def __init__(self, db: OrderFlowDB):
+    def __init__(self, db: OrderFlowDB, stream=None):
         self.db = db
+        self.stream = stream
         self._prev_bai: Dict[str, float] = {}      # cash BAI from previous cycle
         self._prev_fut_bai: Dict[str, float] = {}  # futures BAI from previous cycle
+        self._prev_ts: Dict[str, datetime] = {}    # when each prev BAI was computed (stream mode)
 
     # --------------------------------------------------------
     # Main entry point
@@ -47,6 +53,9 @@ class OrderFlowAnalyzer:
         Analyze all stocks in one pass. Returns {symbol: metrics_dict}.
         Also loads previous BAI values from DB for delta computation.
         """
+        if self.stream is not None:
+            return self._analyze_stream()
+
         # Load previous BAI for delta computation before overwriting
         self._prev_bai, self._prev_fut_bai = self.db.get_previous_bai_map()
 
@@ -61,6 +70,38 @@ class OrderFlowAnalyzer:
             results[symbol] = self.analyze_symbol(symbol, cash_ticks, fut_ticks)
         return results
 
+    def _analyze_stream(self) -> Dict[str, dict]:
+        """
+        Build metrics from the collector's in-memory windows — no tick SQL.
+
+        Previous BAI comes from the last cycle's results; flow_metrics is read
+        once, on the first cycle after a restart. Like get_previous_bai_map(),
+        values older than 5 minutes are dropped so bai_delta defaults to 0.
+        """
+        now = datetime.now()
+        if not self._prev_ts:
+            self._prev_bai, self._prev_fut_bai = self.db.get_previous_bai_map()
+            self._prev_ts = {symbol: now for symbol in self._prev_bai}
+        else:
+            cutoff = now - timedelta(minutes=5)
+            for symbol in [s for s, ts in self._prev_ts.items() if ts < cutoff]:
+                del self._prev_ts[symbol]
+                self._prev_bai.pop(symbol, None)
+                self._prev_fut_bai.pop(symbol, None)
+
+        results = {}
+        for symbol, windows in self.stream.snapshot().items():
+            cash = windows.get('CASH')
+            if cash is None or cash['tick_count'] < config.ORDER_FLOW_MIN_TICKS:
+                continue
+            results[symbol] = self._build_metrics(symbol, cash, windows.get('FUT'))
+
+        for symbol, m in results.items():
+            self._prev_bai[symbol] = m['bai']
+            self._prev_fut_bai[symbol] = m['fut_bai']
+            self._prev_ts[symbol] = now
+        return results
+
     # --------------------------------------------------------
     # Per-symbol analysis
     # --------------------------------------------------------
@@ -68,53 +109,84 @@ class OrderFlowAnalyzer:
     def analyze_symbol(self, symbol: str, cash_ticks: List[dict],
                        fut_ticks: List[dict] = None) -> dict:
         """Compute all metrics for one stock from cash and (optionally) futures tick lists."""
-        from datetime import datetime
         if fut_ticks is None:
             fut_ticks = []
 
-        # --- Cash metrics (unchanged) ---
-        bai          = self._compute_bai(cash_ticks)
+        cum_buy, cum_sell = self.db.get_cumulative_volume_stats(symbol, minutes=5, asset_type='CASH')
+        cash = self._window_stats(cash_ticks, cum_buy, cum_sell)
+
+        fut = None
+        if len(fut_ticks) >= config.ORDER_FLOW_MIN_TICKS:
+            fut_cum_buy, fut_cum_sell = self.db.get_cumulative_volume_stats(
+                symbol, minutes=5, asset_type='FUT')
+            fut = self._window_stats(fut_ticks, fut_cum_buy, fut_cum_sell)
+        elif fut_ticks:
+            fut = {'tick_count': len(fut_ticks)}
+        return self._build_metrics(symbol, cash, fut)
+
+    def _window_stats(self, ticks: List[dict], cum_buy: int, cum_sell: int) -> dict:
+        """Window aggregates from a tick list (same shape as OrderFlowStream.snapshot)."""
+        _, buy_vol, sell_vol = self._compute_volume_delta(ticks)
+        return {
+            'bai':              self._compute_bai(ticks),
+            'depth_ratio':      self._compute_depth_ratio(ticks),
+            'buy_volume':       buy_vol,
+            'sell_volume':      sell_vol,
+            'tick_velocity':    self._compute_tick_velocity(ticks),
+            'price_change_pct': self._compute_price_change(ticks),
+            'last_price':       ticks[-1]['last_price'],
+            'last_tick':        ticks[-1],
+            'tick_count':       len(ticks),
+            'cum_buy':          cum_buy,
+            'cum_sell':         cum_sell,
+        }
+
+    def _build_metrics(self, symbol: str, cash: dict, fut: Optional[dict] = None) -> dict:
+        """Combine cash / futures window aggregates into one flow_metrics row."""
+        # --- Cash metrics ---
+        bai          = cash['bai']
         bai_prev     = self._prev_bai.get(symbol, bai)
         bai_delta    = bai - bai_prev
 
-        depth_ratio  = self._compute_depth_ratio(cash_ticks)
-        delta, buy_vol, sell_vol = self._compute_volume_delta(cash_ticks)
-        tick_velocity = self._compute_tick_velocity(cash_ticks)
-        price_chg    = self._compute_price_change(cash_ticks)
+        depth_ratio  = cash['depth_ratio']
+        buy_vol, sell_vol = cash['buy_volume'], cash['sell_volume']
+        delta        = buy_vol - sell_vol
+        tick_velocity = cash['tick_velocity']
+        price_chg    = cash['price_change_pct']
 
-        cum_buy, cum_sell = self.db.get_cumulative_volume_stats(symbol, minutes=5, asset_type='CASH')
+        cum_buy, cum_sell = cash['cum_buy'], cash['cum_sell']
         cum_total = cum_buy + cum_sell
         cum_delta_pct = (cum_buy - cum_sell) / cum_total if cum_total > 0 else 0.0
 
         has_bid_wall, has_ask_wall, wall_ratio, wall_side, wall_price, wall_qty = (
-            self._detect_walls(cash_ticks)
+            self._detect_walls([cash['last_tick']])
         )
         abs_signal, abs_strength = self._detect_absorption(
-            cash_ticks, bai, price_chg, has_bid_wall, has_ask_wall,
+            None, bai, price_chg, has_bid_wall, has_ask_wall,
             wall_side, buy_vol, sell_vol
         )
-        cash_last_price = cash_ticks[-1]['last_price']
+        cash_last_price = cash['last_price']
 
         # --- Futures metrics ---
         fut_bai = fut_bai_prev = fut_bai_delta = 0.0
         fut_cum_delta_pct = fut_tick_velocity = 0.0
         fut_last_price = 0.0
         basis_pct = 0.0
+        fut_tick_count = fut['tick_count'] if fut else 0
 
-        if len(fut_ticks) >= config.ORDER_FLOW_MIN_TICKS:
-            fut_bai      = self._compute_bai(fut_ticks)
+        if fut_tick_count >= config.ORDER_FLOW_MIN_TICKS:
+            fut_bai      = fut['bai']
             fut_bai_prev = self._prev_fut_bai.get(symbol, fut_bai)
             fut_bai_delta = fut_bai - fut_bai_prev
 
-            fut_cum_buy, fut_cum_sell = self.db.get_cumulative_volume_stats(
-                symbol, minutes=5, asset_type='FUT')
+            fut_cum_buy, fut_cum_sell = fut['cum_buy'], fut['cum_sell']
             fut_cum_total = fut_cum_buy + fut_cum_sell
             fut_cum_delta_pct = (
                 (fut_cum_buy - fut_cum_sell) / fut_cum_total if fut_cum_total > 0 else 0.0
             )
 
-            fut_tick_velocity = self._compute_tick_velocity(fut_ticks)
-            fut_last_price = fut_ticks[-1]['last_price']
+            fut_tick_velocity = fut['tick_velocity']
+            fut_last_price = fut['last_price']
 
             if cash_last_price > 0:
                 basis_pct = (fut_last_price - cash_last_price) / cash_last_price * 100
@@ -141,7 +213,7 @@ class OrderFlowAnalyzer:
             'absorption_signal': abs_signal,
             'absorption_strength': round(abs_strength, 4),
             'last_price':        cash_last_price,
-            'tick_count':        len(cash_ticks),
+            'tick_count':        cash['tick_count'],
             # Futures
             'fut_bai':           round(fut_bai, 4),
             'fut_bai_prev':      round(fut_bai_prev, 4),
@@ -149,7 +221,7 @@ class OrderFlowAnalyzer:
             'fut_cum_delta_pct': round(fut_cum_delta_pct, 4),
             'fut_tick_velocity': round(fut_tick_velocity, 4),
             'fut_last_price':    fut_last_price,
-            'fut_tick_count':    len(fut_ticks),
+            'fut_tick_count':    fut_tick_count,
             'basis_pct':         round(basis_pct, 4),
         }
 
@@ -13,6 +13,14 @@ Design:
   - _on_ticks callback: parse → append to in-memory deque (non-blocking)
   - Writer thread: drain deque → bulk INSERT to order_flow.db every 2 seconds
   - Runs as a daemon thread inside order_flow_monitor.py
+  - Optional (ENABLE_TICK_MINUTE_BARS): cash/futures ticks are also folded into
+    exact 1-minute bars (minute_bar_builder.py) that the writer thread stores in
+    central_quotes.db; the central collector then skips its REST poll
+  - Optional (TICK_RECORD_DIR): raw tick batches are recorded to JSONL for replay
+  - Optional (ENABLE_TICK_ARCHIVE): the writer thread also appends each batch to
+    the full-day binary tick archive (tick_archive.py) for backtests
+  - Optional (ORDER_FLOW_STREAMING): parsed ticks are also folded into rolling
+    per-symbol windows (order_flow_stream.py) the monitor analyzes without SQL
 
 Author: Claude Sonnet 4.6
 """
@@ -29,8 +37,11 @@ from typing import Dict, List, Optional
 from kiteconnect import KiteConnect, KiteTicker
 
 import config
+from minute_bar_builder import MinuteBarBuilder, TickRecorder, write_bars_to_central_db
 from order_flow_db import OrderFlowDB
 from order_flow_futures_tokens import get_futures_token_map
+from order_flow_stream import OrderFlowStream
+from tick_archive import TickArchive, get_tick_archive
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +72,18 @@ class OrderFlowCollector:
         self._ticks_written = 0
         self._last_tick_time: Optional[datetime] = None
 
+        # Tick-built minute bars for central_quotes.db and raw tick recording
+        # (both set up in start() once the token maps are loaded)
+        self.bar_builder: Optional[MinuteBarBuilder] = None
+        self._central_db = None
+        self._recorder: Optional[TickRecorder] = None
+        self._archive: Optional[TickArchive] = None
+
+        # Rolling per-symbol flow windows read by OrderFlowAnalyzer (no tick SQL)
+        self.stream: Optional[OrderFlowStream] = (
+            OrderFlowStream() if config.ORDER_FLOW_STREAMING else None
+        )
+
     # --------------------------------------------------------
     # Token loading
     # --------------------------------------------------------
@@ -198,13 +221,24 @@ class OrderFlowCollector:
         Called by KiteTicker on every incoming tick batch.
         Parses and appends to buffer — never blocks; DB write is in writer thread.
         """
+        if self._recorder:
+            try:
+                self._recorder.record(ticks)
+            except Exception as e:
+                logger.error(f"Tick recording failed (disabling): {e}")
+                self._recorder = None
+
         parsed = []
         for raw in ticks:
             tick = self._parse_tick(raw)
             if tick:
                 parsed.append(tick)
+                if self.bar_builder:
+                    self.bar_builder.add_tick(tick['symbol'], tick['asset_type'], raw)
 
         if parsed:
+            if self.stream:
+                self.stream.add_ticks(parsed)
             with self._buffer_lock:
                 self._tick_buffer.extend(parsed)
             self._ticks_received += len(parsed)
@@ -254,6 +288,19 @@ class OrderFlowCollector:
                 if batch:
                     self.db.store_tick_batch(batch)
                     self._ticks_written += len(batch)
+                    if self._archive:
+                        try:
+                            self._archive.append(batch)
+                            self._archive.flush()
+                        except Exception as e:
+                            logger.error(f"Tick archive append failed (disabling): {e}")
+                            self._archive = None
+
+                # Close finished minutes even if no tick of the next minute arrived
+                if self.bar_builder:
+                    self.bar_builder.flush()
+                if self._recorder:
+                    self._recorder.flush()
 
                 # Update health metadata every 10 cycles (~20 seconds)
                 cycle += 1
@@ -278,6 +325,58 @@ class OrderFlowCollector:
 
         logger.info("OrderFlow writer thread stopped")
 
+    # --------------------------------------------------------
+    # Minute bars / recording
+    # --------------------------------------------------------
+
+    def _init_minute_bars(self):
+        """Create the bar builder and its central DB writer (error-isolated)."""
+        if not config.ENABLE_TICK_MINUTE_BARS:
+            return
+        try:
+            from central_quote_db import get_central_db_writer
+            self._central_db = get_central_db_writer()
+            self.bar_builder = MinuteBarBuilder(
+                on_bars=self._store_minute_bars,
+                close_grace_sec=config.TICK_BAR_CLOSE_GRACE_SEC
+            )
+            logger.info("Tick minute bars enabled → central_quotes.db (REST poll becomes fallback)")
+        except Exception as e:
+            logger.error(f"Failed to initialize tick minute bars (central collector keeps polling): {e}")
+            self.bar_builder = None
+
+    def _store_minute_bars(self, bar_start: datetime, bars: Dict[str, Dict]):
+        """MinuteBarBuilder sink: one transaction per closed minute."""
+        write_ms = write_bars_to_central_db(self._central_db, bar_start, bars)
+        logger.debug(f"Minute bars {bar_start:%H:%M}: {len(bars)} symbols in {write_ms:.1f}ms")
+
+    def _init_recorder(self):
+        """Record raw tick batches to TICK_RECORD_DIR/ticks_YYYYMMDD.jsonl (if set)."""
+        record_dir = config.TICK_RECORD_DIR
+        if not record_dir:
+            return
+        path = os.path.join(record_dir, f"ticks_{datetime.now():%Y%m%d}.jsonl")
+        try:
+            self._recorder = TickRecorder(path, self.cash_token_map, self.fut_token_map)
+            logger.info(f"Recording raw ticks to {path}")
+        except Exception as e:
+            logger.error(f"Failed to open tick recording {path}: {e}")
+            self._recorder = None
+
+    def _init_archive(self):
+        """Open the full-day tick archive; compact closed days and apply retention."""
+        if not config.ENABLE_TICK_ARCHIVE:
+            return
+        try:
+            archive = get_tick_archive()
+            archive.compact_closed_days()
+            archive.cleanup()
+            self._archive = archive
+            logger.info(f"Archiving ticks to {archive.root}")
+        except Exception as e:
+            logger.error(f"Failed to initialize tick archive: {e}")
+            self._archive = None
+
     # --------------------------------------------------------
     # Lifecycle
     # --------------------------------------------------------
@@ -296,6 +395,10 @@ class OrderFlowCollector:
         self.tokens = list(self.token_map.keys())
         self._running = True
 
+        self._init_minute_bars()
+        self._init_recorder()
+        self._init_archive()
+
         # Start writer thread
         self._writer_thread = threading.Thread(
             target=self._writer_loop,
@@ -331,6 +434,14 @@ class OrderFlowCollector:
                 self._ws.close()
             except Exception:
                 pass
+        if self.bar_builder:
+            self.bar_builder.flush()
+        if self._recorder:
+            self._recorder.close()
+            self._recorder = None
+        if self._archive:
+            self._archive.close()
+            self._archive = None
         self.db.update_metadata('ws_status', 'stopped')
 
     def is_data_fresh(self) -> bool:
@@ -8,7 +8,8 @@ Lifecycle:
   3. Start OrderFlowCollector in a daemon thread (KiteTicker WebSocket)
   4. Main loop every 30 seconds:
      a. Check data freshness (skip if WebSocket is stale)
-     b. Run OrderFlowAnalyzer.analyze_all() on all 208 stocks
+     b. Run OrderFlowAnalyzer.analyze_all() on all 208 stocks (reads the
+        collector's rolling windows when ORDER_FLOW_STREAMING, else tick_snapshots)
      c. Write results to flow_metrics table
      d. Check each stock against alert thresholds → send Telegram alerts
   5. Every 5 minutes: send summary of top 5 bullish + bearish stocks
@@ -100,6 +101,8 @@ class OrderFlowMonitor:
 
     def _start_collector(self):
         self.collector = OrderFlowCollector(kite=self.kite, db=self.db)
+        # Streaming mode: the analyzer reads the collector's in-memory windows
+        self.analyzer.stream = self.collector.stream
         self._collector_thread = threading.Thread(
             target=self.collector.start,
             name="OrderFlowCollector",
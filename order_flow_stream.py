@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Order Flow Stream - Incremental Per-Symbol Order Flow Windows
+
+OrderFlowCollector._on_ticks folds every parsed tick into the stream; the
+monitor reads snapshot() once per cycle instead of re-querying tick_snapshots.
+
+Why:
+- OrderFlowAnalyzer.analyze_all pulled the whole 30-second window from
+  tick_snapshots (one 32-key dict per row) and then ran
+  get_cumulative_volume_stats twice per symbol (cash + futures) - ~400 extra
+  queries per cycle with the full F&O subscription.
+- The metrics were only as fresh as the writer thread's last flush.
+
+Per symbol and asset type (CASH / FUT) two time windows are kept:
+- analysis window (ORDER_FLOW_ANALYSIS_WINDOW seconds): running sums of the
+  per-tick BAI and depth-ratio terms, buy/sell volume classified on
+  last_quantity, and the non-zero price moves between consecutive ticks
+  (tick velocity). First/last price and the last tick (wall detection) are
+  read off the window ends.
+- flow window (ORDER_FLOW_CUM_WINDOW_SEC seconds): executed volume deltas
+  (change in cumulative volume) classified buy/sell - the 5-minute cumulative
+  delta get_cumulative_volume_stats used to compute with LAG(volume).
+
+Each tick is O(1) amortized (append + evict expired entries); snapshot() is
+O(symbols). Windows are also capped at ORDER_FLOW_STREAM_MAX_TICKS entries so a
+burst cannot grow memory without bound.
+
+Date: 2026-10-16
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import config
+
+ASSET_TYPES = ('CASH', 'FUT')
+
+
+class _FlowWindow:
+    """Rolling order flow state of one symbol / asset type."""
+
+    __slots__ = ('ticks', 'bai_sum', 'bai_n', 'depth_sum', 'depth_n',
+                 'buy_vol', 'sell_vol', 'move_sum', 'move_n',
+                 'last', 'last_volume', 'flow', 'cum_buy', 'cum_sell')
+
+    def __init__(self):
+        # [t, bai_term, depth_term, price, buy_qty, sell_qty, move_from_previous]
+        self.ticks = deque()
+        self.bai_sum = 0.0
+        self.bai_n = 0
+        self.depth_sum = 0.0
+        self.depth_n = 0
+        self.buy_vol = 0
+        self.sell_vol = 0
+        self.move_sum = 0.0
+        self.move_n = 0
+        self.last: Optional[dict] = None
+        self.last_volume: Optional[int] = None
+        # [t, buy_vol_delta, sell_vol_delta]
+        self.flow = deque()
+        self.cum_buy = 0
+        self.cum_sell = 0
+
+    def add(self, t: float, tick: dict, max_ticks: int):
+        b, s = tick['buy_quantity'], tick['sell_quantity']
+        bai_term = (b - s) / (b + s) if b + s > 0 else None
+        ask_depth = tick['ask_depth_total']
+        depth_term = tick['bid_depth_total'] / ask_depth if ask_depth > 0 else None
+
+        price = tick['last_price']
+        best_bid, best_ask = tick['best_bid'], tick['best_ask']
+        is_buy = best_ask > 0 and price >= best_ask
+        is_sell = not is_buy and best_bid > 0 and price <= best_bid
+
+        qty = tick['last_quantity']
+        buy_qty = qty if qty > 0 and is_buy else 0
+        sell_qty = qty if qty > 0 and is_sell else 0
+
+        move = abs(price - self.ticks[-1][3]) if self.ticks else 0.0
+
+        self.ticks.append([t, bai_term, depth_term, price, buy_qty, sell_qty, move])
+        if bai_term is not None:
+            self.bai_sum += bai_term
+            self.bai_n += 1
+        if depth_term is not None:
+            self.depth_sum += depth_term
+            self.depth_n += 1
+        self.buy_vol += buy_qty
+        self.sell_vol += sell_qty
+        if move > 0:
+            self.move_sum += move
+            self.move_n += 1
+        self.last = tick
+
+        # Executed volume = change in cumulative volume (book-only updates repeat
+        # last_quantity but leave volume unchanged, so they are not counted)
+        volume = tick['volume']
+        vol_delta = volume - self.last_volume if self.last_volume is not None else 0
+        self.last_volume = volume
+        if vol_delta > 0 and (is_buy or is_sell):
+            fb, fs = (vol_delta, 0) if is_buy else (0, vol_delta)
+            self.flow.append([t, fb, fs])
+            self.cum_buy += fb
+            self.cum_sell += fs
+
+        while len(self.ticks) > max_ticks:
+            self._pop_tick()
+        while len(self.flow) > max_ticks:
+            self._pop_flow()
+
+    def expire(self, now: float, window_sec: float, flow_sec: float):
+        cutoff = now - window_sec
+        while self.ticks and self.ticks[0][0] < cutoff:
+            self._pop_tick()
+        flow_cutoff = now - flow_sec
+        while self.flow and self.flow[0][0] < flow_cutoff:
+            self._pop_flow()
+
+    def _pop_tick(self):
+        _, bai_term, depth_term, _, buy_qty, sell_qty, _ = self.ticks.popleft()
+        if bai_term is not None:
+            self.bai_sum -= bai_term
+            self.bai_n -= 1
+        if depth_term is not None:
+            self.depth_sum -= depth_term
+            self.depth_n -= 1
+        self.buy_vol -= buy_qty
+        self.sell_vol -= sell_qty
+        if self.ticks:
+            # The new head's move pairs it with a tick that left the window
+            head = self.ticks[0]
+            if head[6] > 0:
+                self.move_sum -= head[6]
+                self.move_n -= 1
+            head[6] = 0.0
+        else:
+            # Window empty - reset so float drift cannot accumulate
+            self.bai_sum = self.depth_sum = self.move_sum = 0.0
+            self.bai_n = self.depth_n = self.move_n = 0
+            self.buy_vol = self.sell_vol = 0
+
+    def _pop_flow(self):
+        _, fb, fs = self.flow.popleft()
+        self.cum_buy -= fb
+        self.cum_sell -= fs
+
+    def stats(self) -> dict:
+        """Window aggregates in the shape OrderFlowAnalyzer builds metrics from."""
+        first_price = self.ticks[0][3]
+        last_price = self.ticks[-1][3]
+        return {
+            'bai': self.bai_sum / self.bai_n if self.bai_n else 0.0,
+            'depth_ratio': self.depth_sum / self.depth_n if self.depth_n else 1.0,
+            'buy_volume': self.buy_vol,
+            'sell_volume': self.sell_vol,
+            'tick_velocity': self.move_sum / self.move_n if self.move_n else 0.0,
+            'price_change_pct': ((last_price - first_price) / first_price * 100)
+                                if first_price > 0 else 0.0,
+            'last_price': last_price,
+            'last_tick': self.last,
+            'tick_count': len(self.ticks),
+            'cum_buy': self.cum_buy,
+            'cum_sell': self.cum_sell,
+        }
+
+
+class OrderFlowStream:
+    """
+    Rolling order flow windows for every subscribed symbol.
+
+    Written by the WebSocket thread (add_ticks), read by the monitor thread
+    (snapshot) - one lock, no SQL on either side.
+    """
+
+    def __init__(self, window_sec: float = None, flow_window_sec: float = None,
+                 max_ticks: int = None):
+        """
+        Initialize an empty stream.
+
+        Args:
+            window_sec: Analysis window (default: config.ORDER_FLOW_ANALYSIS_WINDOW)
+            flow_window_sec: Cumulative delta window (default: config.ORDER_FLOW_CUM_WINDOW_SEC)
+            max_ticks: Per-window entry cap (default: config.ORDER_FLOW_STREAM_MAX_TICKS)
+        """
+        self.window_sec = window_sec or config.ORDER_FLOW_ANALYSIS_WINDOW
+        self.flow_window_sec = flow_window_sec or config.ORDER_FLOW_CUM_WINDOW_SEC
+        self.max_ticks = max_ticks or config.ORDER_FLOW_STREAM_MAX_TICKS
+        self._lock = threading.Lock()
+        self._windows: Dict[str, Dict[str, _FlowWindow]] = {}
+
+    def add_ticks(self, ticks, now: float = None) -> None:
+        """
+        Fold a batch of parsed ticks (OrderFlowCollector._parse_tick dicts).
+
+        Args:
+            ticks: Iterable of tick dicts with symbol / asset_type set
+            now: Receive time in epoch seconds (default: time.time())
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            for tick in ticks:
+                per_symbol = self._windows.get(tick['symbol'])
+                if per_symbol is None:
+                    per_symbol = self._windows[tick['symbol']] = {}
+                window = per_symbol.get(tick['asset_type'])
+                if window is None:
+                    window = per_symbol[tick['asset_type']] = _FlowWindow()
+                window.add(now, tick, self.max_ticks)
+                window.expire(now, self.window_sec, self.flow_window_sec)
+
+    def snapshot(self, now: float = None) -> Dict[str, Dict[str, dict]]:
+        """
+        Current window aggregates for every symbol with ticks in the window.
+
+        Returns:
+            {symbol: {'CASH': stats, 'FUT': stats}} - an asset type is absent
+            when it has no tick inside the analysis window
+        """
+        now = time.time() if now is None else now
+        result: Dict[str, Dict[str, dict]] = {}
+        with self._lock:
+            for symbol, per_symbol in self._windows.items():
+                entry = {}
+                for asset_type, window in per_symbol.items():
+                    window.expire(now, self.window_sec, self.flow_window_sec)
+                    if window.ticks:
+                        entry[asset_type] = window.stats()
+                if entry:
+                    result[symbol] = entry
+        return result
+
+    def reset(self) -> None:
+        """Drop all windows (e.g. after a long WebSocket outage)."""
+        with self._lock:
+            self._windows.clear()
@@ -52,6 +52,11 @@ class BasePatternDetector:
         if period is None:
             period = self.atr_period
 
+        # Computed once for the whole universe by vectorized_scan
+        precomputed = getattr(candles, 'precomputed_atr', None)
+        if precomputed and period in precomputed:
+            return precomputed[period]
+
         if len(candles) < period + 1:
             # Not enough data, use simple range
             recent_candles = candles[-min(5, len(candles)):]
@@ -0,0 +1,333 @@
+"""
+Vectorized Pattern Scan
+
+Scans a whole universe of symbols for every candlestick pattern in one pass.
+
+The detectors walk one symbol's List[Dict] at a time, and each recomputes ATR
+from scratch. Here the recent candles of all symbols are converted once into
+right-aligned OHLCV arrays (one row per symbol, newest candle in the last
+column), the shared features (body, wicks, body ratio, ATR, volume ratio,
+trend change) are computed once, and each pattern's structural rules are
+evaluated as a boolean mask over all symbols.
+
+The masks repeat each detector's "return None" gates with the same arithmetic,
+so they select exactly the symbols the detector can fire on. Confidence
+scoring, entry/target/stop and the result dict stay in the detector: detect()
+runs only for (symbol, pattern) pairs the mask selects, on a CandleSeries that
+carries the precomputed ATR.
+
+Usage:
+    from pattern_detectors.vectorized_scan import candidates
+
+    for symbol, (series, detectors) in candidates(all_detectors, candles_by_symbol).items():
+        for detector in detectors:
+            pattern = detector.detect(series, market_regime, avg_volumes[symbol])
+"""
+
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .continuation_patterns import (
+    BearishMarubozuDetector,
+    BullishMarubozuDetector,
+    FallingThreeMethodsDetector,
+    RisingThreeMethodsDetector,
+)
+from .indecision_patterns import DojiDetector, LongLeggedDojiDetector, SpinningTopDetector
+from .multi_candle_patterns import ThreeBlackCrowsDetector, ThreeWhiteSoldiersDetector
+from .reversal_patterns import (
+    BearishEngulfingDetector,
+    BullishEngulfingDetector,
+    DarkCloudCoverDetector,
+    EveningStarDetector,
+    HammerDetector,
+    HangingManDetector,
+    InvertedHammerDetector,
+    MorningStarDetector,
+    PiercingPatternDetector,
+    ShootingStarDetector,
+)
+
+# Columns kept per symbol: the patterns look back at most 9 candles (trend
+# start for the hammer family); ATR needs atr_period + 1
+MIN_WINDOW = 16
+
+
+class CandleSeries(list):
+    """
+    A symbol's candle list carrying ATR values computed by the scan.
+
+    BasePatternDetector.calculate_atr() returns the stored value for a period
+    instead of recomputing it; everything else sees a plain list.
+    """
+
+    def __init__(self, candles: Sequence[Dict], precomputed_atr: Optional[Dict[int, float]] = None):
+        super().__init__(candles)
+        self.precomputed_atr = precomputed_atr or {}
+
+
+class CandleMatrix:
+    """Recent OHLCV of many symbols as (n_symbols, window) float arrays, NaN-padded on the left."""
+
+    def __init__(self, candles_by_symbol: Dict[str, Sequence[Dict]], window: int = MIN_WINDOW):
+        """
+        Args:
+            candles_by_symbol: {symbol: [{open, high, low, close, volume}, ...]} oldest-first
+            window: Most recent candles kept per symbol
+        """
+        self.symbols: List[str] = list(candles_by_symbol)
+        self.window = window
+        self.lengths = np.array([len(candles_by_symbol[s]) for s in self.symbols], dtype=int)
+
+        # One flat pass over every tail, then scatter into the right-aligned rows
+        tails = [candles_by_symbol[s][-window:] for s in self.symbols]
+        kept = np.minimum(self.lengths, window)
+        ohlc = itemgetter('open', 'high', 'low', 'close')
+        flat = np.empty((int(kept.sum()), 5))
+        if len(flat):
+            flat[:, :4] = [ohlc(c) for tail in tails for c in tail]
+            flat[:, 4] = [c.get('volume') or 0 for tail in tails for c in tail]
+        rows = np.repeat(np.arange(len(self.symbols)), kept)
+        cols = np.arange(len(rows)) - np.repeat(np.cumsum(kept) - kept, kept) + np.repeat(window - kept, kept)
+
+        values = np.full((len(self.symbols), window, 5), np.nan)
+        values[rows, cols] = flat
+        self.open, self.high, self.low, self.close, self.volume = (values[:, :, i] for i in range(5))
+
+
+def sequential_mean(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Row means adding columns left to right, as sum(list) / len(list) does.
+
+    Keeps the scan's ATR bit-identical to BasePatternDetector.calculate_atr().
+    """
+    total = np.zeros(values.shape[0])
+    for col in range(values.shape[1]):
+        total = np.where(valid[:, col], total + np.where(valid[:, col], values[:, col], 0.0), total)
+    count = valid.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / count
+
+
+def atr(m: CandleMatrix, period: int) -> np.ndarray:
+    """
+    ATR per symbol, with calculate_atr()'s short-history fallback.
+
+    Returns:
+        (n_symbols,) array; NaN for symbols without candles
+    """
+    prev_close = m.close[:, -period - 1:-1]
+    high, low = m.high[:, -period:], m.low[:, -period:]
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    full = sequential_mean(true_range, np.ones(true_range.shape, dtype=bool))
+
+    recent_range = m.high[:, -5:] - m.low[:, -5:]
+    short = sequential_mean(recent_range, ~np.isnan(recent_range))
+    return np.where(m.lengths >= period + 1, full, short)
+
+
+def compute_features(m: CandleMatrix, atr_period: int = 14,
+                     avg_volumes: Optional[Sequence[float]] = None) -> Dict[str, np.ndarray]:
+    """
+    Shared candle features, once for every symbol.
+
+    Args:
+        m: CandleMatrix
+        atr_period: ATR period
+        avg_volumes: Per-symbol average volume, in m.symbols order (for volume_ratio)
+
+    Returns:
+        (n_symbols, window) arrays: body, body_top, body_bottom, upper_wick,
+        lower_wick, range, body_ratio, bullish, bearish;
+        (n_symbols,) arrays: atr, volume_ratio, trend_8 (% change of the last
+        close over 8 candles)
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        body_top = np.maximum(m.open, m.close)
+        body_bottom = np.minimum(m.open, m.close)
+        body = np.abs(m.close - m.open)
+        total_range = m.high - m.low
+        features = {
+            'body': body,
+            'body_top': body_top,
+            'body_bottom': body_bottom,
+            'upper_wick': m.high - body_top,
+            'lower_wick': body_bottom - m.low,
+            'range': total_range,
+            'body_ratio': np.where(total_range > 0, body / total_range, np.nan),
+            'bullish': m.close > m.open,
+            'bearish': m.close < m.open,
+            'atr': atr(m, atr_period),
+            'trend_8': (m.close[:, -1] - m.close[:, -9]) / m.close[:, -9] * 100,
+        }
+        if avg_volumes is not None:
+            avg = np.asarray(avg_volumes, dtype=float)
+            features['volume_ratio'] = np.where(avg > 0, m.volume[:, -1] / avg, 1.0)
+    return features
+
+
+# ==================== Pattern masks ====================
+# Each takes (matrix, features) and returns an (n_symbols,) bool array: the
+# detector's structural gates for the newest candle(s). Comparisons involving
+# left padding are NaN and therefore False.
+
+def _engulfing(m: CandleMatrix, f: Dict, bullish: bool) -> np.ndarray:
+    prev_dir, curr_dir = ('bearish', 'bullish') if bullish else ('bullish', 'bearish')
+    return ((m.lengths >= 12) & f[prev_dir][:, -2] & f[curr_dir][:, -1]
+            & (f['body_bottom'][:, -1] <= f['body_bottom'][:, -2])
+            & (f['body_top'][:, -1] >= f['body_top'][:, -2])
+            & (f['body'][:, -2] != 0))
+
+
+def _long_lower_wick(m: CandleMatrix, f: Dict) -> np.ndarray:
+    """Hammer / hanging man shape: long lower wick, tiny upper wick, body in the top third."""
+    body, total_range = f['body'][:, -1], f['range'][:, -1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        position = ((f['body_top'][:, -1] + f['body_bottom'][:, -1]) / 2 - m.low[:, -1]) / total_range
+    return ((m.lengths >= 10) & (total_range >= m.close[:, -1] * 0.002)
+            & (f['lower_wick'][:, -1] >= body * 2.0) & (f['upper_wick'][:, -1] <= body * 0.3)
+            & (position >= 0.67))
+
+
+def _long_upper_wick(m: CandleMatrix, f: Dict) -> np.ndarray:
+    """Shooting star / inverted hammer shape: long upper wick, tiny lower wick, body in the bottom third."""
+    body, total_range = f['body'][:, -1], f['range'][:, -1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        position = ((f['body_top'][:, -1] + f['body_bottom'][:, -1]) / 2 - m.low[:, -1]) / total_range
+    return ((m.lengths >= 10) & (total_range >= m.close[:, -1] * 0.002)
+            & (f['upper_wick'][:, -1] >= body * 2.0) & (f['lower_wick'][:, -1] <= body * 0.3)
+            & (position <= 0.33))
+
+
+def _star(m: CandleMatrix, f: Dict, bullish: bool) -> np.ndarray:
+    first, last = ('bearish', 'bullish') if bullish else ('bullish', 'bearish')
+    c1_mid = (m.open[:, -3] + m.close[:, -3]) / 2
+    closes_into_body = m.close[:, -1] >= c1_mid if bullish else m.close[:, -1] <= c1_mid
+    return ((m.lengths >= 12) & f[first][:, -3]
+            & (f['body'][:, -3] >= f['range'][:, -3] * 0.6)
+            & (f['range'][:, -2] != 0) & (f['body'][:, -2] <= f['body'][:, -3] * 0.3)
+            & f[last][:, -1] & closes_into_body)
+
+
+def _piercing(m: CandleMatrix, f: Dict) -> np.ndarray:
+    return ((m.lengths >= 10) & f['bearish'][:, -2] & f['bullish'][:, -1]
+            & (m.open[:, -1] < m.low[:, -2])
+            & (m.close[:, -1] > (m.open[:, -2] + m.close[:, -2]) / 2))
+
+
+def _dark_cloud(m: CandleMatrix, f: Dict) -> np.ndarray:
+    return ((m.lengths >= 10) & f['bullish'][:, -2] & f['bearish'][:, -1]
+            & (m.open[:, -1] > m.high[:, -2])
+            & (m.close[:, -1] < (m.open[:, -2] + m.close[:, -2]) / 2))
+
+
+def _marubozu(m: CandleMatrix, f: Dict, bullish: bool) -> np.ndarray:
+    return ((m.lengths >= 8) & f['bullish' if bullish else 'bearish'][:, -1]
+            & (f['range'][:, -1] != 0) & (f['body_ratio'][:, -1] >= 0.95))
+
+
+def _three_methods(m: CandleMatrix, f: Dict, bullish: bool) -> np.ndarray:
+    direction = 'bullish' if bullish else 'bearish'
+    mask = (m.lengths >= 12) & f[direction][:, -5] & f[direction][:, -1]
+    for col in (-4, -3, -2):
+        mask &= ((f['body'][:, col] <= f['body'][:, -5] * 0.4)
+                 & (m.high[:, col] <= m.high[:, -5]) & (m.low[:, col] >= m.low[:, -5]))
+    beyond = m.close[:, -1] > m.close[:, -5] if bullish else m.close[:, -1] < m.close[:, -5]
+    return mask & beyond
+
+
+def _three_soldiers(m: CandleMatrix, f: Dict, bullish: bool) -> np.ndarray:
+    direction = 'bullish' if bullish else 'bearish'
+    mask = (m.lengths >= 10) & f[direction][:, -3] & f[direction][:, -2] & f[direction][:, -1]
+    for prev, curr in ((-3, -2), (-2, -1)):
+        if bullish:
+            mask &= ((m.close[:, curr] > m.close[:, prev])
+                     & (m.open[:, curr] >= m.open[:, prev]) & (m.open[:, curr] <= m.close[:, prev]))
+        else:
+            mask &= ((m.close[:, curr] < m.close[:, prev])
+                     & (m.open[:, curr] <= m.open[:, prev]) & (m.open[:, curr] >= m.close[:, prev]))
+    for col in (-3, -2, -1):
+        mask &= (f['range'][:, col] != 0) & (f['body'][:, col] >= f['range'][:, col] * 0.7)
+    return mask
+
+
+def _doji(m: CandleMatrix, f: Dict) -> np.ndarray:
+    total_range = f['range'][:, -1]
+    return ((m.lengths >= 8) & (total_range != 0) & (f['body_ratio'][:, -1] <= 0.1)
+            & (total_range >= m.close[:, -1] * 0.003)
+            & (f['upper_wick'][:, -1] >= total_range * 0.1) & (f['lower_wick'][:, -1] >= total_range * 0.1))
+
+
+def _spinning_top(m: CandleMatrix, f: Dict) -> np.ndarray:
+    body, ratio = f['body'][:, -1], f['body_ratio'][:, -1]
+    return ((m.lengths >= 8) & (f['range'][:, -1] != 0) & (ratio >= 0.1) & (ratio <= 0.3)
+            & (f['upper_wick'][:, -1] >= body) & (f['lower_wick'][:, -1] >= body))
+
+
+def _long_legged_doji(m: CandleMatrix, f: Dict) -> np.ndarray:
+    total_range = f['range'][:, -1]
+    return ((m.lengths >= 8) & (total_range != 0) & (f['body_ratio'][:, -1] <= 0.05)
+            & (f['upper_wick'][:, -1] >= total_range * 0.4) & (f['lower_wick'][:, -1] >= total_range * 0.4))
+
+
+PATTERN_MASKS: Dict[type, Callable[[CandleMatrix, Dict], np.ndarray]] = {
+    BullishEngulfingDetector: lambda m, f: _engulfing(m, f, bullish=True),
+    BearishEngulfingDetector: lambda m, f: _engulfing(m, f, bullish=False),
+    HammerDetector: _long_lower_wick,
+    HangingManDetector: lambda m, f: _long_lower_wick(m, f) & (f['trend_8'] > 0),
+    ShootingStarDetector: _long_upper_wick,
+    InvertedHammerDetector: lambda m, f: _long_upper_wick(m, f) & (f['trend_8'] < 0),
+    MorningStarDetector: lambda m, f: _star(m, f, bullish=True),
+    EveningStarDetector: lambda m, f: _star(m, f, bullish=False),
+    PiercingPatternDetector: _piercing,
+    DarkCloudCoverDetector: _dark_cloud,
+    BullishMarubozuDetector: lambda m, f: _marubozu(m, f, bullish=True),
+    BearishMarubozuDetector: lambda m, f: _marubozu(m, f, bullish=False),
+    RisingThreeMethodsDetector: lambda m, f: _three_methods(m, f, bullish=True),
+    FallingThreeMethodsDetector: lambda m, f: _three_methods(m, f, bullish=False),
+    ThreeWhiteSoldiersDetector: lambda m, f: _three_soldiers(m, f, bullish=True),
+    ThreeBlackCrowsDetector: lambda m, f: _three_soldiers(m, f, bullish=False),
+    DojiDetector: _doji,
+    SpinningTopDetector: _spinning_top,
+    LongLeggedDojiDetector: _long_legged_doji,
+}
+
+
+def candidates(
+    detectors: Sequence,
+    candles_by_symbol: Dict[str, Sequence[Dict]],
+    avg_volumes: Optional[Dict[str, float]] = None,
+    atr_period: int = 14
+) -> Dict[str, Tuple[CandleSeries, List]]:
+    """
+    Evaluate every pattern mask over the whole universe at once.
+
+    Args:
+        detectors: Detector instances (a class without a mask matches every symbol)
+        candles_by_symbol: {symbol: candles oldest-first}
+        avg_volumes: {symbol: average volume} for the volume_ratio feature
+        atr_period: Period of the ATR precomputed for the detectors
+
+    Returns:
+        {symbol: (CandleSeries with precomputed ATR, [detectors whose mask fired])},
+        detectors in the given order; symbols no mask selects are absent
+    """
+    if not candles_by_symbol:
+        return {}
+
+    matrix = CandleMatrix(candles_by_symbol, window=max(MIN_WINDOW, atr_period + 1))
+    volumes = [avg_volumes.get(s, 0) for s in matrix.symbols] if avg_volumes is not None else None
+    features = compute_features(matrix, atr_period, volumes)
+
+    every_symbol = np.ones(len(matrix.symbols), dtype=bool)
+    masks = np.array([PATTERN_MASKS[type(d)](matrix, features) if type(d) in PATTERN_MASKS else every_symbol
+                      for d in detectors]).reshape(len(detectors), len(matrix.symbols))
+
+    selected = {}
+    for row in np.flatnonzero(masks.any(axis=0)):
+        symbol = matrix.symbols[row]
+        series = CandleSeries(candles_by_symbol[symbol], {atr_period: float(features['atr'][row])})
+        selected[symbol] = (series, [detectors[i] for i in np.flatnonzero(masks[:, row])])
+    return selected
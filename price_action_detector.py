@@ -9,6 +9,8 @@ Features:
 - Market regime integration
 - Volume analysis
 - Entry/target/stop loss calculations
+- Universe scan (detect_patterns_batch): pattern rules evaluated as NumPy masks
+  over all symbols at once, detectors run only where a mask fires
 """
 
 import logging
@@ -39,6 +41,7 @@ from pattern_detectors import (
     ThreeWhiteSoldiersDetector,
     ThreeBlackCrowsDetector,
 )
+from pattern_detectors.vectorized_scan import candidates
 
 logger = logging.getLogger(__name__)
 
@@ -195,13 +198,7 @@ class PriceActionDetector:
                 }
             }
         """
-        result = {
-            'symbol': symbol,
-            'has_patterns': False,
-            'patterns_found': [],
-            'market_regime': market_regime,
-            'pattern_details': {}
-        }
+        result = self._empty_result(symbol, market_regime)
 
         # Need minimum candles for analysis
         if len(candles) < 12:
@@ -209,7 +206,56 @@ class PriceActionDetector:
             return result
 
         # Run all pattern detections
-        for detector in self.pattern_detectors:
+        self._run_detectors(symbol, self.pattern_detectors, candles, market_regime, avg_volume, result)
+        return result
+
+    def detect_patterns_batch(
+        self,
+        candles_by_symbol: Dict[str, List[Dict]],
+        market_regime: str,
+        avg_volumes: Dict[str, float]
+    ) -> Dict[str, Dict]:
+        """
+        Scan many symbols at once - same results as detect_patterns() per symbol.
+
+        Candles are converted to arrays once, ATR and the candle features are
+        computed once for the universe, and each pattern's rules are evaluated
+        as a mask over all symbols; a detector runs only where its mask fires.
+
+        Args:
+            candles_by_symbol: {symbol: OHLCV candle dicts (sorted oldest to newest)}
+            market_regime: 'BULLISH', 'BEARISH', or 'NEUTRAL'
+            avg_volumes: {symbol: average volume}
+
+        Returns:
+            {symbol: detect_patterns() result} for every symbol passed
+        """
+        results = {symbol: self._empty_result(symbol, market_regime) for symbol in candles_by_symbol}
+        eligible = {s: c for s, c in candles_by_symbol.items() if len(c) >= 12}
+
+        selected = candidates(self.pattern_detectors, eligible, avg_volumes, self.atr_period)
+        for symbol, (series, detectors) in selected.items():
+            self._run_detectors(symbol, detectors, series, market_regime,
+                                avg_volumes.get(symbol, 0), results[symbol])
+
+        logger.debug(f"Pattern scan: {len(eligible)} symbols, {len(selected)} with candidate patterns")
+        return results
+
+    @staticmethod
+    def _empty_result(symbol: str, market_regime: str) -> Dict:
+        """detect_patterns() result with no patterns"""
+        return {
+            'symbol': symbol,
+            'has_patterns': False,
+            'patterns_found': [],
+            'market_regime': market_regime,
+            'pattern_details': {}
+        }
+
+    def _run_detectors(self, symbol: str, detectors: List, candles: List[Dict],
+                       market_regime: str, avg_volume: float, result: Dict):
+        """Run detectors on one symbol's candles and record enabled, confident patterns in result."""
+        for detector in detectors:
             try:
                 pattern_data = detector.detect(candles, market_regime, avg_volume)
 
@@ -232,5 +278,3 @@ class PriceActionDetector:
             except Exception as e:
                 detector_name = detector.__class__.__name__
                 logger.error(f"{symbol}: Error in {detector_name}: {e}", exc_info=True)
-
-        return result
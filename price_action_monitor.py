@@ -178,7 +178,21 @@ class PriceActionMonitor:
             candle_data = self._fetch_5min_candles()
             logger.info(f"Received candle data for {len(candle_data)} stocks")
 
-            # Step 3: Check each stock for patterns
+            # Step 3: Scan the whole universe at once (vectorized pattern masks)
+            batch_results = None
+            if config.ENABLE_VECTORIZED_PATTERN_SCAN:
+                scannable = {s: d for s, d in candle_data.items()
+                             if d['current_price'] >= config.PRICE_ACTION_MIN_PRICE}
+                try:
+                    batch_results = self.detector.detect_patterns_batch(
+                        {s: d['candles'] for s, d in scannable.items()},
+                        market_regime,
+                        {s: d['avg_volume'] for s, d in scannable.items()}
+                    )
+                except Exception as e:
+                    logger.error(f"Vectorized pattern scan failed, checking stocks one by one: {e}", exc_info=True)
+
+            # Step 4: Check each stock for patterns
             for symbol in self.stocks:
                 stats['total_checked'] += 1
 
@@ -202,13 +216,16 @@ class PriceActionMonitor:
                     # % increase), and min_confidence gates on the resulting score.
 
                     # Detect patterns
-                    result = self.detector.detect_patterns(
-                        symbol=symbol,
-                        candles=candles,
-                        market_regime=market_regime,
-                        current_price=current_price,
-                        avg_volume=avg_volume
-                    )
+                    if batch_results is not None:
+                        result = batch_results[symbol]
+                    else:
+                        result = self.detector.detect_patterns(
+                            symbol=symbol,
+                            candles=candles,
+                            market_regime=market_regime,
+                            current_price=current_price,
+                            avg_volume=avg_volume
+                        )
 
                     if result['has_patterns']:
                         stats['patterns_detected'] += len(result['patterns_found'])
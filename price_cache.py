@@ -1,19 +1,219 @@
+import atexit
 import json
 import os
 import sqlite3
 import shutil
+import threading
 import time
-from datetime import datetime
-from typing import Dict, Optional, Tuple
+from array import array
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 import config
 
 logger = logging.getLogger(__name__)
 
+SNAPSHOT_TYPES = ['current', 'previous_1min', 'previous',
+                  'previous2', 'previous3', 'previous4',
+                  'previous5', 'previous6']
+
+# Named snapshot slot -> lookback (number of updates ago) in the per-symbol ring.
+# An instance is driven at one cadence (stock_monitor: 5-min, onemin_monitor: 1-min),
+# so "previous_1min" and "previous" are both the update before the current one.
+SLOT_LOOKBACK = {
+    'current': 0,
+    'previous_1min': 1,
+    'previous': 1,
+    'previous2': 2,
+    'previous3': 3,
+    'previous4': 4,
+    'previous5': 5,
+    'previous6': 6,
+}
+_MIN_RING_DEPTH = max(SLOT_LOOKBACK.values()) + 1
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+_DAY_US = 86400 * 1000000
+
+# 1-min volume spike baseline: average per-minute delta over this many minutes
+VOLUME_AVG_1MIN_MINUTES = 5
+
+
+def _timestamp_to_us(timestamp: str) -> int:
+    """ISO timestamp -> integer microseconds (wall-clock, timezone dropped; exact round-trip)."""
+    dt = datetime.fromisoformat(timestamp)
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None)
+    return (dt - _EPOCH) // _ONE_US
+
+
+def _us_to_timestamp(us: int) -> str:
+    """Integer microseconds -> ISO timestamp (datetime.isoformat() format)."""
+    return (_EPOCH + timedelta(microseconds=us)).isoformat()
+
+
+class SnapshotRing:
+    """
+    Fixed-size ring of (price, volume, timestamp) points for one symbol.
+
+    Three compact typed arrays (price float64, volume int64, timestamp in int64
+    microseconds) instead of one dict per snapshot. push() is O(1) - no shifting -
+    and any lookback (0 = latest, 1 = the update before, ...) is one index.
+    """
+
+    __slots__ = ('depth', 'size', 'head', 'prices', 'volumes', 'times')
+
+    def __init__(self, depth: int):
+        """
+        Initialize an empty ring.
+
+        Args:
+            depth: Number of points kept (older points are overwritten)
+        """
+        self.depth = depth
+        self.size = 0
+        self.head = -1
+        self.prices = array('d', bytes(8 * depth))
+        self.volumes = array('q', bytes(8 * depth))
+        self.times = array('q', bytes(8 * depth))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, price: float, volume: int, time_us: int):
+        """Append a point, overwriting the oldest once the ring is full."""
+        self.head = (self.head + 1) % self.depth
+        self.prices[self.head] = price
+        self.volumes[self.head] = volume
+        self.times[self.head] = time_us
+        if self.size < self.depth:
+            self.size += 1
+
+    def get(self, lookback: int) -> Optional[Tuple[float, int, int]]:
+        """
+        Point `lookback` updates ago.
+
+        Returns:
+            (price, volume, time_us), or None if the ring is not that deep yet
+        """
+        if lookback < 0 or lookback >= self.size:
+            return None
+        i = (self.head - lookback) % self.depth
+        return self.prices[i], self.volumes[i], self.times[i]
+
+    def set(self, lookback: int, price: float, volume: int, time_us: int):
+        """Overwrite the point `lookback` updates ago (extends a shorter ring)."""
+        if lookback >= self.depth:
+            raise IndexError(f"lookback {lookback} beyond ring depth {self.depth}")
+        if self.size == 0:
+            self.head = 0
+        for k in range(self.size, lookback + 1):  # fill the gap up to the new oldest point
+            i = (self.head - k) % self.depth
+            self.prices[i], self.volumes[i], self.times[i] = price, volume, time_us
+        self.size = max(self.size, lookback + 1)
+        i = (self.head - lookback) % self.depth
+        self.prices[i], self.volumes[i], self.times[i] = price, volume, time_us
+
+    def snapshot(self, lookback: int) -> Optional[Dict]:
+        """Point `lookback` updates ago as the legacy {"price", "volume", "timestamp"} dict."""
+        point = self.get(lookback)
+        if point is None:
+            return None
+        price, volume, time_us = point
+        return {"price": price, "volume": volume, "timestamp": _us_to_timestamp(time_us)}
+
+
+class _SymbolView(MutableMapping):
+    """Legacy dict view of one symbol: named slots read / write through to its ring."""
+
+    def __init__(self, price_cache: 'PriceCache', symbol: str):
+        self._pc = price_cache
+        self._symbol = symbol
+
+    def __getitem__(self, key):
+        if key == 'avg_daily_volume':
+            return self._pc._avg_daily_volumes[self._symbol]
+        if key not in SLOT_LOOKBACK:
+            raise KeyError(key)
+        return self._pc._slot(self._symbol, key)
+
+    def __setitem__(self, key, value):
+        pc = self._pc
+        with pc._lock:
+            if key == 'avg_daily_volume':
+                pc._avg_daily_volumes[self._symbol] = value
+            elif key in SLOT_LOOKBACK:
+                if value is not None:
+                    pc._ring(self._symbol).set(SLOT_LOOKBACK[key], *pc._point(value))
+            else:
+                raise KeyError(key)
+            pc._dirty.add(self._symbol)
+
+    def __delitem__(self, key):
+        raise TypeError("snapshot slots cannot be deleted")
+
+    def __iter__(self):
+        yield from SNAPSHOT_TYPES
+        if self._symbol in self._pc._avg_daily_volumes:
+            yield 'avg_daily_volume'
+
+    def __len__(self):
+        return len(SNAPSHOT_TYPES) + (self._symbol in self._pc._avg_daily_volumes)
+
+
+class _CacheView(MutableMapping):
+    """
+    Compatibility shim: PriceCache.cache as the old {symbol: {slot: snapshot}} dict.
+
+    Reads materialize snapshots from the rings; assigning a whole symbol dict (as the
+    backtests do) rebuilds that symbol's ring.
+    """
+
+    def __init__(self, price_cache: 'PriceCache'):
+        self._pc = price_cache
+
+    def __getitem__(self, symbol):
+        if symbol not in self:
+            raise KeyError(symbol)
+        return _SymbolView(self._pc, symbol)
+
+    def __setitem__(self, symbol, slots):
+        self._pc._import_symbol(symbol, dict(slots))
+
+    def __delitem__(self, symbol):
+        pc = self._pc
+        with pc._lock:
+            if symbol not in self:
+                raise KeyError(symbol)
+            pc._rings.pop(symbol, None)
+            pc._avg_daily_volumes.pop(symbol, None)
+
+    def __contains__(self, symbol):
+        return symbol in self._pc._rings or symbol in self._pc._avg_daily_volumes
+
+    def __iter__(self):
+        pc = self._pc
+        return iter(list(pc._rings) + [s for s in pc._avg_daily_volumes if s not in pc._rings])
+
+    def __len__(self):
+        pc = self._pc
+        return len(pc._rings) + sum(1 for s in pc._avg_daily_volumes if s not in pc._rings)
+
+    def to_dict(self) -> Dict:
+        """Plain-dict copy in the legacy layout (JSON backup, debugging)."""
+        return {symbol: dict(self[symbol]) for symbol in self}
+
 class PriceCache:
     """
-    Manages price cache with last 7 snapshots for each stock (for 30-minute comparison).
-    Also tracks volume data for volume spike detection.
+    Manages price cache with the last PRICE_CACHE_RING_DEPTH snapshots for each stock
+    (7+ needed for the 30-minute comparison). Also tracks volume data for volume spike detection.
+
+    Each symbol is one SnapshotRing; get_snapshot(symbol, lookback) reads any point
+    in O(1). The named slots below are lookbacks into that ring (SLOT_LOOKBACK), and
+    `cache` still presents them as the legacy structure (read/write):
 
     Structure: {
         "stock_symbol": {
@@ -28,6 +228,11 @@ class PriceCache:
             "avg_daily_volume": int  # Average daily volume for liquidity filtering
         }
     }
+
+    Persistence: only symbols changed since the last save are written (dirty set).
+    update_price() still saves immediately, unless it runs inside batch() /
+    update_prices_bulk() (one save at the end) or PRICE_CACHE_WRITE_BEHIND is on
+    (a background thread saves every PRICE_CACHE_FLUSH_INTERVAL_SEC).
     """
 
     def __init__(self):
@@ -36,11 +241,30 @@ class PriceCache:
         self.use_sqlite = config.ENABLE_SQLITE_CACHE
         self.db_conn = None
 
+        # Dirty tracking: symbols whose snapshots changed since the last save.
+        # _lock guards cache + dirty set, _db_lock serializes writes on db_conn.
+        self._dirty = set()
+        self._batch_depth = 0
+        self._lock = threading.RLock()
+        self._db_lock = threading.Lock()
+        self.write_behind = config.PRICE_CACHE_WRITE_BEHIND
+        self._flusher = None
+        self._flusher_stop = threading.Event()
+
         # Initialize SQLite database
         if self.use_sqlite:
             self._init_database()
 
-        self.cache = self._load_cache()
+        # One ring per symbol; avg daily volumes kept beside them
+        self.ring_depth = max(config.PRICE_CACHE_RING_DEPTH, _MIN_RING_DEPTH)
+        self._rings: Dict[str, SnapshotRing] = {}
+        self._avg_daily_volumes: Dict[str, int] = {}
+        self.cache = _CacheView(self)
+        for symbol, slots in self._load_cache().items():
+            self._import_symbol(symbol, slots, mark_dirty=False)
+
+        if self.write_behind:
+            self._start_flusher()
 
     def _init_database(self):
         """
@@ -217,8 +441,114 @@ class PriceCache:
             logger.error(f"Failed to load from SQLite: {e}")
             return {}
 
-    def _save_to_sqlite(self):
-        """Save in-memory cache to SQLite database using transactions"""
+    def _collect_rows(self, symbols: Optional[Iterable[str]] = None) -> Tuple[List[tuple], List[tuple]]:
+        """
+        Build snapshot / avg-volume rows for the given symbols (all if None).
+
+        Args:
+            symbols: Symbols to collect; None collects the whole cache
+
+        Returns:
+            (snapshot_rows, volume_rows) ready for executemany
+        """
+        snapshot_rows = []
+        volume_rows = []
+        with self._lock:
+            if symbols is None:
+                symbols = list(self.cache)
+            for symbol in symbols:
+                # Collect the named snapshots of this symbol (legacy row layout)
+                ring = self._rings.get(symbol)
+                if ring is not None:
+                    for snapshot_type in SNAPSHOT_TYPES:
+                        point = ring.get(SLOT_LOOKBACK[snapshot_type])
+                        if point is not None:
+                            price, volume, time_us = point
+                            snapshot_rows.append((symbol, snapshot_type, price, volume,
+                                                  _us_to_timestamp(time_us)))
+
+                # Collect avg daily volume
+                if symbol in self._avg_daily_volumes:
+                    volume_rows.append((symbol, self._avg_daily_volumes[symbol]))
+        return snapshot_rows, volume_rows
+
+    def _ring(self, symbol: str) -> SnapshotRing:
+        """Ring for `symbol`, created empty on first use (caller holds _lock)."""
+        ring = self._rings.get(symbol)
+        if ring is None:
+            ring = self._rings[symbol] = SnapshotRing(self.ring_depth)
+        return ring
+
+    @staticmethod
+    def _time_us(timestamp: Optional[str]) -> int:
+        """ISO timestamp -> ring time (microseconds); missing/unparseable -> now."""
+        if timestamp:
+            try:
+                return _timestamp_to_us(timestamp)
+            except (TypeError, ValueError):
+                logger.warning(f"Unparseable snapshot timestamp {timestamp!r} - using now")
+        return _timestamp_to_us(datetime.now().isoformat())
+
+    @classmethod
+    def _point(cls, snapshot: Dict) -> Tuple[float, int, int]:
+        """Legacy snapshot dict -> (price, volume, time_us) ring point."""
+        return (float(snapshot.get('price', 0.0)), int(snapshot.get('volume', 0) or 0),
+                cls._time_us(snapshot.get('timestamp')))
+
+    def _import_symbol(self, symbol: str, slots: Dict, mark_dirty: bool = True):
+        """
+        Rebuild a symbol's ring from legacy named slots (loaded rows, JSON, direct assignment).
+
+        Lookback 1 comes from "previous" or "previous_1min", whichever is newer; the
+        chain stops at the first missing slot.
+        """
+        lookbacks = [slots.get('current')]
+        candidates = [p for p in (slots.get('previous'), slots.get('previous_1min')) if p]
+        lookbacks.append(max(candidates, key=lambda p: self._point(p)[2]) if candidates else None)
+        lookbacks.extend(slots.get(f'previous{k}') for k in range(2, _MIN_RING_DEPTH))
+
+        chain = []
+        for snapshot in lookbacks:
+            if not snapshot or not isinstance(snapshot, dict):
+                break
+            chain.append(self._point(snapshot))
+
+        with self._lock:
+            ring = SnapshotRing(self.ring_depth)
+            for point in reversed(chain):
+                ring.push(*point)
+            self._rings[symbol] = ring
+            if 'avg_daily_volume' in slots:
+                self._avg_daily_volumes[symbol] = slots['avg_daily_volume']
+            if mark_dirty:
+                self._dirty.add(symbol)
+
+    def _slot(self, symbol: str, slot: str) -> Optional[Dict]:
+        """Named snapshot (see SLOT_LOOKBACK) of a symbol, or None."""
+        ring = self._rings.get(symbol)
+        return ring.snapshot(SLOT_LOOKBACK[slot]) if ring is not None else None
+
+    def get_snapshot(self, symbol: str, lookback: int = 0) -> Optional[Dict]:
+        """
+        Snapshot `lookback` updates ago (0 = current) - O(1) for any depth.
+
+        Args:
+            symbol: Stock symbol
+            lookback: Updates ago (< PRICE_CACHE_RING_DEPTH)
+
+        Returns:
+            {"price", "volume", "timestamp"} or None if there is no such point
+        """
+        ring = self._rings.get(symbol)
+        return ring.snapshot(lookback) if ring is not None else None
+
+    def get_history_length(self, symbol: str) -> int:
+        """Number of snapshots held for a symbol (<= PRICE_CACHE_RING_DEPTH)."""
+        ring = self._rings.get(symbol)
+        return len(ring) if ring is not None else 0
+
+    def _save_to_sqlite(self, snapshot_rows: List[tuple], volume_rows: List[tuple]):
+        """Upsert the given snapshot / avg-volume rows into SQLite in one transaction"""
         if not self.db_conn:
             logger.warning("SQLite not initialized, skipping save")
             return
@@ -237,34 +567,8 @@ class PriceCache:
                     f"Long lock wait: {lock_wait_duration:.2f}s for {self.__class__.__name__}"
                 )
 
-            # Prepare snapshot rows for bulk upsert (REPLACE INTO = atomic DELETE+INSERT per row)
-            # This is 5-10x faster than full table DELETE + bulk INSERT because:
-            # - No full table scan for DELETE
-            # - Only replaces rows that exist (by UNIQUE constraint: symbol, snapshot_type)
-            # - Inserts new rows if they don't exist
-            # - Reduces exclusive lock duration from 2-5s to 0.3-0.5s
-            snapshot_rows = []
-            volume_rows = []
-
-            for symbol, data in self.cache.items():
-                # Collect all snapshots for this symbol
-                for snapshot_type in ['current', 'previous_1min', 'previous',
-                                      'previous2', 'previous3', 'previous4',
-                                      'previous5', 'previous6']:
-                    snapshot = data.get(snapshot_type)
-                    if snapshot and isinstance(snapshot, dict):
-                        snapshot_rows.append((
-                            symbol,
-                            snapshot_type,
-                            snapshot.get('price', 0.0),
-                            snapshot.get('volume', 0),
-                            snapshot.get('timestamp', datetime.now().isoformat())
-                        ))
-
-                # Collect avg daily volume
-                if 'avg_daily_volume' in data:
-                    volume_rows.append((symbol, data['avg_daily_volume']))
-
+            # Bulk upsert (REPLACE INTO = atomic DELETE+INSERT per row, keyed by
+            # UNIQUE(symbol, snapshot_type)) - only the rows passed in are touched.
             # Bulk upsert using REPLACE INTO (much faster than DELETE+INSERT)
             if snapshot_rows:
                 self.db_conn.executemany("""
@@ -310,7 +614,7 @@ class PriceCache:
             logger.error(f"Unexpected error during SQLite save: {e}")
             raise
 
-    def _save_to_sqlite_with_retry(self):
+    def _save_to_sqlite_with_retry(self, snapshot_rows: List[tuple], volume_rows: List[tuple]):
         """
         Save to SQLite with retry logic for lock contention.
         Handles temporary database locks from concurrent services (stock_monitor, atr_monitor, nifty_option_monitor).
@@ -319,7 +623,7 @@ class PriceCache:
 
         for attempt in range(max_retries):
             try:
-                self._save_to_sqlite()
+                self._save_to_sqlite(snapshot_rows, volume_rows)
                 return  # Success - exit retry loop
             except sqlite3.OperationalError as e:
                 # Retry only on lock errors, and only if we have retries left
@@ -460,21 +764,34 @@ class PriceCache:
         logger.info("Starting with empty cache")
         return {}
 
-    def _save_cache(self):
+    def _save_cache(self, full: bool = False):
         """
-        Save cache to SQLite storage.
+        Save changed symbols to SQLite storage.
 
         DATA ACCURACY FIRST: SQLite save failures are raised, not silently ignored.
-        JSON backup is optional but SQLite success is required.
+        JSON backup is optional but SQLite success is required. Symbols whose save
+        failed stay dirty, so the next save retries them.
+
+        Args:
+            full: Rewrite every symbol, not just the dirty ones
 
         Raises:
             RuntimeError: If SQLite save fails after retries
         """
+        with self._lock:
+            symbols, self._dirty = self._dirty, set()
+        if not symbols and not full:
+            return
+
         # Save to SQLite (primary) with retry logic for lock contention
         if self.use_sqlite and self.db_conn:
             try:
-                self._save_to_sqlite_with_retry()
+                snapshot_rows, volume_rows = self._collect_rows(None if full else symbols)
+                with self._db_lock:
+                    self._save_to_sqlite_with_retry(snapshot_rows, volume_rows)
             except Exception as e:
+                with self._lock:
+                    self._dirty |= symbols
                 # DATA ACCURACY: Do NOT silently continue
                 error_msg = f"CRITICAL: SQLite save failed after retries: {e}"
                 logger.error(error_msg)
@@ -483,13 +800,70 @@ class PriceCache:
         # Save to JSON (optional backup - only for debugging/migration purposes)
         if config.ENABLE_JSON_BACKUP:
             try:
+                with self._lock:
+                    payload = json.dumps(self.cache.to_dict(), indent=2)
                 os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
                 with open(self.cache_file, 'w') as f:
-                    json.dump(self.cache, f, indent=2)
+                    f.write(payload)
             except Exception as e:
                 # JSON backup failure is logged but not fatal
                 logger.warning(f"JSON backup failed (non-fatal): {e}")
 
+    def _request_save(self):
+        """Save now, unless a batch() is open or write-behind will pick it up."""
+        if self._batch_depth == 0 and not self.write_behind:
+            self._save_cache()
+
+    @contextmanager
+    def batch(self):
+        """
+        Defer persistence of every update inside the block to one save at the end.
+
+        Usage:
+            with price_cache.batch():
+                for symbol, quote in quotes.items():
+                    price_cache.update_price(symbol, quote['price'], quote['volume'])
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                done = self._batch_depth == 0
+            if done:
+                self._request_save()
+
+    def flush(self):
+        """Persist pending (dirty) changes now."""
+        self._save_cache()
+
+    def _start_flusher(self):
+        """Start the write-behind thread (saves dirty symbols every PRICE_CACHE_FLUSH_INTERVAL_SEC)."""
+        def _run():
+            while not self._flusher_stop.wait(config.PRICE_CACHE_FLUSH_INTERVAL_SEC):
+                try:
+                    self._save_cache()
+                except Exception as e:
+                    logger.error(f"Price cache write-behind flush failed (will retry): {e}")
+
+        self._flusher = threading.Thread(target=_run, name="price-cache-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+        logger.info(f"Price cache write-behind enabled (every {config.PRICE_CACHE_FLUSH_INTERVAL_SEC}s)")
+
+    def close(self):
+        """Stop the write-behind thread (if any) and persist pending changes."""
+        if self._flusher is not None:
+            self._flusher_stop.set()
+            self._flusher.join(timeout=5)
+            self._flusher = None
+        try:
+            self._save_cache()
+        except RuntimeError as e:
+            logger.error(f"Price cache final flush failed: {e}")
+
     def _is_same_day(self, timestamp1: str, timestamp2: str) -> bool:
         """
         Check if two timestamps are from the same calendar day
@@ -511,7 +885,8 @@ class PriceCache:
 
     def update_price(self, symbol: str, price: float, volume: int = 0, timestamp: str = None):
         """
-        Update price and volume for a stock. Shifts all 7 snapshots.
+        Update price and volume for a stock. Pushes onto the symbol's ring, so the
+        old current becomes previous, previous becomes previous2, ... (O(1), no copying).
 
         Args:
             symbol: Stock symbol
@@ -519,37 +894,19 @@ class PriceCache:
             volume: Current trading volume
             timestamp: ISO format timestamp (defaults to now)
         """
-        if timestamp is None:
-            timestamp = datetime.now().isoformat()
-
-        if symbol not in self.cache:
-            # First time seeing this stock
-            self.cache[symbol] = {
-                "current": {"price": price, "volume": volume, "timestamp": timestamp},
-                "previous": None,
-                "previous2": None,
-                "previous3": None,
-                "previous4": None,
-                "previous5": None,
-                "previous6": None
-            }
-        else:
-            # Shift all snapshots: prev6 <- prev5 <- ... <- prev <- current <- new
-            self.cache[symbol]["previous6"] = self.cache[symbol].get("previous5")
-            self.cache[symbol]["previous5"] = self.cache[symbol].get("previous4")
-            self.cache[symbol]["previous4"] = self.cache[symbol].get("previous3")
-            self.cache[symbol]["previous3"] = self.cache[symbol].get("previous2")
-            self.cache[symbol]["previous2"] = self.cache[symbol].get("previous")
-            self.cache[symbol]["previous"] = self.cache[symbol]["current"]
-            self.cache[symbol]["current"] = {"price": price, "volume": volume, "timestamp": timestamp}
+        with self._lock:
+            # Shift is implicit: the new point becomes lookback 0, current becomes previous, ...
+            self._ring(symbol).push(price, volume, self._time_us(timestamp))
+            self._dirty.add(symbol)
 
-        self._save_cache()
+        self._request_save()
 
     def update_price_1min(self, symbol: str, price: float, volume: int = 0, timestamp: str = None):
         """
-        Update price and volume for 1-minute monitoring (separate from 5-min updates).
-        This method only updates current and previous_1min snapshots.
-        Does NOT shift the 5-minute snapshots (previous, previous2, etc.)
+        Update price and volume for 1-minute monitoring: the old current becomes previous_1min.
+
+        Same ring push as update_price() - a cache instance is driven at one cadence
+        (onemin_monitor owns its own PriceCache), so lookback 1 is "1 minute ago" here.
 
         Args:
             symbol: Stock symbol
@@ -557,27 +914,36 @@ class PriceCache:
             volume: Current trading volume
             timestamp: ISO format timestamp (defaults to now)
         """
+        with self._lock:
+            # Current becomes previous_1min (lookback 1), the new point is current
+            self._ring(symbol).push(price, volume, self._time_us(timestamp))
+            self._dirty.add(symbol)
+
+        self._request_save()
+
+    def update_prices_bulk(self, prices: Dict[str, Tuple[float, int]], timestamp: str = None,
+                           interval: str = "5min") -> int:
+        """
+        Update many symbols and persist them with a single save.
+
+        Args:
+            prices: {symbol: (price, volume)}
+            timestamp: ISO format timestamp shared by all updates (defaults to now)
+            interval: "5min" (update_price) or "1min" (update_price_1min)
+
+        Returns:
+            Number of symbols updated
+        """
+        if interval not in ("5min", "1min"):
+            raise ValueError(f"interval must be '5min' or '1min', got {interval!r}")
         if timestamp is None:
             timestamp = datetime.now().isoformat()
 
-        if symbol not in self.cache:
-            # First time seeing this stock - initialize all fields
-            self.cache[symbol] = {
-                "current": {"price": price, "volume": volume, "timestamp": timestamp},
-                "previous_1min": None,
-                "previous": None,
-                "previous2": None,
-                "previous3": None,
-                "previous4": None,
-                "previous5": None,
-                "previous6": None
-            }
-        else:
-            # Save current as previous_1min, then update current
-            self.cache[symbol]["previous_1min"] = self.cache[symbol]["current"]
-            self.cache[symbol]["current"] = {"price": price, "volume": volume, "timestamp": timestamp}
-
-        self._save_cache()
+        update = self.update_price if interval == "5min" else self.update_price_1min
+        with self.batch():
+            for symbol, (price, volume) in prices.items():
+                update(symbol, price, volume, timestamp)
+        return len(prices)
 
     def get_price_1min_ago(self, symbol: str) -> Optional[float]:
         """
@@ -590,8 +956,8 @@ class PriceCache:
         if symbol not in self.cache:
             return None
 
-        current = self.cache[symbol].get("current")
-        previous_1min = self.cache[symbol].get("previous_1min")
+        current = self._slot(symbol, "current")
+        previous_1min = self._slot(symbol, "previous_1min")
 
         if not current or not previous_1min:
             return None
@@ -638,8 +1004,8 @@ class PriceCache:
         if symbol not in self.cache:
             return None, None
 
-        current = self.cache[symbol].get("current")
-        previous_1min = self.cache[symbol].get("previous_1min")
+        current = self._slot(symbol, "current")
+        previous_1min = self._slot(symbol, "previous_1min")
 
         current_price = current.get("price") if current else None
 
@@ -690,8 +1056,8 @@ class PriceCache:
                 "volume_spike": False
             }
 
-        current = self.cache[symbol].get("current")
-        previous_1min = self.cache[symbol].get("previous_1min")
+        current = self._slot(symbol, "current")
+        previous_1min = self._slot(symbol, "previous_1min")
 
         # DEBUG: Log snapshot availability
         has_current = current is not None
@@ -765,21 +1131,26 @@ class PriceCache:
         deltas = []
 
         if interval_minutes == 1:
-            # For 1-minute: calculate deltas between consecutive snapshots
-            # Use: current, previous_1min, previous (5min ago)
-            snapshots = []
-            for key in ['current', 'previous_1min', 'previous']:
-                snapshot = self.cache[symbol].get(key)
-                if snapshot and snapshot.get('volume', 0) > 0:
-                    snapshots.append(snapshot.get('volume', 0))
-
-            logger.debug(f"[DEBUG] {symbol}: Collected {len(snapshots)} snapshots for avg delta calculation")
-
-            # Calculate deltas between consecutive snapshots
-            for i in range(len(snapshots) - 1):
-                delta = snapshots[i] - snapshots[i+1]
-                if delta > 0:  # Valid increasing delta
-                    deltas.append(delta)
+            # For 1-minute: deltas between consecutive 1-min snapshots over the last
+            # 5 minutes (current back to 5 updates ago), same-day pairs only.
+            # (With the ring, "previous" is also the update before current, so the
+            # old current / previous_1min / previous triple held a single delta and
+            # the average always equalled the current delta - no spike could fire.)
+            ring = self._rings.get(symbol)
+            points = []
+            for lookback in range(VOLUME_AVG_1MIN_MINUTES + 1):
+                point = ring.get(lookback) if ring is not None else None
+                if point is None:
+                    break
+                points.append(point)
+
+            logger.debug(f"[DEBUG] {symbol}: Collected {len(points)} snapshots for avg delta calculation")
+
+            for (_, newer_volume, newer_us), (_, older_volume, older_us) in zip(points, points[1:]):
+                if newer_volume > 0 and older_volume > 0 and newer_us // _DAY_US == older_us // _DAY_US:
+                    delta = newer_volume - older_volume
+                    if delta > 0:  # Valid increasing delta
+                        deltas.append(delta)
 
             logger.debug(f"[DEBUG] {symbol}: Calculated {len(deltas)} valid deltas from snapshots")
 
@@ -793,8 +1164,8 @@ class PriceCache:
             ]
 
             for curr_key, prev_key in snapshot_pairs:
-                curr = self.cache[symbol].get(curr_key)
-                prev = self.cache[symbol].get(prev_key)
+                curr = self._slot(symbol, curr_key)
+                prev = self._slot(symbol, prev_key)
 
                 if curr and prev:
                     curr_vol = curr.get('volume', 0)
@@ -824,20 +1195,10 @@ class PriceCache:
             symbol: Stock symbol
             avg_daily_volume: Average daily volume
         """
-        if symbol not in self.cache:
-            self.cache[symbol] = {
-                "current": None,
-                "previous_1min": None,
-                "previous": None,
-                "previous2": None,
-                "previous3": None,
-                "previous4": None,
-                "previous5": None,
-                "previous6": None
-            }
-
-        self.cache[symbol]["avg_daily_volume"] = avg_daily_volume
-        self._save_cache()
+        with self._lock:
+            self._avg_daily_volumes[symbol] = avg_daily_volume
+            self._dirty.add(symbol)
+        self._request_save()
 
     def get_avg_daily_volume(self, symbol: str) -> Optional[int]:
         """
@@ -846,10 +1207,7 @@ class PriceCache:
         Returns:
             Average daily volume, or None if not available
         """
-        if symbol not in self.cache:
-            return None
-
-        return self.cache[symbol].get("avg_daily_volume")
+        return self._avg_daily_volumes.get(symbol)
 
     def get_prices(self, symbol: str) -> Tuple[Optional[float], Optional[float]]:
         """
@@ -863,8 +1221,8 @@ class PriceCache:
         if symbol not in self.cache:
             return None, None
 
-        current = self.cache[symbol].get("current")
-        previous2 = self.cache[symbol].get("previous2")  # 10 minutes ago
+        current = self._slot(symbol, "current")
+        previous2 = self._slot(symbol, "previous2")  # 10 minutes ago
 
         current_price = current["price"] if current else None
 
@@ -916,8 +1274,8 @@ class PriceCache:
         if symbol not in self.cache:
             return None, None
 
-        current = self.cache[symbol].get("current")
-        previous = self.cache[symbol].get("previous")  # 5 minutes ago
+        current = self._slot(symbol, "current")
+        previous = self._slot(symbol, "previous")  # 5 minutes ago
 
         current_price = current["price"] if current else None
 
@@ -969,8 +1327,8 @@ class PriceCache:
         if symbol not in self.cache:
             return None, None
 
-        current = self.cache[symbol].get("current")
-        previous6 = self.cache[symbol].get("previous6")  # 30 minutes ago
+        current = self._slot(symbol, "current")
+        previous6 = self._slot(symbol, "previous6")  # 30 minutes ago
 
         current_price = current["price"] if current else None
 
@@ -1024,11 +1382,11 @@ class PriceCache:
         # Get all available volumes
         volumes = []
         for key in ["previous6", "previous5", "previous4", "previous3", "previous2", "previous"]:
-            snapshot = self.cache[symbol].get(key)
+            snapshot = self._slot(symbol, key)
             if snapshot and "volume" in snapshot:
                 volumes.append(snapshot["volume"])
 
-        current = self.cache[symbol].get("current")
+        current = self._slot(symbol, "current")
         current_volume = current.get("volume", 0) if current else 0
 
         # Calculate average from historical volumes
@@ -1067,8 +1425,8 @@ class PriceCache:
                 "volume_spike": False
             }
 
-        current = self.cache[symbol].get("current")
-        previous = self.cache[symbol].get("previous")  # 5 minutes ago
+        current = self._slot(symbol, "current")
+        previous = self._slot(symbol, "previous")  # 5 minutes ago
 
         current_volume = current.get("volume", 0) if current else 0
         previous_volume = 0
@@ -1118,9 +1476,9 @@ class PriceCache:
                 "volume_spike": False
             }
 
-        current = self.cache[symbol].get("current")
-        previous = self.cache[symbol].get("previous")    # 5 min ago
-        previous2 = self.cache[symbol].get("previous2")  # 10 min ago
+        current = self._slot(symbol, "current")
+        previous = self._slot(symbol, "previous")    # 5 min ago
+        previous2 = self._slot(symbol, "previous2")  # 10 min ago
 
         current_volume = current.get("volume", 0) if current else 0
 
@@ -1179,14 +1537,14 @@ class PriceCache:
                 "volume_spike": False
             }
 
-        current = self.cache[symbol].get("current")
+        current = self._slot(symbol, "current")
         current_volume = current.get("volume", 0) if current else 0
 
         # Get all available volumes from last 30 minutes
         # Only include volumes from the same day as current
         volumes = []
         for key in ["previous", "previous2", "previous3", "previous4", "previous5", "previous6"]:
-            snapshot = self.cache[symbol].get(key)
+            snapshot = self._slot(symbol, key)
             if current and snapshot and "volume" in snapshot:
                 current_timestamp = current.get("timestamp")
                 snapshot_timestamp = snapshot.get("timestamp")
@@ -1217,15 +1575,18 @@ class PriceCache:
         """Check if we have a 10-minute-ago price to compare against"""
         if symbol not in self.cache:
             return False
-        return self.cache[symbol].get("previous2") is not None
+        return self._slot(symbol, "previous2") is not None
 
     def has_30min_price(self, symbol: str) -> bool:
         """Check if we have a 30-minute-ago price to compare against"""
         if symbol not in self.cache:
             return False
-        return self.cache[symbol].get("previous6") is not None
+        return self._slot(symbol, "previous6") is not None
 
     def clear_cache(self):
         """Clear all cached data"""
-        self.cache = {}
-        self._save_cache()
+        with self._lock:
+            self._rings.clear()
+            self._avg_daily_volumes.clear()
+            self._dirty.clear()
+        self._save_cache(full=True)
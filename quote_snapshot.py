@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Quote Snapshot - Latest Quote Universe in Shared Memory
+
+The central collector writes every committed cycle's stock quotes into a
+memory-mapped NumPy structured array (QUOTE_SNAPSHOT_PATH); consumer services
+map the same file and read the whole universe without touching SQLite.
+
+Why:
+- Every launchd service opens its own reader connection to central_quotes.db
+  and each cycle runs get_latest_stock_quotes(), re-parsing the same ~200-row
+  latest_stock_quotes table into dicts - reader contention for data the
+  collector already had in memory.
+- Reading the mapped array is one memcpy of ~15 KB (microseconds).
+
+File layout:
+- 64-byte header: seq (u64, seqlock - odd while a write is in progress),
+  cycle minute (i64, minutes since epoch), published_at (f64), count (u32),
+  capacity (u32)
+- capacity x RECORD_DTYPE rows: symbol, price, volume, oi, oi_day_high,
+  oi_day_low, minute. A symbol keeps its row index for the life of the file
+  (new symbols are appended), and a symbol missing from a cycle keeps its last
+  row - the same semantics as the latest_stock_quotes table.
+
+Readers copy the rows and re-check seq (retrying if the collector wrote in
+between), so a read never mixes two cycles.
+
+Usage:
+    # Collector (after write_cycle commits)
+    get_quote_snapshot().publish(stock_quotes, timestamp)
+
+    # Consumer
+    snapshot = get_quote_snapshot()
+    if snapshot.age_minutes() <= 2:
+        quotes = snapshot.get_latest_stock_quotes(symbols)
+
+Date: 2026-10-16
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# seq (u64), cycle minute (i64), published_at epoch (f64), count (u32), capacity (u32)
+_HEADER = struct.Struct('<QqdII')
+_HEADER_SIZE = 64
+
+RECORD_DTYPE = np.dtype([
+    ('symbol', 'S24'),
+    ('price', '<f8'),
+    ('volume', '<i8'),
+    ('oi', '<i8'),
+    ('oi_day_high', '<i8'),
+    ('oi_day_low', '<i8'),
+    ('minute', '<i8'),      # minutes since epoch of the row's quote
+])
+
+
+def _to_minute(ts: datetime) -> int:
+    return int((ts - _EPOCH).total_seconds() // 60)
+
+
+def _from_minute(minute: int) -> datetime:
+    return _EPOCH + timedelta(minutes=int(minute))
+
+
+class QuoteSnapshot:
+    """Writer / reader handle on the shared latest-quote array."""
+
+    def __init__(self, path: Optional[str] = None, capacity: Optional[int] = None):
+        """
+        Args:
+            path: Shared file (default: config.QUOTE_SNAPSHOT_PATH)
+            capacity: Rows allocated when the writer creates the file
+                      (default: config.QUOTE_SNAPSHOT_CAPACITY)
+        """
+        self.path = path or config.QUOTE_SNAPSHOT_PATH
+        self.capacity = capacity or config.QUOTE_SNAPSHOT_CAPACITY
+        self._map: Optional[mmap.mmap] = None
+        self._rows: Optional[np.ndarray] = None
+        self._writable = False
+        self._lock = threading.Lock()
+        self._slots: Dict[str, int] = {}   # writer: symbol -> row index
+
+    # ------------------------------------------------------------------
+    # Mapping
+    # ------------------------------------------------------------------
+
+    def _open(self, writable: bool) -> Optional[mmap.mmap]:
+        if self._map is not None and (self._writable or not writable):
+            if writable or _HEADER.unpack_from(self._map, 0)[4] in (0, len(self._rows)):
+                return self._map
+            # The writer grew the file since this handle mapped it - remap
+        if writable:
+            size = _HEADER_SIZE + self.capacity * RECORD_DTYPE.itemsize
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                current = os.fstat(fd).st_size
+                if current < size:
+                    if current >= _HEADER_SIZE:
+                        # Grown: old readers keep their mapping, so start empty
+                        os.pwrite(fd, b'\0' * _HEADER_SIZE, 0)
+                    os.ftruncate(fd, size)
+                mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_WRITE)
+            finally:
+                os.close(fd)
+            capacity = (len(mapped) - _HEADER_SIZE) // RECORD_DTYPE.itemsize
+        else:
+            try:
+                fd = os.open(self.path, os.O_RDONLY)
+            except FileNotFoundError:
+                return None
+            try:
+                if os.fstat(fd).st_size < _HEADER_SIZE:
+                    return None
+                mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            finally:
+                os.close(fd)
+            capacity = _HEADER.unpack_from(mapped, 0)[4]
+            if capacity == 0 or len(mapped) < _HEADER_SIZE + capacity * RECORD_DTYPE.itemsize:
+                mapped.close()
+                return None
+        if self._map is not None:
+            self._rows = None
+            self._map.close()
+        self._map, self._writable = mapped, writable
+        self._rows = np.ndarray(capacity, dtype=RECORD_DTYPE, buffer=mapped, offset=_HEADER_SIZE)
+        return mapped
+
+    # ------------------------------------------------------------------
+    # WRITE PATH (central collector)
+    # ------------------------------------------------------------------
+
+    def publish(self, quotes: Dict[str, Dict], timestamp: datetime) -> int:
+        """
+        Write one committed cycle's quotes into the shared array.
+
+        Args:
+            quotes: {symbol: {price, volume, oi, oi_day_high, oi_day_low}}
+                    (the dict passed to write_cycle)
+            timestamp: Cycle timestamp (minute-level precision)
+
+        Returns:
+            Rows in the snapshot after the write
+        """
+        minute = _to_minute(timestamp)
+        with self._lock:
+            mapped = self._open(writable=True)
+            rows = self._rows
+            seq, _, _, count, _ = _HEADER.unpack_from(mapped, 0)
+            if not self._slots and count:
+                # Adopt the previous run's rows so indices stay stable for readers
+                self._slots = {s.decode(): i for i, s in enumerate(rows['symbol'][:count])}
+            count = len(self._slots)
+
+            seq = seq + 1 if seq % 2 == 0 else seq   # odd = write in progress
+            struct.pack_into('<Q', mapped, 0, seq)
+            for symbol, data in quotes.items():
+                slot = self._slots.get(symbol)
+                if slot is None:
+                    if count >= len(rows):
+                        logger.warning(f"Quote snapshot full ({len(rows)} rows) - skipping {symbol}")
+                        continue
+                    slot = self._slots[symbol] = count
+                    count += 1
+                rows[slot] = (symbol.encode(), data.get('price', 0) or 0, data.get('volume', 0) or 0,
+                              data.get('oi', 0) or 0, data.get('oi_day_high', 0) or 0,
+                              data.get('oi_day_low', 0) or 0, minute)
+            _HEADER.pack_into(mapped, 0, seq, minute, time.time(), count, len(rows))
+            struct.pack_into('<Q', mapped, 0, seq + 1)
+        return count
+
+    # ------------------------------------------------------------------
+    # READ PATH (consumer services)
+    # ------------------------------------------------------------------
+
+    def read(self) -> Optional[Tuple[datetime, np.ndarray]]:
+        """
+        Consistent copy of the snapshot.
+
+        Returns:
+            (cycle minute, RECORD_DTYPE array of `count` rows), or None if the
+            collector never published
+        """
+        with self._lock:
+            if self._open(writable=False) is None:
+                return None
+            mapped = self._map
+            for _ in range(100):
+                seq, minute, _, count, _ = _HEADER.unpack_from(mapped, 0)
+                if seq % 2 == 0:
+                    rows = self._rows[:count].copy()
+                    if struct.unpack_from('<Q', mapped, 0)[0] == seq:
+                        break
+                time.sleep(0)
+            else:
+                return None
+        if seq == 0:
+            return None
+        return _from_minute(minute), rows
+
+    def age_minutes(self, now: Optional[datetime] = None) -> Optional[int]:
+        """Whole minutes since the last published cycle (None if never published)."""
+        with self._lock:
+            if self._open(writable=False) is None:
+                return None
+            seq, minute = _HEADER.unpack_from(self._map, 0)[:2]
+        if seq == 0:
+            return None
+        return int(((now or datetime.now()) - _from_minute(minute)).total_seconds() // 60)
+
+    def get_latest_stock_quotes(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Latest quotes in the shape of CentralQuoteDB.get_latest_stock_quotes().
+
+        Args:
+            symbols: List of symbols (None = all stocks)
+
+        Returns:
+            Dict of {symbol: {price, volume, oi, oi_day_high, oi_day_low, timestamp}};
+            symbols not in the snapshot are absent
+        """
+        snapshot = self.read()
+        if snapshot is None:
+            return {}
+        _, rows = snapshot
+        wanted = set(symbols) if symbols else None
+        timestamps = {}   # rows share one or two minutes - format each once
+        quotes = {}
+        for symbol, price, volume, oi, oi_high, oi_low, minute in rows.tolist():
+            symbol = symbol.decode()
+            if wanted is not None and symbol not in wanted:
+                continue
+            timestamp = timestamps.get(minute)
+            if timestamp is None:
+                timestamp = timestamps[minute] = _from_minute(minute).strftime('%Y-%m-%d %H:%M:00')
+            quotes[symbol] = {
+                'price': price,
+                'volume': volume,
+                'oi': oi,
+                'oi_day_high': oi_high,
+                'oi_day_low': oi_low,
+                'timestamp': timestamp
+            }
+        return quotes
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._rows = None
+                self._map.close()
+                self._map = None
+
+
+_instance: Optional[QuoteSnapshot] = None
+_instance_lock = threading.Lock()
+
+
+def get_quote_snapshot() -> QuoteSnapshot:
+    """Process-wide QuoteSnapshot on config.QUOTE_SNAPSHOT_PATH."""
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = QuoteSnapshot()
+        return _instance
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Quote Window - In-Memory Rolling Store of the Session's 1-Minute Quotes
+
+Columnar NumPy ring buffer holding the last N minutes of price, volume and OI
+for every F&O symbol (plus NIFTY spot). The central collector appends each
+cycle's quotes in place right after storing them, and every detector that runs
+in central_data_collector_continuous.py reads from here instead of SQLite.
+
+Why:
+- RapidAlertDetector / EarlyWarningDetector called get_stock_quotes_at_batch,
+  ClosingWindowDetector called get_stock_history_since_batch, and the VWAP /
+  OBV / RSI filters called get_stock_history per symbol - every minute, for
+  data the collector had just written.
+- With the window, a detection cycle does no SQL reads at all. SQLite remains
+  the durable store; the window is warmed from it once at startup so a mid-day
+  restart sees the same history the DB has.
+
+API (all return the same shapes as the CentralQuoteDB reads they replace):
+- at(minutes_ago)            -> {symbol: {price, volume}}        (get_stock_quotes_at_batch)
+- since(ts)                  -> {symbol: [{timestamp, price, volume}]}
+                                                                 (get_stock_history_since_batch)
+- history(symbol, minutes)   -> [{timestamp, price, volume, oi}] (get_stock_history)
+- day_aggregates()           -> {symbol: {total_volume, day_high, day_low, candle_count}}
+                                                                 (get_stock_day_aggregates_batch)
+- day_open(not_before)       -> {symbol: {timestamp, price, volume, oi}}
+- price_at_time(symbol, ts)  -> float                            (get_stock_price_at_time)
+- nifty_latest() / nifty_since(ts)
+
+Memory: 3 arrays of (symbols x depth) - ~210 x 400 x 8 bytes x 3 = ~2 MB.
+
+Date: 2026-10-16
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Minute ordinals are counted from a naive epoch so they round-trip to the
+# 'YYYY-MM-DD HH:MM:00' strings stored in central_quotes.db without any tz math.
+_EPOCH = datetime(1970, 1, 1)
+_TS_FORMAT = '%Y-%m-%d %H:%M:00'
+
+TimeLike = Union[str, datetime]
+
+
+def _to_minute(ts: TimeLike) -> int:
+    """Convert a datetime or 'YYYY-MM-DD HH:MM[:SS]' string to a minute ordinal."""
+    if isinstance(ts, str):
+        ts = datetime.strptime(ts[:16], '%Y-%m-%d %H:%M')
+    return int((ts - _EPOCH).total_seconds() // 60)
+
+
+def _minute_to_str(minute: int) -> str:
+    """Inverse of _to_minute, formatted like stock_quotes.timestamp."""
+    return (_EPOCH + timedelta(minutes=int(minute))).strftime(_TS_FORMAT)
+
+
+class QuoteWindow:
+    """
+    Fixed-depth ring buffer of per-minute quotes for the whole universe.
+
+    Layout: one row per symbol, one column per minute slot. A slot holds the
+    quotes of exactly one collection minute; a symbol missing from that cycle
+    has NaN price in that slot. Slot minutes are tracked in a dict so any
+    minute lookup is O(1).
+    """
+
+    def __init__(self, depth: int = None, symbols: Optional[Iterable[str]] = None):
+        """
+        Initialize an empty window.
+
+        Args:
+            depth: Number of 1-minute slots kept (default: config.QUOTE_WINDOW_MINUTES).
+                   Must cover a full session (375 min) for day_aggregates()/since(09:15)
+                   to match the DB exactly.
+            symbols: Optional initial symbol universe (rows are added on demand anyway)
+        """
+        self.depth = depth or config.QUOTE_WINDOW_MINUTES
+        self._lock = threading.Lock()
+
+        self._index: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        capacity = 256
+        self._price = np.full((capacity, self.depth), np.nan, dtype=np.float64)
+        self._volume = np.zeros((capacity, self.depth), dtype=np.int64)
+        self._oi = np.zeros((capacity, self.depth), dtype=np.int64)
+
+        self._nifty = np.full(self.depth, np.nan, dtype=np.float64)
+        self._slot_minute = np.full(self.depth, -1, dtype=np.int64)
+        self._minute_slot: Dict[int, int] = {}
+        self._head = -1   # Slot of the most recent minute
+        self._count = 0   # Filled slots
+
+        for symbol in symbols or ():
+            self._row(symbol)
+
+    # ============================================
+    # WRITE PATH (Central Collector)
+    # ============================================
+
+    def _row(self, symbol: str) -> int:
+        """Return the row for a symbol, growing the arrays if it is new."""
+        row = self._index.get(symbol)
+        if row is not None:
+            return row
+
+        row = len(self._symbols)
+        if row >= self._price.shape[0]:
+            grow = self._price.shape[0]
+            self._price = np.vstack([self._price, np.full((grow, self.depth), np.nan)])
+            self._volume = np.vstack([self._volume, np.zeros((grow, self.depth), dtype=np.int64)])
+            self._oi = np.vstack([self._oi, np.zeros((grow, self.depth), dtype=np.int64)])
+
+        self._index[symbol] = row
+        self._symbols.append(symbol)
+        return row
+
+    def _slot_for(self, minute: int) -> int:
+        """Return the slot for a minute, claiming the next ring slot if it is new."""
+        slot = self._minute_slot.get(minute)
+        if slot is not None:
+            return slot
+
+        if self._count and minute < self._slot_minute[self._head]:
+            raise ValueError(f"QuoteWindow: {_minute_to_str(minute)} is older than the latest minute")
+
+        slot = (self._head + 1) % self.depth
+        evicted = int(self._slot_minute[slot])
+        if evicted >= 0:
+            self._minute_slot.pop(evicted, None)
+
+        self._price[:, slot] = np.nan
+        self._volume[:, slot] = 0
+        self._oi[:, slot] = 0
+        self._nifty[slot] = np.nan
+        self._slot_minute[slot] = minute
+        self._minute_slot[minute] = slot
+        self._head = slot
+        self._count = min(self._count + 1, self.depth)
+        return slot
+
+    def append(self, timestamp: datetime, quotes: Dict[str, Dict], nifty_price: Optional[float] = None):
+        """
+        Record one collection cycle. Same minute twice overwrites (like INSERT OR REPLACE).
+
+        A new trading day clears the window, so every slot always belongs to today.
+
+        Args:
+            timestamp: Collection timestamp (rounded to the minute, as the DB does)
+            quotes: {symbol: {price, volume, oi, ...}} exactly as passed to store_stock_quotes
+            nifty_price: NIFTY spot for the same minute, if it was stored
+        """
+        minute = _to_minute(timestamp)
+
+        with self._lock:
+            if self._count and (minute // 1440) != (int(self._slot_minute[self._head]) // 1440):
+                self._reset()
+
+            slot = self._slot_for(minute)
+            for symbol, data in quotes.items():
+                row = self._row(symbol)
+                self._price[row, slot] = data.get('price', 0) or 0
+                self._volume[row, slot] = data.get('volume', 0) or 0
+                self._oi[row, slot] = data.get('oi', 0) or 0
+
+            if nifty_price is not None:
+                self._nifty[slot] = nifty_price
+
+    def append_nifty(self, timestamp: datetime, nifty_price: float):
+        """Record a NIFTY price for a minute whose stock quotes were not stored."""
+        with self._lock:
+            if self._count and (_to_minute(timestamp) // 1440) != (int(self._slot_minute[self._head]) // 1440):
+                self._reset()
+            self._nifty[self._slot_for(_to_minute(timestamp))] = nifty_price
+
+    def reset(self):
+        """Drop every slot (symbol rows are kept)."""
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self._price[:] = np.nan
+        self._volume[:] = 0
+        self._oi[:] = 0
+        self._nifty[:] = np.nan
+        self._slot_minute[:] = -1
+        self._minute_slot = {}
+        self._head = -1
+        self._count = 0
+
+    def load_from_db(self, db, now: Optional[datetime] = None) -> int:
+        """
+        Warm the window with today's rows from central_quotes.db.
+
+        Called once at collector startup so a mid-session restart gives detectors
+        the same history the DB has. This is the only SQL read the window does.
+
+        Args:
+            db: CentralQuoteDB instance (writer or reader)
+            now: Clock override (default: datetime.now())
+
+        Returns:
+            Number of minute slots loaded
+        """
+        now = now or datetime.now()
+        oldest = now - timedelta(minutes=self.depth - 1)
+        since = max(oldest, now.replace(hour=0, minute=0, second=0, microsecond=0))
+        since_str = since.strftime(_TS_FORMAT)
+
+        history = db.get_all_stock_history_since(since_str)
+        nifty = {row['timestamp']: row['price'] for row in db.get_nifty_history_since(since_str)}
+
+        by_minute: Dict[str, Dict[str, Dict]] = {}
+        for symbol, rows in history.items():
+            for row in rows:
+                by_minute.setdefault(row['timestamp'], {})[symbol] = row
+
+        for ts_str in sorted(set(by_minute) | set(nifty)):
+            ts = datetime.strptime(ts_str, '%Y-%m-%d %H:%M:%S')
+            if ts_str in by_minute:
+                self.append(ts, by_minute[ts_str], nifty.get(ts_str))
+            else:
+                self.append_nifty(ts, nifty[ts_str])
+
+        logger.info(f"QuoteWindow: warmed {self._count} minutes x {len(self._symbols)} symbols from DB")
+        return self._count
+
+    # ============================================
+    # READ PATH (Detectors)
+    # ============================================
+
+    def _ordered_slots(self) -> np.ndarray:
+        """Filled slots, oldest first."""
+        if not self._count:
+            return np.empty(0, dtype=np.int64)
+        start = self._head - self._count + 1
+        return (start + np.arange(self._count)) % self.depth
+
+    def _rows(self, symbols: Optional[Iterable[str]]) -> List[tuple]:
+        """(symbol, row) pairs for the requested symbols that the window knows."""
+        if symbols is None:
+            return list(self._index.items())
+        return [(s, self._index[s]) for s in symbols if s in self._index]
+
+    def latest_minute(self) -> Optional[str]:
+        """Timestamp of the most recent slot, or None if empty."""
+        if not self._count:
+            return None
+        return _minute_to_str(self._slot_minute[self._head])
+
+    def at(self, minutes_ago: int, symbols: Optional[Iterable[str]] = None,
+           now: Optional[datetime] = None) -> Dict[str, Dict]:
+        """
+        Price and volume N minutes ago (same minute rounding as get_stock_quotes_at_batch).
+
+        Returns:
+            {symbol: {price, volume}}; symbols without a positive price are omitted
+        """
+        now = now or datetime.now()
+        target = _to_minute(now - timedelta(minutes=minutes_ago))
+
+        with self._lock:
+            slot = self._minute_slot.get(target)
+            if slot is None:
+                return {}
+            result = {}
+            for symbol, row in self._rows(symbols):
+                price = self._price[row, slot]
+                if price > 0:  # NaN compares False
+                    result[symbol] = {'price': float(price), 'volume': int(self._volume[row, slot])}
+            return result
+
+    def price_at_time(self, symbol: str, timestamp: TimeLike) -> Optional[float]:
+        """Price at an absolute minute, or None (same contract as get_stock_price_at_time)."""
+        with self._lock:
+            slot = self._minute_slot.get(_to_minute(timestamp))
+            row = self._index.get(symbol)
+            if slot is None or row is None:
+                return None
+            price = self._price[row, slot]
+            return None if np.isnan(price) else float(price)
+
+    def _series_since(self, since_minute: int, symbols: Optional[Iterable[str]],
+                      include_oi: bool) -> Dict[str, List[Dict]]:
+        slots = self._ordered_slots()
+        slots = slots[self._slot_minute[slots] >= since_minute]
+        if not len(slots):
+            return {}
+
+        ts_strs = [_minute_to_str(m) for m in self._slot_minute[slots]]
+        result: Dict[str, List[Dict]] = {}
+        for symbol, row in self._rows(symbols):
+            prices = self._price[row, slots]
+            present = np.flatnonzero(~np.isnan(prices))
+            if not len(present):
+                continue
+            volumes = self._volume[row, slots]
+            if include_oi:
+                ois = self._oi[row, slots]
+                result[symbol] = [{'timestamp': ts_strs[i], 'price': float(prices[i]),
+                                   'volume': int(volumes[i]), 'oi': int(ois[i])} for i in present]
+            else:
+                result[symbol] = [{'timestamp': ts_strs[i], 'price': float(prices[i]),
+                                   'volume': int(volumes[i])} for i in present]
+        return result
+
+    def since(self, since_time: TimeLike, symbols: Optional[Iterable[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Minute-by-minute history since a time (drop-in for get_stock_history_since_batch).
+
+        Returns:
+            {symbol: [{timestamp, price, volume}, ...]} oldest first
+        """
+        with self._lock:
+            return self._series_since(_to_minute(since_time), symbols, include_oi=False)
+
+    def history(self, symbol: str, minutes: int = 30, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Last N minutes for one symbol (drop-in for get_stock_history).
+
+        Returns:
+            [{timestamp, price, volume, oi}, ...] oldest first
+        """
+        now = now or datetime.now()
+        with self._lock:
+            series = self._series_since(_to_minute(now - timedelta(minutes=minutes)), [symbol], include_oi=True)
+        return series.get(symbol, [])
+
+    def day_aggregates(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """
+        Today's aggregates per symbol (drop-in for get_stock_day_aggregates_batch).
+
+        Volume in stock_quotes is Kite's cumulative day volume, so total_volume is its max.
+
+        Returns:
+            {symbol: {total_volume, day_high, day_low, candle_count}}
+        """
+        with self._lock:
+            slots = self._ordered_slots()
+            if not len(slots):
+                return {}
+            pairs = self._rows(symbols)
+            if not pairs:
+                return {}
+            rows = np.fromiter((row for _, row in pairs), dtype=np.int64, count=len(pairs))
+
+            prices = self._price[np.ix_(rows, slots)]
+            present = ~np.isnan(prices)
+            counts = present.sum(axis=1)
+            volumes = np.where(present, self._volume[np.ix_(rows, slots)], 0)
+            highs = np.where(present, prices, -np.inf).max(axis=1)
+            lows = np.where(present, prices, np.inf).min(axis=1)
+            max_volumes = volumes.max(axis=1)
+
+            result = {}
+            for i, (symbol, _) in enumerate(pairs):
+                if counts[i] == 0:
+                    continue
+                result[symbol] = {
+                    'total_volume': int(max_volumes[i]),
+                    'day_high': float(highs[i]),
+                    'day_low': float(lows[i]),
+                    'candle_count': int(counts[i])
+                }
+            return result
+
+    def day_open(self, symbols: Optional[Iterable[str]] = None, not_before: str = '09:15') -> Dict[str, Dict]:
+        """
+        First quote of the day at or after `not_before` (HH:MM) per symbol.
+
+        Returns:
+            {symbol: {timestamp, price, volume, oi}}
+        """
+        with self._lock:
+            slots = self._ordered_slots()
+            if not len(slots):
+                return {}
+            hour, minute = (int(x) for x in not_before.split(':'))
+            day_start = (int(self._slot_minute[self._head]) // 1440) * 1440 + hour * 60 + minute
+            slots = slots[self._slot_minute[slots] >= day_start]
+            if not len(slots):
+                return {}
+
+            result = {}
+            for symbol, row in self._rows(symbols):
+                present = np.flatnonzero(~np.isnan(self._price[row, slots]))
+                if not len(present):
+                    continue
+                slot = slots[present[0]]
+                result[symbol] = {
+                    'timestamp': _minute_to_str(self._slot_minute[slot]),
+                    'price': float(self._price[row, slot]),
+                    'volume': int(self._volume[row, slot]),
+                    'oi': int(self._oi[row, slot])
+                }
+            return result
+
+    def nifty_latest(self) -> Optional[Dict]:
+        """Most recent NIFTY price in the window: {timestamp, price} or None."""
+        with self._lock:
+            for slot in self._ordered_slots()[::-1]:
+                if not np.isnan(self._nifty[slot]):
+                    return {'timestamp': _minute_to_str(self._slot_minute[slot]),
+                            'price': float(self._nifty[slot])}
+            return None
+
+    def nifty_since(self, since_time: TimeLike) -> List[Dict]:
+        """NIFTY history since a time: [{timestamp, price}, ...] oldest first."""
+        since_minute = _to_minute(since_time)
+        with self._lock:
+            slots = self._ordered_slots()
+            slots = slots[self._slot_minute[slots] >= since_minute]
+            return [{'timestamp': _minute_to_str(self._slot_minute[s]), 'price': float(self._nifty[s])}
+                    for s in slots if not np.isnan(self._nifty[s])]
+
+    def __len__(self) -> int:
+        return self._count
@@ -27,6 +27,7 @@ from sector_manager import get_sector_manager
 
 if TYPE_CHECKING:
     from auto_trader import AutoTrader
+    from quote_window import QuoteWindow
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +39,8 @@ class RapidAlertDetector:
     Runs in central_data_collector_continuous.py after each collect_and_store() cycle.
     """
 
-    def __init__(self, central_db, alert_history, telegram, auto_trader: Optional['AutoTrader'] = None):
+    def __init__(self, central_db, alert_history, telegram, auto_trader: Optional['AutoTrader'] = None,
+                 quote_window: Optional['QuoteWindow'] = None):
         """
         Initialize detector with shared components.
 
@@ -47,8 +49,10 @@ class RapidAlertDetector:
             alert_history: AlertHistoryManager instance
             telegram: TelegramNotifier instance
             auto_trader: Optional AutoTrader instance for auto-trading on alerts
+            quote_window: Optional in-memory QuoteWindow (no SQL reads when provided)
         """
         self.db = central_db
+        self.window = quote_window
         self.alert_history = alert_history
         self.telegram = telegram
         self.auto_trader = auto_trader
@@ -109,8 +113,11 @@ class RapidAlertDetector:
         # Get symbols from current quotes
         symbols = list(current_quotes.keys())
 
-        # Batch query: Get prices AND volumes from 5 minutes ago for all symbols in ONE query
-        quotes_5min_ago = self.db.get_stock_quotes_at_batch(symbols, minutes_ago=5)
+        # Prices AND volumes from 5 minutes ago for all symbols (in-memory window, else ONE query)
+        if self.window is not None:
+            quotes_5min_ago = self.window.at(5, symbols)
+        else:
+            quotes_5min_ago = self.db.get_stock_quotes_at_batch(symbols, minutes_ago=5)
 
         if not quotes_5min_ago:
             logger.debug("RapidAlertDetector: No 5-min-ago data found (likely first 5 mins of collection)")
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Replay Harness - Run the Live Detector Stack Against a Recorded Day
+
+Streams a stored central_quotes.db day minute by minute into the REAL detector
+classes - RapidAlertDetector, EarlyWarningDetector, ClosingWindowDetector and
+AlertPnLTracker - wired exactly as central_data_collector_continuous.py wires
+them (QuoteWindow + IndicatorEngine fed first, then detection in live order).
+No Kite, no Telegram, no sleeping: a day runs as fast as the CPU allows.
+
+How:
+- Injected clock: each module's `datetime` / `date` is swapped for a subclass
+  whose now() / today() return the replay minute (+ DETECT_OFFSET_SEC, when
+  detection ran live). The window only ever holds minutes up to the clock.
+- Stubbed notifiers: a RecordingNotifier stands in for TelegramNotifier, and
+  requests.post (the detectors' direct Telegram sends) is recorded, not sent.
+- Live-only context is stubbed for determinism: quarterly-results labels,
+  sector context (today's cache file, not the replayed day's), Excel alert
+  logging and Drive sync. Alert history and the P&L workbook go to a temp dir.
+- Lot sizes for the P&L tracker come from data/lot_sizes.json (1 if missing).
+
+Reports the alerts each detector produced and the time spent in each detector
+(calls, total, mean, p95, max) - a regression and performance benchmark for
+the hot path. Several days can run in one process or across worker processes
+(the clock patch is process-wide, so days never share a process concurrently).
+
+Usage:
+    python3 replay_harness.py --date 2026-10-15
+    python3 replay_harness.py --all-days --workers 4 --json replay.json
+    python3 replay_harness.py --db /path/to/central_quotes.db --date 2026-10-14 --date 2026-10-15
+
+Date: 2026-10-16
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "data/central_quotes.db"
+LOT_SIZES_FILE = "data/lot_sizes.json"
+DETECT_OFFSET_SEC = 5  # Live detection runs a few seconds after the minute is stored
+
+# Modules whose module-level `datetime` / `date` names read the replay clock
+CLOCK_MODULES = (
+    'rapid_drop_detector',
+    'early_warning_detector',
+    'closing_window_detector',
+    'alert_pnl_tracker',
+    'alert_history_manager',
+    'quote_window',
+)
+
+DETECTORS = ('early_warning', 'rapid', 'closing_window', 'pnl_tracker')
+
+
+# ============================================
+# CLOCK / STUBS
+# ============================================
+
+class ReplayClock:
+    """The replay's notion of "now", handed to the detectors via datetime/date subclasses."""
+
+    def __init__(self, start: datetime):
+        self.now = start
+
+    def datetime_class(self):
+        clock = self
+
+        class ReplayDateTime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock.now if tz is None else clock.now.replace(tzinfo=tz)
+
+            @classmethod
+            def today(cls):
+                return clock.now
+
+        return ReplayDateTime
+
+    def date_class(self):
+        clock = self
+
+        class ReplayDate(date):
+            @classmethod
+            def today(cls):
+                return clock.now.date()
+
+        return ReplayDate
+
+
+class RecordingNotifier:
+    """Stands in for TelegramNotifier: every send is recorded and reported as delivered."""
+
+    bot_token = "replay"
+    channel_id = "replay"
+
+    def __init__(self, clock: ReplayClock):
+        self.clock = clock
+        self.sent: List[Dict] = []
+
+    def _record(self, kind: str, **payload) -> bool:
+        self.sent.append({'time': self.clock.now.strftime('%H:%M'), 'kind': kind, **payload})
+        return True
+
+    def send_alert(self, **kwargs) -> bool:
+        return self._record('alert', symbol=kwargs.get('symbol'), alert_type=kwargs.get('alert_type'))
+
+    def send_message(self, message: str, *args, **kwargs) -> bool:
+        return self._record('message', text=message[:80])
+
+    def send_debug(self, message: str, *args, **kwargs) -> bool:
+        return self._record('debug', text=message[:80])
+
+    def post(self, url, json=None, timeout=None, **kwargs):
+        """requests.post replacement for the detectors' direct Telegram sends."""
+        self._record('post', text=((json or {}).get('text') or '')[:80])
+        return _OkResponse()
+
+
+class _OkResponse:
+    status_code = 200
+    text = '{"ok": true}'
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return {'ok': True}
+
+
+class _LotSizeKite:
+    """Kite stand-in for AlertPnLTracker: NFO futures built from data/lot_sizes.json."""
+
+    def __init__(self, symbols: Iterable[str], lot_sizes: Dict[str, int]):
+        self._rows = [{'instrument_type': 'FUT', 'name': s, 'expiry': date(2099, 12, 31),
+                       'lot_size': lot_sizes.get(s, 1)} for s in symbols]
+
+    def instruments(self, exchange: str = None) -> List[Dict]:
+        return self._rows
+
+
+def load_lot_sizes(path: str = LOT_SIZES_FILE) -> Dict[str, int]:
+    try:
+        with open(path) as f:
+            return {k: int(v) for k, v in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+@contextmanager
+def _swapped(obj, name: str, value):
+    """Temporarily replace an attribute (restored even if the replay fails)."""
+    original = getattr(obj, name)
+    setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        setattr(obj, name, original)
+
+
+# ============================================
+# RECORDED DATA
+# ============================================
+
+def list_days(db_path: str) -> List[str]:
+    """Trading days present in stock_quotes, oldest first."""
+    from central_quote_db import CentralQuoteDB
+    db = CentralQuoteDB(db_path=db_path, mode='reader')
+    try:
+        rows = db.conn.execute("SELECT DISTINCT substr(timestamp, 1, 10) FROM stock_quotes ORDER BY 1").fetchall()
+        return [r[0] for r in rows]
+    finally:
+        db.close()
+
+
+def load_day(db, day: str) -> List[Tuple[datetime, Dict[str, Dict], Optional[float]]]:
+    """
+    One stored day as collection cycles.
+
+    Args:
+        db: CentralQuoteDB (reader)
+        day: 'YYYY-MM-DD'
+
+    Returns:
+        [(minute, {symbol: quote}, nifty_price or None)] oldest first - the same
+        quotes the collector handed to the detectors that minute
+    """
+    start, end = f"{day} 00:00:00", f"{day} 23:59:59"
+    by_minute: Dict[str, Dict[str, Dict]] = {}
+    for symbol, ts, price, volume, oi, oi_high, oi_low in db.conn.execute("""
+            SELECT symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low
+            FROM stock_quotes WHERE timestamp >= ? AND timestamp <= ?
+        """, (start, end)):
+        by_minute.setdefault(ts, {})[symbol] = {
+            'price': price, 'volume': volume or 0, 'oi': oi or 0,
+            'oi_day_high': oi_high or 0, 'oi_day_low': oi_low or 0,
+        }
+    nifty = dict(db.conn.execute(
+        "SELECT timestamp, price FROM nifty_quotes WHERE timestamp >= ? AND timestamp <= ?", (start, end)))
+
+    return [(datetime.strptime(ts, '%Y-%m-%d %H:%M:%S'), by_minute.get(ts, {}), nifty.get(ts))
+            for ts in sorted(set(by_minute) | set(nifty))]
+
+
+# ============================================
+# REPLAY
+# ============================================
+
+class _Timings:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {name: [] for name in DETECTORS}
+
+    @contextmanager
+    def measure(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append((time.perf_counter() - start) * 1000)
+
+    def summary(self) -> Dict[str, Dict]:
+        result = {}
+        for name, samples in self.samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result[name] = {
+                'calls': len(samples),
+                'total_ms': round(sum(samples), 2),
+                'mean_ms': round(statistics.fmean(samples), 3),
+                'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                'max_ms': round(ordered[-1], 3),
+            }
+        return result
+
+
+def replay_day(day: str, db_path: str = DEFAULT_DB_PATH, detectors: Optional[Iterable[str]] = None,
+               lot_sizes_file: str = LOT_SIZES_FILE) -> Dict:
+    """
+    Replay one stored day through the live detector stack.
+
+    Args:
+        day: 'YYYY-MM-DD'
+        db_path: Recorded central_quotes.db (opened read-only)
+        detectors: Subset of DETECTORS (default: those enabled in config, as live)
+        lot_sizes_file: JSON {symbol: lot_size} for the P&L tracker
+
+    Returns:
+        {day, minutes, wall_ms, alerts: [...], messages, timings: {detector: {...}}, pnl_trades}
+    """
+    import alert_history_manager
+    import alert_pnl_tracker
+    import early_warning_detector
+    import google_drive_sync
+    import rapid_drop_detector
+    import requests
+    from central_quote_db import CentralQuoteDB
+    from indicator_engine import IndicatorEngine
+    from quote_window import QuoteWindow
+
+    if detectors is None:
+        detectors = ['rapid']
+        if config.ENABLE_EARLY_WARNING:
+            detectors.append('early_warning')
+        if config.ENABLE_CLOSING_WINDOW_MONITOR:
+            detectors.append('closing_window')
+        if config.ENABLE_ALERT_PNL_TRACKER:
+            detectors.append('pnl_tracker')
+    detectors = set(detectors)
+
+    db = CentralQuoteDB(db_path=db_path, mode='reader')
+    cycles = load_day(db, day)
+    if not cycles:
+        db.close()
+        return {'day': day, 'minutes': 0, 'wall_ms': 0.0, 'alerts': [], 'messages': 0,
+                'timings': {}, 'pnl_trades': []}
+
+    clock = ReplayClock(cycles[0][0])
+    notifier = RecordingNotifier(clock)
+    timings = _Timings()
+    alerts: List[Dict] = []
+    tmpdir = tempfile.mkdtemp(prefix=f'replay_{day}_')
+
+    with ExitStack() as stack:
+        replay_datetime, replay_date = clock.datetime_class(), clock.date_class()
+        for name in CLOCK_MODULES:
+            module = sys.modules.get(name) or __import__(name)
+            if getattr(module, 'datetime', None) is datetime:
+                stack.enter_context(_swapped(module, 'datetime', replay_datetime))
+            if getattr(module, 'date', None) is date:
+                stack.enter_context(_swapped(module, 'date', replay_date))
+        stack.enter_context(_swapped(requests, 'post', notifier.post))
+        stack.enter_context(_swapped(google_drive_sync, 'sync_to_drive', lambda *a, **k: None))
+        for module in (rapid_drop_detector, early_warning_detector):
+            stack.enter_context(_swapped(module, 'get_results_label', lambda symbol: ''))
+        stack.enter_context(_swapped(rapid_drop_detector.RapidAlertDetector, '_get_sector_context',
+                                     lambda self, symbol, change: None))
+        stack.enter_context(_swapped(early_warning_detector.EarlyWarningDetector, '_get_sector_info',
+                                     lambda self, symbol: ''))
+        stack.enter_context(_swapped(config, 'ENABLE_EXCEL_LOGGING', False))
+        stack.enter_context(_swapped(config, 'ALERT_PNL_EXCEL_PATH', os.path.join(tmpdir, 'alert_pnl.xlsx')))
+        stack.callback(shutil.rmtree, tmpdir, True)
+        stack.callback(db.close)
+
+        from closing_window_detector import ClosingWindowDetector
+        from early_warning_detector import EarlyWarningDetector
+        from rapid_drop_detector import RapidAlertDetector
+
+        symbols = sorted({s for _, quotes, _ in cycles for s in quotes})
+        window = QuoteWindow(symbols=symbols)
+        indicators = IndicatorEngine() if config.ENABLE_INDICATOR_ENGINE else None
+        alert_history = alert_history_manager.AlertHistoryManager(
+            history_file=os.path.join(tmpdir, 'alert_history.json'))
+
+        rapid = RapidAlertDetector(db, alert_history, notifier, None, quote_window=window) \
+            if 'rapid' in detectors else None
+        early = EarlyWarningDetector(db, alert_history, notifier, quote_window=window, indicators=indicators) \
+            if 'early_warning' in detectors else None
+        closing = ClosingWindowDetector(db, alert_history, notifier, quote_window=window) \
+            if 'closing_window' in detectors else None
+        pnl = alert_pnl_tracker.AlertPnLTracker(db, notifier, _LotSizeKite(symbols, load_lot_sizes(lot_sizes_file)),
+                                                quote_window=window) \
+            if 'pnl_tracker' in detectors else None
+
+        def run(name: str, fn, *args):
+            sent_before = len(notifier.sent)
+            with timings.measure(name):
+                try:
+                    result = fn(*args)
+                except Exception as e:
+                    logger.error(f"Replay {day} {clock.now:%H:%M}: {name} failed: {e}")
+                    result = None
+            alerted = result.get('alerted_symbols', []) if isinstance(result, dict) else []
+            for alert in alerted:
+                alerts.append({'time': clock.now.strftime('%H:%M'), 'detector': name,
+                               'symbol': alert.get('symbol'), 'direction': alert.get('direction'),
+                               'alert_type': alert.get('alert_type'), 'price': alert.get('price')})
+            if name == 'closing_window':
+                for sent in notifier.sent[sent_before:]:
+                    alerts.append({'time': sent['time'], 'detector': name, 'symbol': None,
+                                   'direction': None, 'alert_type': 'closing_window', 'price': None,
+                                   'text': sent.get('text')})
+            return result
+
+        wall_start = time.perf_counter()
+        for minute, quotes, nifty_price in cycles:
+            clock.now = minute + timedelta(seconds=DETECT_OFFSET_SEC)
+
+            # Collector side: the stored minute goes into the window and the engine first
+            if quotes:
+                window.append(minute, quotes, nifty_price)
+                if indicators is not None:
+                    indicators.update(minute, quotes)
+            elif nifty_price is not None:
+                window.append_nifty(minute, nifty_price)
+
+            # Detection, in central_data_collector_continuous.py order
+            if quotes:
+                ew_stats = run('early_warning', early.detect_all, quotes) if early else None
+                rapid_stats = run('rapid', rapid.detect_all, quotes) if rapid else None
+                if closing:
+                    run('closing_window', closing.detect_all, quotes)
+                if pnl:
+                    with timings.measure('pnl_tracker'):
+                        for stats in (ew_stats, rapid_stats):
+                            if stats and stats.get('alerted_symbols'):
+                                pnl.record_alerts(stats['alerted_symbols'])
+            if pnl:
+                run('pnl_tracker', pnl.process_pending_prices)
+
+        if pnl:
+            run('pnl_tracker', pnl.send_eod_report)
+        wall_ms = (time.perf_counter() - wall_start) * 1000
+
+        pnl_trades = []
+        if pnl:
+            for trade in pnl._completed_trades + pnl._pending_trades:
+                pnl_trades.append({k: trade.get(k) for k in ('time', 'symbol', 'alert_type', 'direction',
+                                                             'entry_price', 'pnl_pct_15m', 'pnl_pct_30m')})
+
+    return {
+        'day': day,
+        'minutes': len(cycles),
+        'wall_ms': round(wall_ms, 1),
+        'alerts': alerts,
+        'messages': len(notifier.sent),
+        'timings': timings.summary(),
+        'pnl_trades': pnl_trades,
+    }
+
+
+def replay_days(days: List[str], db_path: str = DEFAULT_DB_PATH, workers: int = 1,
+                detectors: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Replay several days - sequentially, or one day per worker process.
+
+    Returns:
+        One replay_day() report per day, in input order
+    """
+    detectors = list(detectors) if detectors is not None else None
+    if workers <= 1 or len(days) <= 1:
+        return [replay_day(day, db_path, detectors) for day in days]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(replay_day, day, db_path, detectors) for day in days]
+        return [f.result() for f in futures]
+
+
+def print_report(reports: List[Dict]):
+    for report in reports:
+        minutes = report['minutes']
+        rate = minutes / (report['wall_ms'] / 1000) if report['wall_ms'] else 0
+        print(f"\n{'=' * 72}")
+        print(f"REPLAY {report['day']}: {minutes} minutes in {report['wall_ms'] / 1000:.2f}s "
+              f"({rate:,.0f} minutes/s), {len(report['alerts'])} alerts, {report['messages']} messages")
+        print(f"{'=' * 72}")
+        if report['timings']:
+            print(f"{'detector':<16}{'calls':>7}{'total ms':>11}{'mean ms':>10}{'p95 ms':>9}{'max ms':>9}")
+            for name, t in report['timings'].items():
+                print(f"{name:<16}{t['calls']:>7}{t['total_ms']:>11.1f}{t['mean_ms']:>10.3f}"
+                      f"{t['p95_ms']:>9.3f}{t['max_ms']:>9.3f}")
+        for alert in report['alerts']:
+            price = f"₹{alert['price']:.2f}" if alert.get('price') else ''
+            print(f"  {alert['time']}  {alert['detector']:<15} {alert.get('symbol') or '-':<12} "
+                  f"{alert.get('direction') or '':<5} {alert.get('alert_type') or '':<14} {price}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded central_quotes.db days through the live detectors")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help=f"Recorded database (default: {DEFAULT_DB_PATH})")
+    parser.add_argument('--date', action='append', dest='dates', help="Day to replay (YYYY-MM-DD, repeatable)")
+    parser.add_argument('--all-days', action='store_true', help="Replay every day in the database")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (one day per process)")
+    parser.add_argument('--detectors', help=f"Comma-separated subset of {','.join(DETECTORS)} (default: as config)")
+    parser.add_argument('--json', help="Write the full reports to this file")
+    parser.add_argument('--verbose', action='store_true', help="Keep detector INFO logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    days = list_days(args.db) if args.all_days else (args.dates or [])
+    if not days:
+        parser.error("no days to replay (use --date or --all-days)")
+    detectors = args.detectors.split(',') if args.detectors else None
+
+    reports = replay_days(days, args.db, args.workers, detectors)
+    print_report(reports)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2, default=str)
+        print(f"\nReports written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,6 @@ import sys
 import logging
 from datetime import datetime, timedelta, time as dt_time
 from volume_profile_analyzer import VolumeProfileAnalyzer
-from kiteconnect import KiteConnect
 import config
 
 # Configure logging
@@ -38,52 +37,15 @@ def main():
     print()
 
     try:
-        # Create analyzer
-        analyzer = VolumeProfileAnalyzer(execution_time="3:25PM")
+        # Create analyzer for the target date (candles 9:15 AM - 3:25 PM)
+        analyzer = VolumeProfileAnalyzer(execution_time="3:25PM", session_date=target_date,
+                                         session_cutoff=dt_time(15, 25))
 
         # Get components
         logger.info("Fetching stock list...")
         stocks = analyzer.fo_stocks
         logger.info(f"Loaded {len(stocks)} F&O stocks")
 
-        # Override fetch method to use target date
-        original_fetch = analyzer._fetch_intraday_1min_data
-
-        def fetch_for_target_date(symbol):
-            """Fetch data for specific target date"""
-            if symbol not in analyzer.instrument_tokens:
-                logger.warning(f"{symbol}: Instrument token not found")
-                return []
-
-            try:
-                instrument_token = analyzer.instrument_tokens[symbol]
-
-                # Use target date instead of today
-                from_date = datetime.combine(target_date, dt_time(9, 15))
-                to_date = datetime.combine(target_date, dt_time(15, 25))
-
-                # Fetch 1-minute candles
-                data = analyzer.kite.historical_data(
-                    instrument_token=instrument_token,
-                    from_date=from_date,
-                    to_date=to_date,
-                    interval="minute"
-                )
-
-                if not data:
-                    logger.warning(f"{symbol}: No data for {target_date}")
-                    return []
-
-                logger.debug(f"{symbol}: Fetched {len(data)} candles for {target_date}")
-                return data
-
-            except Exception as e:
-                logger.error(f"{symbol}: Error fetching data - {e}")
-                return []
-
-        # Replace fetch method
-        analyzer._fetch_intraday_1min_data = fetch_for_target_date
-
         # Run batch analysis
         logger.info(f"Starting volume profile analysis for {target_date}...")
         results = analyzer._batch_analyze(stocks)
@@ -19,6 +19,7 @@ from sector_eod_report_generator import get_sector_eod_report_generator
 from oi_analyzer import get_oi_analyzer
 from central_quote_db import get_central_db
 from central_db_reader import fetch_stock_prices, report_cycle_complete
+from instrument_master import get_instrument_master
 import config
 
 # Import data source libraries based on configuration
@@ -194,16 +195,11 @@ class StockMonitor:
             return {}
 
     def _fetch_instrument_tokens(self) -> Dict[str, int]:
-        """Fetch instrument tokens from Kite instruments dump"""
+        """Fetch instrument tokens from the instrument master (daily NSE snapshot)"""
         try:
-            instruments = self.kite.instruments("NSE")
-            token_map = {}
             # Remove .NS suffix from stock symbols for matching
             clean_stocks = [s.replace('.NS', '') for s in self.stocks]
-
-            for inst in instruments:
-                if inst['tradingsymbol'] in clean_stocks:
-                    token_map[inst['tradingsymbol']] = inst['instrument_token']
+            token_map = get_instrument_master(self.kite).index("NSE").tokens(clean_stocks)
 
             # Save for future use
             os.makedirs("data", exist_ok=True)
@@ -1439,72 +1435,74 @@ class StockMonitor:
         price_data = self.fetch_all_prices_batch()
         _prof["fetch"] += _pc() - _t
 
-        # Check each stock for drops and rises
-        for symbol, quote_data in price_data.items():
-            try:
-                current_price = quote_data['price']
-                current_volume = quote_data['volume']
-                current_oi = quote_data.get('oi', 0)
-                oi_day_high = quote_data.get('oi_day_high', 0)
-                oi_day_low = quote_data.get('oi_day_low', 0)
-
-                # Calculate RSI once for this stock (if enabled)
-                rsi_analysis = None
-                if config.ENABLE_RSI:
-                    _t = _pc()
-                    rsi_analysis = self._calculate_rsi_for_stock(symbol, current_price, current_volume)
-                    _prof["rsi"] += _pc() - _t
-
-                # Calculate OI analysis once for this stock (if enabled and OI data available)
-                oi_analysis = None
-                if config.ENABLE_OI_ANALYSIS and self.oi_analyzer and current_oi > 0:
-                    stats["oi_stocks"] += 1  # Track F&O stocks with OI data
-
-                    # Calculate price change for OI pattern classification
-                    # Use 10-minute price if available, otherwise use current price (0% change)
-                    _, price_10min_ago = self.price_cache.get_prices(symbol)
-                    if price_10min_ago:
-                        price_change_pct = self.calculate_rise_percentage(current_price, price_10min_ago)
-                    else:
-                        price_change_pct = 0.0  # No historical price yet, assume 0% change
-
-                    # Run OI analysis (independent of price history availability)
-                    _t = _pc()
-                    oi_analysis = self.oi_analyzer.analyze_oi_change(
-                        symbol=symbol,
-                        current_oi=current_oi,
-                        price_change_pct=price_change_pct,
-                        oi_day_high=oi_day_high,
-                        oi_day_low=oi_day_low
-                    )
-                    _prof["oi"] += _pc() - _t
-
-                    if oi_analysis:
-                        logger.info(f"📊 {symbol}: OI {oi_analysis['pattern']} ({oi_analysis['oi_change_pct']:+.1f}%) - {oi_analysis['signal']} - {oi_analysis['interpretation']}")
-
-                # Check for drops (pass RSI and OI analysis)
-                _t = _pc()
-                drop_alert_sent = self.check_stock_for_drop(symbol, current_price, current_volume, rsi_analysis, oi_analysis)
-                _prof["drop"] += _pc() - _t
-
-                # Check for rises (if enabled, pass RSI and OI analysis)
-                rise_alert_sent = False
-                if config.ENABLE_RISE_ALERTS:
+        # Check each stock for drops and rises. check_stock_for_drop() updates the
+        # price cache per symbol; batch() persists all of them once, after the loop.
+        with self.price_cache.batch():
+            for symbol, quote_data in price_data.items():
+                try:
+                    current_price = quote_data['price']
+                    current_volume = quote_data['volume']
+                    current_oi = quote_data.get('oi', 0)
+                    oi_day_high = quote_data.get('oi_day_high', 0)
+                    oi_day_low = quote_data.get('oi_day_low', 0)
+
+                    # Calculate RSI once for this stock (if enabled)
+                    rsi_analysis = None
+                    if config.ENABLE_RSI:
+                        _t = _pc()
+                        rsi_analysis = self._calculate_rsi_for_stock(symbol, current_price, current_volume)
+                        _prof["rsi"] += _pc() - _t
+
+                    # Calculate OI analysis once for this stock (if enabled and OI data available)
+                    oi_analysis = None
+                    if config.ENABLE_OI_ANALYSIS and self.oi_analyzer and current_oi > 0:
+                        stats["oi_stocks"] += 1  # Track F&O stocks with OI data
+
+                        # Calculate price change for OI pattern classification
+                        # Use 10-minute price if available, otherwise use current price (0% change)
+                        _, price_10min_ago = self.price_cache.get_prices(symbol)
+                        if price_10min_ago:
+                            price_change_pct = self.calculate_rise_percentage(current_price, price_10min_ago)
+                        else:
+                            price_change_pct = 0.0  # No historical price yet, assume 0% change
+
+                        # Run OI analysis (independent of price history availability)
+                        _t = _pc()
+                        oi_analysis = self.oi_analyzer.analyze_oi_change(
+                            symbol=symbol,
+                            current_oi=current_oi,
+                            price_change_pct=price_change_pct,
+                            oi_day_high=oi_day_high,
+                            oi_day_low=oi_day_low
+                        )
+                        _prof["oi"] += _pc() - _t
+
+                        if oi_analysis:
+                            logger.info(f"📊 {symbol}: OI {oi_analysis['pattern']} ({oi_analysis['oi_change_pct']:+.1f}%) - {oi_analysis['signal']} - {oi_analysis['interpretation']}")
+
+                    # Check for drops (pass RSI and OI analysis)
                     _t = _pc()
-                    rise_alert_sent = self.check_stock_for_rise(symbol, current_price, current_volume, rsi_analysis, oi_analysis)
-                    _prof["rise"] += _pc() - _t
-
-                stats["checked"] += 1
-                if drop_alert_sent:
-                    stats["drop_alerts"] += 1
-                    stats["alerts_sent"] += 1
-                if rise_alert_sent:
-                    stats["rise_alerts"] += 1
-                    stats["alerts_sent"] += 1
+                    drop_alert_sent = self.check_stock_for_drop(symbol, current_price, current_volume, rsi_analysis, oi_analysis)
+                    _prof["drop"] += _pc() - _t
+
+                    # Check for rises (if enabled, pass RSI and OI analysis)
+                    rise_alert_sent = False
+                    if config.ENABLE_RISE_ALERTS:
+                        _t = _pc()
+                        rise_alert_sent = self.check_stock_for_rise(symbol, current_price, current_volume, rsi_analysis, oi_analysis)
+                        _prof["rise"] += _pc() - _t
+
+                    stats["checked"] += 1
+                    if drop_alert_sent:
+                        stats["drop_alerts"] += 1
+                        stats["alerts_sent"] += 1
+                    if rise_alert_sent:
+                        stats["rise_alerts"] += 1
+                        stats["alerts_sent"] += 1
 
-            except Exception as e:
-                logger.error(f"Error checking {symbol}: {e}")
-                stats["errors"] += 1
+                except Exception as e:
+                    logger.error(f"Error checking {symbol}: {e}")
+                    stats["errors"] += 1
 
         # Count stocks that failed to fetch
         stats["errors"] += (stats["total"] - len(price_data))
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Sweep Engine - Parallel, Resumable Parameter Sweeps over Shared Arrays
+
+The VWAP / early-warning optimizers evaluated their config grids one config
+at a time in a single process, hours for the larger grids. A sweep here is:
+
+- arrays:    NumPy arrays holding everything the configs read (candles and
+             per-day features, precomputed once). They are copied once into
+             one multiprocessing.shared_memory block that every worker maps -
+             nothing is pickled per config, on fork or spawn (macOS).
+- meta:      small picklable extras (symbol names, dates, lot sizes), sent
+             once per worker.
+- evaluate:  a module-level function evaluate(config, arrays, meta) -> dict of
+             JSON-serialisable results.
+- configs:   tuples of parameters.
+
+run_sweep() fans the configs out over a process pool and writes each result
+to the sweep_results table (SWEEP_RESULTS_DB) as it arrives. Results are keyed
+by sweep name, a fingerprint of arrays + meta, and the config. An interrupted
+sweep picks up where it stopped, and a sweep over different data never reuses
+stale rows.
+
+Usage:
+    from sweep_engine import run_sweep
+
+    results = run_sweep('vwap_winrate', evaluate_config, configs, arrays, meta)
+    summary = results[configs[0]]
+
+Date: 2026-10-16
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+Evaluate = Callable[[Tuple, Dict[str, np.ndarray], Any], Dict]
+
+COMMIT_EVERY = 20           # results written per SQLite commit
+ALIGN = 64                  # byte alignment of each array in the shared block
+
+
+class SharedArrays:
+    """Named NumPy arrays packed into one shared-memory block."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        Copy arrays into a new block (the creating process owns and unlinks it).
+
+        Args:
+            arrays: {name: array}
+        """
+        layout, offset = [], 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            layout.append((name, array.dtype.str, array.shape, offset))
+            offset += -(-array.nbytes // ALIGN) * ALIGN
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self._owner = True
+        self.layout = layout
+        self.arrays = self._views()
+        for name, array in arrays.items():
+            self.arrays[name][...] = array
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, List]) -> 'SharedArrays':
+        """Map a block created in another process (from its .spec)."""
+        shared = cls.__new__(cls)
+        name, shared.layout = spec
+        shared._shm = shared_memory.SharedMemory(name=name)
+        shared._owner = False
+        shared.arrays = shared._views()
+        return shared
+
+    @property
+    def spec(self) -> Tuple[str, List]:
+        """Picklable handle for attach()."""
+        return self._shm.name, self.layout
+
+    def _views(self) -> Dict[str, np.ndarray]:
+        return {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=self._shm.buf, offset=offset)
+                for name, dtype, shape, offset in self.layout}
+
+    def close(self):
+        self.arrays = {}
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def fingerprint(arrays: Dict[str, np.ndarray], meta: Any = None) -> str:
+    """Digest of the sweep's inputs; results are only reused for identical data."""
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f"{name}|{array.dtype.str}|{array.shape}".encode())
+        digest.update(array.data)
+    digest.update(json.dumps(meta, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+class ResultsTable:
+    """sweep_results rows: one JSON result per (sweep, config)."""
+
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=config.SQLITE_TIMEOUT_SECONDS)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sweep_results (
+                sweep TEXT NOT NULL,
+                config TEXT NOT NULL,
+                result TEXT NOT NULL,
+                finished_at TEXT NOT NULL,
+                PRIMARY KEY (sweep, config)
+            )
+        """)
+        self.conn.commit()
+
+    def load(self, sweep: str) -> Dict[str, Dict]:
+        rows = self.conn.execute("SELECT config, result FROM sweep_results WHERE sweep = ?", (sweep,))
+        return {key: json.loads(result) for key, result in rows}
+
+    def add(self, sweep: str, key: str, result: Dict):
+        self.conn.execute("INSERT OR REPLACE INTO sweep_results VALUES (?, ?, ?, ?)",
+                          (sweep, key, json.dumps(result), datetime.now().isoformat()))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def config_key(cfg: Tuple) -> str:
+    return json.dumps(list(cfg))
+
+
+# Worker state, set once per process by _init_worker
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(spec: Tuple[str, List], evaluate: Evaluate, meta: Any):
+    _WORKER['shared'] = SharedArrays.attach(spec)
+    _WORKER['evaluate'] = evaluate
+    _WORKER['meta'] = meta
+
+
+def _run_chunk(configs: List[Tuple]) -> List[Tuple[Tuple, Dict]]:
+    arrays, evaluate, meta = _WORKER['shared'].arrays, _WORKER['evaluate'], _WORKER['meta']
+    return [(cfg, evaluate(cfg, arrays, meta)) for cfg in configs]
+
+
+def run_sweep(
+    name: str,
+    evaluate: Evaluate,
+    configs: Iterable[Tuple],
+    arrays: Dict[str, np.ndarray],
+    meta: Any = None,
+    workers: Optional[int] = None,
+    results_db: Optional[str] = None,
+    chunk_size: int = 4,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[Tuple, Dict]:
+    """
+    Evaluate every config, in parallel, checkpointing results as they finish.
+
+    Args:
+        name: Sweep name (with the data fingerprint, the checkpoint namespace)
+        evaluate: Module-level evaluate(config, arrays, meta) -> JSON-serialisable dict
+        configs: Parameter tuples (JSON-serialisable values)
+        arrays: Inputs shared with the workers, read-only
+        meta: Small picklable extras passed to evaluate
+        workers: Processes (default config.SWEEP_WORKERS; 0 or 1 = in-process)
+        results_db: SQLite results file (default config.SWEEP_RESULTS_DB; '' = no checkpoints)
+        chunk_size: Configs per task
+        progress: Called with (done, total) as results arrive
+
+    Returns:
+        {config: result} for every config, in input order
+    """
+    configs = list(dict.fromkeys(tuple(cfg) for cfg in configs))
+    workers = config.SWEEP_WORKERS if workers is None else workers
+    results_db = config.SWEEP_RESULTS_DB if results_db is None else results_db
+    sweep = f"{name}:{fingerprint(arrays, meta)}"
+
+    table = ResultsTable(results_db) if results_db else None
+    done = table.load(sweep) if table else {}
+    results = {cfg: done[config_key(cfg)] for cfg in configs if config_key(cfg) in done}
+    todo = [cfg for cfg in configs if cfg not in results]
+    if results:
+        logger.info(f"{sweep}: {len(results)}/{len(configs)} configs already in {results_db}")
+
+    def finished(batch):
+        for cfg, result in batch:
+            results[cfg] = result
+            if table:
+                table.add(sweep, config_key(cfg), result)
+        if table and len(results) % COMMIT_EVERY < len(batch):
+            table.commit()
+        if progress:
+            progress(len(results), len(configs))
+
+    try:
+        chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+        if workers > 1 and len(chunks) > 1:
+            shared = SharedArrays(arrays)
+            try:
+                with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                         initargs=(shared.spec, evaluate, meta)) as pool:
+                    for job in as_completed([pool.submit(_run_chunk, chunk) for chunk in chunks]):
+                        finished(job.result())
+            finally:
+                shared.close()
+        else:
+            for chunk in chunks:
+                finished([(cfg, evaluate(cfg, arrays, meta)) for cfg in chunk])
+    finally:
+        if table:
+            table.close()
+
+    return {cfg: results[cfg] for cfg in configs}
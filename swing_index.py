@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Swing Index - Shared Swing Points for the EOD Chart-Pattern Detectors
+
+EODPatternDetector's double bottom / top, inverse head & shoulders, ascending
+triangle and falling wedge each rescanned the candle list for local highs and
+lows on every call, and the backtests called them once per historical day on
+a freshly sliced window - O(days x window) rescans per symbol.
+
+A SwingIndex keeps one symbol's daily highs and lows, and the sorted
+positions of its swing points:
+
+- swing low / high:  strictly below / above both neighbours
+- near low / high:   within 1% of both neighbours (the falling wedge's
+                     lenient peaks and troughs)
+
+Building from a candle list is vectorized (NumPy comparisons over the whole
+series); append() adds a day in O(1) - only the previous last day gains its
+right neighbour. window(end, length) selects any span of days, and a window's
+swing points are found by bisecting the position lists instead of scanning
+candles. A day is only reported as a swing point of a window when both its
+neighbours are inside the window, exactly as the detectors' own
+range(1, len - 1) scans did, so results do not depend on how much history the
+index holds.
+
+Window highs / lows are plain lists: the detectors look at 15-30 days at a
+time, where Python's max() / min() beat NumPy's per-call overhead.
+
+Usage:
+    from swing_index import SwingIndex
+
+    index = SwingIndex(daily_candles)
+    for candle in new_days:
+        index.append(candle)
+    swings = index.window(len(index), 30)       # last 30 days
+    lows = swings.tail(15).swing_lows()         # [(position in window, low), ...]
+
+Date: 2026-10-16
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+NEAR_HIGH = 0.99    # near high: high >= neighbour high * 0.99
+NEAR_LOW = 1.01     # near low:  low <= neighbour low * 1.01
+
+
+class SwingIndex:
+    """One symbol's daily highs / lows with swing point positions, extended a day at a time."""
+
+    def __init__(self, candles: Iterable[Dict] = ()):
+        """
+        Args:
+            candles: Daily OHLC dicts, oldest first
+        """
+        candles = list(candles)
+        self.highs: List[float] = [c['high'] for c in candles]
+        self.lows: List[float] = [c['low'] for c in candles]
+        self._points: Dict[str, List[int]] = {name: [] for name in
+                                              ('swing_low', 'swing_high', 'near_low', 'near_high')}
+        if len(candles) >= 3:
+            self._build()
+
+    def __len__(self) -> int:
+        return len(self.highs)
+
+    def append(self, candle: Dict):
+        """Add the next day's candle."""
+        self.highs.append(candle['high'])
+        self.lows.append(candle['low'])
+        i = len(self.highs) - 2
+        if i < 1:
+            return
+
+        high, low = self.highs, self.lows
+        if high[i] > high[i - 1] and high[i] > high[i + 1]:
+            self._points['swing_high'].append(i)
+        if low[i] < low[i - 1] and low[i] < low[i + 1]:
+            self._points['swing_low'].append(i)
+        if high[i] >= high[i - 1] * NEAR_HIGH and high[i] >= high[i + 1] * NEAR_HIGH:
+            self._points['near_high'].append(i)
+        if low[i] <= low[i - 1] * NEAR_LOW and low[i] <= low[i + 1] * NEAR_LOW:
+            self._points['near_low'].append(i)
+
+    def extend(self, candles: Iterable[Dict]):
+        """Add several days, oldest first."""
+        for candle in candles:
+            self.append(candle)
+
+    def window(self, end: Optional[int] = None, length: Optional[int] = None) -> 'SwingWindow':
+        """
+        The days [end - length, end).
+
+        Args:
+            end: One past the last day (default: all days)
+            length: Number of days (default: from the first day); clipped at the start
+
+        Returns:
+            SwingWindow with positions relative to its first day
+        """
+        end = len(self) if end is None else end
+        if not 0 <= end <= len(self):
+            raise ValueError(f"window end {end} outside 0..{len(self)}")
+        start = 0 if length is None else max(0, end - length)
+        return SwingWindow(self, start, end)
+
+    def _build(self):
+        """Swing points of every day with both neighbours, in one vectorized pass."""
+        high, low = np.array(self.highs, dtype=float), np.array(self.lows, dtype=float)
+        mid_h, prev_h, next_h = high[1:-1], high[:-2], high[2:]
+        mid_l, prev_l, next_l = low[1:-1], low[:-2], low[2:]
+        flags = {
+            'swing_high': (mid_h > prev_h) & (mid_h > next_h),
+            'swing_low': (mid_l < prev_l) & (mid_l < next_l),
+            'near_high': (mid_h >= prev_h * NEAR_HIGH) & (mid_h >= next_h * NEAR_HIGH),
+            'near_low': (mid_l <= prev_l * NEAR_LOW) & (mid_l <= next_l * NEAR_LOW),
+        }
+        for name, flag in flags.items():
+            self._points[name] = (np.flatnonzero(flag) + 1).tolist()
+
+
+class SwingWindow:
+    """A span of days of a SwingIndex. Positions are relative to the window's first day."""
+
+    def __init__(self, index: SwingIndex, start: int, stop: int):
+        self._index = index
+        self._start = start
+        self._stop = stop
+        self.high: List[float] = index.highs[start:stop]
+        self.low: List[float] = index.lows[start:stop]
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def tail(self, length: int) -> 'SwingWindow':
+        """The last `length` days of this window (all of it if shorter)."""
+        return SwingWindow(self._index, max(self._start, self._stop - length), self._stop)
+
+    def swing_lows(self, start: int = 0, stop: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Strict local lows at positions [start, stop): [(position, low), ...]"""
+        return self._select('swing_low', self.low, start, stop)
+
+    def swing_highs(self, start: int = 0, stop: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Strict local highs at positions [start, stop): [(position, high), ...]"""
+        return self._select('swing_high', self.high, start, stop)
+
+    def near_lows(self, start: int = 0, stop: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Lows within 1% of both neighbours at positions [start, stop)"""
+        return self._select('near_low', self.low, start, stop)
+
+    def near_highs(self, start: int = 0, stop: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Highs within 1% of both neighbours at positions [start, stop)"""
+        return self._select('near_high', self.high, start, stop)
+
+    def _select(self, kind: str, values: List[float], start: int, stop: Optional[int]) -> List[Tuple[int, float]]:
+        # The window's first and last days have a neighbour outside it: never swing points here
+        start = max(start, 1)
+        stop = len(self) - 1 if stop is None else min(stop, len(self) - 1)
+        if stop <= start:
+            return []
+        points = self._index._points[kind]
+        lo = bisect_left(points, self._start + start)
+        hi = bisect_left(points, self._start + stop, lo)
+        return [(p - self._start, values[p - self._start]) for p in points[lo:hi]]
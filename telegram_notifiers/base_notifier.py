@@ -35,15 +35,44 @@ class BaseNotifier:
         if not self.bot_token or not self.channel_id:
             raise ValueError("Telegram bot token and channel ID must be set in .env file")
 
-    def _send_to(self, channel_id: str, message: str) -> bool:
-        """Send message to a specific Telegram channel. Retries once on 429."""
+        # Alert outbox: enqueue and return, a background sender delivers (alert_outbox.py).
+        # Any failure to open it leaves the synchronous path in place.
+        self.outbox = None
+        if config.ENABLE_ALERT_OUTBOX:
+            try:
+                from alert_outbox import get_alert_outbox
+                self.outbox = get_alert_outbox()
+            except Exception as e:
+                logger.warning(f"Alert outbox unavailable, sending synchronously: {e}")
+
+    def _enqueue(self, channel: str, route: str, payload: dict, chat_id: str = None) -> bool:
+        """Queue a payload in the outbox. False if there is no outbox or the enqueue failed."""
+        if self.outbox is None:
+            return False
+        try:
+            self.outbox.enqueue(channel, route, payload, chat_id=chat_id)
+            return True
+        except Exception as e:
+            logger.error(f"Alert outbox enqueue failed, sending synchronously: {e}")
+            return False
+
+    def _send_to(self, channel_id: str, message: str, route: str = "main") -> bool:
+        """
+        Send message to a specific Telegram channel. Retries once on 429.
+
+        With the alert outbox enabled the message is only queued, and True means
+        "accepted for delivery"; route selects the bot ("main" or "debug").
+        """
         import time as _time
-        url = f"{self.base_url}/sendMessage"
         payload = {
             "chat_id": channel_id,
             "text": alert_provenance.stamp(message),
             "parse_mode": "HTML"
         }
+        if self._enqueue("telegram", route, payload, chat_id=channel_id):
+            return True
+        base_url = self.debug_base_url if route == "debug" else self.base_url
+        url = f"{base_url}/sendMessage"
         for attempt in range(2):
             try:
                 response = requests.post(url, json=payload, timeout=10)
@@ -91,7 +120,7 @@ class BaseNotifier:
             chunks.append(current)
         return chunks
 
-    def _send_to_discord(self, webhook_url: str, message: str) -> bool:
+    def _send_to_discord(self, webhook_url: str, message: str, route: str = "main") -> bool:
         """Send a message to a Discord webhook as embed(s). No-op if not configured."""
         if not webhook_url:
             return False
@@ -102,6 +131,8 @@ class BaseNotifier:
         embeds = [{"description": chunk}
                   for chunk in self._chunk_text(content, _DISCORD_EMBED_LIMIT)][:_DISCORD_MAX_EMBEDS]
         payload = {"embeds": embeds}
+        if self._enqueue("discord", route, payload):
+            return True
         for attempt in range(2):
             try:
                 response = requests.post(webhook_url, json=payload, timeout=10)
@@ -124,7 +155,7 @@ class BaseNotifier:
         dc_ok = self._send_to_discord(self.discord_webhook, message)
         ok = tg_ok or dc_ok
         if ok:
-            logger.info(f"Alert delivered to main channel (telegram={tg_ok}, discord={dc_ok})")
+            logger.info(f"Alert {'queued' if self.outbox else 'delivered'} to main channel (telegram={tg_ok}, discord={dc_ok})")
         return ok
 
     def send_debug(self, message: str) -> bool:
@@ -136,20 +167,11 @@ class BaseNotifier:
         if not self.debug_channel_id:
             logger.warning("TELEGRAM_DEBUG_CHANNEL_ID not set — falling back to main channel")
             return self._send_message(message)
-        url = f"{self.debug_base_url}/sendMessage"
-        payload = {"chat_id": self.debug_channel_id,
-                   "text": alert_provenance.stamp(message), "parse_mode": "HTML"}
-        tg_ok = False
-        try:
-            response = requests.post(url, json=payload, timeout=10)
-            response.raise_for_status()
-            tg_ok = True
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to send to debug channel: {e}")
-        dc_ok = self._send_to_discord(self.discord_debug_webhook, message)
+        tg_ok = self._send_to(self.debug_channel_id, message, route="debug")
+        dc_ok = self._send_to_discord(self.discord_debug_webhook, message, route="debug")
         ok = tg_ok or dc_ok
         if ok:
-            logger.info(f"Debug message delivered (telegram={tg_ok}, discord={dc_ok})")
+            logger.info(f"Debug message {'queued' if self.outbox else 'delivered'} (telegram={tg_ok}, discord={dc_ok})")
         return ok
 
     def send_test_message(self) -> bool:
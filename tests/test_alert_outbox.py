@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Regression test: alerts are queued in the outbox and delivered off the detector's thread.
+
+BaseNotifier used to requests.post() every alert synchronously (10s timeout, plus a
+Retry-After sleep on 429) from inside detect_all(), so a burst of alerts or a slow
+Telegram delayed the next collection minute. With ENABLE_ALERT_OUTBOX the notifier
+enqueues into a SQLite outbox (alert_outbox.py) and a background sender delivers.
+Pinned here:
+
+  * _send_message() / send_debug() return without waiting on HTTP, and the queued
+    payloads are the same stamped bodies the synchronous path would have sent;
+  * each destination has its own token bucket - a rate-limited Telegram chat does not
+    hold back Discord or another chat, and one chat's messages stay in order;
+  * 429 reschedules for Retry-After, 5xx backs off and retries, other 4xx fail at once;
+  * queued rows survive a restart, and a row claimed by a dead sender is reclaimed;
+  * enqueue -> delivered latency is recorded and reported (to a recording sink -
+    data/service_health.db is never touched);
+  * no bot token or webhook URL is written to the outbox file.
+
+Runs offline: HTTP sessions are fakes, the outbox is a temporary file.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import alert_provenance
+from alert_outbox import AlertOutbox
+from telegram_notifiers.base_notifier import BaseNotifier
+
+URLS = {('telegram', 'main'): 'https://tg.invalid/botmain-token/sendMessage',
+        ('telegram', 'debug'): 'https://tg.invalid/botdebug-token/sendMessage',
+        ('discord', 'main'): 'https://discord.invalid/hooks/main',
+        ('discord', 'debug'): 'https://discord.invalid/hooks/debug'}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_800_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, body=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body or {}
+        self.text = json.dumps(self._body)
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """Records posts; replies from a per-URL script of status codes (default 200)."""
+
+    def __init__(self, replies=None, delay=0.0):
+        self.posts = []
+        self.replies = replies or {}
+        self.delay = delay
+        self.closed = False
+
+    def post(self, url, json=None, timeout=None):
+        time.sleep(self.delay)
+        self.posts.append((url, json))
+        script = self.replies.get(url)
+        return script.pop(0) if script else FakeResponse()
+
+    def close(self):
+        self.closed = True
+
+
+class OutboxTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='alert_outbox_test_')
+        self.db_path = os.path.join(self.tmpdir, 'alert_outbox.db')
+        self.clock = FakeClock()
+        self.session = FakeSession()
+        self.metrics = []
+        self.config = mock.patch.multiple('config',
+                                          ALERT_OUTBOX_TELEGRAM_RATE_PER_SEC=1.0,
+                                          ALERT_OUTBOX_TELEGRAM_BURST=2,
+                                          ALERT_OUTBOX_DISCORD_RATE_PER_SEC=2.5,
+                                          ALERT_OUTBOX_DISCORD_BURST=5,
+                                          ALERT_OUTBOX_MAX_ATTEMPTS=3)
+        self.config.start()
+        self.addCleanup(self.config.stop)
+        self.outbox = self.make_outbox()
+
+    def tearDown(self):
+        self.outbox.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def make_outbox(self, session=None, clock=None):
+        session = session or self.session
+        return AlertOutbox(db_path=self.db_path, url_resolver=lambda c, r: URLS[(c, r)],
+                           session_factory=lambda: session, clock=clock or self.clock,
+                           metric_reporter=lambda *metric: self.metrics.append(metric))
+
+    def statuses(self, outbox=None):
+        outbox = outbox or self.outbox
+        with outbox._lock:
+            return [tuple(r) for r in outbox._conn.execute(
+                "SELECT id, status, attempts FROM alert_outbox ORDER BY id")]
+
+
+class RateLimitAndRetryTest(OutboxTestCase):
+
+    def test_per_destination_buckets_and_order(self):
+        for i in range(4):
+            self.outbox.enqueue('telegram', 'main', {'chat_id': '-100a', 'text': f'a{i}'}, chat_id='-100a')
+        self.outbox.enqueue('telegram', 'main', {'chat_id': '-100b', 'text': 'b0'}, chat_id='-100b')
+        for i in range(3):
+            self.outbox.enqueue('discord', 'main', {'embeds': [{'description': f'd{i}'}]})
+
+        self.outbox.process_due('telegram')
+        self.outbox.process_due('discord')
+        texts = [body.get('text') or body['embeds'][0]['description'] for _, body in self.session.posts]
+        # Chat a: burst of 2; chat b and Discord are not held back by it
+        self.assertEqual(texts, ['a0', 'a1', 'b0', 'd0', 'd1', 'd2'])
+
+        self.clock.now += 1.0
+        self.outbox.process_due('telegram')
+        self.assertEqual(self.session.posts[-1][1]['text'], 'a2')
+        self.clock.now += 1.0
+        self.outbox.process_due('telegram')
+        self.assertEqual(self.session.posts[-1][1]['text'], 'a3')
+        self.assertEqual(self.outbox.pending_count(), 0)
+
+    def test_429_reschedules_for_retry_after(self):
+        url = URLS[('telegram', 'main')]
+        self.session.replies[url] = [FakeResponse(429, body={'parameters': {'retry_after': 7}})]
+        self.outbox.enqueue('telegram', 'main', {'text': 'x'}, chat_id='-100a')
+        self.outbox.enqueue('telegram', 'main', {'text': 'y'}, chat_id='-100a')
+
+        self.outbox.process_due('telegram')
+        self.assertEqual(len(self.session.posts), 1)  # 'y' waits behind 'x'
+        self.clock.now += 6.9
+        self.outbox.process_due('telegram')
+        self.assertEqual(len(self.session.posts), 1)
+        self.clock.now += 0.2
+        self.outbox.process_due('telegram')
+        self.assertEqual([body['text'] for _, body in self.session.posts], ['x', 'x', 'y'])
+        self.assertEqual(self.statuses(), [(1, 'sent', 2), (2, 'sent', 1)])
+
+    def test_server_errors_back_off_then_fail_client_errors_fail_at_once(self):
+        url = URLS[('discord', 'main')]
+        self.session.replies[url] = [FakeResponse(502), FakeResponse(502), FakeResponse(502),
+                                     FakeResponse(400, body={'message': 'bad embed'})]
+        self.outbox.enqueue('discord', 'main', {'embeds': []})
+        for _ in range(3):
+            self.outbox.process_due('discord')
+            self.clock.now += 60
+        self.outbox.enqueue('discord', 'main', {'embeds': []})
+        self.outbox.process_due('discord')
+
+        self.assertEqual(self.statuses(), [(1, 'failed', 3), (2, 'failed', 1)])
+        self.assertEqual(self.outbox.stats['retried'], 2)
+
+
+class PersistenceTest(OutboxTestCase):
+
+    def test_queued_rows_survive_restart_and_dead_claims_are_reclaimed(self):
+        self.outbox.enqueue('telegram', 'main', {'text': 'queued'}, chat_id='-100a')
+        self.outbox.enqueue('telegram', 'main', {'text': 'claimed'}, chat_id='-100b')
+        self.outbox._claim(2, self.clock.now)  # sender died mid-send
+        self.outbox.close()
+
+        self.clock.now += 120
+        session = FakeSession()
+        self.outbox = self.make_outbox(session=session)
+        self.outbox.process_due('telegram')
+        self.assertEqual(sorted(body['text'] for _, body in session.posts), ['claimed', 'queued'])
+        self.assertEqual(self.outbox.stats['last_latency_ms'], 120_000.0)
+        self.assertEqual([value for _, name, value in self.metrics if name == 'alert_latency_ms'][-1],
+                         120_000.0)
+
+    def test_no_secrets_in_outbox_file(self):
+        self.outbox.enqueue('telegram', 'debug', {'text': 'x'}, chat_id='-100debug')
+        self.outbox.enqueue('discord', 'debug', {'embeds': []})
+        self.outbox.close()
+        with open(self.db_path, 'rb') as f:
+            raw = f.read()
+        with open(self.db_path + '-wal', 'rb') if os.path.exists(self.db_path + '-wal') else open(os.devnull, 'rb') as f:
+            raw += f.read()
+        self.assertNotIn(b'debug-token', raw)
+        self.assertNotIn(b'hooks/debug', raw)
+        self.outbox = self.make_outbox()
+
+
+class NotifierIntegrationTest(OutboxTestCase):
+
+    def make_notifier(self, outbox):
+        with mock.patch.multiple('config',
+                                 TELEGRAM_BOT_TOKEN='main-token',
+                                 TELEGRAM_CHANNEL_ID='-100main',
+                                 TELEGRAM_DEBUG_BOT_TOKEN='debug-token',
+                                 TELEGRAM_DEBUG_CHANNEL_ID='-100debug',
+                                 TELEGRAM_API_BASE='https://tg.invalid',
+                                 DISCORD_WEBHOOK_URL=URLS[('discord', 'main')],
+                                 DISCORD_DEBUG_WEBHOOK_URL=URLS[('discord', 'debug')],
+                                 ENABLE_ALERT_OUTBOX=True), \
+                mock.patch('alert_outbox.get_alert_outbox', return_value=outbox):
+            return BaseNotifier()
+
+    def test_notifier_returns_before_slow_http_and_sender_delivers(self):
+        self.addCleanup(alert_provenance.set_service, None)
+        alert_provenance.set_service('rapid_alert')
+        slow = FakeSession(delay=0.3)
+        outbox = self.make_outbox(session=slow, clock=time.time)
+        self.addCleanup(outbox.close)
+        notifier = self.make_notifier(outbox)
+
+        with mock.patch('telegram_notifiers.base_notifier.requests.post') as post:
+            start = time.perf_counter()
+            self.assertTrue(notifier._send_message('🔻 RELIANCE down 2.1%'))
+            self.assertTrue(notifier.send_debug('Service started'))
+            elapsed = time.perf_counter() - start
+        post.assert_not_called()
+        self.assertLess(elapsed, 0.3)  # four sends queued, not one slow round-trip waited on
+
+        outbox.start()
+        self.assertTrue(outbox.drain(timeout=5))
+        sent = {url: body for url, body in slow.posts}
+        self.assertEqual(set(sent), set(URLS.values()))
+        self.assertEqual(sent[URLS[('telegram', 'debug')]]['chat_id'], '-100debug')
+        self.assertIn('[ShortIndicator · rapid_alert]', sent[URLS[('telegram', 'main')]]['text'])
+        self.assertIn('rapid_alert', sent[URLS[('discord', 'main')]]['embeds'][0]['description'])
+        self.assertGreaterEqual(outbox.stats['max_latency_ms'], 300)
+        self.assertEqual(outbox.stats['sent'], 4)
+
+    def test_falls_back_to_synchronous_send_when_enqueue_fails(self):
+        notifier = self.make_notifier(self.outbox)
+        self.outbox.close()  # enqueue now raises
+
+        response = FakeResponse()
+        response.raise_for_status = lambda: None
+        with mock.patch('telegram_notifiers.base_notifier.requests.post', return_value=response) as post:
+            self.assertTrue(notifier._send_message('fallback'))
+        self.assertEqual(post.call_count, 2)  # Telegram + Discord, sent inline
+        self.outbox = self.make_outbox()
+
+
+if __name__ == '__main__':
+    unittest.main()
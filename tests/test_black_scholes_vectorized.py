@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Equivalence test: black_scholes_vectorized prices and inverts a whole chain at once.
+
+IV used to be solved one contract at a time - scalar Newton in BlackScholesGreeks,
+bisection to 1e-6 in NiftyOptionAnalyzer. Pinned here, on a 200-strike NIFTY chain
+with known volatilities:
+
+  * implied_volatility() recovers every volatility the premium is sensitive to,
+    and reprices every premium to within the tolerance;
+  * premiums no volatility explains (below intrinsic, zero, expired) come back in
+    the no-solution mask as NaN - never as a default;
+  * bs_greeks() matches the scalar BlackScholesGreeks formulas, and vanna matches
+    a finite difference of delta;
+  * calculate_chain_greeks_from_prices() returns what the per-contract
+    calculate_greeks_from_price() loop returned (to the scalar solver's tolerance).
+
+Runs offline, no files.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import black_scholes_vectorized as bsv
+from black_scholes_greeks import BlackScholesGreeks
+
+SPOT = 24250.0
+T = 8 / 365
+R = 0.07
+
+
+def seeded_chain(n=200, seed=3):
+    rng = np.random.default_rng(seed)
+    strikes = SPOT + 50.0 * (np.arange(n) - n // 2)
+    types = np.where(np.arange(n) % 2 == 0, 'CE', 'PE')
+    vols = rng.uniform(0.08, 0.60, n)
+    return strikes, types, vols
+
+
+class ImpliedVolatilityTest(unittest.TestCase):
+
+    def test_chain_round_trip(self):
+        strikes, types, vols = seeded_chain()
+        premiums = bsv.bs_price(SPOT, strikes, T, vols, types, R)
+        iv, valid = bsv.implied_volatility(SPOT, strikes, T, premiums, types, R)
+
+        self.assertTrue(valid.all())
+        repriced = bsv.bs_price(SPOT, strikes, T, iv, types, R)
+        np.testing.assert_allclose(repriced, premiums, atol=1e-5)
+
+        sensitive = bsv.bs_greeks(SPOT, strikes, T, vols, types, R)['vega'] > 0.5
+        self.assertGreater(sensitive.sum(), 100)
+        np.testing.assert_allclose(iv[sensitive], vols[sensitive], atol=1e-6)
+
+    def test_matches_scalar_bisection(self):
+        # The real 2026-07-20 ATM call (see test_nifty_option_analyzer_measurement)
+        iv, valid = bsv.implied_volatility(24243.90, 24250, T, 184.30, 'CE', R)
+        self.assertTrue(valid)
+        self.assertAlmostEqual(float(iv), 0.1176, places=3)
+
+    def test_no_solution_mask(self):
+        iv, valid = bsv.implied_volatility(
+            SPOT, [20000, 24250, 24250, 24250], [T, T, 0.0, T], [5.0, 0.0, 100.0, 30000.0],
+            ['CE', 'CE', 'CE', 'PE'], R)
+        self.assertEqual(valid.tolist(), [False, False, False, False])  # below intrinsic / zero / expired / above max
+        self.assertTrue(np.isnan(iv).all())
+
+    def test_broadcasting_keeps_shape(self):
+        iv, valid = bsv.implied_volatility(SPOT, np.full((3, 4), SPOT), T, 150.0, 'PE', R)
+        self.assertEqual(iv.shape, (3, 4))
+        self.assertTrue(valid.all())
+
+
+class GreeksTest(unittest.TestCase):
+
+    def test_greeks_match_scalar_formulas(self):
+        strikes, types, vols = seeded_chain(n=20)
+        scalar = BlackScholesGreeks(risk_free_rate=R)
+        greeks = bsv.bs_greeks(SPOT, strikes, T, vols, types, R)
+        for i in range(len(strikes)):
+            expected = scalar.calculate_greeks(SPOT, strikes[i], T, vols[i], types[i])
+            self.assertAlmostEqual(round(float(greeks['delta'][i]), 4), expected['delta'])
+            self.assertAlmostEqual(round(float(greeks['theta'][i]), 4), expected['theta'])
+            self.assertAlmostEqual(round(float(greeks['vega'][i]), 4), expected['vega'])
+            self.assertAlmostEqual(round(float(greeks['gamma'][i]), 6), expected['gamma'])
+
+    def test_vanna_is_delta_sensitivity_per_vol_point(self):
+        h = 1e-5
+        for option_type in ('CE', 'PE'):
+            up = bsv.bs_greeks(SPOT, 24500, T, 0.15 + h, option_type, R)['delta']
+            down = bsv.bs_greeks(SPOT, 24500, T, 0.15 - h, option_type, R)['delta']
+            vanna = bsv.bs_greeks(SPOT, 24500, T, 0.15, option_type, R)['vanna']
+            self.assertAlmostEqual(float(vanna), float((up - down) / (2 * h) / 100), places=9)
+
+    def test_chain_greeks_nan_where_invalid(self):
+        chain = bsv.chain_greeks(SPOT, [24250, 20000], T, [180.0, 5.0], ['CE', 'CE'], R)
+        self.assertEqual(chain['valid'].tolist(), [True, False])
+        self.assertTrue(np.isnan(chain['delta'][1]))
+
+
+class BlackScholesGreeksChainTest(unittest.TestCase):
+
+    def test_chain_method_matches_per_contract_loop(self):
+        calc = BlackScholesGreeks()
+        strikes = [23000, 23500, 24000, 24500, 23500, 23000, 22000]
+        prices = [1300.0, 860.0, 430.0, 140.0, 100.0, 40.0, 1.0]
+        types = ['CE', 'CE', 'CE', 'CE', 'PE', 'PE', 'PE']
+        chain = calc.calculate_chain_greeks_from_prices(SPOT, strikes, T, prices, types)
+        for i, (strike, price, option_type) in enumerate(zip(strikes, prices, types)):
+            expected = calc.calculate_greeks_from_price(SPOT, strike, T, price, option_type)
+            self.assertEqual(set(chain[i]), set(expected))
+            for key, value in expected.items():  # Scalar Newton stops at 1e-4 in price
+                self.assertAlmostEqual(chain[i][key], value, delta=1e-3 * max(1.0, abs(value)),
+                                       msg=f"{option_type} {strike} {key}")
+
+
+if __name__ == '__main__':
+    unittest.main()
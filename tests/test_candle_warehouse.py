@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Regression test: the local candle warehouse behind the backtests.
+
+Backtests used to call kite.historical_data() for every symbol on every run.
+candle_warehouse stores fetched candles as columnar month files and records
+which dates were synced. Pinned here, against a fake Kite client:
+
+  * candles read back (as arrays, Kite-format dicts and DataFrames) equal what
+    Kite returned, across month boundaries;
+  * a second sync of the same range makes no Kite calls, a wider range fetches
+    only the missing dates, and long ranges are split at Kite's per-interval
+    request limit;
+  * today stays unsynced until the close, and a failed fetch is retried on
+    the next sync;
+  * a range inside one month is served as views of the memory-mapped file.
+
+Runs offline in a temporary directory.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candle_warehouse import IST, CandleWarehouse, INTERVAL_MAX_DAYS, get_candle_warehouse, load_candles
+
+
+def market_candles(day: date, interval: str, seed: int):
+    """Deterministic candles for one weekday (none on weekends)."""
+    if day.weekday() >= 5:
+        return []
+    if interval == 'day':
+        times = [datetime(day.year, day.month, day.day, tzinfo=IST)]
+    else:
+        open_ = datetime(day.year, day.month, day.day, 9, 15, tzinfo=IST)
+        times = [open_ + timedelta(minutes=m) for m in range(0, 375, 5)]
+    candles = []
+    for i, ts in enumerate(times):
+        base = 100 + (day.toordinal() % 50) + i * 0.05 + seed
+        candles.append({'date': ts, 'open': round(base, 2), 'high': round(base + 1.25, 2),
+                        'low': round(base - 0.8, 2), 'close': round(base + 0.35, 2),
+                        'volume': 1000 * (i + 1) + day.day})
+    return candles
+
+
+class FakeKite:
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    def historical_data(self, instrument_token, from_date, to_date, interval):
+        self.calls.append((instrument_token, from_date.date(), to_date.date(), interval))
+        if self.fail_on is not None and from_date.date() <= self.fail_on <= to_date.date():
+            raise RuntimeError("Too many requests")
+        day, candles = from_date.date(), []
+        while day <= to_date.date():
+            candles.extend(market_candles(day, interval, instrument_token))
+            day += timedelta(days=1)
+        return candles
+
+
+def expected(start, end, interval, token):
+    day, candles = start, []
+    while day <= end:
+        candles.extend(market_candles(day, interval, token))
+        day += timedelta(days=1)
+    return candles
+
+
+class CandleWarehouseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.warehouse = CandleWarehouse(self.root)
+        self.tokens = {'AAA': 1, 'BBB': 2}
+        self.after_close = datetime(2026, 10, 16, 18, 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def sync(self, kite, start, end, interval='5minute', now=None):
+        return self.warehouse.sync(kite, ['AAA', 'BBB'], interval, start, end,
+                                   tokens=self.tokens, now=now or self.after_close)
+
+    def test_round_trip_across_months(self):
+        kite = FakeKite()
+        start, end = date(2026, 8, 20), date(2026, 10, 9)
+        self.sync(kite, start, end)
+
+        rows = self.warehouse.historical_data(None, 'AAA', start, end, '5minute')
+        self.assertEqual(rows, expected(start, end, '5minute', 1))
+        self.assertEqual(rows[0]['date'].replace(tzinfo=None), datetime(2026, 8, 20, 9, 15))
+
+        candles = load_candles(['BBB', 'ZZZ'], '5minute', date(2026, 9, 28), date(2026, 10, 2), root=self.root)
+        want = expected(date(2026, 9, 28), date(2026, 10, 2), '5minute', 2)
+        np.testing.assert_array_equal(candles['BBB'].close, [c['close'] for c in want])
+        np.testing.assert_array_equal(candles['BBB'].volume, [c['volume'] for c in want])
+        self.assertEqual(len(candles['ZZZ']), 0)
+
+        frame = candles['BBB'].to_frame()
+        self.assertEqual(frame['date'].iloc[0].to_pydatetime(), datetime(2026, 9, 28, 9, 15))
+        self.assertEqual(frame['volume'].tolist(), [c['volume'] for c in want])
+
+    def test_only_missing_dates_are_fetched(self):
+        kite = FakeKite()
+        self.sync(kite, date(2026, 9, 1), date(2026, 9, 30))
+        self.assertEqual(len(kite.calls), 2)
+
+        kite.calls.clear()
+        self.assertEqual(self.sync(kite, date(2026, 9, 5), date(2026, 9, 25)), {})
+        self.assertEqual(kite.calls, [])
+
+        self.sync(kite, date(2026, 8, 25), date(2026, 10, 3))
+        self.assertEqual(sorted(kite.calls), [
+            (1, date(2026, 8, 25), date(2026, 8, 31), '5minute'),
+            (1, date(2026, 10, 1), date(2026, 10, 3), '5minute'),
+            (2, date(2026, 8, 25), date(2026, 8, 31), '5minute'),
+            (2, date(2026, 10, 1), date(2026, 10, 3), '5minute'),
+        ])
+        self.assertEqual(self.warehouse.coverage('AAA', '5minute'), [(date(2026, 8, 25), date(2026, 10, 3))])
+        self.assertEqual(self.warehouse.historical_data(None, 'AAA', date(2026, 8, 25), date(2026, 10, 3), '5minute'),
+                         expected(date(2026, 8, 25), date(2026, 10, 3), '5minute', 1))
+
+    def test_long_ranges_split_at_kite_limit(self):
+        kite = FakeKite()
+        self.warehouse.sync(kite, ['AAA'], 'minute', date(2026, 6, 1), date(2026, 9, 30),
+                            tokens=self.tokens, now=self.after_close)
+        spans = [(lo, hi) for _, lo, hi, _ in kite.calls]
+        self.assertEqual(spans[0][0], date(2026, 6, 1))
+        self.assertEqual(spans[-1][1], date(2026, 9, 30))
+        for (lo, hi), (next_lo, _) in zip(spans, spans[1:]):
+            self.assertEqual(next_lo, hi + timedelta(days=1))
+        self.assertTrue(all((hi - lo).days < INTERVAL_MAX_DAYS['minute'] for lo, hi in spans))
+
+    def test_today_is_refetched_until_the_close(self):
+        kite = FakeKite()
+        today = date(2026, 10, 16)
+        self.sync(kite, date(2026, 10, 12), today, now=datetime(2026, 10, 16, 11, 0))
+        self.assertEqual(self.warehouse.coverage('AAA', '5minute'), [(date(2026, 10, 12), date(2026, 10, 15))])
+
+        kite.calls.clear()
+        self.sync(kite, date(2026, 10, 12), today, now=self.after_close)
+        self.assertEqual(sorted(kite.calls), [(1, today, today, '5minute'), (2, today, today, '5minute')])
+        self.assertEqual(self.warehouse.historical_data(None, 'AAA', date(2026, 10, 12), today, '5minute'),
+                         expected(date(2026, 10, 12), today, '5minute', 1))
+
+    def test_failed_fetch_is_retried(self):
+        self.warehouse.sync(FakeKite(fail_on=date(2026, 9, 10)), ['AAA'], 'day', date(2026, 9, 1),
+                            date(2026, 9, 30), tokens=self.tokens, now=self.after_close)
+        self.assertEqual(self.warehouse.coverage('AAA', 'day'), [])
+
+        kite = FakeKite()
+        self.warehouse.sync(kite, ['AAA'], 'day', date(2026, 9, 1), date(2026, 9, 30),
+                            tokens=self.tokens, now=self.after_close)
+        self.assertEqual(len(kite.calls), 1)
+        self.assertEqual(self.warehouse.historical_data(None, 'AAA', date(2026, 9, 1), date(2026, 9, 30), 'day'),
+                         expected(date(2026, 9, 1), date(2026, 9, 30), 'day', 1))
+
+    def test_single_month_range_is_memory_mapped(self):
+        self.sync(FakeKite(), date(2026, 9, 1), date(2026, 9, 30))
+        candles = self.warehouse.load('AAA', '5minute', date(2026, 9, 7), date(2026, 9, 11))
+        self.assertIsInstance(candles.close.base, np.memmap)
+        self.assertTrue(candles.close.flags['C_CONTIGUOUS'])
+        self.assertEqual(len(candles), 5 * 75)
+
+    def test_get_candle_warehouse_is_shared_per_directory(self):
+        self.assertIs(get_candle_warehouse(self.root), get_candle_warehouse(self.root))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Regression test: the central collector's concurrent, rate-limited quote fetch.
+
+CentralDataCollector._fetch_stock_quotes() used to fetch its ~400 instruments one batch
+at a time with REQUEST_DELAY_SECONDS sleeps in between, then fetch NIFTY and VIX with two
+more calls. It now fans the batches out over a small thread pool, folds NIFTY/VIX into
+those batches, and paces every kite.quote() through a shared token bucket
+(kite_rate_limiter.py). Pinned here:
+
+  * TokenBucket allows a burst of `capacity` calls, then exactly `rate` per second;
+  * the concurrent path returns the same parsed quotes as the sequential path;
+  * NIFTY/VIX come back from the stock batches - no separate quote() call;
+  * batches really overlap (wall time ~ one round-trip, not one per batch);
+  * no more than QUOTE_FETCH_WORKERS quote() calls are in flight at once.
+
+Runs offline: no broker, no network, no credentials. The collector's log file
+goes to a temporary directory, not logs/.
+"""
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from kite_rate_limiter import TokenBucket
+
+# central_data_collector opens logs/central_collector.log at import - redirect it
+LOG_DIR = tempfile.mkdtemp(prefix='quote_fetch_logs_')
+_FileHandler = logging.FileHandler
+with mock.patch.object(logging, 'FileHandler', lambda filename, *args, **kwargs: _FileHandler(
+        os.path.join(LOG_DIR, os.path.basename(filename)), *args, **kwargs)):
+    from central_data_collector import CentralDataCollector, NIFTY_INSTRUMENT, VIX_INSTRUMENT
+
+
+def tearDownModule():
+    for handler in list(logging.getLogger().handlers):
+        if getattr(handler, 'baseFilename', '').startswith(LOG_DIR):
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+    shutil.rmtree(LOG_DIR, ignore_errors=True)
+
+SYMBOLS = [f"STOCK{i:03d}" for i in range(210)]
+ROUND_TRIP = 0.15  # seconds per fake quote() call
+
+
+class FakeClock:
+    """Manual clock: sleep() advances time instead of blocking."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeKite:
+    """quote() that takes ROUND_TRIP seconds and records concurrency."""
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def quote(self, *instruments):
+        with self._lock:
+            self.calls.append(instruments)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(ROUND_TRIP)
+        with self._lock:
+            self.in_flight -= 1
+        out = {}
+        for inst in instruments:
+            n = sum(map(ord, inst))
+            if inst.startswith('NFO:'):
+                out[inst] = {'oi': n * 10, 'oi_day_high': n * 11, 'oi_day_low': n * 9}
+            else:
+                out[inst] = {'last_price': float(n), 'volume': n * 100, 'ohlc': {'close': n - 1.0}}
+        return out
+
+
+def make_collector(kite):
+    """A collector wired to a fake Kite, skipping __init__ (token validation, DB)."""
+    collector = CentralDataCollector.__new__(CentralDataCollector)
+    collector.kite = kite
+    collector.stocks = SYMBOLS
+    collector.rate_limiter = TokenBucket(rate=1000, capacity=10)
+    collector.futures_mapper = MagicMock()
+    collector.futures_mapper.get_futures_symbol.side_effect = lambda s: f"{s}26OCTFUT"
+    return collector
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_then_steady_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=3, capacity=3, clock=clock, sleep=clock.sleep)
+        granted_at = []
+        for _ in range(9):
+            bucket.acquire()
+            granted_at.append(clock.now)
+        # Burst of 3 at t=0, then one every 1/3 s
+        self.assertEqual(granted_at[:3], [0.0, 0.0, 0.0])
+        for prev, cur in zip(granted_at[2:], granted_at[3:]):
+            self.assertAlmostEqual(cur - prev, 1 / 3, places=6)
+
+    def test_try_acquire_and_timeout(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleep=clock.sleep)
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        self.assertFalse(bucket.acquire(timeout=0.5))
+        self.assertTrue(bucket.acquire(timeout=0.6))
+
+    def test_rejects_bad_parameters(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0, capacity=1)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, capacity=0)
+
+
+class ConcurrentFetchTest(unittest.TestCase):
+
+    def _fetch(self, concurrent):
+        kite = FakeKite()
+        collector = make_collector(kite)
+        extras = (NIFTY_INSTRUMENT, VIX_INSTRUMENT)
+        with mock.patch.object(config, 'ENABLE_CONCURRENT_QUOTE_FETCH', concurrent), \
+                mock.patch.object(config, 'QUOTE_FETCH_WORKERS', 3):
+            start = time.perf_counter()
+            result = collector._fetch_stock_quotes(extras)
+            elapsed = time.perf_counter() - start
+        return result, elapsed, kite
+
+    def test_concurrent_matches_sequential(self):
+        (seq_data, seq_raw, seq_map), seq_elapsed, _ = self._fetch(concurrent=False)
+        (con_data, con_raw, con_map), con_elapsed, kite = self._fetch(concurrent=True)
+
+        self.assertEqual(con_data, seq_data)
+        self.assertEqual(con_raw, seq_raw)
+        self.assertEqual(con_map, seq_map)
+        self.assertEqual(len(con_data), len(SYMBOLS))
+
+        # 422 instruments = 3 batches of <=200: one round-trip instead of three
+        self.assertEqual(len(kite.calls), 3)
+        self.assertLess(con_elapsed, seq_elapsed)
+        self.assertLess(con_elapsed, 2 * ROUND_TRIP)
+        self.assertLessEqual(kite.max_in_flight, 3)
+
+    def test_indices_ride_along_in_stock_batches(self):
+        (_, raw, instrument_map), _, kite = self._fetch(concurrent=True)
+        self.assertIn(NIFTY_INSTRUMENT, raw)
+        self.assertIn(VIX_INSTRUMENT, raw)
+        self.assertNotIn(NIFTY_INSTRUMENT, instrument_map)  # not parsed as a stock
+        self.assertTrue(all(len(call) > 1 for call in kite.calls))  # no single-index call
+
+
+if __name__ == '__main__':
+    unittest.main()
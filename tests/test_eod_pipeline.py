@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Regression test: the EOD pipeline reads candles from the central DB and parallelises analysis.
+
+EODAnalyzer.run_analysis used to fetch intraday and 30-day history for every
+filtered stock from Kite in two sequential loops with a fixed sleep after each
+call, then analyse one stock at a time. Pinned here, against a temporary
+central DB and a fake Kite:
+
+  * symbols the DB covers for the whole session (daily series ends with a
+    bar for today stored after the close, intraday bars fill every slot to
+    the close) cost no Kite call; only the gaps - including a partial daily
+    bar and a session with a hole - are fetched, each through the shared
+    historical rate limiter;
+  * stored 5-minute bars are rolled up into the session-aligned 15-minute
+    candles the volume analyzer expects;
+  * a broken central DB degrades to fetching everything from Kite;
+  * volume / pattern results from the process pool are identical, in the same
+    order, to an in-process run.
+
+Runs offline; data/central_quotes.db and logs/ are untouched.
+"""
+
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from central_quote_db import CentralQuoteDB
+from eod_pattern_detector import EODPatternDetector
+from eod_volume_analyzer import EODVolumeAnalyzer
+from kite_rate_limiter import TokenBucket
+from unified_data_cache import UnifiedDataCache
+
+# eod_analyzer opens logs/eod_analyzer.log at import - redirect it
+LOG_DIR = tempfile.mkdtemp(prefix='eod_pipeline_logs_')
+_FileHandler = logging.FileHandler
+with mock.patch.object(logging, 'FileHandler', lambda filename, *args, **kwargs: _FileHandler(
+        os.path.join(LOG_DIR, os.path.basename(filename)), *args, **kwargs)):
+    import eod_analyzer
+    from eod_analyzer import EODAnalyzer, aggregate_intraday
+
+
+def tearDownModule():
+    for handler in list(logging.getLogger().handlers):
+        if getattr(handler, 'baseFilename', '').startswith(LOG_DIR):
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+    shutil.rmtree(LOG_DIR, ignore_errors=True)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+TODAY = datetime.now().date()
+TOKENS = {'RELIANCE': 1, 'TCS': 2, 'INFY': 3}
+
+
+def daily_bars(days, seed, last_day=TODAY):
+    rng = random.Random(seed)
+    bars, price = [], 1000.0
+    for i in range(days, -1, -1):
+        price *= 1 + rng.uniform(-0.02, 0.02)
+        bars.append({'date': last_day - timedelta(days=i), 'open': price, 'high': price * 1.01,
+                     'low': price * 0.99, 'close': price, 'volume': rng.randint(100000, 500000)})
+    return bars
+
+
+def five_minute_bars(day, until_minute=15 * 60 + 25):
+    bars, minute = [], 9 * 60 + 15
+    while minute <= until_minute:
+        start = datetime(day.year, day.month, day.day, minute // 60, minute % 60, tzinfo=IST)
+        bars.append({'date': start, 'open': 100.0 + minute % 7, 'high': 101.0 + minute % 7,
+                     'low': 99.0, 'close': 100.5, 'volume': minute})
+        minute += 5
+    return bars
+
+
+class FakeKite:
+    def __init__(self):
+        self.calls = []
+
+    def historical_data(self, instrument_token, from_date, to_date, interval):
+        self.calls.append((instrument_token, interval))
+        if interval == 'day':
+            return daily_bars(30, instrument_token)
+        return aggregate_intraday(five_minute_bars(TODAY))
+
+
+class CountingBucket(TokenBucket):
+    def __init__(self):
+        super().__init__(rate=1000.0, capacity=1000)
+        self.taken = 0
+
+    def acquire(self, timeout=None):
+        self.taken += 1
+        return super().acquire(timeout)
+
+
+def bare_analyzer(tmpdir):
+    """An analyzer with the components the pipeline stages touch, and no network."""
+    analyzer = EODAnalyzer.__new__(EODAnalyzer)
+    analyzer.kite = FakeKite()
+    analyzer.cache_manager = UnifiedDataCache(cache_dir=os.path.join(tmpdir, 'cache'))
+    analyzer.volume_analyzer = EODVolumeAnalyzer(spike_threshold=1.5)
+    analyzer.pattern_detector = EODPatternDetector(min_confidence=0.0, require_confirmation=False)
+    analyzer.historical_limiter = CountingBucket()
+    analyzer.instrument_tokens = dict(TOKENS)
+    analyzer.stage_timings = {}
+    return analyzer
+
+
+class EODPipelineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='eod_pipeline_test_')
+        self.db = CentralQuoteDB(db_path=os.path.join(self.tmpdir, 'central_quotes.db'), mode='writer')
+        self.analyzer = bare_analyzer(self.tmpdir)
+        patcher = mock.patch.object(eod_analyzer, 'get_central_db', return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+class AggregateIntradayTest(unittest.TestCase):
+
+    def test_five_minute_bars_roll_up_to_session_aligned_quarters(self):
+        candles = aggregate_intraday(five_minute_bars(TODAY))
+        self.assertEqual(len(candles), 25)
+        first = candles[0]
+        self.assertEqual((first['date'].hour, first['date'].minute), (9, 15))
+        self.assertEqual(first['volume'], 555 + 560 + 565)
+        self.assertEqual(first['open'], 100.0 + 555 % 7)
+        self.assertEqual(first['high'], max(101.0 + m % 7 for m in (555, 560, 565)))
+        self.assertEqual((candles[-1]['date'].hour, candles[-1]['date'].minute), (15, 15))
+
+
+class CandleLoadTest(EODPipelineTestCase):
+
+    def stored_at(self, symbol, hour, minute):
+        """Stamp a symbol's daily rows as written at hour:minute today."""
+        self.db.conn.execute("UPDATE daily_candles SET last_updated = ? WHERE symbol = ?",
+                             (f"{TODAY:%Y-%m-%d} {hour:02d}:{minute:02d}:00", symbol))
+        self.db.conn.commit()
+
+    def test_only_uncovered_symbols_hit_kite(self):
+        self.db.store_daily_candles_batch({'RELIANCE': daily_bars(45, 1),
+                                           'TCS': daily_bars(45, 2, last_day=TODAY - timedelta(days=1))})
+        self.stored_at('RELIANCE', 15, 45)
+        self.db.store_intraday_candles_batch({'RELIANCE': five_minute_bars(TODAY),
+                                              'TCS': five_minute_bars(TODAY, until_minute=13 * 60)},
+                                             '5minute')
+
+        with mock.patch.object(config, 'INTRADAY_CANDLE_INTERVAL', '5minute'):
+            intraday, historical = self.analyzer._load_candles(['RELIANCE', 'TCS', 'INFY'])
+
+        self.assertEqual(sorted(self.analyzer.kite.calls),
+                         [(2, '15minute'), (2, 'day'), (3, '15minute'), (3, 'day')])
+        self.assertEqual(self.analyzer.historical_limiter.taken, 4)
+        self.assertEqual(list(historical), ['RELIANCE', 'TCS', 'INFY'])
+
+        cutoff = (TODAY - timedelta(days=config.EOD_HISTORY_DAYS)).strftime('%Y-%m-%d')
+        self.assertEqual(historical['RELIANCE'][0]['date'], cutoff)
+        self.assertEqual(historical['RELIANCE'][-1]['date'], TODAY.strftime('%Y-%m-%d'))
+        self.assertEqual(intraday['RELIANCE'], aggregate_intraday(five_minute_bars(TODAY)))
+
+        # Fetched daily history is cached for the other monitors
+        self.assertIsNotNone(self.analyzer.cache_manager.get_historical_data('INFY'))
+
+    def test_partial_daily_bar_for_today_is_refetched(self):
+        # Collector restarted at 11:00: today's daily bar is the session so far
+        self.db.store_daily_candles_batch({'RELIANCE': daily_bars(45, 1)})
+        self.stored_at('RELIANCE', 11, 0)
+        self.db.store_intraday_candles_batch({'RELIANCE': five_minute_bars(TODAY)}, '5minute')
+
+        with mock.patch.object(config, 'INTRADAY_CANDLE_INTERVAL', '5minute'):
+            _, historical = self.analyzer._load_candles(['RELIANCE'])
+
+        self.assertEqual(self.analyzer.kite.calls, [(1, 'day')])
+        self.assertEqual(historical['RELIANCE'], daily_bars(30, 1))
+
+    def test_session_with_a_hole_is_refetched(self):
+        self.db.store_daily_candles_batch({'RELIANCE': daily_bars(45, 1)})
+        self.stored_at('RELIANCE', 15, 45)
+        holed = [bar for bar in five_minute_bars(TODAY)
+                 if not (11 * 60 <= bar['date'].hour * 60 + bar['date'].minute < 11 * 60 + 15)]
+        self.db.store_intraday_candles_batch({'RELIANCE': holed}, '5minute')
+
+        with mock.patch.object(config, 'INTRADAY_CANDLE_INTERVAL', '5minute'):
+            intraday, _ = self.analyzer._load_candles(['RELIANCE'])
+
+        self.assertEqual(self.analyzer.kite.calls, [(1, '15minute')])
+        self.assertEqual(intraday['RELIANCE'], aggregate_intraday(five_minute_bars(TODAY)))
+
+    def test_central_db_failure_falls_back_to_kite(self):
+        with mock.patch.object(eod_analyzer, 'get_central_db', side_effect=RuntimeError('locked')):
+            intraday, historical = self.analyzer._load_candles(['RELIANCE', 'TCS'])
+        self.assertEqual(len(self.analyzer.kite.calls), 4)
+        self.assertEqual(len(historical['TCS']), 31)
+
+
+class ParallelAnalysisTest(EODPipelineTestCase):
+
+    def test_process_pool_matches_in_process_run(self):
+        symbols = [f"STOCK{i}" for i in range(12)]
+        historical = {s: daily_bars(30, i) for i, s in enumerate(symbols)}
+        intraday = {s: aggregate_intraday(five_minute_bars(TODAY)) for s in symbols}
+
+        with mock.patch.object(config, 'EOD_ANALYSIS_WORKERS', 1):
+            serial = self.analyzer._run_analysis_stage(intraday, historical, 'BULLISH')
+        with mock.patch.object(config, 'EOD_ANALYSIS_WORKERS', 3):
+            parallel = self.analyzer._run_analysis_stage(intraday, historical, 'BULLISH')
+
+        self.assertEqual([r['symbol'] for r in parallel[1]], symbols)
+        self.assertEqual(parallel, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Equivalence test: IndicatorEngine's O(1) updates match a full recomputation.
+
+EarlyWarningDetector used to recompute VWAP / OBV / RSI per symbol from raw
+history every cycle (and cached VWAP for the whole day). The collector now feeds
+each stored minute into indicator_engine.IndicatorEngine. Pinned here, on a
+seeded session with cumulative Kite volumes:
+
+  * after every minute, vwap / obv / rsi / atr equal a from-scratch computation
+    over the whole series (minute volume = delta of the cumulative volume);
+  * save() + load() + catch_up() after a restart gives the same state as an
+    engine that never stopped; repeated minutes are ignored; a new day resets;
+  * EarlyWarningDetector reads the engine - fresh VWAP every minute, no SQL.
+
+Runs offline against temporary files.
+"""
+
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicator_engine import IndicatorEngine
+
+SYMBOLS = ['RELIANCE', 'TCS', 'INFY']
+OPEN = datetime(2026, 10, 16, 9, 15)
+
+
+def seeded_session(minutes=60, seed=7):
+    """[(timestamp, {symbol: {price, volume}})]; INFY skips every 9th minute."""
+    rng = random.Random(seed)
+    prices = {s: 100.0 * (i + 1) for i, s in enumerate(SYMBOLS)}
+    cum = {s: 0 for s in SYMBOLS}
+    session = []
+    for m in range(minutes):
+        quotes = {}
+        for symbol in SYMBOLS:
+            prices[symbol] = round(prices[symbol] + rng.choice([-1, 0, 1]) * rng.random(), 2)
+            cum[symbol] += rng.randint(0, 5000)
+            if symbol == 'INFY' and m % 9 == 4:
+                continue
+            quotes[symbol] = {'price': prices[symbol], 'volume': cum[symbol]}
+        session.append((OPEN + timedelta(minutes=m), quotes))
+    return session
+
+
+def brute_force(series, rsi_period=9, atr_period=14):
+    """Indicators over a whole [(price, cum_volume)] series, recomputed from scratch."""
+    prices = [p for p, _ in series]
+    volumes = [series[0][1]] + [max(0, series[i][1] - series[i - 1][1]) for i in range(1, len(series))]
+    changes = [prices[i] - prices[i - 1] for i in range(1, len(prices))]
+
+    total = sum(volumes)
+    vwap = sum(p * v for p, v in zip(prices, volumes)) / total if total else None
+    obv = sum(v if c > 0 else -v if c < 0 else 0 for c, v in zip(changes, volumes[1:]))
+
+    def wilder(values, period):
+        if len(values) < period:
+            return None
+        avg = sum(values[:period]) / period
+        for x in values[period:]:
+            avg = (avg * (period - 1) + x) / period
+        return avg
+
+    gain = wilder([max(c, 0.0) for c in changes], rsi_period)
+    loss = wilder([max(-c, 0.0) for c in changes], rsi_period)
+    rsi = None if gain is None else 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+    atr = wilder([abs(c) for c in changes], atr_period)
+    return {'vwap': vwap, 'obv': obv, 'rsi': rsi, 'atr': atr}
+
+
+class IndicatorEngineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='indicator_engine_test_')
+        self.db_path = os.path.join(self.tmpdir, 'indicator_state.db')
+        self.engines = []
+
+    def tearDown(self):
+        for engine in self.engines:
+            engine.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def make_engine(self, db_path=None):
+        engine = IndicatorEngine(db_path=db_path, rsi_period=9, atr_period=14)
+        self.engines.append(engine)
+        return engine
+
+    def assertIndicatorsEqual(self, actual, expected, msg=None):
+        for name in ('vwap', 'obv', 'rsi', 'atr'):
+            value = expected[name]
+            if value is None:
+                self.assertIsNone(actual[name], f"{msg} {name}")
+            else:
+                self.assertTrue(math.isclose(actual[name], value, rel_tol=1e-9, abs_tol=1e-9),
+                                f"{msg} {name}: {actual[name]} != {value}")
+
+
+class IncrementalEquivalenceTest(IndicatorEngineTestCase):
+
+    def test_every_minute_matches_full_recomputation(self):
+        engine = self.make_engine()
+        series = {s: [] for s in SYMBOLS}
+        for ts, quotes in seeded_session():
+            engine.update(ts, quotes)
+            for symbol, q in quotes.items():
+                series[symbol].append((q['price'], q['volume']))
+                self.assertIndicatorsEqual(engine.snapshot(symbol), brute_force(series[symbol]),
+                                           f"{symbol} {ts:%H:%M}")
+
+    def test_true_range_uses_high_low_when_present(self):
+        engine = IndicatorEngine(atr_period=2)
+        engine.update(OPEN, {'X': {'price': 100.0, 'volume': 10}})
+        engine.update(OPEN + timedelta(minutes=1), {'X': {'price': 101.0, 'volume': 20, 'high': 103.0, 'low': 99.0}})
+        engine.update(OPEN + timedelta(minutes=2), {'X': {'price': 100.0, 'volume': 30}})
+        self.assertEqual(engine.atr('X'), (4.0 + 1.0) / 2)
+
+
+class RestartTest(IndicatorEngineTestCase):
+
+    def test_save_load_catch_up_matches_uninterrupted(self):
+        session = seeded_session()
+        reference = self.make_engine()
+        live = self.make_engine(self.db_path)
+        for ts, quotes in session[:40]:
+            reference.update(ts, quotes)
+            live.update(ts, quotes)
+            live.save()
+        live.close()  # Collector stops; minutes 40-59 are stored by nobody's engine
+
+        for ts, quotes in session[40:]:
+            reference.update(ts, quotes)
+        history = {s: [] for s in SYMBOLS}  # today's rows, as QuoteWindow.since() returns them
+        for ts, quotes in session:
+            for symbol, q in quotes.items():
+                history[symbol].append({'timestamp': ts.strftime('%Y-%m-%d %H:%M:00'), **q})
+
+        restarted = self.make_engine(self.db_path)
+        self.assertEqual(restarted.load(now=OPEN), len(SYMBOLS))
+        replayed = restarted.catch_up(history)
+        self.assertEqual(replayed, sum(len(q) for _, q in session[40:]))
+        for symbol in SYMBOLS:
+            self.assertIndicatorsEqual(restarted.snapshot(symbol), reference.snapshot(symbol), symbol)
+            self.assertEqual(restarted.recent_obv(symbol), reference.recent_obv(symbol))
+
+    def test_repeated_minute_ignored_and_new_day_resets(self):
+        engine = self.make_engine(self.db_path)
+        engine.update(OPEN, {'X': {'price': 100.0, 'volume': 1000}})
+        engine.update(OPEN + timedelta(minutes=1), {'X': {'price': 102.0, 'volume': 3000}})
+        engine.update(OPEN + timedelta(minutes=1), {'X': {'price': 500.0, 'volume': 9000}})
+        self.assertAlmostEqual(engine.vwap('X'), (100.0 * 1000 + 102.0 * 2000) / 3000)
+
+        engine.update(OPEN + timedelta(days=1), {'X': {'price': 90.0, 'volume': 500}})
+        self.assertEqual(engine.vwap('X'), 90.0)
+        self.assertEqual(engine.obv('X'), 0.0)
+        engine.save()
+        self.assertEqual(self.make_engine(self.db_path).load(now=OPEN + timedelta(days=2)), 0)  # stale day not reused
+
+
+class EarlyWarningIntegrationTest(IndicatorEngineTestCase):
+
+    def test_detector_reads_fresh_engine_values_without_sql(self):
+        from early_warning_detector import EarlyWarningDetector
+
+        engine = self.make_engine()
+        db = mock.Mock()
+        db.conn.cursor.side_effect = AssertionError("detector queried SQLite")
+        with mock.patch('early_warning_detector.get_results_checker'):
+            detector = EarlyWarningDetector(db, mock.Mock(), mock.Mock(), indicators=engine)
+
+        session = seeded_session()
+        vwaps = []
+        for ts, quotes in session[:20]:
+            engine.update(ts, quotes)
+            vwaps.append(detector._calculate_vwap('TCS'))
+            detector._check_obv_confirmation('TCS', 'rise')
+            detector._check_rsi_momentum('TCS', 'drop')
+        self.assertEqual(vwaps[-1], engine.vwap('TCS'))
+        self.assertGreater(len(set(vwaps)), 10)  # recomputed as minutes arrive, not cached for the day
+
+        confirmed, rsi = detector._check_rsi_momentum('TCS', 'drop')
+        self.assertEqual(rsi, engine.rsi('TCS'))
+        self.assertEqual(confirmed, rsi > 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Regression test: instrument_master serves one daily snapshot of the instrument dump.
+
+kite.instruments() used to be downloaded and linearly scanned by every consumer.
+Pinned here, against a fake Kite and a temporary snapshot file:
+
+  * the dump is fetched once per exchange per day, however many processes
+    (InstrumentMaster instances) read it; a new day fetches again;
+  * token / option / expiry / futures-month / lot-size lookups agree with the
+    rows, with strikes matched as int or float and expiries as date or datetime;
+  * a failed fetch or a missing Kite client falls back to the last snapshot, and
+    the fetch is retried on later calls with a doubling backoff - not given up
+    for the rest of the day;
+  * tokens(segment=...) keeps only that segment's rows;
+  * nothing is read until the first lookup.
+
+Runs offline; the real data/instrument_master.db is untouched.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from instrument_master import InstrumentIndex, InstrumentMaster
+
+TODAY = datetime(2026, 10, 16, 8, 45)
+WEEKLY = date(2026, 10, 20)
+MONTHLY = date(2026, 10, 27)
+NEXT_MONTH = date(2026, 11, 24)
+
+NSE = [
+    {'instrument_token': 738561, 'exchange_token': 2885, 'tradingsymbol': 'RELIANCE', 'name': 'RELIANCE',
+     'expiry': '', 'strike': 0.0, 'tick_size': 0.05, 'lot_size': 1, 'instrument_type': 'EQ',
+     'segment': 'NSE', 'exchange': 'NSE'},
+    {'instrument_token': 2953217, 'exchange_token': 11536, 'tradingsymbol': 'TCS', 'name': 'TCS',
+     'expiry': '', 'strike': 0.0, 'tick_size': 0.05, 'lot_size': 1, 'instrument_type': 'EQ',
+     'segment': 'NSE', 'exchange': 'NSE'},
+    {'instrument_token': 256265, 'exchange_token': 1001, 'tradingsymbol': 'NIFTY 50', 'name': 'NIFTY 50',
+     'expiry': '', 'strike': 0.0, 'tick_size': 0.0, 'lot_size': 0, 'instrument_type': 'EQ',
+     'segment': 'INDICES', 'exchange': 'NSE'},
+]
+
+
+def nfo_row(token, symbol, name, expiry, instrument_type, strike=0.0, lot_size=75):
+    return {'instrument_token': token, 'exchange_token': token // 256, 'tradingsymbol': symbol, 'name': name,
+            'expiry': expiry, 'strike': strike, 'tick_size': 0.05, 'lot_size': lot_size,
+            'instrument_type': instrument_type, 'segment': 'NFO-OPT' if instrument_type != 'FUT' else 'NFO-FUT',
+            'exchange': 'NFO'}
+
+
+NFO = [
+    nfo_row(1001, 'NIFTY26O2025350CE', 'NIFTY', WEEKLY, 'CE', 25350.0),
+    nfo_row(1002, 'NIFTY26O2025350PE', 'NIFTY', WEEKLY, 'PE', 25350.0),
+    nfo_row(1003, 'NIFTY26OCT25350CE', 'NIFTY', MONTHLY, 'CE', 25350.0),
+    nfo_row(1004, 'NIFTY26NOV25350CE', 'NIFTY', NEXT_MONTH, 'CE', 25350.0),
+    nfo_row(1005, 'NIFTY26OCTFUT', 'NIFTY', MONTHLY, 'FUT'),
+    nfo_row(2001, 'RELIANCE26NOVFUT', 'RELIANCE', NEXT_MONTH, 'FUT', lot_size=500),
+    nfo_row(2002, 'RELIANCE26OCTFUT', 'RELIANCE', MONTHLY, 'FUT', lot_size=250),
+    nfo_row(3001, 'BANKNIFTY26OCT25350CE', 'BANKNIFTY', MONTHLY, 'CE', 25350.0),
+]
+
+
+class FakeKite:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def instruments(self, exchange=None):
+        self.calls.append(exchange)
+        if self.fail:
+            raise ConnectionError("instruments endpoint down")
+        return [dict(row) for row in {'NSE': NSE, 'NFO': NFO}[exchange]]
+
+
+class InstrumentMasterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='instrument_master_test_')
+        self.db_path = os.path.join(self.tmpdir, 'instrument_master.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+class DailySnapshotTest(InstrumentMasterTestCase):
+
+    def test_fetched_once_per_exchange_per_day(self):
+        kite = FakeKite()
+        first = InstrumentMaster(self.db_path, kite)
+        self.assertEqual(first.index('NFO', now=TODAY).token('NIFTY26OCTFUT'), 1005)
+        first.index('NFO', now=TODAY)
+        second = InstrumentMaster(self.db_path, kite)  # Another process, same day
+        self.assertEqual(len(second.index('NFO', now=TODAY)), len(NFO))
+        self.assertEqual(kite.calls, ['NFO'])
+
+        second.index('NSE', now=TODAY)
+        InstrumentMaster(self.db_path, kite).index('NFO', now=TODAY.replace(day=19))
+        self.assertEqual(kite.calls, ['NFO', 'NSE', 'NFO'])
+
+    def test_stale_snapshot_served_when_fetch_fails_or_no_kite(self):
+        InstrumentMaster(self.db_path, FakeKite()).index('NSE', now=TODAY)
+        later = TODAY.replace(day=19)
+
+        failing = FakeKite(fail=True)
+        self.assertEqual(InstrumentMaster(self.db_path, failing).index('NSE', now=later).token('TCS'), 2953217)
+        self.assertEqual(failing.calls, ['NSE'])
+        self.assertEqual(InstrumentMaster(self.db_path).index('NSE', now=later).token('TCS'), 2953217)
+        self.assertEqual(InstrumentMaster(self.db_path).snapshot_date('NSE'), '2026-10-16')
+
+    def test_failed_fetch_retried_with_backoff(self):
+        InstrumentMaster(self.db_path, FakeKite()).index('NSE', now=TODAY)
+        later = TODAY.replace(day=19, hour=9)
+        kite = FakeKite(fail=True)
+        master = InstrumentMaster(self.db_path, kite)
+
+        with mock.patch.multiple(config, INSTRUMENT_MASTER_RETRY_SEC=60, INSTRUMENT_MASTER_RETRY_MAX_SEC=150):
+            master.index('NSE', now=later)
+            master.index('NSE', now=later + timedelta(seconds=59))         # backing off
+            self.assertEqual(kite.calls, ['NSE'])
+            master.index('NSE', now=later + timedelta(seconds=60))         # retry 1, next in 120s
+            master.index('NSE', now=later + timedelta(seconds=179))
+            self.assertEqual(kite.calls, ['NSE', 'NSE'])
+            master.index('NSE', now=later + timedelta(seconds=180))        # retry 2, next capped at 150s
+
+            kite.fail = False
+            self.assertEqual(master.index('NSE', now=later + timedelta(seconds=329)).token('TCS'), 2953217)
+            self.assertEqual(len(kite.calls), 3)
+            master.index('NSE', now=later + timedelta(seconds=330))        # succeeds, today's snapshot
+            master.index('NSE', now=later + timedelta(hours=3))
+        self.assertEqual(len(kite.calls), 4)
+        self.assertEqual(master.snapshot_date('NSE'), '2026-10-19')
+
+    def test_nothing_read_before_first_lookup(self):
+        kite = FakeKite()
+        master = InstrumentMaster(self.db_path, kite)
+        self.assertEqual(kite.calls, [])
+        self.assertFalse(os.path.exists(self.db_path))
+        master.instruments('NSE')
+        self.assertEqual(kite.calls, ['NSE'])
+
+
+class LookupTest(InstrumentMasterTestCase):
+
+    def setUp(self):
+        super().setUp()
+        master = InstrumentMaster(self.db_path, FakeKite())
+        master.index('NSE', now=TODAY)
+        master.index('NFO', now=TODAY)
+        reloaded = InstrumentMaster(self.db_path)  # Lookups served from the stored snapshot
+        self.nse = reloaded.index('NSE', now=TODAY)
+        self.nfo = reloaded.index('NFO', now=TODAY)
+
+    def test_tokens(self):
+        self.assertEqual(self.nse.token('RELIANCE'), 738561)
+        self.assertIsNone(self.nse.token('UNLISTED'))
+        self.assertEqual(self.nse.tokens(['TCS', 'UNLISTED', 'RELIANCE']), {'TCS': 2953217, 'RELIANCE': 738561})
+        self.assertEqual(self.nse.tokens(['TCS', 'NIFTY 50'], segment='NSE'), {'TCS': 2953217})
+        self.assertEqual(self.nse.tokens(['TCS', 'NIFTY 50'], segment='INDICES'), {'NIFTY 50': 256265})
+
+    def test_option_symbol(self):
+        self.assertEqual(self.nfo.option_symbol('NIFTY', WEEKLY, 25350, 'CE'), 'NIFTY26O2025350CE')
+        self.assertEqual(self.nfo.option_symbol('NIFTY', datetime(2026, 10, 27), 25350.0, 'CE'), 'NIFTY26OCT25350CE')
+        self.assertEqual(self.nfo.option_symbol('NIFTY', '2026-10-20', 25350, 'PE'), 'NIFTY26O2025350PE')
+        self.assertIsNone(self.nfo.option_symbol('NIFTY', MONTHLY, 25350, 'PE'))
+        self.assertIsNone(self.nfo.option_symbol('NIFTY', MONTHLY, 99999, 'CE'))
+
+    def test_expiries_and_futures_months(self):
+        self.assertEqual(self.nfo.expiries('NIFTY'), [WEEKLY, MONTHLY, NEXT_MONTH])
+        self.assertEqual(self.nfo.expiries('NIFTY', 'FUT'), [MONTHLY])
+        self.assertEqual([r['tradingsymbol'] for r in self.nfo.futures('RELIANCE')],
+                         ['RELIANCE26OCTFUT', 'RELIANCE26NOVFUT'])
+        self.assertEqual(self.nfo.futures_month('RELIANCE', today=TODAY.date())['tradingsymbol'], 'RELIANCE26OCTFUT')
+        self.assertEqual(self.nfo.futures_month('RELIANCE', 1, today=TODAY.date())['tradingsymbol'], 'RELIANCE26NOVFUT')
+        self.assertEqual(self.nfo.lot_size('RELIANCE', today=date(2026, 10, 28)), 500)  # October expired
+        self.assertEqual({k: v['tradingsymbol'] for k, v in self.nfo.futures_map(today=TODAY.date()).items()},
+                         {'NIFTY': 'NIFTY26OCTFUT', 'RELIANCE': 'RELIANCE26OCTFUT'})
+
+    def test_rows_keep_kite_format(self):
+        row = self.nfo.get('NIFTY26OCT25350CE')
+        self.assertEqual(row['expiry'], MONTHLY)
+        self.assertEqual(row['strike'], 25350.0)
+        self.assertEqual(self.nse.get('TCS')['expiry'], '')
+
+    def test_index_over_plain_rows(self):
+        index = InstrumentIndex(NFO)
+        self.assertEqual(index.option_symbol('BANKNIFTY', MONTHLY, 25350, 'CE'), 'BANKNIFTY26OCT25350CE')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Regression test: get_latest_stock_quotes() reads a snapshot that never disagrees with stock_quotes.
+
+get_latest_stock_quotes() used to run a correlated MAX(timestamp) subquery over the
+whole of stock_quotes; it now reads latest_stock_quotes, a one-row-per-symbol table
+upserted in the same transaction as every stock_quotes write. Pinned here:
+
+  * the snapshot returns exactly what the old correlated query returns;
+  * writing an OLDER minute (backfill) never rolls the snapshot back;
+  * a database created before the snapshot existed is seeded from stock_quotes on open;
+  * cleanup_old_data() drops snapshot rows whose quotes it deleted.
+
+Runs offline against a temporary database - nothing touches data/central_quotes.db.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from central_quote_db import CentralQuoteDB
+
+OLD_QUERY = """
+    SELECT symbol, timestamp, price, volume, oi
+    FROM stock_quotes
+    WHERE timestamp = (
+        SELECT MAX(timestamp)
+        FROM stock_quotes sq2
+        WHERE sq2.symbol = stock_quotes.symbol
+    )
+"""
+
+
+class LatestStockQuotesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='latest_quotes_test_')
+        self.db_path = os.path.join(self.tmpdir, 'central_quotes.db')
+        self.db = CentralQuoteDB(db_path=self.db_path, mode='writer')
+        self.open_ts = datetime.now().replace(hour=9, minute=15, second=0, microsecond=0)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _seed(self, minutes=20):
+        """TCS quotes every minute; INFY stops trading after minute 10."""
+        for i in range(minutes):
+            quotes = {'TCS': {'price': 3000.0 + i, 'volume': 100 * (i + 1), 'oi': 5000 + i}}
+            if i <= 10:
+                quotes['INFY'] = {'price': 1500.0 - i, 'volume': 50 * (i + 1), 'oi': 7000 + i}
+            self.db.store_stock_quotes(quotes, self.open_ts + timedelta(minutes=i))
+
+    def _old_latest(self):
+        rows = self.db.conn.execute(OLD_QUERY).fetchall()
+        return {r[0]: {'timestamp': r[1], 'price': r[2], 'volume': r[3], 'oi': r[4]} for r in rows}
+
+    def _latest(self, symbols=None):
+        return {s: {k: q[k] for k in ('timestamp', 'price', 'volume', 'oi')}
+                for s, q in self.db.get_latest_stock_quotes(symbols).items()}
+
+    def test_snapshot_matches_correlated_query(self):
+        self._seed()
+        self.assertEqual(self._latest(), self._old_latest())
+        self.assertEqual(self._latest(['INFY']), {'INFY': self._old_latest()['INFY']})
+        self.assertEqual(self._latest()['INFY']['price'], 1490.0)
+
+    def test_older_minute_does_not_roll_snapshot_back(self):
+        self._seed()
+        self.db.store_stock_quotes({'TCS': {'price': 1.0, 'volume': 1}}, self.open_ts + timedelta(minutes=5))
+        self.assertEqual(self._latest()['TCS']['price'], 3019.0)
+        self.assertEqual(self._latest(), self._old_latest())
+
+    def test_existing_database_is_seeded_on_open(self):
+        self._seed()
+        self.db.conn.execute("DELETE FROM latest_stock_quotes")
+        self.db.conn.commit()
+        self.db.close()
+
+        self.db = CentralQuoteDB(db_path=self.db_path, mode='writer')
+        self.assertEqual(self._latest(), self._old_latest())
+
+    def test_cleanup_drops_stale_snapshot_rows(self):
+        old = self.open_ts - timedelta(days=3)
+        self.db.store_stock_quotes({'OLDSYM': {'price': 10.0, 'volume': 1}}, old)
+        self._seed()
+        self.db.cleanup_old_data(days=1)
+        self.assertNotIn('OLDSYM', self.db.get_latest_stock_quotes())
+        self.assertEqual(self._latest(), self._old_latest())
+
+
+if __name__ == '__main__':
+    unittest.main()
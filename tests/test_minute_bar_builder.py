@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Replay test: tick-built minute bars match the recorded KiteTicker stream.
+
+OrderFlowCollector folds its MODE_FULL ticks into 1-minute bars (minute_bar_builder.py)
+that are written to central_quotes.db, and the central collector uses those rows instead
+of polling Kite REST. tests/fixtures/kite_ticks_sample.jsonl is a TickRecorder file:
+RELIANCE / TCS / INFY cash + RELIANCE / TCS futures from 9:15 to 9:19, plus one pre-open
+tick, one tick that arrives after its minute closed, and a minute (9:17) where INFY does
+not trade. Pinned here:
+
+  * replaying the file gives the OHLC / volume / tick count a brute-force group-by gives;
+  * bar volume equals the quantity traded in the minute (delta of volume_traded);
+  * a quiet symbol is carried forward flat in stock_quotes but gets no candle;
+  * pre-open ticks make no bars; a tick that arrives after its minute closed is
+    dropped and counted, leaves the closed bar as emitted and the open bar's
+    price untouched, and its quantity reaches the next bar via volume_traded;
+  * bars land in central_quotes.db - stock_quotes at bar END, '1minute' candles at bar
+    START (IST), tick_bars_minute metadata - and the collector picks them up, falling
+    back to REST when the minute is missing.
+
+Runs offline against a temporary database - no broker, no network; the collector's
+log file goes to a temporary directory.
+"""
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from central_quote_db import CentralQuoteDB
+from minute_bar_builder import (MinuteBarBuilder, load_recording, replay_recording,
+                                write_bars_to_central_db)
+
+# central_data_collector opens logs/central_collector.log at import - redirect it
+LOG_DIR = tempfile.mkdtemp(prefix='minute_bar_logs_')
+_FileHandler = logging.FileHandler
+with mock.patch.object(logging, 'FileHandler', lambda filename, *args, **kwargs: _FileHandler(
+        os.path.join(LOG_DIR, os.path.basename(filename)), *args, **kwargs)):
+    from central_data_collector import CentralDataCollector
+
+RECORDING = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'kite_ticks_sample.jsonl')
+GRACE = timedelta(seconds=1)
+
+
+def tearDownModule():
+    for handler in list(logging.getLogger().handlers):
+        if getattr(handler, 'baseFilename', '').startswith(LOG_DIR):
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+    shutil.rmtree(LOG_DIR, ignore_errors=True)
+
+
+def replay(sink=None):
+    bars = {}
+
+    def collect(bar_start, minute_bars):
+        bars[bar_start] = minute_bars
+        if sink:
+            sink(bar_start, minute_bars)
+
+    builder = MinuteBarBuilder(on_bars=collect, close_grace_sec=GRACE.total_seconds())
+    replay_recording(RECORDING, builder)
+    return builder, bars
+
+
+def brute_force_bars():
+    """Group cash ticks by minute directly from the file (late ticks only add their quantity to the next bar)."""
+    cash_map, _, batches = load_recording(RECORDING)
+    grouped = defaultdict(list)
+    late_quantity = defaultdict(int)
+    carried = defaultdict(int)
+    for received_at, ticks in batches:
+        closed_through = (received_at - GRACE).replace(second=0, microsecond=0) - timedelta(minutes=1)
+        for tick in ticks:
+            symbol = cash_map.get(tick['instrument_token'])
+            if symbol is None:
+                continue
+            minute = tick['exchange_timestamp'].replace(second=0, microsecond=0)
+            if minute.hour == 9 and minute.minute < 15:
+                continue
+            if minute <= closed_through:
+                late_quantity[symbol] += tick['last_traded_quantity']
+                continue
+            grouped[(minute, symbol)].append(tick)
+            carried[(minute, symbol)] += late_quantity.pop(symbol, 0)
+
+    expected = {}
+    for key, ticks in grouped.items():
+        prices = [t['last_price'] for t in ticks]
+        expected[key] = {
+            'open': prices[0], 'high': max(prices), 'low': min(prices), 'close': prices[-1],
+            'volume': sum(t['last_traded_quantity'] for t in ticks) + carried[key], 'ticks': len(ticks),
+        }
+    return expected
+
+
+class MinuteBarReplayTest(unittest.TestCase):
+
+    def test_replay_matches_brute_force(self):
+        builder, bars = replay()
+        expected = brute_force_bars()
+        actual = {(minute, symbol): {k: bar[k] for k in ('open', 'high', 'low', 'close', 'volume', 'ticks')}
+                  for minute, minute_bars in bars.items()
+                  for symbol, bar in minute_bars.items() if bar['ticks'] > 0}
+        self.assertEqual(actual, expected)
+        self.assertEqual(sorted(bars), [datetime(2026, 10, 16, 9, m) for m in (15, 16, 17, 18)])
+
+    def test_quiet_symbol_carried_forward(self):
+        _, bars = replay()
+        infy = bars[datetime(2026, 10, 16, 9, 17)]['INFY']
+        prev = bars[datetime(2026, 10, 16, 9, 16)]['INFY']
+        self.assertEqual(infy['ticks'], 0)
+        self.assertEqual(infy['volume'], 0)
+        self.assertEqual((infy['open'], infy['high'], infy['low'], infy['close']), (prev['close'],) * 4)
+        self.assertEqual(infy['cum_volume'], prev['cum_volume'])
+
+    def test_preopen_and_late_ticks(self):
+        builder, bars = replay()
+        self.assertEqual(builder.late_ticks, 1)
+        self.assertTrue(all(minute.hour == 9 and minute.minute >= 15 for minute in bars))
+
+    def test_tick_after_its_minute_closed_is_dropped(self):
+        emitted = []
+        builder = MinuteBarBuilder(on_bars=lambda start, bars: emitted.append((start, bars)))
+
+        def tick(ts, price, volume):
+            builder.add_tick('TCS', 'CASH', {'exchange_timestamp': ts, 'last_price': price,
+                                             'volume_traded': volume, 'last_traded_quantity': 10})
+
+        tick(datetime(2026, 10, 16, 9, 15, 10), 100.0, 1000)
+        tick(datetime(2026, 10, 16, 9, 15, 40), 101.0, 1010)
+        tick(datetime(2026, 10, 16, 9, 16, 5), 102.0, 1020)      # closes 9:15
+        closed_915 = dict(emitted[0][1]['TCS'])
+        tick(datetime(2026, 10, 16, 9, 15, 59), 150.0, 1030)     # late for 9:15
+        tick(datetime(2026, 10, 16, 9, 16, 30), 103.0, 1040)
+        builder.flush(datetime(2026, 10, 16, 9, 17, 5))
+
+        self.assertEqual(builder.late_ticks, 1)
+        self.assertEqual([start for start, _ in emitted],
+                         [datetime(2026, 10, 16, 9, 15), datetime(2026, 10, 16, 9, 16)])
+        self.assertEqual(emitted[0][1]['TCS'], closed_915)
+        bar_916 = emitted[1][1]['TCS']
+        self.assertEqual((bar_916['open'], bar_916['high'], bar_916['low'], bar_916['close'], bar_916['ticks']),
+                         (102.0, 103.0, 102.0, 103.0, 2))
+        self.assertEqual(bar_916['volume'], 1040 - 1010)
+
+    def test_futures_oi_attached(self):
+        _, fut_map, batches = load_recording(RECORDING)
+        last_oi = {}
+        for _, ticks in batches:
+            for tick in ticks:
+                if tick['instrument_token'] in fut_map:
+                    last_oi[fut_map[tick['instrument_token']]] = tick['oi']
+        _, bars = replay()
+        final = bars[max(bars)]
+        self.assertEqual(final['RELIANCE']['oi'], last_oi['RELIANCE'])
+        self.assertEqual(final['TCS']['oi'], last_oi['TCS'])
+        self.assertEqual(final['INFY']['oi'], 0)  # no futures token recorded
+
+
+class MinuteBarCentralDBTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='minute_bar_test_')
+        self.db = CentralQuoteDB(db_path=os.path.join(self.tmpdir, 'central_quotes.db'), mode='writer')
+        _, self.bars = replay(sink=lambda start, bars: write_bars_to_central_db(self.db, start, bars))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_rows_written_at_bar_end_and_start(self):
+        bar = self.bars[datetime(2026, 10, 16, 9, 16)]['TCS']
+        self.assertEqual(self.db.get_stock_price_at_time('TCS', '2026-10-16 09:17:00'), bar['close'])
+
+        candles = self.db.get_intraday_candles_batch(['TCS', 'INFY'], '1minute', limit=10)
+        self.assertEqual([c['date'] for c in candles['TCS']][:2],
+                         ['2026-10-16T09:15:00+05:30', '2026-10-16T09:16:00+05:30'])
+        tcs_916 = candles['TCS'][1]
+        self.assertEqual((tcs_916['open'], tcs_916['high'], tcs_916['low'], tcs_916['close'], tcs_916['volume']),
+                         (bar['open'], bar['high'], bar['low'], bar['close'], bar['volume']))
+        # INFY did not trade at 9:17 - no candle, but a carried-forward quote
+        self.assertNotIn('2026-10-16T09:17:00+05:30', [c['date'] for c in candles['INFY']])
+        self.assertIsNotNone(self.db.get_stock_price_at_time('INFY', '2026-10-16 09:18:00'))
+
+        self.assertEqual(self.db.get_metadata('tick_bars_minute'), '2026-10-16 09:19:00')
+
+    def test_collector_prefers_tick_bars_then_falls_back(self):
+        collector = CentralDataCollector.__new__(CentralDataCollector)
+        collector.db = self.db
+        collector.stocks = ['RELIANCE', 'TCS', 'INFY']
+        with mock.patch.object(config, 'ENABLE_TICK_MINUTE_BARS', True), \
+                mock.patch.object(config, 'TICK_BAR_WAIT_SEC', 0):
+            quotes = collector._tick_bar_quotes(datetime(2026, 10, 16, 9, 19, 0, 300000))
+            missing = collector._tick_bar_quotes(datetime(2026, 10, 16, 9, 20, 1))
+
+        last = self.bars[datetime(2026, 10, 16, 9, 18)]
+        self.assertEqual({s: q['price'] for s, q in quotes.items()},
+                         {s: b['close'] for s, b in last.items()})
+        self.assertEqual(quotes['RELIANCE']['volume'], last['RELIANCE']['cum_volume'])
+        self.assertIsNone(missing)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for minute_bus.MinuteBus - the "minute N committed" notification.
+
+Consumer services used to sleep on their own timers and then poll
+is_data_fresh(), often landing just before the collector's commit and falling
+back to Kite. The collector now publishes each committed minute on a shared
+memory counter. Pinned here:
+
+  * publish() is visible to a second handle (another process's view) with the
+    minute, stock count and flags;
+  * wait_for_next() wakes on a publish from another thread, times out when
+    nothing is published, and after_time returns a commit made mid-cycle;
+  * wait_for_minute() returns only once the requested minute is committed;
+  * check_data_freshness() answers from the bus without SQL when it is fresh,
+    and waits for the next commit instead of reporting stale data;
+  * wait_for_next_minute() falls back to a single time.sleep(timeout) when
+    nothing was ever published or the last commit is stale, and an injected
+    clock / sleep drive wait_for_next() without real time passing.
+
+Runs offline against a temporary bus file; the database is a stub.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import central_db_reader
+import minute_bus
+from minute_bus import FLAG_NIFTY, FLAG_VIX, MinuteBus
+
+
+class StubDB:
+    """is_data_fresh() answers from a list; counts calls."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def is_data_fresh(self, max_age_minutes=2):
+        self.calls += 1
+        return self.answers.pop(0)
+
+
+class MinuteBusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='minute_bus_test_')
+        self.path = os.path.join(self.tmpdir, 'bus.shm')
+        self.publisher = MinuteBus(self.path, poll_sec=0.01)
+
+    def tearDown(self):
+        self.publisher.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_publish_visible_to_other_handle(self):
+        reader = MinuteBus(self.path, poll_sec=0.01)
+        self.assertIsNone(reader.latest())
+
+        ts = datetime(2026, 10, 16, 10, 31, 42)
+        self.assertEqual(self.publisher.publish(ts, stocks=208, flags=FLAG_NIFTY | FLAG_VIX), 1)
+        self.assertEqual(self.publisher.publish(ts + timedelta(minutes=1), stocks=207), 2)
+
+        event = reader.latest()
+        self.assertEqual(event.seq, 2)
+        self.assertEqual(event.minute, datetime(2026, 10, 16, 10, 32))
+        self.assertEqual((event.stocks, event.flags), (207, 0))
+        self.assertEqual(reader.age_minutes(now=datetime(2026, 10, 16, 10, 35, 5)), 3)
+        reader.close()
+
+    def test_wait_for_next_wakes_on_publish(self):
+        self.publisher.publish(datetime(2026, 10, 16, 10, 30))
+        reader = MinuteBus(self.path, poll_sec=0.01)
+
+        self.assertIsNone(reader.wait_for_next(timeout=0.05))
+
+        threading.Timer(0.1, self.publisher.publish, args=(datetime(2026, 10, 16, 10, 31),)).start()
+        started = time.monotonic()
+        event = reader.wait_for_next(timeout=5)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(event.minute, datetime(2026, 10, 16, 10, 31))
+
+        # A commit that landed while the consumer was busy returns at once
+        cycle_start = time.time() - 30
+        self.assertEqual(reader.wait_for_next(timeout=0.05, after_time=cycle_start), event)
+        reader.close()
+
+    def test_wait_for_minute(self):
+        reader = MinuteBus(self.path, poll_sec=0.01)
+        self.publisher.publish(datetime(2026, 10, 16, 10, 30))
+        self.assertIsNone(reader.wait_for_minute(datetime(2026, 10, 16, 10, 31, 20), timeout=0.05))
+        self.publisher.publish(datetime(2026, 10, 16, 10, 31, 3))
+        event = reader.wait_for_minute(datetime(2026, 10, 16, 10, 31, 20), timeout=0.05)
+        self.assertEqual(event.minute, datetime(2026, 10, 16, 10, 31))
+        reader.close()
+
+    def test_check_data_freshness_reads_bus_first(self):
+        self.publisher.publish(datetime.now())
+        db = StubDB([])
+        with mock.patch.object(central_db_reader, '_get_minute_bus', return_value=self.publisher):
+            self.assertEqual(central_db_reader.check_data_freshness(db, 'test', 2), (True, 0))
+        self.assertEqual(db.calls, 0)
+
+    def test_check_data_freshness_waits_for_next_commit(self):
+        # Bus lags (collector slow this minute) but the collector is alive
+        self.publisher.publish(datetime.now() - timedelta(minutes=3))
+        db = StubDB([(False, 3), (True, 0)])
+        threading.Timer(0.1, self.publisher.publish, args=(datetime.now(),)).start()
+        with mock.patch.object(central_db_reader, '_get_minute_bus', return_value=self.publisher):
+            self.assertEqual(central_db_reader.check_data_freshness(db, 'test', 2), (True, 0))
+        self.assertEqual(db.calls, 2)
+
+    def test_wait_for_next_minute_sleeps_once_without_a_live_collector(self):
+        reader = MinuteBus(self.path, poll_sec=0.01)
+        sleeps = []
+        with mock.patch.object(minute_bus, 'get_minute_bus', return_value=reader), \
+                mock.patch.object(minute_bus.time, 'sleep', sleeps.append):
+            # Never published
+            self.assertIsNone(minute_bus.wait_for_next_minute(20, after_time=time.time()))
+            # Last commit long ago (collector down / market closed)
+            self.publisher.publish(datetime.now() - timedelta(hours=1))
+            with mock.patch.object(minute_bus.time, 'time',
+                                   return_value=time.time() + minute_bus.STALE_BUS_SEC + 60):
+                self.assertIsNone(minute_bus.wait_for_next_minute(20))
+        self.assertEqual(sleeps, [20, 20])
+        reader.close()
+
+    def test_injected_clock_drives_the_wait(self):
+        self.publisher.publish(datetime(2026, 10, 16, 10, 30))
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        reader = MinuteBus(self.path, poll_sec=1.0, clock=lambda: now[0], sleep=sleep)
+        self.assertIsNone(reader.wait_for_next(timeout=5))
+        self.assertEqual(sum(sleeps), 5)
+        reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -41,6 +41,7 @@ from unittest import mock
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import nifty_option_analyzer as noa
+from instrument_master import InstrumentIndex
 from nifty_option_analyzer import (
     GreeksUnavailable,
     NiftyOptionAnalyzer,
@@ -80,7 +81,7 @@ def bare_analyzer(instruments=BHAVCOPY_INSTRUMENTS):
     none of that is needed to test symbol resolution or Black-Scholes.
     """
     analyzer = NiftyOptionAnalyzer.__new__(NiftyOptionAnalyzer)
-    analyzer._nfo_instruments = list(instruments)
+    analyzer._nfo_index = InstrumentIndex(list(instruments))
     analyzer._instruments_cache_time = datetime.now()
     return analyzer
 
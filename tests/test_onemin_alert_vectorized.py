@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Regression test: the 1-min backtest detects alerts with array operations.
+
+OneMinBacktester.detect_1min_alerts used to rebuild a price_cache entry per
+candle and call OneMinAlertDetector candle by candle. onemin_alert_vectorized
+applies the same six layers to the whole series. Pinned here, against the real
+detector fed the way onemin_monitor feeds it (one PriceCache update per minute
+with the day's cumulative volume, cooldowns on the candle clock):
+
+  * identical alerts - candle, direction, priority, move size and volume
+    baseline - over seeded multi-day series with volume spikes, gaps in
+    trading, penny-stock stretches and back-to-back moves inside the cooldown;
+  * the same with rise alerts switched off and with a different threshold set;
+  * the backtester's alert dicts come from the kernel.
+
+Runs offline; PriceCache, the alert history and the backtester's log file live
+in a temporary directory.
+"""
+
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import alert_history_manager
+import config
+from alert_history_manager import AlertHistoryManager
+from candle_warehouse import IST
+from onemin_alert_detector import OneMinAlertDetector
+from onemin_alert_vectorized import candle_arrays, detect_1min_alerts
+from price_cache import PriceCache
+
+# backtest_1min_alerts opens logs/1min_backtest.log at import - redirect it
+LOG_DIR = tempfile.mkdtemp(prefix='onemin_backtest_logs_')
+_FileHandler = logging.FileHandler
+with mock.patch.object(logging, 'FileHandler', lambda filename, *args, **kwargs: _FileHandler(
+        os.path.join(LOG_DIR, os.path.basename(filename)), *args, **kwargs)):
+    from backtest_1min_alerts import OneMinBacktester
+
+
+def tearDownModule():
+    for handler in list(logging.getLogger().handlers):
+        if getattr(handler, 'baseFilename', '').startswith(LOG_DIR):
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+    shutil.rmtree(LOG_DIR, ignore_errors=True)
+
+
+def session(rng, day, price, penny=False):
+    """One day of 1-minute candles: a random walk with bursts and trends of volume and price."""
+    candles = []
+    t = datetime(day.year, day.month, day.day, 9, 15, tzinfo=IST)
+    base_volume = rng.choice([2000, 20000, 300000])
+    price = price * 0.3 if penny else price
+    trend, steps = 0.0, 0
+    for m in range(375):
+        move = rng.gauss(0, 0.002)
+        volume = int(base_volume * rng.uniform(0.5, 1.5))
+        if steps:                       # steady trend: no acceleration on its last, heavy minute
+            move, steps = trend, steps - 1
+            volume *= 1 if steps else 6
+        elif rng.random() < 0.02:
+            trend, steps = rng.choice([-1, 1]) * rng.uniform(0.005, 0.008), 6
+        elif rng.random() < 0.06:       # burst: big move on heavy volume
+            move = rng.choice([-1, 1]) * rng.uniform(0.004, 0.015)
+            volume *= rng.choice([2, 3, 6])
+        if m < 3 and rng.random() < 0.3 or rng.random() < 0.01:
+            volume = 0                  # no trade yet / a quiet minute
+        price = round(price * (1 + move), 2)
+        candles.append({'date': t + timedelta(minutes=m), 'open': price, 'high': price,
+                        'low': price, 'close': price, 'volume': volume})
+    return candles
+
+
+def series(seed, days=6):
+    rng = random.Random(seed)
+    candles, price = [], rng.uniform(80, 3000)
+    day = datetime(2026, 9, 7)
+    for d in range(days):
+        candles += session(rng, day + timedelta(days=d), price, penny=(d == 2 and seed % 2 == 0))
+        price = candles[-1]['close']
+    return candles
+
+
+class CandleClock(datetime):
+    """datetime whose now() is the candle being replayed."""
+    current = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+class OneMinVectorizedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='onemin_vectorized_test_')
+        self.patcher = mock.patch.multiple(
+            config,
+            PRICE_CACHE_FILE=os.path.join(self.tmpdir, 'price_cache.json'),
+            PRICE_CACHE_DB_FILE=os.path.join(self.tmpdir, 'price_cache.db'),
+            ENABLE_SQLITE_CACHE=False,
+            ENABLE_JSON_BACKUP=False,
+            PRICE_CACHE_WRITE_BEHIND=False)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def replay(self, candles, symbol='TEST'):
+        """Alerts from OneMinAlertDetector, one minute at a time."""
+        cache = PriceCache()
+        history = AlertHistoryManager(os.path.join(self.tmpdir, f'alert_history_{symbol}.json'))
+        detector = OneMinAlertDetector(cache, history)
+        alerts, cumulative, day = [], 0, None
+        with mock.patch.object(alert_history_manager, 'datetime', CandleClock), cache.batch():
+            for i, candle in enumerate(candles):
+                t = candle['date'].replace(tzinfo=None)
+                CandleClock.current = t
+                cumulative = (cumulative if t.date() == day else 0) + candle['volume']
+                day = t.date()
+                cache.update_price_1min(symbol, candle['close'], cumulative, t.isoformat())
+                if i == 0 or (t.hour == 9 and 15 <= t.minute < 25):
+                    continue
+
+                current, prev = candle['close'], candles[i - 1]['close']
+                price_5min_ago = candles[i - 5]['close'] if i >= 5 else None
+                args = dict(symbol=symbol, current_price=current, price_1min_ago=prev,
+                            current_volume=cumulative, price_5min_ago=price_5min_ago)
+                volume = cache.get_volume_data_1min(symbol)
+                priority = detector.check_for_drop_1min(**args)
+                if priority:
+                    alerts.append((i, 'drop', priority, detector.get_drop_percentage(current, prev),
+                                   volume['avg_volume']))
+                    continue
+                if config.ENABLE_RISE_ALERTS:
+                    priority = detector.check_for_rise_1min(**args)
+                    if priority:
+                        alerts.append((i, 'rise', priority, detector.get_rise_percentage(current, prev),
+                                       volume['avg_volume']))
+        cache.close()
+        return alerts
+
+    def vectorized(self, candles):
+        found = detect_1min_alerts(*candle_arrays(candles))
+        return list(zip(found['index'].tolist(), found['direction'].tolist(), found['priority'].tolist(),
+                        found['change_percent'].tolist(), found['avg_volume'].tolist()))
+
+    def assert_same_alerts(self, seeds):
+        total = set()
+        for seed in seeds:
+            candles = series(seed)
+            expected = self.replay(candles, f'S{seed}')
+            self.assertEqual(self.vectorized(candles), expected, f'seed {seed}')
+            total.update((direction, priority) for _, direction, priority, _, _ in expected)
+        return total
+
+    def test_matches_detector(self):
+        kinds = self.assert_same_alerts(range(8))
+        self.assertEqual(kinds, {('drop', 'HIGH'), ('drop', 'NORMAL'), ('rise', 'HIGH'), ('rise', 'NORMAL')})
+
+    def test_matches_detector_with_rises_disabled(self):
+        with mock.patch.object(config, 'ENABLE_RISE_ALERTS', False):
+            kinds = self.assert_same_alerts(range(8, 12))
+        self.assertEqual({direction for direction, _ in kinds}, {'drop'})
+
+    def test_matches_detector_with_other_thresholds(self):
+        with mock.patch.multiple(config, DROP_THRESHOLD_1MIN=0.8, RISE_THRESHOLD_1MIN=0.3,
+                                 VOLUME_SPIKE_MULTIPLIER_1MIN=2.5, COOLDOWN_1MIN_ALERTS=3):
+            self.assertTrue(self.assert_same_alerts(range(12, 16)))
+
+    def test_short_series_has_no_alerts(self):
+        found = detect_1min_alerts(*candle_arrays(series(1)[:5]))
+        self.assertEqual(len(found['index']), 0)
+
+    def test_backtester_alerts(self):
+        candles = series(3)
+        backtester = OneMinBacktester.__new__(OneMinBacktester)
+        backtester.stats = dict.fromkeys(['alerts_with_3x_volume', 'alerts_with_4x_volume',
+                                          'alerts_with_5x_volume'], 0)
+        alerts = backtester.detect_1min_alerts(candles, 'TEST')
+        found = detect_1min_alerts(*candle_arrays(candles))
+        self.assertEqual([a['candle_index'] for a in alerts], found['index'].tolist())
+        first = alerts[0]
+        i = first['candle_index']
+        self.assertEqual(first['timestamp'], candles[i]['date'])
+        self.assertEqual((first['current_price'], first['previous_price']),
+                         (candles[i]['close'], candles[i - 1]['close']))
+        self.assertEqual(first['volume'], candles[i]['volume'])
+        self.assertEqual(sum(backtester.stats.values()),
+                         sum(a['volume_multiplier'] >= 3.0 for a in alerts))
+
+
+if __name__ == '__main__':
+    unittest.main()
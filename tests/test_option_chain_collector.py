@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Regression test: option_chain_collector records the NIFTY chain into option_chain_snapshots.
+
+No option chain history used to exist - each consumer quoted its own few
+contracts. Pinned here, with a fake Kite quote function pricing every contract
+at a known volatility, a temporary central DB and a temporary instrument master:
+
+  * the snapshot covers ±N strikes around ATM on the next N unexpired expiries,
+    only contracts the exchange lists, in one quote call;
+  * IV recovers the volatility the premiums were priced at; a contract with no
+    traded price is stored with NULL IV / Greeks, not a default;
+  * readers get the chain at a minute, the latest fresh row per contract (stale
+    rows are dropped) and a contract's premium at a past minute of the same day;
+  * cleanup_old_data() keeps OPTION_CHAIN_RETENTION_DAYS of snapshots;
+  * in the collector cycle the chain is quoted on the chain thread around the
+    last stored NIFTY price, priced at the cycle's spot and committed by
+    write_cycle with the rest of the minute; a chain quote slower than
+    OPTION_CHAIN_WAIT_SEC is left out instead of holding the cycle.
+
+Runs offline; data/central_quotes.db, data/instrument_master.db and logs/ are
+untouched.
+"""
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import black_scholes_vectorized as bsv
+import config
+from central_quote_db import CentralQuoteDB
+from instrument_master import InstrumentMaster
+from option_chain_collector import OptionChainCollector
+
+# central_data_collector opens logs/central_collector.log at import - redirect it
+LOG_DIR = tempfile.mkdtemp(prefix='option_chain_logs_')
+_FileHandler = logging.FileHandler
+with mock.patch.object(logging, 'FileHandler', lambda filename, *args, **kwargs: _FileHandler(
+        os.path.join(LOG_DIR, os.path.basename(filename)), *args, **kwargs)):
+    from central_data_collector import CentralDataCollector
+
+
+def tearDownModule():
+    for handler in list(logging.getLogger().handlers):
+        if getattr(handler, 'baseFilename', '').startswith(LOG_DIR):
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+    shutil.rmtree(LOG_DIR, ignore_errors=True)
+
+NOW = datetime(2026, 10, 16, 10, 5)
+EXPIRED = date(2026, 10, 13)
+WEEKLY = date(2026, 10, 20)
+MONTHLY = date(2026, 10, 27)
+NEXT_MONTH = date(2026, 11, 24)
+SPOT = 24262.0                       # ATM 24250
+VOL = 0.15
+RATE = 0.07
+UNLISTED = (24300.0, 'PE', WEEKLY)   # A gap in the exchange's listing
+
+
+def nfo_rows():
+    rows, token = [], 1000
+    for expiry in (EXPIRED, WEEKLY, MONTHLY, NEXT_MONTH):
+        for strike in range(23500, 25050, 50):
+            for option_type in ('CE', 'PE'):
+                if (float(strike), option_type, expiry) == UNLISTED:
+                    continue
+                token += 1
+                rows.append({'instrument_token': token, 'exchange_token': token, 'name': 'NIFTY',
+                             'tradingsymbol': f"NIFTY{expiry:%y%m%d}{strike}{option_type}",
+                             'expiry': expiry, 'strike': float(strike), 'tick_size': 0.05, 'lot_size': 75,
+                             'instrument_type': option_type, 'segment': 'NFO-OPT', 'exchange': 'NFO'})
+    return rows
+
+
+class FakeKite:
+    def instruments(self, exchange=None):
+        return nfo_rows() if exchange == 'NFO' else []
+
+
+class FakeQuotes:
+    """kite.quote stand-in: every contract priced at VOL, one contract untraded."""
+
+    def __init__(self, spot=SPOT, now=NOW, untraded=None):
+        self.calls = []
+        self.untraded = untraded
+        self.by_symbol = {f"NFO:{row['tradingsymbol']}": row for row in nfo_rows()}
+        self.spot, self.now = spot, now
+
+    def __call__(self, *instruments):
+        self.calls.append(instruments)
+        quotes = {}
+        for key in instruments:
+            row = self.by_symbol[key]
+            t = OptionChainCollector._years_to_expiry(row['expiry'], self.now)
+            price = 0.0 if key == self.untraded else round(float(
+                bsv.bs_price(self.spot, row['strike'], t, VOL, row['instrument_type'], RATE)), 2)
+            quotes[key] = {'last_price': price, 'oi': 1000, 'volume': 50,
+                           'depth': {'buy': [{'price': max(price - 0.5, 0)}], 'sell': [{'price': price + 0.5}]}}
+        return quotes
+
+
+class OptionChainTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='option_chain_test_')
+        self.db = CentralQuoteDB(db_path=os.path.join(self.tmpdir, 'central_quotes.db'), mode='writer')
+        self.master = InstrumentMaster(os.path.join(self.tmpdir, 'instrument_master.db'), FakeKite())
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def collector(self, quotes):
+        return OptionChainCollector(quotes, self.db, self.master, underlying='NIFTY', strike_step=50,
+                                    strikes_each_side=4, expiries=2, risk_free_rate=RATE)
+
+
+class ContractSelectionTest(OptionChainTestCase):
+
+    def test_strikes_around_atm_on_next_listed_expiries(self):
+        contracts = self.collector(FakeQuotes()).select_contracts(SPOT, NOW)
+        self.assertEqual(sorted({c['expiry'] for c in contracts}), [WEEKLY, MONTHLY])
+        self.assertEqual(sorted({c['strike'] for c in contracts}), [24050.0 + 50 * i for i in range(9)])
+        self.assertEqual(len(contracts), 2 * 9 * 2 - 1)
+        self.assertNotIn(UNLISTED, {(c['strike'], c['option_type'], c['expiry']) for c in contracts})
+
+
+class CollectTest(OptionChainTestCase):
+
+    def test_snapshot_stored_with_iv_and_greeks(self):
+        untraded = f"NFO:NIFTY{WEEKLY:%y%m%d}24250CE"
+        quotes = FakeQuotes(untraded=untraded)
+        stored = self.collector(quotes).collect(NOW, SPOT)
+
+        self.assertEqual(stored, 35)
+        self.assertEqual(len(quotes.calls), 1)
+        chain = self.db.get_option_chain('2026-10-20')
+        self.assertEqual(len(chain), 17)
+        for row in chain:
+            self.assertEqual(row['timestamp'], '2026-10-16 10:05:00')
+            self.assertEqual(row['spot'], SPOT)
+            if f"NFO:{row['tradingsymbol']}" == untraded:
+                self.assertIsNone(row['iv'])
+                self.assertIsNone(row['delta'])
+            elif row['ltp'] >= 1.0:  # Premiums rounded to paise: deep OTM IV is loose
+                self.assertAlmostEqual(row['iv'], VOL, delta=0.005, msg=row['tradingsymbol'])
+                self.assertEqual(row['ask'] - row['bid'], 1.0)
+
+    def test_no_listed_contracts_stores_nothing(self):
+        quotes = FakeQuotes()
+        self.assertEqual(self.collector(quotes).collect(NOW, 40000.0), 0)
+        self.assertEqual(quotes.calls, [])
+
+
+class ReaderTest(OptionChainTestCase):
+
+    def test_chain_at_a_minute_and_premium_at_a_past_minute(self):
+        collector = self.collector(FakeQuotes())
+        collector.collect(NOW, SPOT)
+        later = NOW + timedelta(minutes=1)
+        collector.quote_fn = FakeQuotes(spot=SPOT + 40, now=later)
+        collector.collect(later, SPOT + 40)
+
+        self.assertEqual(self.db.get_option_chain('2026-10-20', at='2026-10-16 10:05:30')[0]['timestamp'],
+                         '2026-10-16 10:05:00')
+        self.assertEqual(self.db.get_option_chain('2026-10-20')[0]['spot'], SPOT + 40)
+        self.assertEqual(self.db.get_option_chain('2026-10-20', at='2026-10-16 10:04:00'), [])
+
+        symbol = f"NIFTY{WEEKLY:%y%m%d}24250CE"
+        first = self.db.get_option_ltp_at(symbol, '2026-10-16 10:05:00')
+        latest = {row['tradingsymbol']: row['ltp'] for row in self.db.get_option_chain('2026-10-20')}
+        self.assertEqual(self.db.get_option_ltp_at(symbol, '2026-10-16 15:10:00'), latest[symbol])
+        self.assertLess(first, self.db.get_option_ltp_at(symbol, '2026-10-16 10:06:00'))
+        self.assertIsNone(self.db.get_option_ltp_at(symbol, '2026-10-17 09:20:00'))
+
+    def test_latest_fresh_row_per_contract(self):
+        now = datetime.now().replace(second=0, microsecond=0)
+        fresh, stale = f"NIFTY{WEEKLY:%y%m%d}24250CE", f"NIFTY{WEEKLY:%y%m%d}24300CE"
+        row = {'expiry': '2026-10-20', 'option_type': 'CE', 'oi': 10, 'volume': 1, 'spot': SPOT}
+        self.db.store_option_chain([dict(row, strike=24250.0, tradingsymbol=fresh, ltp=100.0),
+                                    dict(row, strike=24300.0, tradingsymbol=stale, ltp=80.0)],
+                                   now - timedelta(minutes=10))
+        self.db.store_option_chain([dict(row, strike=24250.0, tradingsymbol=fresh, ltp=101.0)], now)
+
+        quotes = self.db.get_option_chain_quotes([f"NFO:{fresh}", f"NFO:{stale}"], max_age_minutes=2)
+        self.assertEqual(list(quotes), [f"NFO:{fresh}"])
+        self.assertEqual(quotes[f"NFO:{fresh}"]['ltp'], 101.0)
+        self.assertEqual(self.db.get_option_chain_quotes([stale])[stale]['ltp'], 80.0)
+
+
+class RetentionTest(OptionChainTestCase):
+
+    def test_cleanup_keeps_configured_days(self):
+        row = {'expiry': '2099-01-01', 'strike': 24250.0, 'option_type': 'CE', 'tradingsymbol': 'X', 'ltp': 1.0}
+        for days in (1, 5, 40):
+            self.db.store_option_chain([row], datetime.now() - timedelta(days=days))
+        with mock.patch.object(config, 'OPTION_CHAIN_RETENTION_DAYS', 10):
+            self.db.cleanup_old_data(days=1)
+        count = self.db.conn.execute("SELECT COUNT(*) FROM option_chain_snapshots").fetchone()[0]
+        self.assertEqual(count, 2)
+
+
+class CollectorCycleTest(OptionChainTestCase):
+
+    def cycle_collector(self, quotes):
+        collector = CentralDataCollector.__new__(CentralDataCollector)
+        collector.db = self.db
+        collector.option_chain = self.collector(quotes)
+        collector._chain_pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(collector._chain_pool.shutdown)
+        return collector
+
+    def test_chain_committed_with_the_cycle(self):
+        self.db.store_nifty_quote(SPOT - 30, {}, NOW - timedelta(minutes=1))
+        quotes = FakeQuotes()
+        collector = self.cycle_collector(quotes)
+
+        job = collector._start_option_chain(NOW)
+        rows = collector._finish_option_chain(job, NOW, SPOT)
+        self.db.write_cycle(NOW, nifty={'price': SPOT}, option_chain=rows)
+
+        chain = self.db.get_option_chain('2026-10-20')
+        self.assertEqual(len(chain), 2 * 9 - 1)
+        self.assertEqual({row['spot'] for row in chain}, {SPOT})
+        self.assertAlmostEqual(chain[0]['iv'], VOL, places=3)
+        self.assertEqual(len(quotes.calls), 1)
+
+    def test_slow_chain_is_skipped(self):
+        self.db.store_nifty_quote(SPOT, {}, NOW - timedelta(minutes=1))
+        release = threading.Event()
+        quotes = FakeQuotes()
+
+        def slow_quotes(*instruments):
+            release.wait(5)
+            return quotes(*instruments)
+
+        collector = self.cycle_collector(slow_quotes)
+        job = collector._start_option_chain(NOW)
+        with mock.patch.object(config, 'OPTION_CHAIN_WAIT_SEC', 0.05):
+            self.assertEqual(collector._finish_option_chain(job, NOW, SPOT), [])
+        release.set()
+
+    def test_no_stored_nifty_skips_the_chain(self):
+        self.assertIsNone(self.cycle_collector(FakeQuotes())._start_option_chain(NOW))
+
+
+if __name__ == '__main__':
+    unittest.main()
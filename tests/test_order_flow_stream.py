@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Equivalence test: OrderFlowStream's rolling windows match the batch analyzer.
+
+OrderFlowAnalyzer.analyze_all used to re-read the 30-second window from
+tick_snapshots and run get_cumulative_volume_stats twice per symbol every
+cycle. The collector now folds each tick into order_flow_stream.OrderFlowStream
+and the analyzer builds metrics from its snapshot. Pinned here, on seeded tick
+streams with cash and futures:
+
+  * at every checkpoint, BAI / depth ratio / volume delta / tick velocity /
+    price change / walls equal the batch computation over the ticks still
+    inside the analysis window, and the cumulative flow equals the executed
+    volume deltas inside the flow window;
+  * analyze_all() in stream mode reads no tick SQL and carries bai_prev from
+    the previous cycle;
+  * the per-window tick cap evicts the oldest ticks and keeps the sums exact.
+
+Runs offline: the database is a stub.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from order_flow_analyzer import OrderFlowAnalyzer
+from order_flow_stream import OrderFlowStream
+
+SYMBOLS = ['RELIANCE', 'TCS', 'INFY']
+WINDOW = 30
+FLOW_WINDOW = 300
+
+
+def make_tick(rng, symbol, asset_type, price, volume):
+    """A parsed tick (OrderFlowCollector._parse_tick shape) around `price`."""
+    spread = 0.05
+    bid, ask = round(price - spread, 2), round(price + spread, 2)
+    last = rng.choice([bid, ask, price])
+    qtys = [rng.randint(0, 500) for _ in range(10)]
+    if rng.random() < 0.1:
+        qtys[rng.randrange(5)] *= 40   # occasional wall
+    tick = {
+        'symbol': symbol, 'asset_type': asset_type,
+        'last_price': last, 'last_quantity': rng.randint(0, 200), 'volume': volume,
+        'buy_quantity': rng.randint(0, 50000), 'sell_quantity': rng.randint(0, 50000),
+        'best_bid': bid, 'best_ask': ask,
+        'bid_depth_total': sum(qtys[:5]), 'ask_depth_total': sum(qtys[5:]),
+    }
+    for i in range(5):
+        tick[f'bid_l{i + 1}_qty'] = qtys[i]
+        tick[f'ask_l{i + 1}_qty'] = qtys[5 + i]
+        tick[f'bid_l{i + 1}_price'] = round(bid - 0.05 * i, 2)
+        tick[f'ask_l{i + 1}_price'] = round(ask + 0.05 * i, 2)
+    return tick
+
+
+def seeded_stream(seconds=600, seed=11):
+    """[(t, tick)] over `seconds`, several ticks per second across symbols."""
+    rng = random.Random(seed)
+    prices = {(s, a): 100.0 * (i + 1) * (1.002 if a == 'FUT' else 1.0)
+              for i, s in enumerate(SYMBOLS) for a in ('CASH', 'FUT')}
+    volumes = {key: 0 for key in prices}
+    events = []
+    t = 1_000_000.0
+    for _ in range(seconds * 4):
+        t += rng.random() * 0.5
+        key = rng.choice(list(prices))
+        prices[key] = round(prices[key] + rng.choice([-0.05, 0, 0, 0.05, 0.1]), 2)
+        if rng.random() < 0.7:
+            volumes[key] += rng.randint(1, 300)
+        events.append((t, make_tick(rng, key[0], key[1], prices[key], volumes[key])))
+    return events
+
+
+def cumulative_flow(history, now):
+    """(buy, sell) executed volume deltas inside the flow window."""
+    buy = sell = 0
+    prev_volume = None
+    for t, tick in history:
+        vol_delta = tick['volume'] - prev_volume if prev_volume is not None else 0
+        prev_volume = tick['volume']
+        if t < now - FLOW_WINDOW or vol_delta <= 0:
+            continue
+        if tick['best_ask'] > 0 and tick['last_price'] >= tick['best_ask']:
+            buy += vol_delta
+        elif tick['best_bid'] > 0 and tick['last_price'] <= tick['best_bid']:
+            sell += vol_delta
+    return buy, sell
+
+
+class StubDB:
+    """flow_metrics is empty; any tick query is a failure."""
+
+    def __init__(self):
+        self.bai_map_reads = 0
+
+    def get_previous_bai_map(self):
+        self.bai_map_reads += 1
+        return {}, {}
+
+    def get_all_ticks_since(self, seconds=None):
+        raise AssertionError("stream mode must not query tick_snapshots")
+
+    def get_cumulative_volume_stats(self, *args, **kwargs):
+        raise AssertionError("stream mode must not query cumulative volume")
+
+
+class OrderFlowStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = OrderFlowAnalyzer(db=StubDB())
+
+    def test_snapshot_matches_batch_computation(self):
+        stream = OrderFlowStream(window_sec=WINDOW, flow_window_sec=FLOW_WINDOW, max_ticks=100000)
+        history = {}
+        checked = 0
+        for i, (t, tick) in enumerate(seeded_stream()):
+            stream.add_ticks([tick], now=t)
+            history.setdefault((tick['symbol'], tick['asset_type']), []).append((t, tick))
+            if i % 97:
+                continue
+
+            snapshot = stream.snapshot(now=t)
+            for (symbol, asset_type), ticks in history.items():
+                in_window = [tk for ts, tk in ticks if ts >= t - WINDOW]
+                stats = snapshot.get(symbol, {}).get(asset_type)
+                if not in_window:
+                    self.assertIsNone(stats)
+                    continue
+                _, buy, sell = self.analyzer._compute_volume_delta(in_window)
+                self.assertEqual(stats['tick_count'], len(in_window))
+                self.assertAlmostEqual(stats['bai'], self.analyzer._compute_bai(in_window), places=9)
+                self.assertAlmostEqual(stats['depth_ratio'],
+                                       self.analyzer._compute_depth_ratio(in_window), places=9)
+                self.assertEqual((stats['buy_volume'], stats['sell_volume']), (buy, sell))
+                self.assertAlmostEqual(stats['tick_velocity'],
+                                       self.analyzer._compute_tick_velocity(in_window), places=9)
+                self.assertAlmostEqual(stats['price_change_pct'],
+                                       self.analyzer._compute_price_change(in_window), places=9)
+                self.assertEqual(self.analyzer._detect_walls([stats['last_tick']]),
+                                 self.analyzer._detect_walls(in_window))
+                self.assertEqual((stats['cum_buy'], stats['cum_sell']), cumulative_flow(ticks, t))
+                checked += 1
+        self.assertGreater(checked, 100)
+
+    def test_analyze_all_reads_stream_without_tick_sql(self):
+        stream = OrderFlowStream(window_sec=WINDOW, flow_window_sec=FLOW_WINDOW)
+        rng = random.Random(3)
+        now = __import__('time').time()
+        for i in range(10):
+            stream.add_ticks([make_tick(rng, 'RELIANCE', 'CASH', 2500.0, 1000 * (i + 1)),
+                              make_tick(rng, 'RELIANCE', 'FUT', 2505.0, 500 * (i + 1))], now=now)
+        stream.add_ticks([make_tick(rng, 'TCS', 'CASH', 3500.0, 10)], now=now)
+        self.analyzer.stream = stream
+
+        first = self.analyzer.analyze_all()
+        self.assertEqual(set(first), {'RELIANCE'})   # TCS below ORDER_FLOW_MIN_TICKS
+        m = first['RELIANCE']
+        self.assertEqual(m['tick_count'], 10)
+        self.assertEqual(m['fut_tick_count'], 10)
+        self.assertEqual(m['bai_delta'], 0.0)        # no previous cycle yet
+
+        stream.add_ticks([make_tick(rng, 'RELIANCE', 'CASH', 2500.0, 20000)], now=now)
+        second = self.analyzer.analyze_all()['RELIANCE']
+        self.assertEqual(second['bai_prev'], m['bai'])
+        self.assertAlmostEqual(second['bai_delta'], second['bai'] - m['bai'], places=3)
+        self.assertEqual(self.analyzer.db.bai_map_reads, 1)   # only seeded once
+
+    def test_tick_cap_evicts_oldest(self):
+        stream = OrderFlowStream(window_sec=WINDOW, flow_window_sec=FLOW_WINDOW, max_ticks=5)
+        rng = random.Random(5)
+        ticks = [make_tick(rng, 'INFY', 'CASH', 1500.0 + i, 100 * (i + 1)) for i in range(12)]
+        stream.add_ticks(ticks, now=1000.0)
+        stats = stream.snapshot(now=1000.0)['INFY']['CASH']
+        kept = ticks[-5:]
+        self.assertEqual(stats['tick_count'], 5)
+        self.assertAlmostEqual(stats['bai'], self.analyzer._compute_bai(kept), places=9)
+        self.assertAlmostEqual(stats['tick_velocity'],
+                               self.analyzer._compute_tick_velocity(kept), places=9)
+
+    def test_streaming_enabled_by_default(self):
+        self.assertTrue(config.ORDER_FLOW_STREAMING)
+
+
+if __name__ == '__main__':
+    unittest.main()
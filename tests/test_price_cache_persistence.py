@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Regression test: PriceCache persists only what changed, once per cycle.
+
+update_price() / update_price_1min() used to call _save_cache() on every call, and
+each save rewrote every snapshot row of every symbol in a BEGIN IMMEDIATE transaction -
+~200 full-table rewrites per monitor cycle. PriceCache now tracks dirty symbols, and
+batch() / update_prices_bulk() persist a whole cycle with one save. Pinned here:
+
+  * update_prices_bulk() leaves the same cache - in memory and on disk - as the
+    per-symbol update_price() / update_price_1min() loop it replaces;
+  * a save writes only the rows of symbols changed since the last save;
+  * a 200-symbol batch is one SQLite transaction;
+  * a failed save keeps its symbols dirty, so the next save writes them;
+  * write-behind mode saves from a background thread and flushes on close().
+
+Runs offline against temporary SQLite files; the real data/price_cache.db is untouched.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from price_cache import PriceCache
+
+SYMBOLS = [f"SYM{i:03d}" for i in range(200)]
+
+
+def cycle_prices(cycle):
+    return {s: (100.0 + i + cycle * 0.5, 1000 * (cycle + 1) + i) for i, s in enumerate(SYMBOLS)}
+
+
+class PriceCacheTestCase(unittest.TestCase):
+
+    write_behind = False
+    flush_interval = 0.05
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='price_cache_test_')
+        self.patcher = mock.patch.multiple(
+            config,
+            PRICE_CACHE_FILE=os.path.join(self.tmpdir, 'price_cache.json'),
+            PRICE_CACHE_DB_FILE=os.path.join(self.tmpdir, 'price_cache.db'),
+            ENABLE_SQLITE_CACHE=True,
+            ENABLE_JSON_BACKUP=False,
+            PRICE_CACHE_WRITE_BEHIND=self.write_behind,
+            PRICE_CACHE_FLUSH_INTERVAL_SEC=self.flush_interval)
+        self.patcher.start()
+        self.caches = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+            cache.db_conn.close()
+        self.patcher.stop()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def make_cache(self, name='price_cache.db'):
+        with mock.patch.object(config, 'PRICE_CACHE_DB_FILE', os.path.join(self.tmpdir, name)):
+            cache = PriceCache()
+        self.caches.append(cache)
+        return cache
+
+    @staticmethod
+    def db_rows(cache):
+        conn = sqlite3.connect(cache.db_file)
+        try:
+            return conn.execute("SELECT symbol, snapshot_type, price, volume, timestamp FROM price_snapshots "
+                                "ORDER BY symbol, snapshot_type").fetchall()
+        finally:
+            conn.close()
+
+
+class BulkUpdateTest(PriceCacheTestCase):
+
+    def test_bulk_matches_per_symbol_updates(self):
+        loop = self.make_cache('loop.db')
+        bulk = self.make_cache('bulk.db')
+        for cycle in range(4):
+            ts = f"2026-10-16T09:{20 + cycle:02d}:00"
+            for symbol, (price, volume) in cycle_prices(cycle).items():
+                loop.update_price(symbol, price, volume, ts)
+                loop.update_price_1min(symbol, price + 0.1, volume, ts)
+            bulk.update_prices_bulk(cycle_prices(cycle), timestamp=ts)
+            bulk.update_prices_bulk({s: (p + 0.1, v) for s, (p, v) in cycle_prices(cycle).items()},
+                                    timestamp=ts, interval="1min")
+
+        self.assertEqual(bulk.cache, loop.cache)
+        self.assertEqual(self.db_rows(bulk), self.db_rows(loop))
+        self.assertEqual(len(self.db_rows(bulk)), 200 * 8)  # 8 updates: current, previous_1min, previous..previous6
+
+    def test_batch_is_one_transaction(self):
+        cache = self.make_cache()
+        with mock.patch.object(cache, '_save_to_sqlite', wraps=cache._save_to_sqlite) as save:
+            cache.update_prices_bulk(cycle_prices(0))
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(len(save.call_args.args[0]), 200)
+
+    def test_only_dirty_symbols_are_written(self):
+        cache = self.make_cache()
+        cache.update_prices_bulk(cycle_prices(0))
+        with mock.patch.object(cache, '_save_to_sqlite', wraps=cache._save_to_sqlite) as save:
+            cache.update_price('SYM007', 555.0, 1, "2026-10-16T09:25:00")
+        snapshot_rows, _ = save.call_args.args
+        self.assertEqual({row[0] for row in snapshot_rows}, {'SYM007'})
+        self.assertEqual({row[1] for row in snapshot_rows}, {'current', 'previous_1min', 'previous'})
+
+        reloaded = self.make_cache()
+        snapshots = lambda data: {k: v for k, v in data.items() if v is not None}
+        self.assertEqual(snapshots(reloaded.cache['SYM007']), snapshots(cache.cache['SYM007']))
+
+    def test_failed_save_keeps_symbols_dirty(self):
+        cache = self.make_cache()
+        with mock.patch.object(cache, '_save_to_sqlite_with_retry',
+                               side_effect=sqlite3.OperationalError('disk I/O error')):
+            with self.assertRaises(RuntimeError):
+                cache.update_price('SYM001', 10.0, 1, "2026-10-16T09:25:00")
+        self.assertEqual(self.db_rows(cache), [])
+
+        cache.update_price('SYM002', 20.0, 1, "2026-10-16T09:25:00")
+        self.assertEqual([row[0] for row in self.db_rows(cache)], ['SYM001', 'SYM002'])
+
+
+class WriteBehindTest(PriceCacheTestCase):
+
+    write_behind = True
+    flush_interval = 0.2
+
+    def test_updates_are_flushed_in_background_and_on_close(self):
+        cache = self.make_cache()
+        with mock.patch.object(cache, '_save_to_sqlite', wraps=cache._save_to_sqlite) as save:
+            cache.update_prices_bulk(cycle_prices(0))
+            self.assertEqual(save.call_count, 0)  # the caller never waits on SQLite
+            deadline = time.time() + 2
+            while not self.db_rows(cache) and time.time() < deadline:
+                time.sleep(0.02)
+        self.assertEqual(len(self.db_rows(cache)), 200)
+
+        cache.update_price('SYM000', 1.0, 1, "2026-10-16T09:30:00")
+        cache.close()
+        self.assertIn(('SYM000', 'current', 1.0, 1, "2026-10-16T09:30:00"), self.db_rows(cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Regression test: PriceCache snapshots live in a fixed-size per-symbol ring buffer.
+
+Every update used to rebuild a dict of eight named snapshot dicts per symbol
+(current -> previous -> previous2 ... copied one slot down). Each symbol is now a
+SnapshotRing of typed arrays, and the named slots are lookbacks into it. Pinned here:
+
+  * the getters give the same answers as the named-slot cache for a 5-minute and a
+    1-minute update sequence (including the timestamp-window rejections);
+  * the 1-min volume spike compares the last minute's volume with the average
+    per-minute volume of the last five minutes;
+  * get_snapshot(symbol, k) reaches any lookback below PRICE_CACHE_RING_DEPTH, and the
+    ring overwrites its oldest point once full;
+  * `cache` still reads and writes like the old dict - the backtests assign whole
+    symbols and single slots through it;
+  * the named slots survive a save/reload (SQLite and the JSON backup).
+
+Runs offline against temporary SQLite/JSON files; the real data/price_cache.db is untouched.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from price_cache import PriceCache, SnapshotRing
+
+
+def ts(minute, second=0):
+    return f"2026-10-16T10:{minute:02d}:{second:02d}"
+
+
+class RingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='price_cache_ring_test_')
+        self.patcher = mock.patch.multiple(
+            config,
+            PRICE_CACHE_FILE=os.path.join(self.tmpdir, 'price_cache.json'),
+            PRICE_CACHE_DB_FILE=os.path.join(self.tmpdir, 'price_cache.db'),
+            ENABLE_SQLITE_CACHE=True,
+            ENABLE_JSON_BACKUP=False,
+            PRICE_CACHE_WRITE_BEHIND=False,
+            PRICE_CACHE_RING_DEPTH=60)
+        self.patcher.start()
+        self.caches = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+            if cache.db_conn:
+                cache.db_conn.close()
+        self.patcher.stop()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def make_cache(self):
+        cache = PriceCache()
+        self.caches.append(cache)
+        return cache
+
+
+class SnapshotRingTest(unittest.TestCase):
+
+    def test_push_get_and_wraparound(self):
+        ring = SnapshotRing(depth=4)
+        self.assertIsNone(ring.get(0))
+        for i in range(6):
+            ring.push(100.0 + i, 10 * i, i)
+        self.assertEqual(len(ring), 4)
+        self.assertEqual([ring.get(k)[0] for k in range(4)], [105.0, 104.0, 103.0, 102.0])
+        self.assertIsNone(ring.get(4))
+
+    def test_set_extends_a_short_ring(self):
+        ring = SnapshotRing(depth=8)
+        ring.set(1, 50.0, 5, 1)
+        ring.set(0, 51.0, 6, 2)
+        self.assertEqual((ring.get(0)[0], ring.get(1)[0]), (51.0, 50.0))
+        self.assertEqual(len(ring), 2)
+
+
+class GetterTest(RingTestCase):
+
+    def test_five_minute_sequence(self):
+        cache = self.make_cache()
+        for i in range(8):
+            cache.update_price('INFY', 1500.0 + i, 1000 * (i + 1), ts(5 * i))
+
+        self.assertEqual(cache.get_prices('INFY'), (1507.0, 1505.0))       # previous2, 10 min
+        self.assertEqual(cache.get_prices_5min('INFY'), (1507.0, 1506.0))  # previous, 5 min
+        self.assertEqual(cache.get_price_30min('INFY'), (1507.0, 1501.0))  # previous6, 30 min
+        self.assertTrue(cache.has_previous_price('INFY'))
+        self.assertTrue(cache.has_30min_price('INFY'))
+        self.assertEqual(cache.cache['INFY']['previous3'],
+                         {'price': 1504.0, 'volume': 5000, 'timestamp': ts(20)})
+
+    def test_one_minute_sequence_and_window_rejection(self):
+        cache = self.make_cache()
+        cache.update_price_1min('TCS', 3000.0, 100, ts(0))
+        cache.update_price_1min('TCS', 3003.0, 160, ts(1))
+        self.assertEqual(cache.get_prices_1min('TCS'), (3003.0, 3000.0))
+        self.assertEqual(cache.get_price_1min_ago('TCS'), 3000.0)
+
+        cache.update_price_1min('TCS', 3004.0, 170, ts(1, 10))  # 10s later: too close
+        self.assertIsNone(cache.get_price_1min_ago('TCS'))
+        cache.update_price_1min('TCS', 3005.0, 180, ts(9))      # 8 min gap: stale
+        self.assertIsNone(cache.get_price_1min_ago('TCS'))
+        cache.update_price_1min('TCS', 3006.0, 190, "2026-10-17T09:15:00")
+        self.assertEqual(cache.get_prices_1min('TCS'), (3006.0, None))  # previous day
+
+    def test_one_minute_volume_spike(self):
+        cache = self.make_cache()
+        cumulative = 1000000
+        for minute, traded in enumerate([10000, 12000, 9000, 11000, 10000, 8000, 60000]):
+            cumulative += traded
+            cache.update_prices_bulk({'INFY': (1500.0, cumulative)}, timestamp=ts(minute))
+            if minute == 5:
+                self.assertFalse(cache.get_volume_data_1min('INFY')['volume_spike'])
+
+        volume = cache.get_volume_data_1min('INFY')
+        self.assertEqual(volume['current_volume'], 60000)
+        self.assertEqual(volume['avg_volume'], (60000 + 8000 + 10000 + 11000 + 9000) / 5)  # last 5 minutes
+        self.assertTrue(volume['volume_spike'])
+
+        # The first update of a day has no same-day history to compare against
+        cache.update_prices_bulk({'INFY': (1500.0, 50000)}, timestamp="2026-10-17T09:15:00")
+        self.assertFalse(cache.get_volume_data_1min('INFY')['volume_spike'])
+
+    def test_missing_history(self):
+        cache = self.make_cache()
+        cache.update_price('SBIN', 800.0, 1, ts(0))
+        self.assertEqual(cache.get_prices('SBIN'), (800.0, None))
+        self.assertFalse(cache.has_previous_price('SBIN'))
+        self.assertEqual(cache.get_prices('UNKNOWN'), (None, None))
+        self.assertIsNone(cache.get_snapshot('UNKNOWN', 0))
+
+
+class LookbackTest(RingTestCase):
+
+    def test_arbitrary_lookback_up_to_depth(self):
+        cache = self.make_cache()
+        for i in range(75):
+            cache.update_price_1min('RELIANCE', 2000.0 + i, i, ts(i % 60, i // 60))
+        self.assertEqual(cache.get_history_length('RELIANCE'), 60)
+        self.assertEqual(cache.get_snapshot('RELIANCE', 0)['price'], 2074.0)
+        self.assertEqual(cache.get_snapshot('RELIANCE', 45)['price'], 2029.0)
+        self.assertEqual(cache.get_snapshot('RELIANCE', 59)['price'], 2015.0)
+        self.assertIsNone(cache.get_snapshot('RELIANCE', 60))
+
+
+class CompatibilityShimTest(RingTestCase):
+
+    def test_backtest_style_writes(self):
+        cache = self.make_cache()
+        # backtest_1min_alerts: whole symbol assignment
+        cache.cache['HDFC'] = {
+            'current': {'price': 101.0, 'volume': 20, 'timestamp': ts(1)},
+            'previous_1min': {'price': 100.0, 'volume': 10, 'timestamp': ts(0)},
+        }
+        self.assertEqual(cache.get_prices_1min('HDFC'), (101.0, 100.0))
+
+        # backtest_1min_yesterday: empty dict, then slot-by-slot
+        cache.cache['ITC'] = {}
+        cache.cache['ITC']['previous_1min'] = cache.cache['ITC'].get('current')
+        cache.cache['ITC']['current'] = {'price': 400.0, 'volume': 5, 'timestamp': ts(0)}
+        cache.cache['ITC']['previous_1min'] = cache.cache['ITC'].get('current')
+        cache.cache['ITC']['current'] = {'price': 402.0, 'volume': 9, 'timestamp': ts(1)}
+        self.assertEqual(cache.get_prices_1min('ITC'), (402.0, 400.0))
+
+        self.assertIn('ITC', cache.cache)
+        self.assertEqual(len(cache.cache), 2)
+        self.assertEqual(sorted(cache.cache), ['HDFC', 'ITC'])
+
+    def test_avg_daily_volume_only_symbol(self):
+        cache = self.make_cache()
+        cache.set_avg_daily_volume('WIPRO', 1_000_000)
+        self.assertIn('WIPRO', cache.cache)
+        self.assertEqual(cache.cache['WIPRO'].get('avg_daily_volume'), 1_000_000)
+        self.assertIsNone(cache.cache['WIPRO'].get('current'))
+
+
+class PersistenceTest(RingTestCase):
+
+    def test_named_slots_round_trip(self):
+        cache = self.make_cache()
+        for i in range(8):
+            cache.update_price('INFY', 1500.0 + i, 1000 * (i + 1), ts(5 * i))
+        cache.set_avg_daily_volume('INFY', 42)
+        before = dict(cache.cache['INFY'])
+
+        reloaded = self.make_cache()
+        self.assertEqual(dict(reloaded.cache['INFY']), before)
+        self.assertEqual(reloaded.get_price_30min('INFY'), (1507.0, 1501.0))
+        # Deeper history is in memory only; the named slots define what reloads
+        self.assertEqual(reloaded.get_history_length('INFY'), 7)
+
+    def test_json_backup_keeps_the_legacy_layout(self):
+        with mock.patch.multiple(config, ENABLE_SQLITE_CACHE=False, ENABLE_JSON_BACKUP=True):
+            cache = self.make_cache()
+            cache.update_price('TCS', 3000.0, 1, ts(0))
+            cache.update_price('TCS', 3010.0, 2, ts(5))
+            with open(config.PRICE_CACHE_FILE) as f:
+                data = json.load(f)
+            self.assertEqual(data['TCS']['previous'], {'price': 3000.0, 'volume': 1, 'timestamp': ts(0)})
+            self.assertEqual(self.make_cache().get_prices_5min('TCS'), (3010.0, 3000.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for quote_snapshot.QuoteSnapshot - the shared-memory latest quote universe.
+
+Each consumer service used to re-read latest_stock_quotes from its own SQLite
+reader connection every cycle. The collector now also writes each committed
+cycle into a memory-mapped structured array. Pinned here:
+
+  * a second handle (another process's view) reads exactly what
+    CentralQuoteDB.get_latest_stock_quotes() returns for the same writes,
+    including a symbol that stopped trading (keeps its last row);
+  * row indices stay stable across cycles and across a writer restart;
+  * a reader never sees a half-written cycle while the writer publishes;
+  * central_db_reader.get_latest_stock_quotes() serves a fresh snapshot
+    without SQL, reads only missing symbols from SQL, and falls back to SQL
+    when the snapshot is stale.
+
+Runs offline against temporary files.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import central_db_reader
+from central_quote_db import CentralQuoteDB
+from quote_snapshot import QuoteSnapshot
+
+
+def cycle_quotes(i):
+    """TCS every minute; INFY stops after minute 5."""
+    quotes = {'TCS': {'price': 3000.0 + i, 'volume': 100 * (i + 1), 'oi': 5000 + i,
+                      'oi_day_high': 5100 + i, 'oi_day_low': 4900}}
+    if i <= 5:
+        quotes['INFY'] = {'price': 1500.0 - i, 'volume': 50 * (i + 1), 'oi': 7000 + i,
+                          'oi_day_high': 7100, 'oi_day_low': 6900 - i}
+    return quotes
+
+
+class StubDB:
+    """get_latest_stock_quotes() records the symbols it was asked for."""
+
+    def __init__(self, quotes=None):
+        self.quotes = quotes or {}
+        self.calls = []
+
+    def get_latest_stock_quotes(self, symbols=None):
+        self.calls.append(symbols)
+        return {s: q for s, q in self.quotes.items() if symbols is None or s in symbols}
+
+
+class QuoteSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='quote_snapshot_test_')
+        self.path = os.path.join(self.tmpdir, 'quotes.shm')
+        self.writer = QuoteSnapshot(self.path, capacity=64)
+        self.open_ts = datetime.now().replace(hour=9, minute=15, second=0, microsecond=0)
+
+    def tearDown(self):
+        self.writer.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_matches_latest_stock_quotes_table(self):
+        db = CentralQuoteDB(db_path=os.path.join(self.tmpdir, 'central_quotes.db'), mode='writer')
+        reader = QuoteSnapshot(self.path)
+        self.assertIsNone(reader.read())
+        try:
+            for i in range(10):
+                ts = self.open_ts + timedelta(minutes=i)
+                db.write_cycle(ts, stock_quotes=cycle_quotes(i))
+                self.writer.publish(cycle_quotes(i), ts)
+
+            self.assertEqual(reader.get_latest_stock_quotes(), db.get_latest_stock_quotes())
+            self.assertEqual(reader.get_latest_stock_quotes(['INFY']),
+                             db.get_latest_stock_quotes(['INFY']))
+            minute, rows = reader.read()
+            self.assertEqual(minute, self.open_ts + timedelta(minutes=9))
+            self.assertEqual(rows['symbol'].tolist(), [b'TCS', b'INFY'])
+        finally:
+            reader.close()
+            db.close()
+
+    def test_writer_restart_keeps_row_indices(self):
+        self.writer.publish(cycle_quotes(0), self.open_ts)
+        self.writer.close()
+
+        restarted = QuoteSnapshot(self.path, capacity=64)
+        restarted.publish({'SBIN': {'price': 800.0}, 'INFY': {'price': 1490.0}},
+                          self.open_ts + timedelta(minutes=1))
+        _, rows = restarted.read()
+        self.assertEqual(rows['symbol'].tolist(), [b'TCS', b'INFY', b'SBIN'])
+        self.assertEqual(rows['price'].tolist(), [3000.0, 1490.0, 800.0])
+        restarted.close()
+
+    def test_reader_never_sees_a_torn_cycle(self):
+        symbols = [f'S{i}' for i in range(40)]
+        reader = QuoteSnapshot(self.path)
+        stop = threading.Event()
+
+        def write():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                self.writer.publish({s: {'price': float(i), 'volume': i} for s in symbols},
+                                    self.open_ts + timedelta(minutes=i % 300))
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        try:
+            reads = 0
+            while reads < 300:
+                snapshot = reader.read()
+                if snapshot is None:
+                    continue
+                _, rows = snapshot
+                if len(rows) == len(symbols):
+                    self.assertEqual(len(set(rows['price'].tolist())), 1)
+                    reads += 1
+        finally:
+            stop.set()
+            thread.join()
+            reader.close()
+
+    def test_reader_helper_prefers_fresh_snapshot(self):
+        now = datetime.now()
+        self.writer.publish(cycle_quotes(0), now)
+        db = StubDB({'SBIN': {'price': 800.0}})
+
+        with mock.patch.object(central_db_reader, '_get_quote_snapshot', return_value=self.writer):
+            quotes = central_db_reader.get_latest_stock_quotes(db, ['TCS', 'INFY'])
+            self.assertEqual(quotes['TCS']['price'], 3000.0)
+            self.assertEqual(db.calls, [])
+
+            quotes = central_db_reader.get_latest_stock_quotes(db, ['TCS', 'SBIN'])
+            self.assertEqual(set(quotes), {'TCS', 'SBIN'})
+            self.assertEqual(db.calls, [['SBIN']])
+
+            self.writer.publish(cycle_quotes(1), now - timedelta(minutes=5))
+            central_db_reader.get_latest_stock_quotes(db, ['TCS'])
+            self.assertEqual(db.calls[-1], ['TCS'])
+
+
+if __name__ == '__main__':
+    unittest.main()
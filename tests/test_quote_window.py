@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Equivalence test: the in-memory QuoteWindow answers exactly what central_quotes.db does.
+
+The detectors in central_data_collector_continuous.py read the window instead of SQLite,
+so every read it offers is pinned against the CentralQuoteDB query it replaces, on the
+same seeded session:
+
+  * since()          == get_stock_history_since_batch()
+  * day_aggregates() == get_stock_day_aggregates_batch()
+  * price_at_time()  == get_stock_price_at_time()
+  * at(N)            == the row stored N minutes before the injected clock
+  * load_from_db() rebuilds the same window the live appends built
+
+Also pinned: ring eviction keeps only `depth` minutes, and a new trading day clears it.
+
+Runs offline against a temporary database - nothing touches data/central_quotes.db.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from central_quote_db import CentralQuoteDB
+from quote_window import QuoteWindow
+
+SYMBOLS = ['RELIANCE', 'TCS', 'INFY']
+
+
+class QuoteWindowEquivalenceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='quote_window_test_')
+        self.db = CentralQuoteDB(db_path=os.path.join(self.tmpdir, 'central_quotes.db'), mode='writer')
+        self.window = QuoteWindow(depth=400)
+        self.open_ts = datetime.now().replace(hour=9, minute=15, second=0, microsecond=0)
+        self.minutes = 40
+        self._seed()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _seed(self):
+        """40 minutes from 9:15; INFY skips every 7th minute, NIFTY every 5th."""
+        for i in range(self.minutes):
+            ts = self.open_ts + timedelta(minutes=i)
+            quotes = {}
+            for j, symbol in enumerate(SYMBOLS):
+                if symbol == 'INFY' and i % 7 == 3:
+                    continue
+                quotes[symbol] = {'price': 100.0 * (j + 1) + ((i * 7 + j) % 11) - 5,
+                                  'volume': 1000 * (i + 1) + j, 'oi': 50000 + i * 10 * (j + 1)}
+            nifty = None if i % 5 == 4 else 24000.0 + i
+            self.db.store_stock_quotes(quotes, ts)
+            if nifty is not None:
+                self.db.store_nifty_quote(nifty, {}, ts)
+            self.window.append(ts, quotes, nifty)
+
+    def test_since_matches_db(self):
+        since = (self.open_ts + timedelta(minutes=12)).strftime('%Y-%m-%d %H:%M:00')
+        self.assertEqual(self.window.since(since, SYMBOLS),
+                         self.db.get_stock_history_since_batch(SYMBOLS, since))
+
+    def test_day_aggregates_match_db(self):
+        self.assertEqual(self.window.day_aggregates(SYMBOLS),
+                         self.db.get_stock_day_aggregates_batch(SYMBOLS))
+
+    def test_price_at_time_matches_db(self):
+        for i in (0, 3, 10, 39):
+            ts = (self.open_ts + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:00')
+            for symbol in SYMBOLS:
+                self.assertEqual(self.window.price_at_time(symbol, ts),
+                                 self.db.get_stock_price_at_time(symbol, ts))
+
+    def test_at_returns_row_n_minutes_before_clock(self):
+        now = self.open_ts + timedelta(minutes=self.minutes - 1, seconds=20)
+        target = (self.open_ts + timedelta(minutes=self.minutes - 6)).strftime('%Y-%m-%d %H:%M:00')
+        expected = {}
+        for symbol, rows in self.db.get_stock_history_since_batch(SYMBOLS, target).items():
+            row = rows[0]
+            if row['timestamp'] == target:
+                expected[symbol] = {'price': row['price'], 'volume': row['volume']}
+        self.assertEqual(self.window.at(5, SYMBOLS, now=now), expected)
+
+    def test_day_open_and_nifty(self):
+        first = self.window.day_open(SYMBOLS)
+        self.assertEqual(first['RELIANCE']['oi'], 50000)
+        self.assertEqual(first['INFY']['timestamp'], self.open_ts.strftime('%Y-%m-%d %H:%M:00'))
+
+        since = (self.open_ts + timedelta(minutes=20)).strftime('%Y-%m-%d %H:%M:00')
+        db_nifty = [{'timestamp': r['timestamp'], 'price': r['price']}
+                    for r in self.db.get_nifty_history_since(since)]
+        self.assertEqual(self.window.nifty_since(since), db_nifty)
+        self.assertEqual(self.window.nifty_latest()['price'], db_nifty[-1]['price'])
+
+    def test_load_from_db_rebuilds_window(self):
+        now = self.open_ts + timedelta(minutes=self.minutes)
+        warmed = QuoteWindow(depth=400)
+        self.assertEqual(warmed.load_from_db(self.db, now=now), self.minutes)
+
+        since = self.open_ts.strftime('%Y-%m-%d %H:%M:00')
+        self.assertEqual(warmed.since(since), self.window.since(since))
+        self.assertEqual(warmed.day_aggregates(), self.window.day_aggregates())
+        self.assertEqual(warmed.history('TCS', 15, now=now), self.window.history('TCS', 15, now=now))
+
+    def test_ring_evicts_oldest_minutes(self):
+        small = QuoteWindow(depth=10)
+        for i in range(25):
+            small.append(self.open_ts + timedelta(minutes=i), {'TCS': {'price': 100.0 + i, 'volume': i}})
+        rows = small.since(self.open_ts)['TCS']
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0]['price'], 115.0)
+        self.assertIsNone(small.price_at_time('TCS', self.open_ts))
+
+    def test_new_day_clears_window(self):
+        self.window.append(self.open_ts + timedelta(days=1), {'TCS': {'price': 1.0, 'volume': 1}})
+        self.assertEqual(len(self.window), 1)
+        self.assertEqual(self.window.day_aggregates(['RELIANCE']), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Regression test: replay_harness runs the live detectors against a recorded day.
+
+A synthetic day is written to a temporary central_quotes.db: three stocks from
+09:15 to 13:10, one of which (CRASH) falls 1.5% over five minutes on a volume burst,
+crossing the 1.25% threshold at 12:30.
+Pinned here:
+
+  * the real RapidAlertDetector fires on CRASH at the injected 12:30 clock, and
+    nowhere else; AlertPnLTracker fills its T+2 entry and exits from the window;
+  * every detector is timed, and nothing is sent - notifications are recorded;
+  * the clock and stubs are restored afterwards (module datetime is real again);
+  * multi-day replay returns one report per day, in order.
+
+Runs offline: no Kite, no Telegram, no data/ files are written.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import replay_harness
+from central_quote_db import CentralQuoteDB
+
+DAY = '2026-10-15'
+OPEN = datetime(2026, 10, 15, 9, 15)
+
+
+def seed_day(db, day_open):
+    """09:15-13:10; CRASH drops 0.3%/min over 12:26-12:30 on a volume burst."""
+    crash_at = day_open.replace(hour=12, minute=30)
+    for i in range(236):
+        ts = day_open + timedelta(minutes=i)
+        crash_price = 500.0
+        crash_volume = 100_000 + 100 * i
+        if ts > crash_at - timedelta(minutes=5):
+            step = min((ts - (crash_at - timedelta(minutes=5))).seconds // 60, 5)
+            crash_price = 500.0 * (1 - 0.003 * step)
+            crash_volume += 200_000 * step
+        quotes = {
+            'CRASH': {'price': crash_price, 'volume': crash_volume, 'oi': 0},
+            'FLAT': {'price': 1000.0, 'volume': 50_000 + 10 * i, 'oi': 0},
+            'DRIFT': {'price': 200.0 + 0.01 * i, 'volume': 80_000 + 20 * i, 'oi': 0},
+        }
+        db.store_stock_quotes(quotes, ts)
+        db.store_nifty_quote(24000.0 + i * 0.1, {}, ts)
+
+
+class ReplayHarnessTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp(prefix='replay_harness_test_')
+        cls.db_path = os.path.join(cls.tmpdir, 'central_quotes.db')
+        db = CentralQuoteDB(db_path=cls.db_path, mode='writer')
+        seed_day(db, OPEN)
+        seed_day(db, OPEN + timedelta(days=1))
+        db.close()
+
+        cls.lot_sizes = os.path.join(cls.tmpdir, 'lot_sizes.json')
+        with open(cls.lot_sizes, 'w') as f:
+            f.write('{"CRASH": 750}')
+
+        cls.report = replay_harness.replay_day(DAY, cls.db_path, detectors=replay_harness.DETECTORS,
+                                               lot_sizes_file=cls.lot_sizes)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def test_rapid_alert_fires_at_replayed_minute(self):
+        rapid = [a for a in self.report['alerts'] if a['detector'] == 'rapid']
+        self.assertEqual([(a['time'], a['symbol'], a['direction']) for a in rapid],
+                         [('12:30', 'CRASH', 'drop')])
+        self.assertEqual(self.report['minutes'], 236)
+
+    def test_pnl_tracker_follows_the_alert(self):
+        trades = [t for t in self.report['pnl_trades'] if t['alert_type'] != 'prealert']
+        self.assertEqual(len(trades), 1)
+        trade = trades[0]
+        self.assertEqual((trade['symbol'], trade['time']), ('CRASH', '12:30'))
+        self.assertAlmostEqual(trade['entry_price'], 492.5)  # T+2 = 12:32
+        self.assertAlmostEqual(trade['pnl_pct_15m'], 0.0)
+
+    def test_every_detector_timed_and_nothing_sent(self):
+        self.assertEqual(set(self.report['timings']), set(replay_harness.DETECTORS))
+        self.assertEqual(self.report['timings']['rapid']['calls'], 236)
+        self.assertGreater(self.report['messages'], 0)  # recorded by the stub notifier
+
+    def test_clock_and_stubs_restored(self):
+        import rapid_drop_detector
+        import requests
+        self.assertIs(rapid_drop_detector.datetime, datetime)
+        self.assertNotIsInstance(getattr(requests.post, '__self__', None), replay_harness.RecordingNotifier)
+
+    def test_multi_day_reports_in_order(self):
+        self.assertEqual(replay_harness.list_days(self.db_path), [DAY, '2026-10-16'])
+        reports = replay_harness.replay_days([DAY, '2026-10-16'], self.db_path, detectors=['rapid'])
+        self.assertEqual([r['day'] for r in reports], [DAY, '2026-10-16'])
+        self.assertEqual([[a['symbol'] for a in r['alerts']] for r in reports], [['CRASH'], ['CRASH']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Regression test: the VWAP win-rate sweep runs on precomputed features in parallel.
+
+vwap_winrate_optimizer evaluated every config serially, re-deriving VWAP, C1
+ratios, approach counts and the mover ranking from the candle lists at each
+timestamp. Features are now built once per day and configs are fanned out
+by sweep_engine. Pinned here:
+
+  * run_day_features() over build_day_features() gives exactly run_day()'s
+    trades (same order, same floats) across seeded synthetic days and configs
+    covering every filter, confirmation delays and time windows;
+  * run_sweep() returns the same results in a process pool as in-process;
+  * results are checkpointed per config: a rerun evaluates only what is
+    missing, and changed data starts a fresh sweep.
+
+Runs offline on synthetic quotes; results go to a temporary SQLite file.
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from itertools import product
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vwap_winrate_optimizer as opt
+from sweep_engine import SharedArrays, run_sweep
+
+CALLS = []
+
+
+def counting_evaluate(cfg, arrays, meta):
+    CALLS.append(cfg)
+    return {'total': float(arrays['x'].sum()) * cfg[0], 'label': meta}
+
+
+def make_day(rng, date, n_symbols=40):
+    """Quotes for one day: mean-reverting walks around a drifting level, with gaps."""
+    open_ = datetime.strptime(f"{date} 09:15:00", '%Y-%m-%d %H:%M:%S')
+    minutes = [open_ + timedelta(minutes=m) for m in range(316)]          # 09:15 .. 14:30
+    candles, prev_close = {}, {}
+    for s in range(n_symbols):
+        sym = f"S{s:02d}"
+        close = round(rng.uniform(100, 2000), 1)
+        level = close * (1 + rng.choice([-1, 1]) * rng.uniform(0, 0.04))
+        price, volume, rows = level, 0.0, []
+        for t in minutes:
+            if rng.random() < 0.08:
+                continue                                                  # no quote this minute
+            level *= 1 + rng.gauss(0, 0.0008)
+            price = round(price + (level - price) * 0.3 + rng.gauss(0, level * 0.0015), 1)
+            volume += rng.choice([0, 0, 1, 1, 2, 6]) * 1000 if rng.random() < 0.97 else -500
+            rows.append({'timestamp': t.strftime('%Y-%m-%d %H:%M:%S'), 'price': float(price),
+                         'volume': float(volume)})
+        candles[sym] = rows
+        if s % 13:
+            prev_close[sym] = float(close)
+    candles['S00_COPY'] = [dict(c) for c in candles['S00']]               # exact ties in the ranking
+    prev_close['S00_COPY'] = prev_close.get('S00', 0.0)
+    nifty, level = [], 24000.0
+    for t in minutes:
+        level = round(level * (1 + rng.gauss(0, 0.0004)), 2)
+        if rng.random() < 0.9:
+            nifty.append({'timestamp': t.strftime('%Y-%m-%d %H:%M:%S'), 'price': level})
+    timestamps = sorted({c['timestamp'] for rows in candles.values() for c in rows})
+    return prev_close, candles, nifty, timestamps
+
+
+def make_days(seed, n_days=2):
+    rng = random.Random(seed)
+    dates = [f"2026-09-{day:02d}" for day in range(14, 14 + n_days)]
+    prev_close, candles, nifty, timestamps = {}, {}, {}, {}
+    for date in dates:
+        prev_close[date], candles[date], nifty[date], timestamps[date] = make_day(rng, date)
+    lot_sizes = {f"S{s:02d}": rng.choice([25, 50, 300, 1200]) for s in range(0, 40, 2)}
+    return dates, prev_close, nifty, candles, timestamps, lot_sizes
+
+
+CONFIGS = list(opt.PHASE1_CONFIGS.values()) + [
+    (20, 0.0, 0.5, 0.0, 0, 0, 0, "09:30", "14:30"),
+    (20, 0.0, 0.5, 1.5, 1, 2, 1, "09:30", "14:30"),
+    (15, 0.3, 0.3, 1.2, 2, 1, 2, "10:00", "14:00"),
+    (20, 1.0, 0.5, 0.0, 3, 3, 3, "09:45", "14:30"),
+]
+
+
+class OptimizerFeaturesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.days = make_days(7)
+        dates, prev_close, nifty, candles, timestamps, lot_sizes = cls.days
+        cls.arrays, cls.meta = opt.build_sweep(dates, prev_close, nifty, candles, timestamps, lot_sizes, 20)
+
+    def reference(self, cfg):
+        dates, prev_close, nifty, candles, timestamps, lot_sizes = self.days
+        trades = []
+        for date in dates:
+            trades += opt.run_day(date, prev_close[date], candles[date], nifty[date],
+                                  timestamps[date], lot_sizes, *cfg)
+        return trades
+
+    def test_trades_match_run_day(self):
+        rng = random.Random(11)
+        grid = list(product(*opt.PHASE2_SWEEP.values()))
+        configs = CONFIGS + rng.sample(grid, 12)
+        reasons, traded = set(), 0
+        for cfg in configs:
+            expected = self.reference(cfg)
+            result = opt.evaluate_config(cfg, self.arrays, self.meta)
+            self.assertEqual(result['trades'], expected, cfg)
+            self.assertEqual(result['summary'], opt.summarise(expected, self.meta['all_dates']))
+            reasons.update(t['reason'] for t in expected)
+            traded += bool(expected)
+        self.assertEqual(reasons, {'TSL', 'EOD'})
+        self.assertGreater(traded, len(configs) * 0.8)
+
+    def test_pool_matches_in_process(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            serial = run_sweep('t', opt.evaluate_config, CONFIGS, self.arrays, self.meta,
+                               workers=1, results_db='')
+            pooled = run_sweep('t', opt.evaluate_config, CONFIGS, self.arrays, self.meta,
+                               workers=2, results_db=os.path.join(tmp, 'sweep.db'))
+        finally:
+            shutil.rmtree(tmp)
+        self.assertEqual(list(pooled), list(serial))
+        self.assertEqual(pooled, serial)
+
+
+class SweepEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = os.path.join(self.tmp, 'sweep.db')
+        CALLS.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_resume_evaluates_only_missing_configs(self):
+        arrays = {'x': np.arange(10.0)}
+        first = run_sweep('demo', counting_evaluate, [(1,), (2,)], arrays, 'm', workers=1, results_db=self.db)
+        self.assertEqual(CALLS, [(1,), (2,)])
+
+        CALLS.clear()
+        both = run_sweep('demo', counting_evaluate, [(2,), (3,), (1,)], arrays, 'm', workers=1, results_db=self.db)
+        self.assertEqual(CALLS, [(3,)])
+        self.assertEqual(list(both), [(2,), (3,), (1,)])
+        self.assertEqual(both[(1,)], first[(1,)])
+        self.assertEqual(both[(3,)], {'total': 135.0, 'label': 'm'})
+
+        CALLS.clear()
+        run_sweep('demo', counting_evaluate, [(1,)], {'x': np.arange(11.0)}, 'm', workers=1, results_db=self.db)
+        self.assertEqual(CALLS, [(1,)])
+
+    def test_shared_arrays_round_trip(self):
+        arrays = {'a': np.arange(7, dtype=np.int64), 'b': np.linspace(0, 1, 12).reshape(3, 4),
+                  'c': np.array([True, False, True])}
+        shared = SharedArrays(arrays)
+        try:
+            other = SharedArrays.attach(shared.spec)
+            for name, array in arrays.items():
+                np.testing.assert_array_equal(other.arrays[name], array)
+                self.assertEqual(other.arrays[name].dtype, array.dtype)
+            other.close()
+        finally:
+            shared.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Regression test: EODPatternDetector reads swing points from a shared SwingIndex.
+
+Each chart-pattern detector used to rescan the raw candle list for local
+extrema on every call, and the backtests refetched and rescanned a window per
+test day. The extrema now come from one SwingIndex per symbol, built with
+vectorized comparisons and extended one day at a time. Pinned here:
+
+  * appending days one by one gives the same swing flags as building the
+    index in one go, and a window's swing points are exactly the interior
+    local extrema of that window's candles;
+  * every detector returns the same result, bit for bit, as the list-scanning
+    implementation it replaced: digests of all results over seeded random
+    walks and triangle / wedge / cup-and-handle shapes are recorded in
+    tests/fixtures/eod_pattern_golden.json, and every detector fires on them;
+  * detect_patterns() with a window of a long-lived index, and
+    detect_patterns_over_history() as used by the backtests, equal fresh runs
+    on the same candles.
+
+Runs offline on synthetic candles.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eod_pattern_detector import EODPatternDetector
+from swing_index import SwingIndex
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'eod_pattern_golden.json')
+DETECTORS = ['_detect_double_bottom', '_detect_double_top', '_detect_support_breakout',
+             '_detect_resistance_breakout', '_detect_cup_handle', '_detect_inverse_head_shoulders',
+             '_detect_bull_flag', '_detect_ascending_triangle', '_detect_falling_wedge']
+WINDOW = 30
+
+
+def bar(rng, o, c, wick):
+    return {'open': round(o, 2), 'high': round(max(o, c) * (1 + wick * rng.random()), 2),
+            'low': round(min(o, c) * (1 - wick * rng.random()), 2), 'close': round(c, 2),
+            'volume': rng.randint(10000, 500000)}
+
+
+def random_walk(rng, days):
+    bars, price = [], rng.uniform(100, 2000)
+    vol = rng.choice([0.01, 0.02, 0.035])
+    for _ in range(days):
+        close = price * (1 + rng.gauss(0.0, vol))
+        bars.append(bar(rng, price, close, vol))
+        price = close
+    return bars
+
+
+def channel(rng, days, top, bottom, period, sharpness, breakout):
+    """Oscillate between two straight lines ((start, end) pairs), then break out upwards."""
+    bars, prev = [], (top[0] + bottom[0]) / 2
+    for t in range(days):
+        f = t / (days - 1)
+        hi, lo = top[0] + (top[1] - top[0]) * f, bottom[0] + (bottom[1] - bottom[0]) * f
+        phase = ((math.sin(2 * math.pi * t / period) + 1) / 2) ** sharpness
+        close = lo + (hi - lo) * phase * rng.uniform(0.97, 1.0)
+        bars.append(bar(rng, prev, close, 0.004))
+        prev = close
+    bars.append(bar(rng, prev, max(b['high'] for b in bars[-20:]) * rng.uniform(*breakout), 0.002))
+    return bars
+
+
+def shaped(rng):
+    """Ascending triangles and falling wedges - random walks almost never form them."""
+    base, days = rng.uniform(100, 2000), rng.randint(18, 28)
+    if rng.random() < 0.5:
+        return channel(rng, days, (base, base), (base * rng.uniform(0.85, 0.93), base * rng.uniform(0.95, 0.99)),
+                       rng.uniform(4, 6), 6, (1.01, 1.02))
+    return channel(rng, days, (base, base * rng.uniform(0.85, 0.95)),
+                   (base * rng.uniform(0.9, 0.95), base * rng.uniform(0.7, 0.8)),
+                   rng.uniform(3.5, 7), 1, (1.02, 1.05))
+
+
+def cup_handle(rng):
+    """Rise to a rim, rounded cup, 3-5 day handle, then a last candle that breaks out (or not)."""
+    rim, days, handle, left = rng.uniform(100, 2000), rng.randint(22, 30), rng.randint(3, 5), rng.randint(6, 8)
+    right = days - 1 - handle
+    depth, recovery, pullback = rng.uniform(0.1, 0.35), rng.uniform(0.88, 1.0), rng.uniform(0.03, 0.14)
+    closes = [rim * (0.85 + 0.15 * t / left) for t in range(left + 1)]
+    for t in range(left + 1, right + 1):
+        f = (t - left) / (right - left)
+        closes.append(rim * (1 - depth * (1 - (2 * f - 1) ** 2)) * (1 + (recovery - 1) * f))
+    closes += [closes[right] * (1 - pullback * math.sin(math.pi * k / (handle + 1))) for k in range(1, handle)]
+    closes.append(closes[right] * rng.uniform(0.995, 1.04))
+    bars, prev = [], closes[0]
+    for close in closes:
+        bars.append(bar(rng, prev, close, 0.004))
+        prev = close
+    return bars
+
+
+def windows():
+    """Every 30-day window of 40 random walks, then 2000 shaped series and 2000 cups."""
+    rng = random.Random(2026)
+    for _ in range(40):
+        candles = random_walk(rng, 300)
+        for end in range(10, len(candles) + 1):
+            yield candles[max(0, end - WINDOW):end]
+    for _ in range(2000):
+        yield shaped(rng)
+    for _ in range(2000):
+        yield cup_handle(rng)
+
+
+def result_digests(detector, use_index=True):
+    """{detector: {'hits': n, 'sha256': digest of every result in order}}"""
+    hashes = {name: hashlib.sha256() for name in DETECTORS}
+    hits = dict.fromkeys(DETECTORS, 0)
+    for candles in windows():
+        swings = SwingIndex(candles).window() if use_index else None
+        for name in DETECTORS:
+            args = (candles, 100000, 'NEUTRAL') + ((swings,) if use_index else ())
+            result = getattr(detector, name)(*args)
+            hits[name] += result is not None
+            hashes[name].update(json.dumps(result, sort_keys=True).encode())
+    return {name: {'hits': hits[name], 'sha256': hashes[name].hexdigest()} for name in DETECTORS}
+
+
+def brute_force_extrema(candles):
+    n = len(candles)
+    lows = [i for i in range(1, n - 1)
+            if candles[i]['low'] < candles[i - 1]['low'] and candles[i]['low'] < candles[i + 1]['low']]
+    highs = [i for i in range(1, n - 1)
+             if candles[i]['high'] > candles[i - 1]['high'] and candles[i]['high'] > candles[i + 1]['high']]
+    return lows, highs
+
+
+class SwingIndexTest(unittest.TestCase):
+
+    def test_incremental_appends_match_bulk_build(self):
+        candles = random_walk(random.Random(1), 120)
+        grown = SwingIndex()
+        for i, candle in enumerate(candles, 1):
+            grown.append(candle)
+            bulk = SwingIndex(candles[:i])
+            self.assertEqual(len(grown), i)
+            self.assertEqual(grown.window().swing_lows(), bulk.window().swing_lows())
+            self.assertEqual(grown.window().near_highs(), bulk.window().near_highs())
+
+    def test_window_swing_points_are_interior_extrema(self):
+        candles = random_walk(random.Random(2), 200)
+        index = SwingIndex(candles)
+        for end in range(3, len(candles) + 1, 7):
+            for length in (5, 15, 30):
+                window = index.window(end, length)
+                sub = candles[max(0, end - length):end]
+                lows, highs = brute_force_extrema(sub)
+                self.assertEqual([i for i, _ in window.swing_lows()], lows)
+                self.assertEqual([i for i, _ in window.swing_highs()], highs)
+                self.assertEqual(window.swing_lows(), [(i, sub[i]['low']) for i in lows])
+
+    def test_index_must_match_candles(self):
+        candles = random_walk(random.Random(3), 40)
+        with self.assertRaises(ValueError):
+            EODPatternDetector().detect_patterns('X', candles, 'NEUTRAL', swings=SwingIndex(candles[:-1]).window())
+
+
+class DetectorEquivalenceTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_results_match_list_scanning_implementation(self):
+        with open(GOLDEN_FILE) as f:
+            golden = json.load(f)
+        detector = EODPatternDetector(min_confidence=0.0, volume_confirmation=False, require_confirmation=False)
+        self.assertEqual(result_digests(detector), golden)
+        for name in DETECTORS:
+            self.assertGreater(golden[name]['hits'], 0, name)
+
+    def test_sliding_window_of_one_index_matches_fresh_detection(self):
+        detector = EODPatternDetector(min_confidence=0.0, volume_confirmation=False, require_confirmation=False)
+        candles = random_walk(random.Random(4), 250)
+        index = SwingIndex()
+        found = 0
+        for end, candle in enumerate(candles, 1):
+            index.append(candle)
+            window = candles[max(0, end - WINDOW):end]
+            shared = detector.detect_patterns('X', window, 'NEUTRAL', swings=index.window(end, WINDOW))
+            self.assertEqual(shared, detector.detect_patterns('X', window, 'NEUTRAL'))
+            found += shared['has_patterns']
+        self.assertGreater(found, 0)
+
+    def test_detect_patterns_over_history_matches_per_window_detection(self):
+        detector = EODPatternDetector(min_confidence=0.0, volume_confirmation=False, require_confirmation=False)
+        candles = random_walk(random.Random(5), 400)
+        rng = random.Random(6)
+        ends = sorted(rng.sample(range(10, len(candles) + 1), 60)) + [len(candles)]
+        spans = [(max(0, end - rng.choice([10, 21, 30])), end) for end in ends]
+        results = detector.detect_patterns_over_history('X', candles, spans)
+        self.assertEqual(results, [detector.detect_patterns('X', candles[start:end]) for start, end in spans])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Tests for tick_archive.TickArchive - the full-day binary order flow archive.
+
+tick_snapshots only keeps ORDER_FLOW_TICK_RETENTION_MINUTES of ticks, so the
+collector's writer thread now also appends every batch to fixed-width
+per-(day, symbol) files. Pinned here:
+
+  * appended ticks read back exactly (paise prices, quantities, depth) and
+    to_tick_dicts() rebuilds the OrderFlowAnalyzer tick format;
+  * a time range read through the minute index equals a filter of the whole day,
+    across several append batches, and an open day is a memory-mapped view;
+  * a torn trailing record (crash mid-write) is dropped on reopen, and index
+    entries past the last whole record are removed from .idx;
+  * compact_day() gives identical reads and is far smaller than the raw files
+    and than the same ticks as tick_snapshots rows in SQLite.
+
+Runs offline against temporary directories.
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tick_archive import INDEX_DTYPE, RECORD_DTYPE, TickArchive
+
+DAY = date(2026, 10, 16)
+SYMBOLS = ['RELIANCE', 'TCS', 'INFY']
+
+
+def session_ticks(n=6000, seed=3, day=DAY):
+    """Parsed ticks (OrderFlowCollector._parse_tick shape) from 09:15, cash and futures."""
+    rng = random.Random(seed)
+    prices = {(s, a): 500.0 * (i + 1) for i, s in enumerate(SYMBOLS) for a in ('CASH', 'FUT')}
+    volumes = {key: 0 for key in prices}
+    t = datetime(day.year, day.month, day.day, 9, 15)
+    ticks = []
+    for _ in range(n):
+        t += timedelta(milliseconds=rng.randint(0, 1500))
+        key = rng.choice(list(prices))
+        prices[key] = round(prices[key] + rng.choice([-0.05, 0, 0.05, 0.1]), 2)
+        volumes[key] += rng.randint(0, 400)
+        bid, ask = round(prices[key] - 0.05, 2), round(prices[key] + 0.05, 2)
+        tick = {
+            'symbol': key[0], 'token': 1000 + SYMBOLS.index(key[0]), 'asset_type': key[1],
+            'ts': t.strftime('%Y-%m-%d %H:%M:%S'),
+            'last_price': prices[key], 'last_quantity': rng.randint(0, 200),
+            'volume': volumes[key],
+            'buy_quantity': rng.randint(0, 3_000_000_000), 'sell_quantity': rng.randint(0, 500000),
+            'best_bid': bid, 'best_ask': ask,
+        }
+        bid_q = [rng.randint(0, 2000) for _ in range(5)]
+        ask_q = [rng.randint(0, 2000) for _ in range(5)]
+        for i in range(5):
+            tick[f'bid_l{i + 1}_qty'] = bid_q[i]
+            tick[f'ask_l{i + 1}_qty'] = ask_q[i]
+            tick[f'bid_l{i + 1}_price'] = round(bid - 0.05 * i, 2)
+            tick[f'ask_l{i + 1}_price'] = round(ask + 0.05 * i, 2)
+        tick['bid_depth_total'] = sum(bid_q)
+        tick['ask_depth_total'] = sum(ask_q)
+        ticks.append(tick)
+    return ticks
+
+
+def sqlite_size(path, ticks):
+    """Bytes the same ticks take as tick_snapshots rows (schema and indexes of order_flow_db)."""
+    import order_flow_db
+    db = order_flow_db.OrderFlowDB.__new__(order_flow_db.OrderFlowDB)
+    conn = sqlite3.connect(path)
+    db._create_tables(conn)
+    cols = ['symbol', 'token', 'ts', 'asset_type', 'last_price', 'last_quantity', 'volume',
+            'buy_quantity', 'sell_quantity', 'best_bid', 'best_ask',
+            'bid_depth_total', 'ask_depth_total'] + \
+           [f'{s}_l{i}_qty' for s in ('bid', 'ask') for i in range(1, 6)] + \
+           [f'{s}_l{i}_price' for s in ('bid', 'ask') for i in range(1, 6)]
+    conn.executemany(
+        f"INSERT INTO tick_snapshots ({', '.join(c if c != 'token' else 'instrument_token' for c in cols)}) "
+        f"VALUES ({','.join('?' * len(cols))})",
+        [tuple(t[c] for c in cols) for t in ticks])
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+class TickArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='tick_archive_test_')
+        self.archive = TickArchive(self.tmpdir)
+        self.ticks = session_ticks()
+
+    def tearDown(self):
+        self.archive.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def append_in_batches(self, ticks, batch=250):
+        for i in range(0, len(ticks), batch):
+            self.archive.append(ticks[i:i + batch])
+        self.archive.flush()
+
+    def expected(self, symbol, asset_type='CASH', start='00:00:00', end='23:59:59'):
+        return [t for t in self.ticks if t['symbol'] == symbol and t['asset_type'] == asset_type
+                and start <= t['ts'][11:] <= end]
+
+    def assertTicksEqual(self, rows, expected):
+        self.assertEqual(len(rows), len(expected))
+        for got, want in zip(rows, expected):
+            for key, value in want.items():
+                if key == 'token' or key == 'asset_type':
+                    continue
+                if isinstance(value, float):
+                    self.assertAlmostEqual(got[key], value, places=6, msg=key)
+                else:
+                    self.assertEqual(got[key], value, msg=key)
+
+    def test_round_trip_and_tick_dicts(self):
+        self.append_in_batches(self.ticks)
+        for symbol in SYMBOLS:
+            for asset_type in ('CASH', 'FUT'):
+                records = self.archive.read(symbol, DAY, asset_type=asset_type)
+                self.assertIsInstance(records, np.memmap)
+                rows = self.archive.to_tick_dicts(symbol, records, DAY)
+                self.assertTicksEqual(rows, self.expected(symbol, asset_type))
+        self.assertEqual(self.archive.symbols(DAY, 'FUT'), sorted(SYMBOLS))
+        self.assertEqual(RECORD_DTYPE.itemsize, 116)
+
+    def test_time_range_uses_index(self):
+        self.append_in_batches(self.ticks, batch=97)
+        for start, end in [('09:15', '09:20'), ('10:00:30', '10:07:12'), ('11:59', '23:00'), ('08:00', '09:00')]:
+            records = self.archive.read('TCS', DAY, start=start, end=end)
+            start_s = start if len(start) == 8 else start + ':00'
+            end_s = end if len(end) == 8 else end + ':00'
+            self.assertTicksEqual(self.archive.to_tick_dicts('TCS', records, DAY),
+                                  self.expected('TCS', start=start_s, end=end_s))
+
+    def test_torn_record_dropped_on_reopen(self):
+        self.append_in_batches(self.ticks[:1000])
+        self.archive.close()
+        path = os.path.join(self.tmpdir, DAY.isoformat(), 'INFY_CASH.ticks')
+        with open(path, 'ab') as f:
+            f.write(b'\x01' * 40)
+
+        reopened = TickArchive(self.tmpdir)
+        reopened.append(self.ticks[1000:])
+        reopened.close()
+        self.assertEqual(os.path.getsize(path) % RECORD_DTYPE.itemsize, 0)
+        self.assertTicksEqual(reopened.to_tick_dicts('INFY', reopened.read('INFY', DAY), DAY),
+                              self.expected('INFY'))
+
+    def test_stale_index_entries_dropped_on_reopen(self):
+        self.append_in_batches(self.ticks[:1000])
+        self.archive.close()
+        stem = os.path.join(self.tmpdir, DAY.isoformat(), 'TCS_CASH')
+        count = os.path.getsize(stem + '.ticks') // RECORD_DTYPE.itemsize
+        last_minute = int(np.fromfile(stem + '.idx', dtype=INDEX_DTYPE)['minute'][-1])
+        # Crash after the index write: an entry (plus a torn one) past the last record
+        stale = np.zeros(1, dtype=INDEX_DTYPE)
+        stale['minute'], stale['offset'] = last_minute + 30, count + 5
+        with open(stem + '.idx', 'ab') as f:
+            f.write(stale.tobytes() + b'\x01' * 5)
+
+        reopened = TickArchive(self.tmpdir)
+        reopened.append(self.ticks[1000:])
+        reopened.close()
+        index = np.fromfile(stem + '.idx', dtype=INDEX_DTYPE)
+        self.assertEqual(os.path.getsize(stem + '.idx') % INDEX_DTYPE.itemsize, 0)
+        self.assertTrue(np.all(np.diff(index['minute']) > 0))
+        self.assertTrue(np.all(np.diff(index['offset']) > 0))
+        for start, end in [('09:15', '09:20'), ('10:00:30', '10:07:12'), ('11:59', '23:00')]:
+            records = reopened.read('TCS', DAY, start=start, end=end)
+            start_s = start if len(start) == 8 else start + ':00'
+            end_s = end if len(end) == 8 else end + ':00'
+            self.assertTicksEqual(reopened.to_tick_dicts('TCS', records, DAY),
+                                  self.expected('TCS', start=start_s, end=end_s))
+
+    def test_compaction_is_lossless_and_small(self):
+        self.append_in_batches(self.ticks)
+        self.archive.close()
+        raw_size = sum(os.path.getsize(os.path.join(root, f))
+                       for root, _, files in os.walk(self.tmpdir) for f in files)
+
+        self.assertEqual(self.archive.compact_closed_days(today=DAY + timedelta(days=1)), 1)
+        packed_size = self.archive.stats()[DAY.isoformat()]['size_mb'] * 1024 * 1024
+        self.assertTrue(self.archive.stats()[DAY.isoformat()]['compacted'])
+        records = self.archive.read('RELIANCE', DAY, start='10:00', end='11:00', asset_type='FUT')
+        self.assertTicksEqual(self.archive.to_tick_dicts('RELIANCE', records, DAY),
+                              self.expected('RELIANCE', 'FUT', '10:00:00', '11:00:00'))
+
+        sqlite_bytes = sqlite_size(os.path.join(self.tmpdir, 'ticks.db'), self.ticks)
+        self.assertLess(raw_size, sqlite_bytes)
+        self.assertLess(packed_size, sqlite_bytes * 0.25)
+
+    def test_cleanup_applies_retention(self):
+        old_day = DAY - timedelta(days=40)
+        self.archive.append(session_ticks(n=50, day=old_day))
+        self.archive.append(self.ticks[:50])
+        self.archive.close()
+        self.assertEqual(self.archive.cleanup(retention_days=30, today=DAY), 1)
+        self.assertEqual(self.archive.days(), [DAY.isoformat()])
+
+
+if __name__ == '__main__':
+    unittest.main()
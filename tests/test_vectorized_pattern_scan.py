@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Regression test: the vectorized pattern scan selects exactly what the detectors would fire on.
+
+price_action_monitor used to run all 19 detectors over every symbol's candle
+list, each detector recomputing ATR. detect_patterns_batch() now evaluates
+each pattern's gates as a mask over the whole universe and only calls detect()
+where the mask fires. Pinned here, over a seeded random universe with gap
+opens plus hand-built soldier / crow runs and gap reversals:
+
+  * every mask equals "detect() does not return None" symbol by symbol;
+  * the scan's ATR is bit-identical to BasePatternDetector.calculate_atr(),
+    including the short-history fallback;
+  * detect_patterns_batch() returns exactly the per-symbol detect_patterns()
+    results, with the default and with no disabled patterns.
+"""
+
+import logging
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pattern_detectors.vectorized_scan import PATTERN_MASKS, CandleMatrix, atr, compute_features
+from price_action_detector import PriceActionDetector
+
+AVG_VOLUME = 50000
+
+
+def random_candles(rng, length):
+    candles, price = [], rng.uniform(100, 3000)
+    for _ in range(length):
+        o = price * (1 + rng.choice([0, 0, rng.gauss(0, 0.006)]))
+        c = o * (1 + rng.choice([0, rng.gauss(0, 0.002), rng.gauss(0, 0.01)]))
+        span = abs(c - o) + o * rng.uniform(0.0, 0.01)
+        h = max(o, c) + span * rng.choice([0, rng.random()])
+        l = min(o, c) - span * rng.choice([0, rng.random(), 2 * rng.random()])
+        candles.append({'open': round(o, 2), 'high': round(h, 2), 'low': round(l, 2),
+                        'close': round(c, 2), 'volume': rng.randint(1000, 90000)})
+        price = c
+    return candles
+
+
+def marching_candles(rng, length, bullish):
+    """A run of strong candles each opening inside the previous body (soldiers / crows)."""
+    candles, price = [], rng.uniform(100, 3000)
+    sign = 1 if bullish else -1
+    for _ in range(length):
+        o = price - sign * price * 0.001
+        c = o + sign * o * 0.01
+        candles.append({'open': round(o, 2), 'high': round(max(o, c) * 1.0005, 2),
+                        'low': round(min(o, c) * 0.9995, 2), 'close': round(c, 2),
+                        'volume': rng.randint(1000, 90000)})
+        price = c
+    return candles
+
+
+def gap_reversal(rng, bullish):
+    """Random history ending in a piercing line (bullish) or dark cloud cover."""
+    candles = random_candles(rng, 20)
+    base = candles[-3]['close']
+    sign = 1 if bullish else -1
+    first_close = base - sign * base * 0.02
+    second_open = first_close - sign * base * 0.01
+    candles[-2:] = [
+        {'open': base, 'high': max(base, first_close) * 1.001, 'low': min(base, first_close) * 0.999,
+         'close': first_close, 'volume': 60000},
+        {'open': second_open, 'high': max(second_open, base) * 1.001, 'low': min(second_open, base) * 0.999,
+         'close': base - sign * base * 0.005, 'volume': 60000},
+    ]
+    return candles
+
+
+def universe():
+    rng = random.Random(7)
+    candles = {f"R{i}": random_candles(rng, rng.choice([8, 11, 14, 30, 50])) for i in range(600)}
+    for i in range(5):
+        candles[f"UP{i}"] = marching_candles(rng, 20, bullish=True)
+        candles[f"DOWN{i}"] = marching_candles(rng, 20, bullish=False)
+        candles[f"PIERCE{i}"] = gap_reversal(rng, bullish=True)
+        candles[f"CLOUD{i}"] = gap_reversal(rng, bullish=False)
+    return candles
+
+
+class VectorizedScanTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+        cls.candles = universe()
+        cls.matrix = CandleMatrix(cls.candles)
+        cls.features = compute_features(cls.matrix)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+
+class MaskEquivalenceTest(VectorizedScanTestCase):
+
+    def test_each_mask_matches_its_detector(self):
+        detector = PriceActionDetector(min_confidence=0.0, disabled_patterns=[])
+        for pattern in detector.pattern_detectors:
+            name = type(pattern).__name__
+            mask = PATTERN_MASKS[type(pattern)](self.matrix, self.features)
+
+            fired = []
+            for symbol in self.matrix.symbols:
+                try:
+                    fired.append(pattern.detect(self.candles[symbol], 'NEUTRAL', AVG_VOLUME) is not None)
+                except Exception:
+                    fired.append(True)  # Past every gate; failed while building the result
+
+            self.assertGreater(sum(fired), 0, name)
+            mismatched = [s for s, m, f in zip(self.matrix.symbols, mask, fired) if m != f]
+            self.assertEqual(mismatched, [], name)
+
+    def test_atr_matches_calculate_atr(self):
+        base = PriceActionDetector().pattern_detectors[0]
+        expected = [base.calculate_atr(self.candles[s], 14) for s in self.matrix.symbols]
+        self.assertTrue(np.array_equal(atr(self.matrix, 14), np.array(expected)))
+
+
+class BatchDetectionTest(VectorizedScanTestCase):
+
+    def assert_batch_matches(self, detector):
+        avg_volumes = {symbol: AVG_VOLUME for symbol in self.candles}
+        expected = {symbol: detector.detect_patterns(symbol, candles, 'BULLISH', candles[-1]['close'], AVG_VOLUME)
+                    for symbol, candles in self.candles.items()}
+        self.assertEqual(detector.detect_patterns_batch(self.candles, 'BULLISH', avg_volumes), expected)
+
+    def test_batch_matches_per_symbol_detection(self):
+        self.assert_batch_matches(PriceActionDetector())
+
+    def test_batch_matches_with_every_pattern_enabled(self):
+        self.assert_batch_matches(PriceActionDetector(min_confidence=0.0, disabled_patterns=[]))
+
+    def test_empty_universe(self):
+        self.assertEqual(PriceActionDetector().detect_patterns_batch({}, 'NEUTRAL', {}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Regression test: the volume profile analyzer reads 1-minute candles from the central DB.
+
+VolumeProfileAnalyzer._batch_analyze used to fetch the whole day of 1-minute
+candles from Kite for every F&O stock, sleeping after each call, in each of
+the 3:00 / 3:15 / 3:25 runs, then profile one stock at a time. Pinned here,
+against a temporary central DB, a temporary cache and a fake Kite:
+
+  * a symbol whose session is in intraday_candles ('1minute') costs no Kite
+    call; a symbol that stops early fetches only its tail (from its last bar,
+    inclusive); a symbol with a hole mid-session fetches from the first missing
+    minute; a symbol with no bars fetches the whole day - each call through
+    the shared historical rate limiter;
+  * missing tick-built bars (ENABLE_TICK_MINUTE_BARS) are logged once per process;
+  * bars from other days in the DB are not mixed into the session;
+  * a second run reuses the first run's cached candles and fetches only tails;
+  * profiles from the process pool are identical, in the same order, to an
+    in-process run.
+
+Runs offline; data/central_quotes.db, data/unified_cache and logs/ are untouched.
+"""
+
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone, time as dt_time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from central_quote_db import CentralQuoteDB
+from kite_rate_limiter import TokenBucket
+from unified_data_cache import UnifiedDataCache
+from volume_profile_calculator import VolumeProfileCalculator
+
+# volume_profile_analyzer opens logs/volume_profile.log at import - redirect it
+LOG_DIR = tempfile.mkdtemp(prefix='volume_profile_logs_')
+_FileHandler = logging.FileHandler
+with mock.patch.object(logging, 'FileHandler', lambda filename, *args, **kwargs: _FileHandler(
+        os.path.join(LOG_DIR, os.path.basename(filename)), *args, **kwargs)):
+    import volume_profile_analyzer
+    from volume_profile_analyzer import VolumeProfileAnalyzer, merge_candles
+
+IST = timezone(timedelta(hours=5, minutes=30))
+TODAY = datetime.now().date()
+TOKENS = {'RELIANCE': 1, 'TCS': 2, 'INFY': 3}
+CUTOFF = dt_time(15, 25)
+SESSION_CANDLES = 371        # 09:15 - 15:25
+
+
+def minute_bars(day, seed, start=dt_time(9, 15), end=CUTOFF):
+    """1-minute candles stamped at the bar start in IST, like Kite."""
+    rng = random.Random(seed)
+    bars, price = [], 1000.0 + seed
+    t = datetime.combine(day, start, tzinfo=IST)
+    while t.time() <= end:
+        open_ = price
+        price = round(price * (1 + rng.gauss(0, 0.001)), 2)
+        bars.append({'date': t, 'open': open_, 'high': round(max(open_, price) + 0.3, 2),
+                     'low': round(min(open_, price) - 0.3, 2), 'close': price,
+                     'volume': rng.randint(1000, 90000)})
+        t += timedelta(minutes=1)
+    return bars
+
+
+def tearDownModule():
+    for handler in list(logging.getLogger().handlers):
+        if getattr(handler, 'baseFilename', '').startswith(LOG_DIR):
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+    shutil.rmtree(LOG_DIR, ignore_errors=True)
+
+
+class FakeKite:
+    def __init__(self):
+        self.calls = []
+
+    def historical_data(self, instrument_token, from_date, to_date, interval):
+        self.calls.append((instrument_token, from_date.strftime('%H:%M')))
+        return [bar for bar in minute_bars(TODAY, instrument_token)
+                if from_date.time() <= bar['date'].time() <= to_date.time()]
+
+
+class CountingBucket(TokenBucket):
+    def __init__(self):
+        super().__init__(rate=1000.0, capacity=1000)
+        self.taken = 0
+
+    def acquire(self, timeout=None):
+        self.taken += 1
+        return super().acquire(timeout)
+
+
+def bare_analyzer(tmpdir):
+    """An analyzer with the components _batch_analyze touches, and no network."""
+    analyzer = VolumeProfileAnalyzer.__new__(VolumeProfileAnalyzer)
+    analyzer.execution_time = '3:25PM'
+    analyzer.session_date = TODAY
+    analyzer.session_cutoff = CUTOFF
+    analyzer.kite = FakeKite()
+    analyzer.cache_manager = UnifiedDataCache(cache_dir=os.path.join(tmpdir, 'cache'))
+    analyzer.profile_calculator = VolumeProfileCalculator()
+    analyzer.historical_limiter = CountingBucket()
+    analyzer.instrument_tokens = dict(TOKENS)
+    return analyzer
+
+
+class VolumeProfileAnalyzerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='volume_profile_test_')
+        self.db = CentralQuoteDB(db_path=os.path.join(self.tmpdir, 'central_quotes.db'), mode='writer')
+        patcher = mock.patch.object(volume_profile_analyzer, 'get_central_db', return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+class CandleLoadTest(VolumeProfileAnalyzerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        yesterday = TODAY - timedelta(days=1)
+        self.db.store_intraday_candles_batch({
+            'RELIANCE': minute_bars(yesterday, 9) + minute_bars(TODAY, 1),
+            'TCS': minute_bars(TODAY, 2, end=dt_time(14, 0)),
+        }, '1minute')
+
+    def test_only_missing_candles_hit_kite(self):
+        analyzer = bare_analyzer(self.tmpdir)
+        candles = analyzer._load_candles(['RELIANCE', 'TCS', 'INFY'])
+
+        self.assertEqual(sorted(analyzer.kite.calls), [(2, '14:00'), (3, '09:15')])
+        self.assertEqual(analyzer.historical_limiter.taken, 2)
+        self.assertEqual(list(candles), ['RELIANCE', 'TCS', 'INFY'])
+        for token, symbol in ((1, 'RELIANCE'), (2, 'TCS'), (3, 'INFY')):
+            self.assertEqual(len(candles[symbol]), SESSION_CANDLES)
+            self.assertEqual([(c['high'], c['low'], c['volume']) for c in candles[symbol]],
+                             [(c['high'], c['low'], c['volume']) for c in minute_bars(TODAY, token)])
+
+    def test_second_run_fetches_only_tails(self):
+        bare_analyzer(self.tmpdir)._load_candles(['RELIANCE', 'TCS', 'INFY'])
+
+        analyzer = bare_analyzer(self.tmpdir)
+        candles = analyzer._load_candles(['RELIANCE', 'TCS', 'INFY'])
+
+        # The cached last candle may have been partial - refetched, nothing earlier
+        self.assertEqual(sorted(analyzer.kite.calls), [(2, '15:24'), (3, '15:24')])
+        self.assertEqual([len(c) for c in candles.values()], [SESSION_CANDLES] * 3)
+
+    def test_mid_session_hole_fetched_from_first_missing_minute(self):
+        bars = minute_bars(TODAY, 3)
+        self.db.store_intraday_candles_batch(
+            {'INFY': [b for b in bars if not dt_time(11, 0) <= b['date'].time() <= dt_time(11, 4)]}, '1minute')
+
+        analyzer = bare_analyzer(self.tmpdir)
+        candles = analyzer._load_candles(['RELIANCE', 'INFY'])
+
+        self.assertEqual(analyzer.kite.calls, [(3, '11:00')])
+        self.assertEqual(len(candles['INFY']), SESSION_CANDLES)
+        self.assertEqual([(c['high'], c['low'], c['volume']) for c in candles['INFY']],
+                         [(c['high'], c['low'], c['volume']) for c in bars])
+
+    def test_missing_tick_bars_logged_once(self):
+        with mock.patch.object(volume_profile_analyzer, '_logged_missing_tick_bars', False), \
+                self.assertLogs(volume_profile_analyzer.logger, 'INFO') as logs:
+            bare_analyzer(self.tmpdir)._load_candles(['RELIANCE', 'INFY'])
+            bare_analyzer(self.tmpdir)._load_candles(['RELIANCE', 'INFY'])
+        notices = [line for line in logs.output if 'ENABLE_TICK_MINUTE_BARS' in line]
+        self.assertEqual(len(notices), 1)
+        self.assertIn('1/2 stocks', notices[0])
+
+    def test_central_db_failure_falls_back_to_kite(self):
+        analyzer = bare_analyzer(self.tmpdir)
+        with mock.patch.object(volume_profile_analyzer, 'get_central_db', side_effect=RuntimeError('locked')):
+            candles = analyzer._load_candles(['RELIANCE', 'TCS'])
+        self.assertEqual(sorted(analyzer.kite.calls), [(1, '09:15'), (2, '09:15')])
+        self.assertEqual(len(candles['RELIANCE']), SESSION_CANDLES)
+
+
+class ParallelAnalysisTest(VolumeProfileAnalyzerTestCase):
+
+    def test_process_pool_matches_in_process_run(self):
+        analyzer = bare_analyzer(self.tmpdir)
+        candles = {f"STOCK{i}": minute_bars(TODAY, i) for i in range(12)}
+
+        with mock.patch.object(config, 'VOLUME_PROFILE_ANALYSIS_WORKERS', 1):
+            serial = analyzer._run_analysis_stage(candles)
+        with mock.patch.object(config, 'VOLUME_PROFILE_ANALYSIS_WORKERS', 3):
+            parallel = analyzer._run_analysis_stage(candles)
+
+        self.assertEqual([r['symbol'] for r in parallel], list(candles))
+        self.assertTrue(all(r['success'] for r in parallel))
+        self.assertEqual(parallel, serial)
+
+    def test_merge_prefers_later_series(self):
+        db_bars = minute_bars(TODAY, 1, end=dt_time(9, 20))
+        kite_bars = [dict(bar, volume=1) for bar in minute_bars(TODAY, 1, start=dt_time(9, 18))]
+        merged = merge_candles(db_bars, kite_bars, until=datetime.combine(TODAY, dt_time(9, 21)))
+        self.assertEqual([c['volume'] for c in merged], [c['volume'] for c in db_bars[:3]] + [1, 1, 1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Regression test: VolumeProfileCalculator builds profiles with NumPy.
+
+_bin_prices used to walk every candle tick-step by tick-step into a dict of
+float price keys, and _calculate_value_area expanded from the POC over sorted
+dict keys. Profiles are now summed over integer tick indices (VolumeProfile)
+and the value area is read off cumulative sums. Pinned here:
+
+  * every field of calculate_volume_profile() - POC, value area, total volume,
+    shape, confidence and the price -> volume distribution in order - is
+    identical to the dict implementation: digests of results over seeded
+    sessions (trends, flat candles, plateaus with tied volumes, inverted
+    candles, thin and flat days), with the adaptive and the fixed 0.05 tick,
+    are recorded in tests/fixtures/volume_profile_golden.json;
+  * an incremental profile extended in chunks - including chunks that change
+    the adaptive tick size - equals a profile built from all candles at once.
+
+Runs offline on synthetic candles.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from volume_profile_calculator import VolumeProfileCalculator
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'volume_profile_golden.json')
+
+
+def session(rng, n=None):
+    """One day of 1-minute candles with a random character."""
+    n = n or rng.choice([20, 60, 200, 375])
+    kind = rng.choice(['trend', 'trend', 'plateau', 'flat_day', 'thin', 'penny'])
+    price = 3.0 if kind == 'penny' else rng.uniform(50, 5000)
+    vol = rng.choice([0.0005, 0.002, 0.006])
+    candles = []
+    for _ in range(n):
+        open_ = price
+        if kind == 'trend':
+            price = round(price * (1 + rng.gauss(0.0002, vol)), 2)
+        elif kind == 'plateau':
+            price = round(price + rng.choice([-0.05, 0, 0, 0.05]), 2)
+        elif kind == 'penny':
+            price = round(max(0.5, price + rng.choice([-0.05, 0, 0.05])), 2)
+        high = round(max(open_, price) * (1 + abs(rng.gauss(0, vol / 2))), 2)
+        low = round(min(open_, price) * (1 - abs(rng.gauss(0, vol / 2))), 2)
+        if kind == 'flat_day':
+            high = low = price = open_
+        elif rng.random() < 0.1:
+            high = low = price                      # flat candle
+        elif rng.random() < 0.01:
+            high, low = low, high                   # bad print
+        volume = rng.randint(0, 40) if kind == 'thin' else rng.choice([1000, 5000, rng.randint(0, 90000)])
+        candles.append({'open': open_, 'high': high, 'low': low, 'close': price, 'volume': volume})
+    return candles
+
+
+def canonical(result):
+    """Result with numbers as floats (the dict loop kept ints for flat-only bins)."""
+    out = {k: (float(v) if isinstance(v, (int, float)) else v)
+           for k, v in result.items() if k != 'volume_distribution'}
+    out['volume_distribution'] = [[float(p), float(v)] for p, v in result['volume_distribution'].items()]
+    return out
+
+
+def result_digests(calculator):
+    """{'auto_tick' / 'fixed_tick': {'profiles', 'shapes', 'sha256'}} over 400 seeded sessions."""
+    digests = {}
+    for label, auto in (('auto_tick', True), ('fixed_tick', False)):
+        rng = random.Random(2026)
+        digest = hashlib.sha256()
+        shapes = {}
+        with mock.patch.object(config, 'VOLUME_PROFILE_TICK_SIZE_AUTO', auto):
+            for _ in range(400):
+                result = calculator.calculate_volume_profile(session(rng))
+                shapes[result['profile_shape']] = shapes.get(result['profile_shape'], 0) + 1
+                digest.update(json.dumps(canonical(result), sort_keys=True).encode())
+        digests[label] = {'profiles': 400, 'shapes': shapes, 'sha256': digest.hexdigest()}
+    return digests
+
+
+class VolumeProfileVectorizedTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def setUp(self):
+        self.calculator = VolumeProfileCalculator(poc_top_threshold=0.70, poc_bottom_threshold=0.30)
+
+    def test_results_match_dict_implementation(self):
+        with open(GOLDEN_FILE) as f:
+            golden = json.load(f)
+        self.assertEqual(result_digests(self.calculator), golden)
+
+    def test_incremental_profile_matches_full_build(self):
+        rng = random.Random(7)
+        for _ in range(40):
+            candles = session(rng, n=375)
+            profile = self.calculator.new_profile()
+            start = 0
+            while start < len(candles):
+                end = min(len(candles), start + rng.choice([1, 15, 60, 200]))
+                profile.add_candles(candles[start:end])
+                start = end
+                self.assertEqual(canonical(self.calculator.calculate_volume_profile(profile=profile)),
+                                 canonical(self.calculator.calculate_volume_profile(candles[:end])))
+            self.assertEqual(len(profile), len(candles))
+
+    def test_p_shape_sample(self):
+        candles = []
+        for i in range(60):
+            base, step, wick, volume = ((100, 0.5, 0.3, 10000) if i < 20 else
+                                        (110, 0.8, 0.5, 20000) if i < 40 else (126, 0.3, 0.4, 50000))
+            top = base + (i % 20) * step
+            candles.append({'high': top, 'low': top - wick, 'close': top, 'volume': volume})
+        result = self.calculator.calculate_volume_profile(candles)
+        self.assertEqual(result['profile_shape'], 'P-SHAPE')
+        self.assertGreaterEqual(result['value_area_high'], result['poc_price'])
+        self.assertLessEqual(result['value_area_low'], result['poc_price'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Regression test: CentralQuoteDB.write_cycle() stores a collection cycle atomically.
+
+central_data_collector.py writes each minute's stocks, NIFTY, VIX, option chain and metadata through
+write_cycle() instead of five or six separately committed store_*/update_metadata calls.
+Pinned here:
+
+  * the rows written are identical to what the individual store_* methods write;
+  * the whole cycle is ONE transaction - a single BEGIN IMMEDIATE and a single COMMIT,
+    option chain rows included;
+  * a failure anywhere rolls the cycle back, so a half-written minute is never visible;
+  * the returned write latency is a non-negative number of milliseconds.
+
+Runs offline against a temporary database - nothing touches data/central_quotes.db.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from central_quote_db import CentralQuoteDB
+
+STOCKS = {
+    'RELIANCE': {'price': 2900.5, 'volume': 120000, 'oi': 500000, 'oi_day_high': 510000, 'oi_day_low': 490000},
+    'TCS': {'price': 4100.0, 'volume': 80000, 'oi': 300000},
+}
+NIFTY = {'price': 24150.25, 'open': 24100.0, 'high': 24200.0, 'low': 24050.0, 'volume': 0}
+VIX = {'price': 13.4, 'open': 13.1, 'high': 13.9, 'low': 12.8}
+CHAIN = [{'expiry': '2026-10-20', 'strike': 24150.0, 'option_type': option_type,
+          'tradingsymbol': f"NIFTY26O2024150{option_type}", 'ltp': 120.0, 'oi': 1000, 'volume': 500,
+          'bid': 119.5, 'ask': 120.5, 'spot': 24150.25, 'iv': 0.15, 'delta': 0.5,
+          'gamma': 0.001, 'theta': -10.0, 'vega': 12.0} for option_type in ('CE', 'PE')]
+
+
+class WriteCycleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='write_cycle_test_')
+        self.db = CentralQuoteDB(db_path=os.path.join(self.tmpdir, 'central_quotes.db'), mode='writer')
+        self.ts = datetime.now().replace(hour=10, minute=30, second=17, microsecond=0)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _snapshot(self, db):
+        """Every row the cycle touches, minus the wall-clock last_updated columns."""
+        conn = db.conn
+        return {
+            'stocks': conn.execute("SELECT symbol, timestamp, price, volume, oi, oi_day_high, oi_day_low "
+                                   "FROM stock_quotes ORDER BY symbol").fetchall(),
+            'latest': conn.execute("SELECT symbol, timestamp, price FROM latest_stock_quotes "
+                                   "ORDER BY symbol").fetchall(),
+            'nifty': conn.execute("SELECT timestamp, price, open, high, low, volume FROM nifty_quotes").fetchall(),
+            'vix': conn.execute("SELECT timestamp, vix_value, open, high, low FROM vix_quotes").fetchall(),
+            'metadata': conn.execute("SELECT key, value FROM metadata ORDER BY key").fetchall(),
+            'chain': conn.execute("SELECT tradingsymbol, timestamp, ltp, spot, iv FROM option_chain_snapshots "
+                                  "ORDER BY tradingsymbol").fetchall(),
+        }
+
+    def test_matches_individual_store_methods(self):
+        metadata = {'last_collection_time': self.ts.isoformat(), 'collection_status': 'success'}
+        write_ms = self.db.write_cycle(self.ts, stock_quotes=STOCKS, nifty=NIFTY, vix=VIX, metadata=metadata,
+                                       option_chain=CHAIN)
+        self.assertGreaterEqual(write_ms, 0.0)
+
+        separate = CentralQuoteDB(db_path=os.path.join(self.tmpdir, 'separate.db'), mode='writer')
+        try:
+            separate.store_stock_quotes(STOCKS, self.ts)
+            separate.store_nifty_quote(NIFTY['price'], NIFTY, self.ts)
+            separate.store_vix_quote(VIX['price'], VIX, self.ts)
+            separate.store_option_chain(CHAIN, self.ts)
+            for key, value in metadata.items():
+                separate.update_metadata(key, value)
+            expected = self._snapshot(separate)
+        finally:
+            separate.close()
+        self.assertEqual(self._snapshot(self.db), expected)
+        self.assertEqual(self.db.get_nifty_latest()['price'], NIFTY['price'])
+
+    def test_single_transaction(self):
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        self.db.write_cycle(self.ts, stock_quotes=STOCKS, nifty=NIFTY, vix=VIX,
+                            metadata={'collection_status': 'success'}, option_chain=CHAIN)
+        self.db.conn.set_trace_callback(None)
+
+        self.assertEqual([s for s in statements if s.startswith('BEGIN')], ['BEGIN IMMEDIATE'])
+        self.assertEqual([s for s in statements if s == 'COMMIT'], ['COMMIT'])
+
+    def test_failure_rolls_back_whole_cycle(self):
+        before = self._snapshot(self.db)
+        with self.assertRaises(Exception):
+            # NIFTY price is NOT NULL - the stock rows written before it must not survive
+            self.db.write_cycle(self.ts, stock_quotes=STOCKS, nifty={'price': None},
+                                metadata={'collection_status': 'success'}, option_chain=CHAIN)
+        self.assertEqual(self._snapshot(self.db), before)
+
+        # The connection is usable again for the next cycle
+        self.db.write_cycle(self.ts, stock_quotes=STOCKS)
+        self.assertEqual(set(self.db.get_latest_stock_quotes()), set(STOCKS))
+
+    def test_skipped_parts_are_not_written(self):
+        self.db.write_cycle(self.ts, stock_quotes=None, nifty=NIFTY, vix=None,
+                            metadata={'collection_status': 'failed: 0/2 stocks'})
+        snap = self._snapshot(self.db)
+        self.assertEqual(snap['stocks'], [])
+        self.assertEqual(snap['vix'], [])
+        self.assertEqual(len(snap['nifty']), 1)
+        self.assertEqual(self.db.get_metadata('collection_status'), 'failed: 0/2 stocks')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Tick Archive - Full-Day Binary Order Flow Ticks
+
+tick_snapshots in order_flow.db is a working buffer: every tick is a 33-column
+SQLite row and cleanup_old_ticks() deletes anything older than
+ORDER_FLOW_TICK_RETENTION_MINUTES, so no tick history survives the session for
+the order flow backtests. The collector's writer thread also appends every
+drained batch here:
+
+    data/tick_archive/<YYYY-MM-DD>/<SYMBOL>_<CASH|FUT>.ticks
+    data/tick_archive/<YYYY-MM-DD>/<SYMBOL>_<CASH|FUT>.idx
+
+.ticks is append-only fixed-width records (RECORD_DTYPE, 116 bytes): time as
+milliseconds since midnight, prices as int32 paise, quantities as integers.
+best_bid / best_ask and the depth totals are not stored - they are level 1 and
+the sums of the five levels. .idx is the time index sidecar: one
+(minute_of_day, first_record) entry per minute that has ticks, so a time range
+is located without scanning.
+
+Reading memory-maps the .ticks file and returns a structured NumPy array that
+is a view of it. Closed days are compacted (compact_day) to one .npz per file:
+every column delta-encoded and deflated, which shrinks a session to a small
+fraction of both the raw records and the SQLite rows; read() decodes those
+transparently.
+
+Usage:
+    from tick_archive import get_tick_archive
+
+    archive = get_tick_archive()
+    ticks = archive.read('RELIANCE', date(2026, 10, 16), start='10:00', end='10:30')
+    prices = ticks['last_price'] / 100.0              # np.ndarray, rupees
+    rows = archive.to_tick_dicts('RELIANCE', ticks)   # OrderFlowAnalyzer tick format
+
+Command line:
+    python tick_archive.py stats
+    python tick_archive.py compact            # compact every closed day
+
+Date: 2026-10-16
+"""
+
+import logging
+import os
+import shutil
+import threading
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+ASSET_TYPES = ('CASH', 'FUT')
+
+RECORD_DTYPE = np.dtype([
+    ('ts_ms', '<u4'),              # milliseconds since midnight (IST wall clock)
+    ('last_price', '<i4'),         # paise
+    ('last_quantity', '<i4'),
+    ('volume', '<i8'),             # cumulative day volume
+    ('buy_quantity', '<i8'),       # total pending buy quantity
+    ('sell_quantity', '<i8'),
+    ('bid_price', '<i4', (5,)),    # paise, level 1..5
+    ('ask_price', '<i4', (5,)),
+    ('bid_qty', '<i4', (5,)),
+    ('ask_qty', '<i4', (5,)),
+])
+
+INDEX_DTYPE = np.dtype([
+    ('minute', '<u2'),             # minute of day
+    ('offset', '<u4'),             # first record of that minute
+])
+
+TimeLike = Union[str, dtime, datetime, None]
+
+
+def _file_stem(symbol: str, asset_type: str) -> str:
+    return f"{symbol}_{asset_type}"
+
+
+def _ms_of_day(ts: str) -> int:
+    """'YYYY-MM-DD HH:MM:SS' -> milliseconds since midnight."""
+    return (int(ts[11:13]) * 3600 + int(ts[14:16]) * 60 + int(ts[17:19])) * 1000
+
+
+def _to_ms(value: TimeLike, default: int) -> int:
+    """'HH:MM[:SS]' / time / datetime -> milliseconds since midnight."""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        parts = [int(p) for p in value.split(':')]
+        value = dtime(*parts)
+    if isinstance(value, datetime):
+        value = value.time()
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1000 + value.microsecond // 1000
+
+
+def _paise(values) -> np.ndarray:
+    return np.rint(np.asarray(values, dtype=np.float64) * 100).astype(np.int32)
+
+
+def _records(ticks: List[dict]) -> np.ndarray:
+    """Parsed ticks (OrderFlowCollector._parse_tick) -> RECORD_DTYPE array."""
+    n = len(ticks)
+    rec = np.zeros(n, dtype=RECORD_DTYPE)
+    rec['ts_ms'] = [_ms_of_day(t['ts']) for t in ticks]
+    rec['last_price'] = _paise([t['last_price'] for t in ticks])
+    rec['last_quantity'] = [t['last_quantity'] for t in ticks]
+    rec['volume'] = [t['volume'] for t in ticks]
+    rec['buy_quantity'] = [t['buy_quantity'] for t in ticks]
+    rec['sell_quantity'] = [t['sell_quantity'] for t in ticks]
+    for side in ('bid', 'ask'):
+        rec[f'{side}_price'] = _paise([[t.get(f'{side}_l{i}_price', 0) for i in range(1, 6)]
+                                       for t in ticks]).reshape(n, 5)
+        rec[f'{side}_qty'] = np.asarray([[t[f'{side}_l{i}_qty'] for i in range(1, 6)]
+                                         for t in ticks], dtype=np.int32).reshape(n, 5)
+    return rec
+
+
+class _AppendFile:
+    """Open .ticks / .idx pair of one (day, symbol, asset type)."""
+
+    def __init__(self, ticks_path: Path, idx_path: Path):
+        size = ticks_path.stat().st_size if ticks_path.exists() else 0
+        torn = size % RECORD_DTYPE.itemsize
+        if torn:
+            # Partial record from a crash mid-write - drop it
+            with open(ticks_path, 'r+b') as f:
+                f.truncate(size - torn)
+            logger.warning(f"Truncated {torn} torn bytes from {ticks_path}")
+        self.count = size // RECORD_DTYPE.itemsize
+        self.last_minute = -1
+        if idx_path.exists():
+            idx_size = idx_path.stat().st_size
+            index = np.fromfile(idx_path, dtype=INDEX_DTYPE, count=idx_size // INDEX_DTYPE.itemsize)
+            kept = index[index['offset'] < self.count]
+            if len(kept) < len(index) or idx_size % INDEX_DTYPE.itemsize:
+                # Entries for records that never reached .ticks (index is written
+                # first) would sit ahead of the next appends and unsort the index
+                kept.tofile(idx_path)
+                logger.warning(f"Dropped {len(index) - len(kept)} stale index entries from {idx_path}")
+            self.last_minute = int(kept['minute'][-1]) if len(kept) else -1
+        self.ticks = open(ticks_path, 'ab')
+        self.idx = open(idx_path, 'ab')
+
+    def append(self, rec: np.ndarray):
+        minutes = rec['ts_ms'] // 60000
+        new = np.flatnonzero(minutes > np.maximum.accumulate(
+            np.concatenate(([self.last_minute], minutes[:-1]))))
+        if len(new):
+            entries = np.zeros(len(new), dtype=INDEX_DTYPE)
+            entries['minute'] = minutes[new]
+            entries['offset'] = self.count + new
+            self.idx.write(entries.tobytes())
+            self.last_minute = int(minutes[new[-1]])
+        self.ticks.write(rec.tobytes())
+        self.count += len(rec)
+
+    def flush(self):
+        self.ticks.flush()
+        self.idx.flush()
+
+    def close(self):
+        self.ticks.close()
+        self.idx.close()
+
+
+class TickArchive:
+    """Per-day, per-symbol binary tick files with a minute index."""
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Archive directory (default: config.TICK_ARCHIVE_DIR)
+        """
+        self.root = Path(root or config.TICK_ARCHIVE_DIR)
+        self._lock = threading.Lock()
+        self._files: Dict[Tuple[str, str, str], _AppendFile] = {}
+
+    def _day_dir(self, day: Union[date, str]) -> Path:
+        return self.root / (day if isinstance(day, str) else day.isoformat())
+
+    # ------------------------------------------------------------------
+    # WRITE PATH (OrderFlowCollector writer thread)
+    # ------------------------------------------------------------------
+
+    def append(self, ticks: List[dict]) -> int:
+        """
+        Append parsed ticks, grouped into their (day, symbol, asset type) files.
+
+        Args:
+            ticks: OrderFlowCollector._parse_tick dicts in arrival order
+
+        Returns:
+            Number of ticks written
+        """
+        groups: Dict[Tuple[str, str, str], List[dict]] = {}
+        for t in ticks:
+            groups.setdefault((t['ts'][:10], t['symbol'], t.get('asset_type', 'CASH')), []).append(t)
+
+        if not groups:
+            return 0
+        with self._lock:
+            newest = max(key[0] for key in groups)
+            for key in [k for k in self._files if k[0] < newest]:
+                # Day rolled over - that day's files are complete
+                self._files.pop(key).close()
+
+            for key, group in groups.items():
+                handle = self._files.get(key)
+                if handle is None:
+                    day_dir = self._day_dir(key[0])
+                    day_dir.mkdir(parents=True, exist_ok=True)
+                    stem = _file_stem(key[1], key[2])
+                    handle = self._files[key] = _AppendFile(day_dir / f"{stem}.ticks",
+                                                            day_dir / f"{stem}.idx")
+                handle.append(_records(group))
+        return len(ticks)
+
+    def flush(self) -> None:
+        """Push buffered writes to the OS (readers in other processes see them)."""
+        with self._lock:
+            for handle in self._files.values():
+                handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            for handle in self._files.values():
+                handle.close()
+            self._files.clear()
+
+    # ------------------------------------------------------------------
+    # READ PATH (backtests, replay)
+    # ------------------------------------------------------------------
+
+    def days(self) -> List[str]:
+        """Archived days, oldest first ('YYYY-MM-DD')."""
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and len(p.name) == 10)
+
+    def symbols(self, day: Union[date, str], asset_type: str = 'CASH') -> List[str]:
+        """Symbols with ticks of asset_type on day."""
+        day_dir = self._day_dir(day)
+        if not day_dir.is_dir():
+            return []
+        suffix = f"_{asset_type}"
+        stems = {p.name.split('.')[0] for p in day_dir.iterdir() if p.suffix in ('.ticks', '.npz')}
+        return sorted(s[:-len(suffix)] for s in stems if s.endswith(suffix))
+
+    def read(self, symbol: str, day: Union[date, str], start: TimeLike = None,
+             end: TimeLike = None, asset_type: str = 'CASH') -> np.ndarray:
+        """
+        Ticks of one symbol in [start, end] on day.
+
+        Args:
+            symbol: Trading symbol
+            day: Trading day
+            start: 'HH:MM[:SS]' / time / datetime (default: start of day)
+            end: Inclusive end (default: end of day)
+            asset_type: 'CASH' or 'FUT'
+
+        Returns:
+            RECORD_DTYPE array - a view of the memory-mapped file for an open
+            day, decoded in memory for a compacted one; empty if nothing stored
+        """
+        day_dir = self._day_dir(day)
+        stem = _file_stem(symbol, asset_type)
+        start_ms = _to_ms(start, 0)
+        end_ms = _to_ms(end, 86_400_000)
+
+        ticks_path = day_dir / f"{stem}.ticks"
+        if ticks_path.exists():
+            count = ticks_path.stat().st_size // RECORD_DTYPE.itemsize
+            if count == 0:
+                return np.zeros(0, dtype=RECORD_DTYPE)
+            data = np.memmap(ticks_path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+            lo, hi = self._index_bounds(day_dir / f"{stem}.idx", start_ms, end_ms, count)
+        else:
+            packed_path = day_dir / f"{stem}.npz"
+            if not packed_path.exists():
+                return np.zeros(0, dtype=RECORD_DTYPE)
+            data = _unpack(packed_path)
+            lo, hi = 0, len(data)
+
+        window = data[lo:hi]
+        ts = window['ts_ms']
+        a = int(np.searchsorted(ts, start_ms, side='left'))
+        b = int(np.searchsorted(ts, end_ms, side='right'))
+        return window[a:b]
+
+    @staticmethod
+    def _index_bounds(idx_path: Path, start_ms: int, end_ms: int, count: int) -> Tuple[int, int]:
+        """Record range covering the minutes of [start_ms, end_ms] (whole file without an index)."""
+        if not idx_path.exists():
+            return 0, count
+        index = np.fromfile(idx_path, dtype=INDEX_DTYPE)
+        if not len(index):
+            return 0, count
+        minutes = index['minute']
+        i = int(np.searchsorted(minutes, start_ms // 60000, side='right')) - 1
+        j = int(np.searchsorted(minutes, end_ms // 60000, side='right'))
+        lo = int(index['offset'][i]) if i >= 0 else 0
+        hi = int(index['offset'][j]) if j < len(index) else count
+        return lo, min(hi, count)
+
+    @staticmethod
+    def to_tick_dicts(symbol: str, records: np.ndarray, day: Union[date, str, None] = None) -> List[dict]:
+        """
+        Records -> OrderFlowAnalyzer tick dicts (rupee prices, best bid/ask and
+        depth totals rebuilt from the levels).
+        """
+        day_str = (day if isinstance(day, str) else day.isoformat()) if day else None
+        rows = []
+        for r in records.tolist():
+            ts_ms, lp, lq, vol, bq, sq, bid_p, ask_p, bid_q, ask_q = r
+            secs = ts_ms // 1000
+            clock = f"{secs // 3600:02d}:{secs // 60 % 60:02d}:{secs % 60:02d}"
+            tick = {
+                'symbol': symbol,
+                'ts': f"{day_str} {clock}" if day_str else clock,
+                'last_price': lp / 100.0, 'last_quantity': lq, 'volume': vol,
+                'buy_quantity': bq, 'sell_quantity': sq,
+                'best_bid': bid_p[0] / 100.0, 'best_ask': ask_p[0] / 100.0,
+                'bid_depth_total': sum(bid_q), 'ask_depth_total': sum(ask_q),
+            }
+            for i in range(5):
+                tick[f'bid_l{i + 1}_qty'] = bid_q[i]
+                tick[f'ask_l{i + 1}_qty'] = ask_q[i]
+                tick[f'bid_l{i + 1}_price'] = bid_p[i] / 100.0
+                tick[f'ask_l{i + 1}_price'] = ask_p[i] / 100.0
+            rows.append(tick)
+        return rows
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def compact_day(self, day: Union[date, str]) -> Tuple[int, int]:
+        """
+        Replace a closed day's .ticks/.idx files with delta-encoded .npz files.
+
+        Returns:
+            (bytes_before, bytes_after)
+        """
+        day_dir = self._day_dir(day)
+        day_key = day_dir.name
+        with self._lock:
+            if any(key[0] == day_key for key in self._files):
+                raise ValueError(f"{day_key} is still being written")
+        before = after = 0
+        for ticks_path in sorted(day_dir.glob('*.ticks')):
+            idx_path = ticks_path.with_suffix('.idx')
+            count = ticks_path.stat().st_size // RECORD_DTYPE.itemsize
+            data = np.fromfile(ticks_path, dtype=RECORD_DTYPE, count=count)
+            packed_path = ticks_path.with_suffix('.npz')
+            _pack(packed_path, data)
+            before += ticks_path.stat().st_size + (idx_path.stat().st_size if idx_path.exists() else 0)
+            after += packed_path.stat().st_size
+            ticks_path.unlink()
+            if idx_path.exists():
+                idx_path.unlink()
+        if before:
+            logger.info(f"Compacted tick archive {day_key}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+        return before, after
+
+    def compact_closed_days(self, today: Optional[date] = None) -> int:
+        """Compact every day before today that still has raw files. Returns days compacted."""
+        today_key = (today or date.today()).isoformat()
+        compacted = 0
+        for day in self.days():
+            if day < today_key and any(self._day_dir(day).glob('*.ticks')):
+                self.compact_day(day)
+                compacted += 1
+        return compacted
+
+    def cleanup(self, retention_days: Optional[int] = None, today: Optional[date] = None) -> int:
+        """Delete days older than retention_days (default: config.TICK_ARCHIVE_RETENTION_DAYS)."""
+        retention_days = retention_days or config.TICK_ARCHIVE_RETENTION_DAYS
+        cutoff = ((today or date.today()) - timedelta(days=retention_days)).isoformat()
+        removed = 0
+        for day in self.days():
+            if day < cutoff:
+                shutil.rmtree(self._day_dir(day), ignore_errors=True)
+                removed += 1
+        return removed
+
+    def stats(self) -> Dict:
+        """File count and size per day."""
+        result = {}
+        for day in self.days():
+            files = [p for p in self._day_dir(day).iterdir() if p.suffix in ('.ticks', '.idx', '.npz')]
+            result[day] = {
+                'files': len(files),
+                'compacted': not any(p.suffix == '.ticks' for p in files),
+                'size_mb': round(sum(p.stat().st_size for p in files) / 1024 / 1024, 2),
+            }
+        return result
+
+
+def _pack(path: Path, data: np.ndarray) -> None:
+    """Delta-encode each column along time and deflate (np.savez_compressed)."""
+    columns = {}
+    for name in RECORD_DTYPE.names:
+        column = data[name].astype(np.int64)
+        if len(column):
+            column = np.diff(column, axis=0, prepend=np.zeros_like(column[:1]))
+        columns[name] = column
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, **columns)
+    os.replace(tmp, path)
+
+
+def _unpack(path: Path) -> np.ndarray:
+    with np.load(path) as packed:
+        n = len(packed['ts_ms'])
+        data = np.zeros(n, dtype=RECORD_DTYPE)
+        for name in RECORD_DTYPE.names:
+            data[name] = np.cumsum(packed[name], axis=0)
+    return data
+
+
+_instances: Dict[str, TickArchive] = {}
+_instances_lock = threading.Lock()
+
+
+def get_tick_archive(root: Optional[str] = None) -> TickArchive:
+    """
+    Get the process-wide TickArchive for a directory.
+
+    Args:
+        root: Archive directory (default: config.TICK_ARCHIVE_DIR)
+    """
+    key = str(root or config.TICK_ARCHIVE_DIR)
+    with _instances_lock:
+        if key not in _instances:
+            _instances[key] = TickArchive(key)
+        return _instances[key]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Binary order flow tick archive')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='Show archived days')
+    compact_parser = sub.add_parser('compact', help='Compact closed days')
+    compact_parser.add_argument('--day', help='Only this day YYYY-MM-DD (default: every closed day)')
+    args = parser.parse_args()
+
+    archive = get_tick_archive()
+    if args.command == 'stats':
+        for day, info in archive.stats().items():
+            state = 'compacted' if info['compacted'] else 'raw'
+            print(f"{day}: {info['files']} files, {info['size_mb']} MB ({state})")
+    elif args.day:
+        archive.compact_day(args.day)
+    else:
+        print(f"Compacted {archive.compact_closed_days()} day(s)")
@@ -40,7 +40,7 @@ class UnifiedDataCache:
         'historical_3year': 24,  # 3-year daily candles - refresh daily (for value screener)
         'intraday_5d': 1,        # 15-min candles - refresh hourly
         'intraday_1d': 0.25,     # 15-min candles - refresh every 15 min
-        'intraday_1min': 0.25,   # 1-min candles - refresh every 15 min (for volume profile)
+        'intraday_1min': 1,      # Today's 1-min candles - shared by the 3:00/3:15/3:25 volume profile runs
         'hourly_10d': 6,         # Hourly candles - refresh every 6 hours (for pre-market patterns)
         'greeks_diff': 24        # Greeks baseline - one per trading day (date-stamped key)
     }
@@ -185,6 +185,35 @@ class UnifiedDataCache:
         logger.debug(f"{symbol} ({data_type}): Cached {len(data)} candles")
         self._save_cache(data_type)
 
+    def set_data_batch(self, data: Dict[str, List[Dict]], data_type: str = 'historical_30d'):
+        """
+        Cache data for many stocks, writing the cache file once.
+
+        Args:
+            data: {symbol: list of OHLCV dicts}
+            data_type: Type of data (see set_data)
+        """
+        if data_type not in self.caches:
+            logger.error(f"Invalid data type: {data_type}")
+            return
+
+        cached_at = datetime.now().isoformat()
+        for symbol, candles in data.items():
+            serializable_data = []
+            for candle in candles:
+                candle_copy = candle.copy()
+                if 'date' in candle_copy and hasattr(candle_copy['date'], 'isoformat'):
+                    candle_copy['date'] = candle_copy['date'].isoformat()
+                serializable_data.append(candle_copy)
+            self.caches[data_type][symbol] = {
+                'data': serializable_data,
+                'cached_at': cached_at,
+                'candle_count': len(candles)
+            }
+
+        logger.debug(f"{data_type}: Cached {len(data)} stocks")
+        self._save_cache(data_type)
+
     def clear_expired(self, data_type: Optional[str] = None):
         """
         Remove all expired cache entries.
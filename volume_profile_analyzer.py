@@ -5,21 +5,38 @@ Runs at 3:25 PM daily (near market close) to detect P-shaped and B-shaped volume
 
 P-shaped: Price held at highs (bullish strength/continuation signal)
 B-shaped: Price held at lows (bearish weakness/continuation signal)
+
+Candles: today's 1-minute bars are read from central_quotes.db intraday_candles
+and merged with the series cached by the previous run; Kite historical_data is
+called only from the first missing minute (the last bar when only the tail is
+missing, the whole day when the head is), from VOLUME_PROFILE_FETCH_WORKERS
+threads sharing the historical rate limiter. The merged series is cached for
+the next run, and profiles are computed across VOLUME_PROFILE_ANALYSIS_WORKERS
+processes.
+
+The '1minute' rows are written only by the order flow collector's tick bar
+builder, i.e. with ENABLE_TICK_MINUTE_BARS=true (default false) and only for
+the symbols it subscribes. Without them every stock is fetched from Kite on
+the first run of the day, and the cache serves the later runs.
 """
 
 import json
 import logging
 import time
 import argparse
-from datetime import datetime, timedelta, time as dt_time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta, time as dt_time
 from typing import Dict, List, Optional
 from kiteconnect import KiteConnect
 import config
+from central_quote_db import get_central_db
+from kite_rate_limiter import get_historical_rate_limiter
 from unified_data_cache import UnifiedDataCache
 from volume_profile_calculator import VolumeProfileCalculator
 from volume_profile_report_generator import VolumeProfileReportGenerator
 from telegram_notifier import TelegramNotifier
 from market_utils import is_trading_day, get_current_ist_time
+from instrument_master import get_instrument_master
 
 # Configure logging
 logging.basicConfig(
@@ -33,18 +50,116 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+MARKET_OPEN = dt_time(9, 15)
+SESSION_MINUTES = 375                # 09:15 - 15:29
+CANDLE_INTERVAL = '1minute'          # intraday_candles interval written by the tick bar builder
+
+_logged_missing_tick_bars = False    # The ENABLE_TICK_MINUTE_BARS notice is logged once per process
+
+
+def _bar_minute(value) -> datetime:
+    """Candle `date` (Kite datetime or stored ISO text) -> naive IST minute."""
+    t = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    return t.replace(tzinfo=None, second=0, microsecond=0)
+
+
+def merge_candles(*series: List[Dict], until: Optional[datetime] = None) -> List[Dict]:
+    """
+    Union of 1-minute candle series keyed by minute, oldest-first.
+
+    Args:
+        series: Candle lists; for a minute present in several, the later series wins
+        until: Drop candles after this minute
+
+    Returns:
+        Merged candle list
+    """
+    merged = {}
+    for bars in series:
+        for bar in bars:
+            merged[_bar_minute(bar['date'])] = bar
+    return [merged[m] for m in sorted(merged) if until is None or m <= until]
+
+
+def _first_missing_minute(candles: List[Dict], start: datetime, end: datetime) -> Optional[datetime]:
+    """
+    First minute of [start, end] without a candle.
+
+    Args:
+        candles: 1-minute candles, oldest-first
+        start, end: Naive IST minutes, inclusive
+
+    Returns:
+        The minute, or None when every minute of the range has a candle
+    """
+    minutes = {_bar_minute(c['date']) for c in candles}
+    expected = int((end - start).total_seconds() // 60) + 1
+    if sum(1 for m in minutes if start <= m <= end) >= expected:
+        return None
+    t = start
+    while t in minutes:
+        t += timedelta(minutes=1)
+    return t
+
+
+def _chunks(items: List[str], count: int) -> List[List[str]]:
+    """Split items into at most `count` contiguous, near-equal chunks."""
+    size = -(-len(items) // max(count, 1))
+    return [items[i:i + size] for i in range(0, len(items), size)] if items else []
+
+
+def analyze_stock(calculator: VolumeProfileCalculator, symbol: str, intraday_data: List[Dict]) -> Dict:
+    """
+    Calculate volume profile for a single stock.
+
+    Args:
+        calculator: Volume profile calculator
+        symbol: Stock symbol
+        intraday_data: List of 1-minute candles
+
+    Returns:
+        Volume profile result dict
+    """
+    try:
+        profile = calculator.calculate_volume_profile(intraday_data)
+
+        return {
+            'symbol': symbol,
+            'success': True,
+            **profile
+        }
+    except Exception as e:
+        logger.error(f"{symbol}: Volume profile calculation failed - {e}", exc_info=True)
+        return {
+            'symbol': symbol,
+            'success': False,
+            'error': str(e),
+            'profile_shape': 'ERROR',
+            'confidence': 0.0
+        }
+
+
+def analyze_stocks(calculator: VolumeProfileCalculator, candles_map: Dict[str, List[Dict]]) -> List[Dict]:
+    """Volume profiles for {symbol: candles}, in the map's order (process pool worker)."""
+    return [analyze_stock(calculator, symbol, candles) for symbol, candles in candles_map.items()]
+
 
 class VolumeProfileAnalyzer:
     """Main orchestrator for volume profile analysis"""
 
-    def __init__(self, execution_time: str = "3:25PM"):
+    def __init__(self, execution_time: str = "3:25PM", session_date: Optional[date] = None,
+                 session_cutoff: Optional[dt_time] = None):
         """
         Initialize volume profile analyzer.
 
         Args:
             execution_time: "3:25PM" (end of day analysis)
+            session_date: Trading day to analyze (default: today)
+            session_cutoff: Last candle minute to include (default: now)
         """
         self.execution_time = execution_time
+        self.session_date = session_date or datetime.now().date()
+        self.session_cutoff = session_cutoff
         logger.info(f"="*70)
         logger.info(f"Volume Profile Analyzer - {execution_time} Execution")
         logger.info(f"="*70)
@@ -58,6 +173,7 @@ class VolumeProfileAnalyzer:
         self.profile_calculator = VolumeProfileCalculator()
         self.report_generator = VolumeProfileReportGenerator()
         self.telegram = TelegramNotifier()
+        self.historical_limiter = get_historical_rate_limiter()
 
         # Load F&O stock list
         self.fo_stocks = self._load_fo_stocks()
@@ -85,15 +201,10 @@ class VolumeProfileAnalyzer:
         Returns:
             Dict mapping symbol to instrument_token
         """
-        logger.info("Building instrument token map from Kite API...")
+        logger.info("Building instrument token map from instrument master...")
 
         try:
-            instruments = self.kite.instruments("NSE")
-            token_map = {}
-
-            for instrument in instruments:
-                if instrument['segment'] == 'NSE' and instrument['tradingsymbol'] in self.fo_stocks:
-                    token_map[instrument['tradingsymbol']] = instrument['instrument_token']
+            token_map = get_instrument_master(self.kite).index("NSE").tokens(self.fo_stocks, segment="NSE")
 
             logger.info(f"Built token map for {len(token_map)} stocks")
             return token_map
@@ -102,12 +213,20 @@ class VolumeProfileAnalyzer:
             logger.error(f"Error building instrument token map: {e}")
             return {}
 
-    def _fetch_intraday_1min_data(self, symbol: str) -> List[Dict]:
+    def _session_end(self) -> datetime:
+        """Last candle minute of the analyzed session (naive IST)."""
+        if self.session_cutoff is not None:
+            return datetime.combine(self.session_date, self.session_cutoff)
+        return get_current_ist_time().replace(tzinfo=None, second=0, microsecond=0)
+
+    def _fetch_intraday_1min_data(self, symbol: str, from_date: Optional[datetime] = None) -> List[Dict]:
         """
-        Fetch 1-minute intraday candles for today from 9:15 AM to current time.
+        Fetch 1-minute intraday candles for the session from 9:15 AM (or from_date)
+        to the session end.
 
         Args:
             symbol: Stock symbol
+            from_date: First minute to fetch (default: session open)
 
         Returns:
             List of 1-minute OHLCV candles
@@ -118,14 +237,13 @@ class VolumeProfileAnalyzer:
 
         try:
             instrument_token = self.instrument_tokens[symbol]
-            today = datetime.now().date()
-            current_time = get_current_ist_time()
 
-            # Time range: 9:15 AM to current time (3:00 PM or 3:15 PM)
-            from_date = datetime.combine(today, dt_time(9, 15))
-            to_date = current_time
+            # Time range: 9:15 AM (or the missing tail) to current time
+            from_date = from_date or datetime.combine(self.session_date, MARKET_OPEN)
+            to_date = self._session_end()
 
             # Fetch 1-minute candles
+            self.historical_limiter.acquire()
             data = self.kite.historical_data(
                 instrument_token=instrument_token,
                 from_date=from_date,
@@ -137,43 +255,119 @@ class VolumeProfileAnalyzer:
                 logger.warning(f"{symbol}: No intraday data returned")
                 return []
 
-            logger.debug(f"{symbol}: Fetched {len(data)} 1-min candles")
+            logger.debug(f"{symbol}: Fetched {len(data)} 1-min candles from {from_date.strftime('%H:%M')}")
             return data
 
         except Exception as e:
             logger.error(f"{symbol}: Error fetching 1-min data - {e}")
             return []
 
-    def _fetch_with_cache(self, symbol: str) -> List[Dict]:
+    def _read_central_candles(self, symbols: List[str]) -> Dict[str, List[Dict]]:
+        """
+        The session's 1-minute candles from central_quotes.db.
+
+        Args:
+            symbols: Stock symbols
+
+        Returns:
+            {symbol: candles} for symbols the DB has bars for
+        """
+        day = self.session_date.strftime('%Y-%m-%d')
+        next_day = (self.session_date + timedelta(days=1)).strftime('%Y-%m-%d')
+        try:
+            bars_map = get_central_db().get_intraday_candles_batch(
+                symbols, CANDLE_INTERVAL, limit=SESSION_MINUTES, since=day, until=next_day)
+        except Exception as e:
+            logger.warning(f"Central candle read failed, fetching everything from Kite: {e}")
+            return {}
+        bars_map = {symbol: bars for symbol, bars in bars_map.items() if bars}
+
+        global _logged_missing_tick_bars
+        if len(bars_map) < len(symbols) and not _logged_missing_tick_bars:
+            _logged_missing_tick_bars = True
+            logger.info(f"{len(symbols) - len(bars_map)}/{len(symbols)} stocks have no '{CANDLE_INTERVAL}' bars "
+                        f"in central_quotes.db - they are written only by the order flow collector with "
+                        f"ENABLE_TICK_MINUTE_BARS=true (currently "
+                        f"{'on' if config.ENABLE_TICK_MINUTE_BARS else 'off'} here), for its subscribed "
+                        f"symbols; fetching the rest from Kite")
+        return bars_map
+
+    def _read_cached_candles(self, symbols: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Candles cached by an earlier run today, minus the last one (it may have
+        been fetched while its minute was still in progress).
+
+        Returns:
+            {symbol: candles} for symbols with a valid cache entry
+        """
+        if self.session_date != datetime.now().date():
+            return {}
+        cached_map = {}
+        for symbol in symbols:
+            cached = self.cache_manager.get_data(symbol, 'intraday_1min')
+            if cached and _bar_minute(cached[0]['date']).date() == self.session_date:
+                cached_map[symbol] = cached[:-1]
+        return cached_map
+
+    def _load_candles(self, symbols: List[str]) -> Dict[str, List[Dict]]:
         """
-        Fetch 1-min data with intelligent caching for two execution windows.
+        1-minute candles for the session: central DB and the previous run's cache
+        first, Kite only for what both are missing.
 
-        Strategy:
-        - 3:00 PM: Fetch full data (9:15 AM - 3:00 PM), cache with 15-min TTL
-        - 3:15 PM: Check cache (still valid), only fetch delta if needed
+        Every completed minute since 9:15 must have a candle. A symbol missing
+        one is fetched from its first missing minute: the whole day when the
+        head is missing, the hole onwards when a minute inside the series is,
+        and from the last bar (inclusive, so a partial candle is replaced) when
+        only the tail is. Fetches run on VOLUME_PROFILE_FETCH_WORKERS threads,
+        each historical_data() call drawing from the shared historical rate
+        limiter instead of sleeping.
 
         Args:
-            symbol: Stock symbol
+            symbols: Stock symbols
 
         Returns:
-            List of 1-minute candles
+            {symbol: candles} for symbols with data, in symbol order
         """
-        # Check cache first
-        cached_data = self.cache_manager.get_data(symbol, 'intraday_1min')
+        end = self._session_end()
+        session_open = datetime.combine(self.session_date, MARKET_OPEN)
+        # The current minute is still in progress unless the session has a fixed cutoff
+        complete_through = end if self.session_cutoff is not None else end - timedelta(minutes=1)
+
+        db_map = self._read_central_candles(symbols)
+        cached_map = self._read_cached_candles(symbols)
+
+        # Kite candles cached by the previous run win over tick-built bars
+        candles_map = {s: merge_candles(db_map.get(s, []), cached_map.get(s, []), until=end)
+                       for s in symbols}
+
+        gaps = {}
+        for symbol, candles in candles_map.items():
+            missing = _first_missing_minute(candles, session_open, complete_through)
+            if missing is None:
+                continue
+            last = _bar_minute(candles[-1]['date']) if candles else None
+            gaps[symbol] = last if last is not None and missing > last else missing
+
+        partial = sum(1 for t in gaps.values() if t > session_open)
+        logger.info(f"1-min candles: {len(db_map)} stocks from central DB, {len(cached_map)} from cache; "
+                    f"fetching from Kite: {len(gaps) - partial} full days, {partial} from the first "
+                    f"missing minute")
 
-        if cached_data and self.execution_time == "3:15PM":
-            # Cache hit at 3:15 PM - reuse cached data from 3:00 PM run
-            logger.debug(f"{symbol}: Using cached 1-min data")
-            return cached_data
+        if gaps:
+            fetch_symbols = list(gaps)
+            with ThreadPoolExecutor(max_workers=max(1, config.VOLUME_PROFILE_FETCH_WORKERS)) as pool:
+                fetched = list(pool.map(lambda s: self._fetch_intraday_1min_data(s, gaps[s]), fetch_symbols))
+            for symbol, data in zip(fetch_symbols, fetched):
+                if data:
+                    candles_map[symbol] = merge_candles(candles_map[symbol], data, until=end)
 
-        # Fetch fresh data
-        data = self._fetch_intraday_1min_data(symbol)
+        candles_map = {s: c for s, c in candles_map.items() if c}
 
-        if data:
-            # Cache for 15 minutes
-            self.cache_manager.set_data(symbol, data, 'intraday_1min')
+        # The unified cache isn't thread-safe: write it once, from here
+        if self.session_date == datetime.now().date() and candles_map:
+            self.cache_manager.set_data_batch(candles_map, 'intraday_1min')
 
-        return data
+        return candles_map
 
     def _analyze_stock(self, symbol: str, intraday_data: List[Dict]) -> Dict:
         """
@@ -186,64 +380,59 @@ class VolumeProfileAnalyzer:
         Returns:
             Volume profile result dict
         """
-        try:
-            profile = self.profile_calculator.calculate_volume_profile(intraday_data)
-
-            return {
-                'symbol': symbol,
-                'success': True,
-                **profile
-            }
-        except Exception as e:
-            logger.error(f"{symbol}: Volume profile calculation failed - {e}", exc_info=True)
-            return {
-                'symbol': symbol,
-                'success': False,
-                'error': str(e),
-                'profile_shape': 'ERROR',
-                'confidence': 0.0
-            }
+        return analyze_stock(self.profile_calculator, symbol, intraday_data)
 
-    def _batch_analyze(self, symbols: List[str]) -> List[Dict]:
+    def _run_analysis_stage(self, candles_map: Dict[str, List[Dict]]) -> List[Dict]:
         """
-        Batch analyze volume profiles for all stocks with rate limiting.
+        Volume profiles split by symbol across a process pool.
+
+        Each worker runs analyze_stocks on a contiguous slice, so the results
+        (concatenated in symbol order) are what one process would produce.
+        Falls back to running in-process if the pool can't be used.
 
         Args:
-            symbols: List of stock symbols
+            candles_map: {symbol: 1-minute candles}
 
         Returns:
             List of volume profile results
         """
-        results = []
-        total = len(symbols)
-
-        logger.info(f"Starting batch analysis of {total} stocks...")
-
-        for i, symbol in enumerate(symbols, 1):
+        symbols = list(candles_map)
+        workers = min(config.VOLUME_PROFILE_ANALYSIS_WORKERS, len(symbols))
+        if workers > 1:
             try:
-                # Fetch 1-min data (with caching)
-                intraday_data = self._fetch_with_cache(symbol)
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    jobs = [pool.submit(analyze_stocks, self.profile_calculator,
+                                        {s: candles_map[s] for s in chunk})
+                            for chunk in _chunks(symbols, workers)]
+                    return [r for job in jobs for r in job.result()]
+            except Exception as e:
+                logger.warning(f"Parallel analysis failed ({e}); running in-process")
 
-                if not intraday_data:
-                    logger.warning(f"{symbol}: No data available, skipping")
-                    continue
+        return analyze_stocks(self.profile_calculator, candles_map)
 
-                # Calculate volume profile
-                result = self._analyze_stock(symbol, intraday_data)
-                results.append(result)
+    def _batch_analyze(self, symbols: List[str]) -> List[Dict]:
+        """
+        Batch analyze volume profiles for all stocks.
 
-                # Progress logging
-                if i % 50 == 0:
-                    logger.info(f"Progress: {i}/{total} stocks analyzed")
+        Args:
+            symbols: List of stock symbols
 
-                # Rate limiting (0.25s delay to stay under Kite API limits)
-                time.sleep(config.REQUEST_DELAY_SECONDS)
+        Returns:
+            List of volume profile results
+        """
+        logger.info(f"Starting batch analysis of {len(symbols)} stocks...")
 
-            except Exception as e:
-                logger.error(f"{symbol}: Error in batch analysis - {e}")
-                continue
+        started = time.perf_counter()
+        candles_map = self._load_candles(symbols)
+        loaded = time.perf_counter()
+        for symbol in symbols:
+            if symbol not in candles_map:
+                logger.warning(f"{symbol}: No data available, skipping")
+
+        results = self._run_analysis_stage(candles_map)
 
-        logger.info(f"Batch analysis complete: {len(results)} stocks analyzed")
+        logger.info(f"Batch analysis complete: {len(results)} stocks analyzed "
+                    f"(candles {loaded - started:.2f}s, profiles {time.perf_counter() - loaded:.2f}s)")
         return results
 
     def _upload_to_dropbox(self, excel_path: str) -> Optional[str]:
@@ -328,7 +517,7 @@ class VolumeProfileAnalyzer:
         """
         Main analysis pipeline:
         1. Check if trading day (skip weekends/holidays)
-        2. Fetch 1-min data for all 212 stocks (with caching)
+        2. Load 1-min data for all 212 stocks (central DB + cache, Kite for gaps)
         3. Calculate volume profiles
         4. Filter high-confidence P/B shapes (confidence >= 7.5)
         5. Generate Excel report
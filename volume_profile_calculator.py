@@ -5,14 +5,156 @@ Calculates volume profiles from 1-minute candles and detects P-shaped and B-shap
 
 P-shaped profile: POC in top 30% of day's range (distribution at highs - bearish)
 B-shaped profile: POC in bottom 30% of day's range (accumulation at lows - bullish)
+
+The profile is built with NumPy over integer tick indices (VolumeProfile):
+every candle's tick-steps are generated for all candles at once and summed
+into a dense per-tick array with np.add.at; POC and value area are read off
+that array. Results equal the original per-candle dict loop exactly - the
+float additions happen in the same order. A VolumeProfile can be kept and
+extended with new candles (incremental mode) instead of rebuilt each run.
 """
 
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
 import config
 
 logger = logging.getLogger(__name__)
 
+_UNSEEN = np.iinfo(np.int64).max
+
+
+class VolumeProfile:
+    """
+    Price-level volume of one symbol's session, extendable with new candles.
+
+    Candles are kept as arrays; their volume is binned at the tick size of the
+    current day range. Adding candles that leave the tick size unchanged bins
+    only the new candles; a tick size change rebins the session.
+    """
+
+    def __init__(self, calculator: 'VolumeProfileCalculator' = None):
+        """
+        Args:
+            calculator: Supplies the adaptive tick size (default: a new
+                        VolumeProfileCalculator)
+        """
+        self.calculator = calculator or VolumeProfileCalculator()
+        self.high = np.empty(0)
+        self.low = np.empty(0)
+        self.close = np.empty(0)
+        self.volume = np.empty(0)
+        self.tick_size: Optional[float] = None
+        self._binned = 0                   # candles already in the arrays below
+        self._base = 0                     # tick index of _sums[0]
+        self._sums = np.zeros(0)           # volume per tick index
+        self._first = np.zeros(0, dtype=np.int64)   # first contribution ordinal per tick
+        self._contributions = 0
+
+    def __len__(self) -> int:
+        return len(self.high)
+
+    def add_candles(self, candles: List[Dict]) -> None:
+        """Append 1-minute OHLCV candles (dicts with high, low, close, volume)."""
+        if not candles:
+            return
+        rows = np.array([(c['high'], c['low'], c['close'], c['volume']) for c in candles], dtype=float)
+        self.high = np.concatenate([self.high, rows[:, 0]])
+        self.low = np.concatenate([self.low, rows[:, 1]])
+        self.close = np.concatenate([self.close, rows[:, 2]])
+        self.volume = np.concatenate([self.volume, rows[:, 3]])
+
+    @property
+    def day_high(self) -> float:
+        return float(self.high.max())
+
+    @property
+    def day_low(self) -> float:
+        return float(self.low.min())
+
+    def distribution(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bin any pending candles and return the populated price levels.
+
+        Returns:
+            (tick indices ascending, volume per level, first contribution
+            ordinal per level)
+        """
+        tick_size = self.calculator._calculate_tick_size(self.day_high - self.day_low)
+        if tick_size != self.tick_size:
+            self.tick_size = tick_size
+            self._binned = 0
+            self._sums = np.zeros(0)
+            self._first = np.zeros(0, dtype=np.int64)
+            self._contributions = 0
+        if self._binned < len(self):
+            self._bin(slice(self._binned, len(self)))
+            self._binned = len(self)
+
+        seen = np.flatnonzero(self._first != _UNSEEN)
+        return self._base + seen, self._sums[seen], self._first[seen]
+
+    def _bin(self, candles: slice) -> None:
+        """
+        Spread each candle's volume over its tick-steps and add it per tick.
+
+        Per candle (as the original loop): a flat candle puts all volume on
+        round(close / tick); otherwise volume / (int(range / tick) + 1) goes to
+        round(price / tick) for price = low, low + tick, ... <= high. The step
+        prices are a row-wise cumsum of [low, tick, tick, ...] - the same
+        repeated additions - so every candle is stepped in one array pass, and
+        row-major order is the candle-then-step order the dict loop added in.
+        """
+        tick = self.tick_size
+        high, low = self.high[candles], self.low[candles]
+        close, volume = self.close[candles], self.volume[candles]
+        candle_range = high - low
+        flat = candle_range == 0
+        num_bins = np.maximum(1, (candle_range / tick).astype(np.int64) + 1)
+        per_bin = np.where(flat, volume, volume / num_bins)
+
+        width = int(num_bins[~flat].max()) + 2 if (~flat).any() else 1
+        while True:
+            steps = np.full((len(high), width), tick)
+            steps[:, 0] = low
+            prices = np.cumsum(steps, axis=1)
+            inside = prices <= high[:, None]
+            if not inside[:, -1].any():
+                break
+            width *= 2   # float drift left a candle short of its last step
+        inside[flat] = False
+        inside[flat, 0] = True
+        prices[flat, 0] = close[flat]
+
+        counts = inside.sum(axis=1)
+        ticks = np.rint(prices[inside] / tick).astype(np.int64)
+        self._accumulate(ticks, np.repeat(per_bin, counts))
+
+    def _accumulate(self, ticks: np.ndarray, volumes: np.ndarray) -> None:
+        """Add volumes at tick indices in sequence, growing the dense arrays as needed."""
+        if not len(ticks):
+            return
+        low, high = int(ticks.min()), int(ticks.max())
+        if not len(self._sums):
+            self._base = low
+        if low < self._base or high >= self._base + len(self._sums):
+            new_base = min(low, self._base)
+            size = max(high, self._base + len(self._sums) - 1) - new_base + 1
+            sums = np.zeros(size)
+            first = np.full(size, _UNSEEN, dtype=np.int64)
+            offset = self._base - new_base
+            sums[offset:offset + len(self._sums)] = self._sums
+            first[offset:offset + len(self._first)] = self._first
+            self._base, self._sums, self._first = new_base, sums, first
+
+        positions = ticks - self._base
+        np.add.at(self._sums, positions, volumes)
+        ordinals = self._contributions + np.arange(len(ticks), dtype=np.int64)
+        np.minimum.at(self._first, positions, ordinals)
+        self._contributions += len(ticks)
+
 
 class VolumeProfileCalculator:
     """
@@ -40,7 +182,17 @@ class VolumeProfileCalculator:
         logger.info(f"P-shape threshold: POC >= {self.poc_top_threshold * 100}%")
         logger.info(f"B-shape threshold: POC <= {self.poc_bottom_threshold * 100}%")
 
-    def calculate_volume_profile(self, intraday_data: List[Dict]) -> Dict:
+    def new_profile(self, intraday_data: Optional[List[Dict]] = None) -> VolumeProfile:
+        """
+        Start an incremental profile (extend it with VolumeProfile.add_candles
+        and evaluate it with calculate_volume_profile(profile=...)).
+        """
+        profile = VolumeProfile(self)
+        profile.add_candles(intraday_data or [])
+        return profile
+
+    def calculate_volume_profile(self, intraday_data: Optional[List[Dict]] = None,
+                                 profile: Optional[VolumeProfile] = None) -> Dict:
         """
         Calculate volume profile from 1-minute candles.
 
@@ -56,6 +208,9 @@ class VolumeProfileCalculator:
 
         Args:
             intraday_data: List of 1-minute OHLCV candles
+            profile: An incremental VolumeProfile to evaluate instead (its
+                     candles so far; only candles added since its last
+                     evaluation are binned)
 
         Returns:
             {
@@ -72,15 +227,18 @@ class VolumeProfileCalculator:
                 'volume_distribution': Dict[float, int]
             }
         """
+        if profile is None:
+            profile = self.new_profile(intraday_data)
+
         # Validate input
-        if not intraday_data or len(intraday_data) < config.VOLUME_PROFILE_MIN_CANDLES:
-            logger.warning(f"Insufficient data: {len(intraday_data) if intraday_data else 0} candles "
+        if len(profile) < config.VOLUME_PROFILE_MIN_CANDLES:
+            logger.warning(f"Insufficient data: {len(profile)} candles "
                          f"(need {config.VOLUME_PROFILE_MIN_CANDLES}+)")
             return self._empty_result()
 
         # Step 1: Extract day's range
-        day_high = max(candle['high'] for candle in intraday_data)
-        day_low = min(candle['low'] for candle in intraday_data)
+        day_high = profile.day_high
+        day_low = profile.day_low
         day_range = day_high - day_low
 
         # Check for flat day (no movement)
@@ -94,40 +252,42 @@ class VolumeProfileCalculator:
                 'day_high': day_high,
                 'day_low': day_low,
                 'day_range': day_range,
-                'total_volume': sum(c['volume'] for c in intraday_data),
+                'total_volume': sum(profile.volume.tolist()),
                 'profile_shape': 'FLAT',
                 'confidence': 0,
                 'volume_distribution': {}
             }
 
-        # Step 2: Calculate adaptive tick size
-        tick_size = self._calculate_tick_size(day_range)
+        # Steps 2-3: Adaptive tick size, bin prices and aggregate volume
+        ticks, volumes, first_seen = profile.distribution()
+        tick_size = profile.tick_size
 
-        # Step 3: Bin prices and aggregate volume
-        volume_distribution = self._bin_prices(intraday_data, tick_size)
-
-        if not volume_distribution:
+        if not len(ticks):
             logger.warning("Failed to create volume distribution")
             return self._empty_result()
 
-        # Step 4: Calculate total volume
-        total_volume = sum(volume_distribution.values())
+        # Step 4: Calculate total volume (summed in first-seen order, as before)
+        insertion_order = np.argsort(first_seen, kind='stable')
+        total_volume = sum(volumes[insertion_order].tolist())
 
         if total_volume < 10000:  # Very low volume (suspicious)
             logger.warning(f"Very low total volume: {total_volume}")
             return self._empty_result()
 
+        prices = ticks * tick_size
+
         # Step 5: Find POC (Point of Control)
-        poc_price = self._calculate_poc(volume_distribution)
-        poc_volume = volume_distribution[poc_price]
+        poc_index = self._calculate_poc(volumes, first_seen)
+        poc_price = float(prices[poc_index])
+        poc_volume = float(volumes[poc_index])
 
         # Step 6: Calculate POC position in day's range
         poc_position = (poc_price - day_low) / day_range  # 0.0 to 1.0
 
         # Step 7: Calculate value area (70% volume)
-        value_area_high, value_area_low = self._calculate_value_area(
-            volume_distribution, poc_price, total_volume
-        )
+        high_index, low_index = self._calculate_value_area(volumes, poc_index, total_volume)
+        value_area_high = float(prices[high_index])
+        value_area_low = float(prices[low_index])
 
         # Step 8: Classify profile shape
         if poc_position >= self.poc_top_threshold:
@@ -139,7 +299,7 @@ class VolumeProfileCalculator:
 
         # Step 9: Calculate confidence score
         confidence = self._calculate_confidence(
-            volume_distribution, poc_price, poc_volume, total_volume, poc_position, profile_shape
+            volumes, poc_volume, total_volume, poc_position, profile_shape
         )
 
         return {
@@ -153,7 +313,8 @@ class VolumeProfileCalculator:
             'total_volume': total_volume,
             'profile_shape': profile_shape,
             'confidence': round(confidence, 1),
-            'volume_distribution': volume_distribution
+            'volume_distribution': dict(zip(prices[insertion_order].tolist(),
+                                            volumes[insertion_order].tolist()))
         }
 
     def _calculate_tick_size(self, day_range: float) -> float:
@@ -179,142 +340,69 @@ class VolumeProfileCalculator:
 
         return tick_size
 
-    def _bin_prices(self, intraday_data: List[Dict], tick_size: float) -> Dict[float, int]:
-        """
-        Bin 1-minute candles into price levels and aggregate volume.
-
-        Strategy:
-        - For each candle, distribute volume across high-low range
-        - If candle has range, distribute proportionally
-        - If candle is flat (high=low), assign all volume to close price
-
-        Args:
-            intraday_data: List of 1-minute OHLCV candles
-            tick_size: Price bin size
-
-        Returns:
-            Dict mapping price_level -> total_volume
-        """
-        volume_distribution = {}
-
-        for candle in intraday_data:
-            candle_high = candle['high']
-            candle_low = candle['low']
-            candle_close = candle['close']
-            candle_volume = candle['volume']
-
-            # Calculate candle range
-            candle_range = candle_high - candle_low
-
-            if candle_range == 0:
-                # Flat candle - assign all volume to close price
-                price_bin = round(candle_close / tick_size) * tick_size
-                volume_distribution[price_bin] = volume_distribution.get(price_bin, 0) + candle_volume
-            else:
-                # Candle has range - distribute volume proportionally
-                # Number of bins in this candle's range
-                num_bins = max(1, int(candle_range / tick_size) + 1)
-                volume_per_bin = candle_volume / num_bins
-
-                # Iterate through price levels in candle range
-                current_price = candle_low
-                while current_price <= candle_high:
-                    price_bin = round(current_price / tick_size) * tick_size
-                    volume_distribution[price_bin] = volume_distribution.get(price_bin, 0) + volume_per_bin
-                    current_price += tick_size
-
-        return volume_distribution
-
-    def _calculate_poc(self, volume_distribution: Dict[float, int]) -> float:
+    def _calculate_poc(self, volumes: np.ndarray, first_seen: np.ndarray) -> int:
         """
         Find Point of Control (price level with highest volume).
 
+        Ties go to the level that received volume first, as max() over the old
+        insertion-ordered dict did.
+
         Args:
-            volume_distribution: Dict mapping price -> volume
+            volumes: Volume per price level (ascending prices)
+            first_seen: First contribution ordinal per level
 
         Returns:
-            POC price level
+            Index of the POC level
         """
-        if not volume_distribution:
-            return 0.0
-
-        poc_price = max(volume_distribution, key=volume_distribution.get)
-        return poc_price
+        candidates = np.flatnonzero(volumes == volumes.max())
+        return int(candidates[np.argmin(first_seen[candidates])])
 
     def _calculate_value_area(self,
-                              volume_distribution: Dict[float, int],
-                              poc_price: float,
-                              total_volume: int) -> Tuple[float, float]:
+                              volumes: np.ndarray,
+                              poc_index: int,
+                              total_volume: float) -> Tuple[int, int]:
         """
         Calculate value area (price range containing 70% of total volume).
 
         Algorithm:
         1. Start at POC
         2. Expand range up/down to include 70% of total volume
-        3. Expand in direction with more volume at each step
+        3. Expand in direction with more volume at each step (ties go up)
+
+        The greedy walk takes levels in the order of a stable merge of the
+        levels above and below the POC, keyed on the running minimum of each
+        side (a level cannot be taken before the smaller level in front of
+        it). The stopping point is the first cumulative sum reaching the
+        target - same additions, same order as the step-by-step walk.
 
         Args:
-            volume_distribution: Dict mapping price -> volume
-            poc_price: Point of Control price
+            volumes: Volume per price level (ascending prices)
+            poc_index: Index of the POC level
             total_volume: Total volume for the day
 
         Returns:
-            (value_area_high, value_area_low)
+            (high_index, low_index) of the value area
         """
         target_volume = total_volume * 0.70
-        accumulated_volume = volume_distribution.get(poc_price, 0)
-
-        # Sort price levels
-        sorted_prices = sorted(volume_distribution.keys())
-
-        # Find POC index
-        try:
-            poc_index = sorted_prices.index(poc_price)
-        except ValueError:
-            # POC not in sorted list (shouldn't happen)
-            logger.warning(f"POC {poc_price} not found in volume distribution")
-            return poc_price, poc_price
-
-        # Expand from POC
-        low_index = poc_index
-        high_index = poc_index
-
-        while accumulated_volume < target_volume:
-            # Check if we can expand up or down
-            can_expand_up = high_index < len(sorted_prices) - 1
-            can_expand_down = low_index > 0
-
-            if not can_expand_up and not can_expand_down:
-                break  # Reached both ends
-
-            # Determine which direction to expand
-            volume_above = volume_distribution.get(sorted_prices[high_index + 1], 0) if can_expand_up else 0
-            volume_below = volume_distribution.get(sorted_prices[low_index - 1], 0) if can_expand_down else 0
-
-            if volume_above >= volume_below and can_expand_up:
-                # Expand upward
-                high_index += 1
-                accumulated_volume += volume_above
-            elif can_expand_down:
-                # Expand downward
-                low_index -= 1
-                accumulated_volume += volume_below
-            elif can_expand_up:
-                # Can only expand up
-                high_index += 1
-                accumulated_volume += volume_above
-            else:
-                break
+        above = volumes[poc_index + 1:]
+        below = volumes[:poc_index][::-1]
+
+        keys = np.concatenate([np.minimum.accumulate(above) if len(above) else above,
+                               np.minimum.accumulate(below) if len(below) else below])
+        is_below = np.concatenate([np.zeros(len(above)), np.ones(len(below))])
+        order = np.lexsort((is_below, -keys))
 
-        value_area_high = sorted_prices[high_index]
-        value_area_low = sorted_prices[low_index]
+        accumulated = np.cumsum(np.concatenate([volumes[poc_index:poc_index + 1],
+                                                np.concatenate([above, below])[order]]))
+        reached = accumulated >= target_volume
+        steps = int(np.argmax(reached)) if reached.any() else len(order)
 
-        return value_area_high, value_area_low
+        steps_up = int(np.count_nonzero(order[:steps] < len(above)))
+        return poc_index + steps_up, poc_index - (steps - steps_up)
 
     def _calculate_confidence(self,
-                             volume_distribution: Dict[float, int],
-                             poc_price: float,
-                             poc_volume: int,
+                             volumes: np.ndarray,
+                             poc_volume: float,
                              total_volume: int,
                              poc_position: float,
                              profile_shape: str) -> float:
@@ -327,8 +415,7 @@ class VolumeProfileCalculator:
         3. Single peak vs multi-peak distribution (single = more confident)
 
         Args:
-            volume_distribution: Dict mapping price -> volume
-            poc_price: Point of Control price
+            volumes: Volume per price level
             poc_volume: Volume at POC
             total_volume: Total volume for the day
             poc_position: POC position (0.0-1.0)
@@ -360,9 +447,8 @@ class VolumeProfileCalculator:
 
         # Factor 3: Single peak vs multi-peak (0-3 points)
         # Single dominant peak = more confident
-        sorted_volumes = sorted(volume_distribution.values(), reverse=True)
-        if len(sorted_volumes) >= 2:
-            second_highest = sorted_volumes[1]
+        if len(volumes) >= 2:
+            second_highest = float(np.partition(volumes, len(volumes) - 2)[-2])
             peak_dominance = (poc_volume - second_highest) / poc_volume if poc_volume > 0 else 0
             confidence += min(3.0, peak_dominance * 3)  # Max 3 points if POC is 100%+ higher than 2nd peak
         else:
@@ -38,8 +38,10 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
 import config
+from central_db_reader import get_latest_stock_quotes
 from central_quote_db import get_central_db_reader
 from market_utils import is_market_open
+from minute_bus import wait_for_next_minute
 from telegram_notifiers.base_notifier import BaseNotifier
 
 # ── Parameters ──────────────────────────────────────────────────────────────
@@ -618,7 +620,7 @@ class VWAPMoverMonitor:
                 )
 
         # Latest quotes
-        latest = self.db.get_latest_stock_quotes()
+        latest = get_latest_stock_quotes(self.db)
         if not latest:
             logger.warning("No quotes in DB")
             return
@@ -855,6 +857,7 @@ class VWAPMoverMonitor:
         while True:
             self._check_day_reset()
 
+            cycle_start = None
             if is_market_open():
                 cycle_start = time.time()
                 try:
@@ -883,7 +886,11 @@ class VWAPMoverMonitor:
                 self._shutdown(reason)
                 return
 
-            time.sleep(sleep_time)
+            if cycle_start is not None:
+                # Wake on the collector's next commit instead of the fixed timer
+                wait_for_next_minute(sleep_time, after_time=cycle_start)
+            else:
+                time.sleep(sleep_time)
 
 
 def main():
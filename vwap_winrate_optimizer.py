@@ -23,6 +23,10 @@ Baseline: top_n=10, min_pct=0, touch=0.15, c1≥1.5, confirm=0, approach=0,
           nifty=off, window=10:00-14:30, TSL=0.5%
 
 Window: 10:00–14:30 | TSL 0.5% | Last 30 trading days
+
+Per-day features (VWAP, C1 ratios, approach runs, mover ranking) are built
+once; configs are evaluated on them by sweep_engine across SWEEP_WORKERS
+processes and checkpointed to SWEEP_RESULTS_DB, so a rerun resumes.
 """
 
 import json
@@ -33,6 +37,10 @@ from datetime import datetime, timedelta
 from itertools import product
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
+from sweep_engine import run_sweep
+
 # ── Backtest parameters ───────────────────────────────────────────────────────
 TRAILING_SL_PCT          = 0.50
 MAX_TRADES_PER_STOCK     = 2
@@ -339,6 +347,253 @@ def run_day(date, prev_close, all_candles, nifty_candles, timestamps, lot_sizes,
     return trades
 
 
+# ── Precomputed per-day features (the sweep path) ───────────────────────────
+# run_day() re-derives VWAP, C1, approach counts and the mover ranking from the
+# candle lists at every timestamp, for every config. None of that depends on the
+# config, so build_day_features() computes it once per day as arrays, and
+# run_day_features() replays run_day()'s state machine (cooldowns, pending
+# confirmations, trade limits) over them with identical results.
+
+def _seconds(hhmmss):
+    h, m, sec = (int(x) for x in hhmmss.split(':'))
+    return h * 3600 + m * 60 + sec
+
+
+def _runs(prices, falling):
+    """Consecutive strictly falling (or rising) moves ending at each index."""
+    runs = np.zeros(len(prices), dtype=np.int64)
+    run = 0
+    for i in range(1, len(prices)):
+        run = run + 1 if (prices[i] < prices[i-1] if falling else prices[i] > prices[i-1]) else 0
+        runs[i] = run
+    return runs
+
+
+def build_day_features(date, prev_close, all_candles, nifty_candles, timestamps, max_top_n):
+    """
+    Everything run_day() reads, for every timestamp of one day.
+
+    Args:
+        date, prev_close, all_candles, nifty_candles, timestamps: as for run_day()
+        max_top_n: Largest top_n any config will use
+
+    Returns:
+        ({name: array}, symbols) - mover_* arrays are [timestamp, rank] for the
+        top max_top_n movers (sym -1 = no mover), sym_* arrays hold each symbol's
+        prices back to back (sym_off[s]:sym_off[s + 1])
+    """
+    exit_ts = f"{date} 14:30:00"
+    ts_all = np.array(timestamps, dtype=str)
+    n_ts = int(np.searchsorted(ts_all, exit_ts, side='right'))
+    symbols = list(all_candles)
+    n_sym = len(symbols)
+
+    k = np.zeros((n_ts, n_sym), dtype=np.int64)           # candles seen per symbol
+    price_at = np.zeros((n_ts, n_sym))                    # quote at exactly this timestamp
+    latest = np.zeros((n_ts, n_sym))
+    first_seen = np.full(n_sym, n_ts, dtype=np.int64)
+    vwap_k, c1_k, down_k, up_k = [], [], [], []
+    sym_off, sym_price, sym_nexit = [0], [], []
+    steps = np.arange(n_ts)
+
+    for s, sym in enumerate(symbols):
+        cl = sorted(all_candles[sym], key=lambda c: c['timestamp'])
+        prices = np.array([c['price'] for c in cl], dtype=float)
+        volumes = np.array([c['volume'] for c in cl], dtype=float)
+        cts = np.array([c['timestamp'] for c in cl], dtype=str)
+        seen_at = np.searchsorted(ts_all, cts, side='left')
+        k[:, s] = np.searchsorted(seen_at, steps, side='right')
+        if len(cl):
+            first_seen[s] = seen_at[0]
+            last = np.maximum(k[:, s] - 1, 0)
+            latest[:, s] = np.where(k[:, s] > 0, prices[last], 0.0)
+            exact = (k[:, s] > 0) & (cts[last] == ts_all[:n_ts])
+            price_at[:, s] = np.where(exact, prices[last], 0.0)
+
+        # compute_vwap / c1_ratio over the first k candles, for every k
+        deltas = np.zeros(len(cl))
+        if len(cl):
+            deltas[0] = volumes[0]
+            diff = volumes[1:] - volumes[:-1]
+            deltas[1:] = np.where(diff > 0, diff, 0.0)
+        cum_pv, cum_vol = np.cumsum(prices * deltas), np.cumsum(deltas)
+        vwap = np.full(len(cl) + 1, np.nan)
+        ok = np.zeros(len(cl) + 1, dtype=bool)
+        ok[2:] = cum_vol[1:] > 0
+        vwap[ok] = cum_pv[np.flatnonzero(ok) - 1] / cum_vol[np.flatnonzero(ok) - 1]
+        c1 = np.zeros(len(cl) + 1)
+        for n in range(3, len(cl) + 1):
+            avg = cum_vol[n - 3] / (n - 2)
+            c1[n] = deltas[n - 1] / avg if avg > 0 else 0.0
+        down, up = np.full(len(cl) + 1, 99), np.full(len(cl) + 1, 99)
+        down[2:], up[2:] = _runs(prices, True)[1:], _runs(prices, False)[1:]
+        vwap_k.append(vwap); c1_k.append(c1); down_k.append(down); up_k.append(up)
+
+        sym_price.append(prices)
+        sym_off.append(sym_off[-1] + len(cl))
+        sym_nexit.append(int(np.searchsorted(cts, exit_ts, side='right')))
+
+    # Nifty: consecutive moves against each direction up to each timestamp
+    nifty = sorted(nifty_candles, key=lambda c: c['timestamp'])
+    nifty_prices = [c['price'] for c in nifty]
+    m = np.searchsorted(np.array([c['timestamp'] for c in nifty], dtype=str), ts_all[:n_ts], side='right')
+    nifty_down = np.where(m > 0, _runs(nifty_prices, True)[np.maximum(m - 1, 0)] if nifty else 0, 0)
+    nifty_up = np.where(m > 0, _runs(nifty_prices, False)[np.maximum(m - 1, 0)] if nifty else 0, 0)
+
+    # Movers: run_day ranks symbols in the order they were first seen (then
+    # candle-dict order) by |% change|, stably
+    pc = np.array([prev_close.get(sym, 0) or 0 for sym in symbols], dtype=float)
+    seen_order = np.lexsort((np.arange(n_sym), first_seen))
+    shape = (n_ts, max_top_n)
+    mover = {'sym': np.full(shape, -1, dtype=np.int64), 'price': np.zeros(shape), 'pct': np.zeros(shape),
+             'vwap': np.full(shape, np.nan), 'c1': np.zeros(shape), 'approach': np.zeros(shape, dtype=np.int64),
+             'nifty': np.zeros(shape, dtype=np.int64), 'k': np.zeros(shape, dtype=np.int64)}
+    for t in range(n_ts):
+        cand = seen_order[(k[t, seen_order] > 0) & (pc[seen_order] > 0)]
+        pct = (latest[t, cand] - pc[cand]) / pc[cand] * 100
+        top = np.argsort(-np.abs(pct), kind='stable')[:max_top_n]
+        syms, pct = cand[top], pct[top]
+        n = len(syms)
+        kk = k[t, syms]
+        long = pct >= 0
+        mover['sym'][t, :n] = syms
+        mover['price'][t, :n] = latest[t, syms]
+        mover['pct'][t, :n] = pct
+        mover['k'][t, :n] = kk
+        for r, (s, kn) in enumerate(zip(syms.tolist(), kk.tolist())):
+            mover['vwap'][t, r] = vwap_k[s][kn]
+            mover['c1'][t, r] = c1_k[s][kn]
+            mover['approach'][t, r] = down_k[s][kn] if long[r] else up_k[s][kn]
+        mover['nifty'][t, :n] = np.where(long, nifty_down[t], nifty_up[t])
+
+    arrays = {f'mover_{name}': array for name, array in mover.items()}
+    arrays.update({
+        'ts_sec': np.array([_seconds(ts[11:]) for ts in timestamps[:n_ts]], dtype=np.int64),
+        'price_at': price_at,
+        'k': k,
+        'sym_off': np.array(sym_off, dtype=np.int64),
+        'sym_price': np.concatenate(sym_price) if sym_price else np.zeros(0),
+        'sym_nexit': np.array(sym_nexit, dtype=np.int64),
+    })
+    return arrays, symbols
+
+
+def _exit_tsl(path, entry_price, direction, eod_price):
+    """get_exit_tsl() on the prices after entry (path), vectorized."""
+    if direction == "LONG":
+        sl = np.maximum.accumulate(np.maximum(path, entry_price)) * (1 - TRAILING_SL_PCT / 100)
+        hit = np.flatnonzero(path <= sl)
+    else:
+        sl = np.minimum.accumulate(np.minimum(path, entry_price)) * (1 + TRAILING_SL_PCT / 100)
+        hit = np.flatnonzero(path >= sl)
+    if len(hit):
+        return float(sl[hit[0]]), "TSL"
+    return eod_price, "EOD"
+
+
+def run_day_features(date, f, symbols, lot_sizes,
+                     top_n, min_pct, touch_pct, c1_min, confirm, approach_min,
+                     nifty_bars, entry_start, entry_end):
+    """run_day() over build_day_features() arrays - same trades, in the same order."""
+    alert_start = _seconds(f"{entry_start}:00")
+    entry_end_s = _seconds(f"{entry_end}:00")
+    sym_off, sym_price, sym_nexit = f['sym_off'], f['sym_price'], f['sym_nexit']
+
+    def exit_for(s, t, price, direction):
+        lo, n_exit = int(sym_off[s]), int(sym_nexit[s])
+        eod = float(sym_price[lo + n_exit - 1]) if n_exit else None
+        return _exit_tsl(sym_price[lo + int(f['k'][t, s]):lo + n_exit], price, direction, eod)
+
+    def trade(sym, direction, price, ep, reason):
+        lot   = lot_sizes.get(sym, 1)
+        pnl   = (ep - price) if direction == "LONG" else (price - ep)
+        gross = pnl * lot
+        chg   = compute_charges(price, ep, lot, direction)
+        return {'date': date, 'symbol': sym, 'dir': direction, 'lot': lot,
+                'entry': price, 'exit': ep, 'reason': reason,
+                'gross': gross, 'net': gross - chg}
+
+    cooldown    = {}
+    trade_count = defaultdict(int)
+    pending     = {}
+    trades      = []
+
+    for t, ts in enumerate(f['ts_sec'].tolist()):
+        for s in list(pending.keys()):
+            sig = pending[s]
+            sig['elapsed'] += 1
+            if sig['elapsed'] < confirm:
+                continue
+            price_now = float(f['price_at'][t, s])
+            if price_now > 0:
+                direction = sig['direction']
+                confirmed = ((direction == "LONG"  and price_now > sig['vwap']) or
+                             (direction == "SHORT" and price_now < sig['vwap']))
+                if confirmed and trade_count[s] < MAX_TRADES_PER_STOCK:
+                    ep, reason = exit_for(s, t, price_now, direction)
+                    if ep is not None:
+                        trades.append(trade(symbols[s], direction, price_now, ep, reason))
+                        trade_count[s] += 1
+                        cooldown[s] = ts
+            del pending[s]
+
+        if ts < alert_start or ts > entry_end_s:
+            continue
+
+        row = zip(f['mover_sym'][t, :top_n].tolist(), f['mover_price'][t, :top_n].tolist(),
+                  f['mover_pct'][t, :top_n].tolist(), f['mover_vwap'][t, :top_n].tolist(),
+                  f['mover_c1'][t, :top_n].tolist(), f['mover_approach'][t, :top_n].tolist(),
+                  f['mover_nifty'][t, :top_n].tolist())
+        for s, price, pct_change, vwap, c1, approach, nifty_run in row:
+            if s < 0:
+                break
+            if trade_count[s] >= MAX_TRADES_PER_STOCK:
+                continue
+            if s in pending:
+                continue
+            if s in cooldown and (ts - cooldown[s]) / 60 < ALERT_COOLDOWN_MINUTES:
+                continue
+            if abs(pct_change) < min_pct:
+                continue
+            if vwap != vwap:                                  # NaN: no VWAP yet
+                continue
+            if abs(price - vwap) / vwap * 100 > touch_pct:
+                continue
+
+            direction = "LONG" if pct_change >= 0 else "SHORT"
+
+            if ((c1_min > 0 and c1 < c1_min) or (approach_min > 0 and approach < approach_min)
+                    or (nifty_bars > 0 and nifty_run >= nifty_bars)):
+                cooldown[s] = ts
+                continue
+
+            cooldown[s] = ts
+
+            if confirm == 0:
+                ep, reason = exit_for(s, t, price, direction)
+                if ep is not None:
+                    trades.append(trade(symbols[s], direction, price, ep, reason))
+                trade_count[s] += 1
+            else:
+                pending[s] = {'vwap': vwap, 'direction': direction, 'elapsed': 0}
+
+    return trades
+
+
+def evaluate_config(cfg, arrays, meta):
+    """sweep_engine evaluate(): every day of the sweep under one config."""
+    all_trades = []
+    for d, (date, symbols) in enumerate(zip(meta['days'], meta['symbols'])):
+        day = {name: arrays[f'{d}.{name}'] for name in DAY_ARRAYS}
+        all_trades.extend(run_day_features(date, day, symbols, meta['lot_sizes'], *cfg))
+    return {'summary': summarise(all_trades, meta['all_dates']), 'trades': all_trades}
+
+
+DAY_ARRAYS = ('ts_sec', 'price_at', 'k', 'sym_off', 'sym_price', 'sym_nexit',
+              'mover_sym', 'mover_price', 'mover_pct', 'mover_vwap', 'mover_c1',
+              'mover_approach', 'mover_nifty', 'mover_k')
+
+
 def summarise(trades, all_dates):
     if not trades:
         return {'n': 0, 'wr': 0.0, 'net': 0.0, 'avg': 0.0,
@@ -387,9 +642,13 @@ def cfg_label(cfg):
     return "+".join(parts) if parts else "Baseline"
 
 
-def run():
-    lot_sizes = load_lot_sizes()
+def load_data():
+    """
+    Candles, Nifty and prev closes for the last LAST_N_DAYS trading days, in bulk.
 
+    Returns:
+        (all_dates, prev_close_by_date, nifty_by_date, candles_by_date, timestamps_by_date)
+    """
     # ── Load all data in bulk (single pass per table) ─────────────────────────
     print("Loading data from DB (single pass)...")
     conn = sqlite3.connect(DB_PATH)
@@ -479,21 +738,48 @@ def run():
 
     conn.close()
     timestamps_by_date = {d: sorted(timestamps_set_by_date[d]) for d in all_dates}
+    return all_dates, prev_close_by_date, nifty_by_date, candles_by_date, timestamps_by_date
+
+
+def build_sweep(all_dates, prev_close_by_date, nifty_by_date, candles_by_date,
+                timestamps_by_date, lot_sizes, max_top_n):
+    """
+    Per-day features of every trading day, laid out for sweep_engine.
+
+    Returns:
+        (arrays, meta) for run_sweep(..., evaluate_config, ...)
+    """
+    arrays = {}
+    meta = {'all_dates': all_dates, 'days': [], 'symbols': [], 'lot_sizes': lot_sizes,
+            'params': [TRAILING_SL_PCT, MAX_TRADES_PER_STOCK, ALERT_COOLDOWN_MINUTES, max_top_n]}
+    for date in all_dates:
+        if not timestamps_by_date[date]: continue
+        day, symbols = build_day_features(
+            date, prev_close_by_date[date], candles_by_date[date],
+            nifty_by_date.get(date, []), timestamps_by_date[date], max_top_n)
+        d = len(meta['days'])
+        arrays.update({f'{d}.{name}': array for name, array in day.items()})
+        meta['days'].append(date)
+        meta['symbols'].append(symbols)
+    return arrays, meta
+
+
+def run():
+    lot_sizes = load_lot_sizes()
+    all_dates, prev_close_by_date, nifty_by_date, candles_by_date, timestamps_by_date = load_data()
+
+    # Features once; configs evaluated across processes, checkpointed to SWEEP_RESULTS_DB
+    print("Precomputing per-day features...")
+    max_top_n = max(max(cfg[0] for cfg in PHASE1_CONFIGS.values()), max(PHASE2_SWEEP['top_n']))
+    arrays, meta = build_sweep(all_dates, prev_close_by_date, nifty_by_date, candles_by_date,
+                               timestamps_by_date, lot_sizes, max_top_n)
+
+    def run_configs(cfgs, progress=None):
+        results = run_sweep('vwap_winrate', evaluate_config, cfgs, arrays, meta, progress=progress)
+        return {cfg: (r['summary'], r['trades']) for cfg, r in results.items()}
 
     def run_config(cfg_tuple):
-        top_n, min_pct, touch_pct, c1_min, confirm, approach, nifty_bars, start, end = cfg_tuple
-        all_trades = []
-        for date in all_dates:
-            if not timestamps_by_date[date]: continue
-            day_trades = run_day(
-                date, prev_close_by_date[date],
-                candles_by_date[date], nifty_by_date.get(date, []),
-                timestamps_by_date[date], lot_sizes,
-                top_n, min_pct, touch_pct, c1_min, confirm, approach,
-                nifty_bars, start, end
-            )
-            all_trades.extend(day_trades)
-        return summarise(all_trades, all_dates), all_trades
+        return run_configs([cfg_tuple])[tuple(cfg_tuple)]
 
     W = 130
 
@@ -564,8 +850,9 @@ def run():
 
     phase1_results = {}
     baseline_s = None
+    phase1_runs = run_configs(PHASE1_CONFIGS.values())
     for label, cfg in PHASE1_CONFIGS.items():
-        s, trades = run_config(cfg)
+        s, trades = phase1_runs[cfg]
         phase1_results[label] = (s, cfg)
         target_mark = "  🎯 best" if s['avg'] >= AVG_TRADE_TARGET and s['n'] >= MIN_TRADES_MONTH else ""
         base_mark   = "  ← baseline" if label == "Baseline" else ""
@@ -611,25 +898,22 @@ def run():
                     len(PHASE2_SWEEP['end']))
     print(f"  Running {total_combos} combinations...")
 
+    def progress(done, total):
+        if done % 50 == 0:
+            print(f"  ... {done}/{total} done")
+
     hits_70 = []
-    done = 0
-    for (top_n, min_pct, touch_pct, c1_min, confirm, approach,
-         nifty_bars, start, end) in product(
-            PHASE2_SWEEP['top_n'],    PHASE2_SWEEP['min_pct'],
-            PHASE2_SWEEP['touch_pct'],PHASE2_SWEEP['c1_min'],
-            PHASE2_SWEEP['confirm'],  PHASE2_SWEEP['approach'],
-            PHASE2_SWEEP['nifty_bars'],PHASE2_SWEEP['start'],
-            PHASE2_SWEEP['end']):
-
-        cfg = (top_n, min_pct, touch_pct, c1_min, confirm, approach,
-               nifty_bars, start, end)
-        s, trades = run_config(cfg)
+    combos = list(product(
+        PHASE2_SWEEP['top_n'],    PHASE2_SWEEP['min_pct'],
+        PHASE2_SWEEP['touch_pct'],PHASE2_SWEEP['c1_min'],
+        PHASE2_SWEEP['confirm'],  PHASE2_SWEEP['approach'],
+        PHASE2_SWEEP['nifty_bars'],PHASE2_SWEEP['start'],
+        PHASE2_SWEEP['end']))
+    for cfg, (s, trades) in run_configs(combos, progress).items():
         combo_results.append((cfg, s, trades))
         if s['avg'] >= AVG_TRADE_TARGET and s['n'] >= MIN_TRADES_MONTH:
             hits_70.append((cfg, s, trades))
-        done += 1
-        if done % 50 == 0:
-            print(f"  ... {done}/{total_combos} done | hits so far: {len(hits_70)}")
+    print(f"  {len(combos)}/{total_combos} done | hits: {len(hits_70)}")
 
     # Sort all combos by avg net/trade (descending), break ties by trade count
     combo_results.sort(key=lambda x: (x[1]['avg'], x[1]['n']), reverse=True)